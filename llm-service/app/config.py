@@ -14,6 +14,8 @@ class Settings(BaseSettings):
     # LLM Configuration
     llm_provider: Literal["openai", "ollama", "anthropic"] = "ollama"
     llm_model: str = "qwen2.5:7b"
+    llm_warm_up: bool = True
+    llm_user_key_cache_size: int = 32
 
     # OpenAI
     openai_api_key: str = ""
@@ -23,18 +25,48 @@ class Settings(BaseSettings):
 
     # Ollama
     ollama_base_url: str = "http://localhost:11434/v1"
+    ollama_keep_alive: str = "30m"
+    ollama_num_ctx_min: int = 4096
+    ollama_num_ctx_max: int = 32768
+    ollama_num_predict: int = 4096
+    ollama_residency_ping_seconds: int = 240
 
     # Supabase
     supabase_url: str
     supabase_anon_key: str
     supabase_service_role_key: str
 
+    # Pagination cursors are HMAC-signed with this secret (the service role key if empty)
+    cursor_signing_secret: str = ""
+
     # API Configuration
     cors_origins: str = "http://localhost:5173,http://localhost:5174,http://localhost:5175,http://localhost:3000"
 
+    # Sync idempotency: replays within the TTL return stored results (0 disables).
+    # Client keys are honoured for a day; request fingerprints only catch retries
+    # and double submits, so a note sent again later is synced again.
+    sync_idempotency_ttl_seconds: int = 86400
+    sync_fingerprint_ttl_seconds: int = 300
+
     # Entity Resolution Configuration (Feature 003)
     fuzzy_match_first_name_threshold: float = 0.8
 
+    # Query intent parsing
+    intent_classifier_enabled: bool = True
+    intent_classifier_threshold: float = 0.6
+    intent_log_path: str = ""
+
+    # Tracing ("none" disables span recording)
+    tracing_exporter: Literal["none", "console", "file", "otel"] = "none"
+    tracing_file_path: str = "traces.jsonl"
+
+    # Profiling (admin-only /api/debug endpoints and slow-request capture)
+    profiling_enabled: bool = False
+    profiling_admin_token: str = ""
+    profiling_sample_interval_ms: float = 10.0
+    slow_request_threshold_ms: float = 2000.0
+    slow_request_buffer_size: int = 50
+
 
 # Global settings instance
 settings = Settings()
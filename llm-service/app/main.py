@@ -1,10 +1,21 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config import settings
-from app.routes import extract, stream, query
+from app.routes import debug, extract, metrics, query, stream
+from app.services.llm import (
+    get_provider_stats,
+    start_residency_ping,
+    stop_residency_ping,
+    warm_up_llm_provider,
+)
+from app.services.metrics import monitor_event_loop, render_metrics
+from app.services.profiling import SlowRequestMiddleware
+from app.services.supabase_sync import preload_source_ids
+from app.utils.date_parser import preload_date_parser
 
 
 @asynccontextmanager
@@ -13,7 +24,16 @@ async def lifespan(app: FastAPI):
     print("Tether Intelligence LLM Service")
     print(f"LLM Provider: {settings.llm_provider}")
     print("=" * 50)
+    preload_date_parser()
+    preload_source_ids()
+    if settings.llm_warm_up:
+        warm_up_llm_provider()
+        start_residency_ping()
+    loop_monitor = asyncio.create_task(monitor_event_loop())
     yield
+    loop_monitor.cancel()
+    if settings.llm_warm_up:
+        stop_residency_ping()
 
 
 app = FastAPI(
@@ -31,9 +51,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.profiling_enabled:
+    app.add_middleware(SlowRequestMiddleware)
+
 app.include_router(extract.router, prefix="/api", tags=["extract"])
 app.include_router(stream.router, prefix="/api", tags=["stream"])
 app.include_router(query.router, prefix="/api", tags=["query"])
+app.include_router(metrics.router, prefix="/api", tags=["metrics"])
+app.include_router(debug.router, prefix="/api", tags=["debug"], include_in_schema=False)
 
 
 @app.get("/health")
@@ -43,9 +68,17 @@ async def health_check():
         "status": "healthy",
         "provider": settings.llm_provider,
         "model": settings.llm_model,
+        "llm": get_provider_stats(),
     }
 
 
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus metrics: stage latencies, DB round-trips, executor, event loop and websocket gauges."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
 
@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field, AliasChoices, ConfigDict, model_validator
 
+from app.models.usage import LLMUsageSummary
+
 
 # Enum definitions matching database schema
 class EntityType(str, Enum):
@@ -283,6 +285,10 @@ class SyncResults(BaseModel):
         default_factory=list,
         description="Any errors that occurred during sync"
     )
+    replayed: bool = Field(
+        default=False,
+        description="True when these are the stored results of an earlier sync with the same idempotency key"
+    )
 
 
 def summarize_reasoning(reasoning: Reasoning) -> str:
@@ -368,3 +374,7 @@ class ClassifiedExtraction(BaseModel):
         default_factory=list,
         description="Entity resolution results for person references (List[EntityResolutionResult])"
     )
+    llm_usage: LLMUsageSummary | None = Field(
+        default=None,
+        description="Tokens, latency and cost of the LLM calls made for this extraction"
+    )
@@ -5,6 +5,8 @@ from typing import Any
 
 from pydantic import BaseModel, Field
 
+from app.models.usage import LLMUsageSummary
+
 
 class QueryIntent(str, Enum):
     ENTITY_SEARCH = "entity_search"
@@ -44,12 +46,17 @@ class QueryPlan(BaseModel):
 class QueryRequest(BaseModel):
     question: str = Field(description="Natural language question")
     context: str | None = Field(default=None, description="Optional conversation context")
+    cursor: str | None = Field(
+        default=None,
+        description="next_cursor from a previous page; the question is then not parsed again"
+    )
+    page_size: int | None = Field(default=None, ge=1, le=200, description="Rows per page")
 
 
 class QueryResult(BaseModel):
     question: str
     intent: QueryIntent
-    answer: str = Field(description="Natural language answer")
+    answer: str = Field(description="Natural language answer (first page only; empty on later pages)")
     data: list[dict[str, Any]] = Field(
         default_factory=list,
         description="Structured result data (entities, paths, intel, etc.)"
@@ -58,3 +65,11 @@ class QueryResult(BaseModel):
         default="generic",
         description="Type of data returned: entities, path, intel, relations, count"
     )
+    next_cursor: str | None = Field(
+        default=None,
+        description="Cursor for the next page, or None if this is the last page"
+    )
+    llm_usage: LLMUsageSummary | None = Field(
+        default=None,
+        description="Tokens, latency and cost of the LLM calls made for this query"
+    )
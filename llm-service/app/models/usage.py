@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from pydantic import BaseModel, Field
+
+
+class TokenUsage(BaseModel):
+    """Token counts for one LLM call (mirrors the Go service's TokenUsage, plus cache fields)."""
+    prompt: int = Field(default=0, description="All input tokens, cached or not")
+    completion: int = Field(default=0, description="Output tokens")
+    total: int = Field(default=0, description="prompt + completion")
+    cached_prompt: int = Field(default=0, description="Input tokens served from the prompt cache")
+    cache_write: int = Field(default=0, description="Input tokens written to the prompt cache (Anthropic)")
+
+    @property
+    def uncached_prompt(self) -> int:
+        return self.prompt - self.cached_prompt
+
+
+class LLMUsageSummary(BaseModel):
+    """LLM calls made while serving one request."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    retries: int = 0
+    validation_failures: int = 0
+    latency_ms: float = Field(default=0.0, description="Sum of LLM call latencies")
+    cost_usd: float | None = Field(default=None, description="Estimated cost, None for unpriced models")
+    endpoints: list[str] = Field(default_factory=list, description="Call sites in call order")
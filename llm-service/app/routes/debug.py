@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import asyncio
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+
+from app.config import settings
+from app.services.profiling import StackSampler, get_slow_requests, render_folded
+
+router = APIRouter()
+
+MAX_PROFILE_SECONDS = 60
+
+
+def require_profiling_admin(x_admin_token: str | None = Header(None)) -> None:
+    """
+    Guard for the profiling endpoints.
+
+    They do not exist unless PROFILING_ENABLED is set, and require the
+    X-Admin-Token header to match PROFILING_ADMIN_TOKEN.
+    """
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not settings.profiling_admin_token or not x_admin_token or not hmac.compare_digest(
+        x_admin_token, settings.profiling_admin_token
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.get("/debug/profile", response_class=PlainTextResponse, dependencies=[Depends(require_profiling_admin)])
+async def cpu_profile(
+    seconds: float = Query(10.0, gt=0, le=MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(10.0, ge=1, le=1000),
+):
+    """
+    Sample the stacks of every thread in this worker for the given duration.
+
+    Returns collapsed stacks ("frame;frame;frame count" per line), the input
+    format of flamegraph.pl, speedscope and inferno. Requests keep being served
+    while sampling.
+    """
+    sampler = StackSampler(interval_s=interval_ms / 1000).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        samples = sampler.stop()
+    return render_folded(samples)
+
+
+@router.get("/debug/slow-requests", dependencies=[Depends(require_profiling_admin)])
+async def slow_requests():
+    """
+    Requests slower than SLOW_REQUEST_THRESHOLD_MS, newest first.
+
+    Each entry has the stage breakdown, database round-trips and collapsed
+    stack samples taken while the request was over the threshold.
+    """
+    return {"threshold_ms": settings.slow_request_threshold_ms, "requests": get_slow_requests()}
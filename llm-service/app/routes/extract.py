@@ -6,6 +6,8 @@ from pydantic import BaseModel
 from app.models.extraction import ClassifiedExtraction
 from app.services.auth import verify_supabase_jwt, create_service_role_client, get_user_info
 from app.services.extraction import ExtractionService, get_extraction_service
+from app.services.llm_usage import collect_llm_calls, summarize_calls
+from app.services.metrics import stage, track_request
 from app.services.supabase_sync import SupabaseSyncService
 
 router = APIRouter()
@@ -17,6 +19,7 @@ class ExtractionRequest(BaseModel):
     source_code: str | None = "LLM"
     sync_to_db: bool = True
     anthropic_api_key: str | None = None
+    idempotency_key: str | None = None
 
 
 @router.post("/extract", response_model=ClassifiedExtraction)
@@ -40,48 +43,54 @@ async def extract_intelligence(
     Returns:
         ClassifiedExtraction with classification, extraction, entity resolutions, and clarification requests
     """
-    user_id = None
-    user_name = None
-    if authorization:
-        token = authorization.replace("Bearer ", "")
-        user_id = verify_supabase_jwt(token)
-        if not user_id and request.sync_to_db:
-            raise HTTPException(status_code=401, detail="Invalid authentication token")
-
-        if user_id:
-            user_info = get_user_info(user_id)
-            if user_info:
-                user_name = user_info.get("name")
-
-    supabase = create_service_role_client()
-
-    if request.anthropic_api_key:
-        extraction_service = ExtractionService(provider="anthropic", api_key=request.anthropic_api_key)
-    else:
-        extraction_service = get_extraction_service()
-    classified_result = await extraction_service.extract_and_classify_with_resolution(
-        text=request.text,
-        supabase_client=supabase,
-        user_id=user_id,
-        context=request.context,
-        user_name=user_name
-    )
-
-    sync_results = None
-    if request.sync_to_db:
-        if not user_id:
-            raise HTTPException(
-                status_code=401, detail="Authentication required for database sync"
+    with track_request("extract"):
+        user_id = None
+        user_name = None
+        if authorization:
+            token = authorization.replace("Bearer ", "")
+            with stage("auth"):
+                user_id = verify_supabase_jwt(token)
+            if not user_id and request.sync_to_db:
+                raise HTTPException(status_code=401, detail="Invalid authentication token")
+
+            if user_id:
+                with stage("user_info"):
+                    user_info = get_user_info(user_id)
+                if user_info:
+                    user_name = user_info.get("name")
+
+        supabase = create_service_role_client()
+
+        if request.anthropic_api_key:
+            extraction_service = ExtractionService(provider="anthropic", api_key=request.anthropic_api_key)
+        else:
+            extraction_service = get_extraction_service()
+        with collect_llm_calls() as llm_calls:
+            classified_result = await extraction_service.extract_and_classify_with_resolution(
+                text=request.text,
+                supabase_client=supabase,
+                user_id=user_id,
+                context=request.context,
+                user_name=user_name
             )
+        classified_result.llm_usage = summarize_calls(llm_calls)
+
+        sync_results = None
+        if request.sync_to_db:
+            if not user_id:
+                raise HTTPException(
+                    status_code=401, detail="Authentication required for database sync"
+                )
+
+            # Sync extraction with entity resolutions
+            sync_service = SupabaseSyncService(supabase, user_id)
+            sync_results = sync_service.sync_extraction(
+                classified_result.extraction,
+                request.source_code,
+                entity_resolutions=classified_result.entity_resolutions,
+                idempotency_key=request.idempotency_key,
+            )
+            classified_result.sync_results = sync_results
 
-        # Sync extraction with entity resolutions
-        sync_service = SupabaseSyncService(supabase, user_id)
-        sync_results = sync_service.sync_extraction(
-            classified_result.extraction,
-            request.source_code,
-            entity_resolutions=classified_result.entity_resolutions
-        )
-        classified_result.sync_results = sync_results
-
-    # T028: needs_clarification is automatically set by extract_and_classify_with_resolution
-    return classified_result
+        # T028: needs_clarification is automatically set by extract_and_classify_with_resolution
+        return classified_result
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+
+from app.services.llm_usage import get_usage_totals
+
+router = APIRouter()
+
+
+@router.get("/metrics/llm")
+async def llm_metrics():
+    """
+    LLM call accounting since process start.
+
+    One row per (provider, model, endpoint) with call, retry and validation
+    failure counts, prompt/completion/cached tokens, latency and estimated cost.
+    """
+    return {"calls": get_usage_totals()}
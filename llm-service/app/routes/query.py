@@ -1,21 +1,39 @@
 from __future__ import annotations
 
+import json
 import logging
+import time
+from collections.abc import AsyncIterator
 
+import httpx
 from fastapi import APIRouter, HTTPException, Header
+from fastapi.responses import StreamingResponse
+from postgrest.exceptions import APIError
+from pydantic import ValidationError
 
+from app.config import settings
 from app.models.query import QueryRequest, QueryResult, QueryPlan, QueryIntent
 from app.models.briefing import BriefingResult
 from app.services.auth import verify_supabase_jwt, create_service_role_client, get_user_info
 from app.services.query_executor import QueryExecutor
 from app.services.answer_synthesizer import AnswerSynthesizer
 from app.services.briefing import BriefingService
-from app.services.llm import get_llm_provider
+from app.services.entity_resolver import EntityResolverService
+from app.services.intent_classifier import NameIndex, get_intent_classifier, log_parsed_plan
+from app.services.llm import chat_messages, get_llm_provider
+from app.services.llm_usage import collect_llm_calls, summarize_calls, track_llm_call
+from app.services.metrics import stage, track_request
+from app.utils.pagination import InvalidCursorError, decode_bound_cursor, encode_bound_cursor
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Per-user resolver name index cache with TTL (used for local slot filling):
+# user_id -> (fetched_at, index of the user's names)
+_known_names: dict[str, tuple[float, NameIndex]] = {}
+_KNOWN_NAMES_TTL_SECONDS = 300
+
 QUERY_PARSING_PROMPT = """You are a query intent parser for a personal CRM / intelligence database.
 Given a natural language question, determine the query intent and extract key parameters.
 
@@ -46,64 +64,219 @@ async def query_network(
 ):
     """
     Natural language query endpoint. Parses intent, executes DB queries, synthesizes answer.
+
+    next_cursor carries the parsed plan, so later pages only execute the query.
     """
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authentication required")
-
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_supabase_jwt(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
-
-    user_info = get_user_info(user_id)
-    user_name = user_info.get("name") if user_info else None
-
-    # Step 1: Parse intent using LLM
-    provider = get_llm_provider()
-    plan = _parse_intent(provider, request.question, user_name)
-
-    # Step 2: Execute query
-    supabase = create_service_role_client()
-    executor = QueryExecutor(supabase, user_id)
-    raw_results = await executor.execute(plan)
-
-    # Step 3: Synthesize answer
-    synthesizer = AnswerSynthesizer(provider)
-    answer = synthesizer.synthesize(
-        question=request.question,
-        intent=plan.intent,
-        raw_results=raw_results,
-        user_name=user_name,
-    )
+    with track_request("query"):
+        if not authorization:
+            raise HTTPException(status_code=401, detail="Authentication required")
+
+        token = authorization.replace("Bearer ", "")
+        with stage("auth"):
+            user_id = verify_supabase_jwt(token)
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication token")
+
+        supabase = create_service_role_client()
+        executor = QueryExecutor(supabase, user_id)
+
+        # Later pages carry the plan in the cursor: no parsing and no answer
+        if request.cursor:
+            try:
+                plan, cursor = _decode_query_cursor(request.cursor)
+                with stage(f"execute_{plan.intent.value}"):
+                    raw_results = await executor.execute(plan, cursor=cursor, page_size=request.page_size)
+            except InvalidCursorError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+            return QueryResult(
+                question=request.question,
+                intent=plan.intent,
+                answer="",
+                data=raw_results.get("data", []),
+                data_type=raw_results.get("type", "generic"),
+                next_cursor=_encode_query_cursor(plan, raw_results.get("next_cursor")),
+            )
+
+        with stage("user_info"):
+            user_info = get_user_info(user_id)
+        user_name = user_info.get("name") if user_info else None
+
+        # Account for every LLM call made for this request
+        with collect_llm_calls() as llm_calls:
+            # Step 1: Parse intent (local classifier first, LLM when not confident)
+            provider = get_llm_provider()
+            known_names = await _load_known_names(supabase, user_id)
+            with stage("intent_parse"):
+                plan = _parse_intent(provider, request.question, user_name, known_names)
+
+            # Step 2: Execute query
+            with stage(f"execute_{plan.intent.value}"):
+                raw_results = await executor.execute(plan, page_size=request.page_size)
+
+            # Step 3: Synthesize answer
+            synthesizer = AnswerSynthesizer(provider)
+            with stage("synthesize"):
+                answer = synthesizer.synthesize(
+                    question=request.question,
+                    intent=plan.intent,
+                    raw_results=raw_results,
+                    user_name=user_name,
+                )
 
-    return QueryResult(
-        question=request.question,
-        intent=plan.intent,
-        answer=answer,
-        data=raw_results.get("data", []),
-        data_type=raw_results.get("type", "generic"),
-    )
+        return QueryResult(
+            question=request.question,
+            intent=plan.intent,
+            answer=answer,
+            data=raw_results.get("data", []),
+            data_type=raw_results.get("type", "generic"),
+            next_cursor=_encode_query_cursor(plan, raw_results.get("next_cursor")),
+            llm_usage=summarize_calls(llm_calls),
+        )
+
+
+def _encode_query_cursor(plan: QueryPlan, cursor: str | None) -> str | None:
+    """Bind the executor's next-page cursor to the plan it pages through."""
+    if not cursor:
+        return None
+    return encode_bound_cursor(cursor, plan.model_dump(mode="json"))
+
+
+def _decode_query_cursor(query_cursor: str) -> tuple[QueryPlan, str]:
+    """
+    Recover the plan and executor cursor from a /query next_cursor.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or carries no valid plan
+    """
+    cursor, context = decode_bound_cursor(query_cursor)
+    try:
+        return QueryPlan.model_validate(context), cursor
+    except ValidationError as e:
+        raise InvalidCursorError(f"Invalid cursor: {query_cursor}") from e
+
+
+@router.post("/query/stream")
+async def query_network_stream(
+    request: QueryRequest,
+    authorization: str | None = Header(None),
+):
+    """
+    Streaming variant of /query for large result sets.
+
+    Returns NDJSON: a header line with the intent and entity names, followed by
+    one line per result row. Rows are fetched page by page, so memory stays
+    bounded and the first rows arrive before the full result set is read. No
+    answer is synthesized.
+
+    Metrics: "query_stream" covers auth and parsing up to the first byte,
+    "query_stream_rows" covers fetching and sending the rows.
+    """
+    with track_request("query_stream"):
+        if not authorization:
+            raise HTTPException(status_code=401, detail="Authentication required")
+
+        token = authorization.replace("Bearer ", "")
+        with stage("auth"):
+            user_id = verify_supabase_jwt(token)
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication token")
+
+        with stage("user_info"):
+            user_info = get_user_info(user_id)
+        user_name = user_info.get("name") if user_info else None
+
+        supabase = create_service_role_client()
+        provider = get_llm_provider()
+        known_names = await _load_known_names(supabase, user_id)
+        with stage("intent_parse"):
+            plan = _parse_intent(provider, request.question, user_name, known_names)
+
+        executor = QueryExecutor(supabase, user_id)
+        return StreamingResponse(
+            _stream_rows(executor, plan, request.page_size),
+            media_type="application/x-ndjson",
+        )
 
 
-def _parse_intent(provider, question: str, user_name: str | None) -> QueryPlan:
-    """Use the LLM to parse a question into a QueryPlan."""
+async def _stream_rows(executor: QueryExecutor, plan: QueryPlan, page_size: int | None) -> AsyncIterator[str]:
+    """Serialize executor rows as NDJSON lines, preceded by a header line."""
+    with track_request("query_stream_rows"):
+        yield json.dumps({"intent": plan.intent.value, "entity_names": plan.entity_names}) + "\n"
+        async for row in executor.stream(plan, page_size=page_size):
+            yield json.dumps(row, default=str) + "\n"
+
+
+async def _load_known_names(supabase, user_id: str) -> NameIndex:
+    """
+    Load the names of the user's persons for the intent classifier, cached with a TTL.
+
+    The names are cached as a NameIndex, built once per fetch, so matching them
+    in a question does not scale with the number of names. Nothing is loaded
+    when the classifier is disabled. Returns the last cached (or an empty)
+    index when the database is unavailable; the classifier then falls back to
+    capitalized-span name extraction.
+    """
+    if not settings.intent_classifier_enabled:
+        return NameIndex()
+
+    now = time.monotonic()
+    cached = _known_names.get(user_id)
+    if cached is not None and (now - cached[0]) < _KNOWN_NAMES_TTL_SECONDS:
+        return cached[1]
+
+    try:
+        persons = await EntityResolverService(supabase).query_persons_from_database(created_by=user_id)
+    except (APIError, httpx.HTTPError) as e:
+        logger.warning(f"Could not load name index for intent classifier: {e}")
+        return cached[1] if cached is not None else NameIndex()
+
+    # Drop expired entries of other users so the cache stays bounded by active users
+    for stale_user in [u for u, (fetched_at, _) in _known_names.items() if now - fetched_at >= _KNOWN_NAMES_TTL_SECONDS]:
+        del _known_names[stale_user]
+    index = NameIndex(name for person in persons for name in person.names)
+    _known_names[user_id] = (now, index)
+    return index
+
+
+def _parse_intent(
+    provider, question: str, user_name: str | None, known_names: NameIndex | None = None
+) -> QueryPlan:
+    """
+    Parse a question into a QueryPlan.
+
+    The local intent classifier handles confident cases without an LLM call;
+    otherwise the LLM parses the question, and the heuristic parser is the
+    last resort.
+    """
+    if settings.intent_classifier_enabled:
+        plan = get_intent_classifier().classify(
+            question, settings.intent_classifier_threshold, known_names=known_names
+        )
+        if plan is not None:
+            return plan
+
     try:
         if hasattr(provider, "client") and provider.client:
             client = provider.client
             if hasattr(client, "chat"):
-                user_prompt = f"Parse this question into a query plan:\n\n{question}"
+                # Static instruction first, per-request parts last (prompt caching)
+                user_prompt = "Parse this question into a query plan."
                 if user_name:
-                    user_prompt = f"The authenticated user is: {user_name}\n\n{user_prompt}"
-
-                result = client.chat.completions.create(
-                    model=getattr(provider, "model", "gpt-4o"),
-                    response_model=QueryPlan,
-                    messages=[
-                        {"role": "system", "content": QUERY_PARSING_PROMPT},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    max_retries=2,
-                )
+                    user_prompt += f"\n\nThe authenticated user is: {user_name}"
+                user_prompt += f"\n\nQuestion: {question}"
+
+                model = getattr(provider, "model", "gpt-4o")
+                with track_llm_call(provider, "intent", model=model) as call:
+                    result = client.chat.completions.create(
+                        model=model,
+                        response_model=QueryPlan,
+                        **chat_messages(provider, QUERY_PARSING_PROMPT, user_prompt),
+                        max_retries=2,
+                    )
+                    call.record(result)
+                if settings.intent_log_path:
+                    log_parsed_plan(settings.intent_log_path, question, result)
                 return result
     except Exception as e:
         logger.warning(f"LLM intent parsing failed, using heuristic: {e}")
@@ -182,18 +355,21 @@ async def get_briefing(
     authorization: str | None = Header(None),
 ):
     """Generate a comprehensive meeting prep briefing for an entity."""
-    if not authorization:
-        raise HTTPException(status_code=401, detail="Authentication required")
+    with track_request("briefing"):
+        if not authorization:
+            raise HTTPException(status_code=401, detail="Authentication required")
 
-    token = authorization.replace("Bearer ", "")
-    user_id = verify_supabase_jwt(token)
-    if not user_id:
-        raise HTTPException(status_code=401, detail="Invalid authentication token")
+        token = authorization.replace("Bearer ", "")
+        with stage("auth"):
+            user_id = verify_supabase_jwt(token)
+        if not user_id:
+            raise HTTPException(status_code=401, detail="Invalid authentication token")
 
-    supabase = create_service_role_client()
-    provider = get_llm_provider()
+        supabase = create_service_role_client()
+        provider = get_llm_provider()
 
-    service = BriefingService(supabase, user_id, llm_provider=provider)
-    result = await service.generate(entity_id)
+        service = BriefingService(supabase, user_id, llm_provider=provider)
+        with stage("briefing_generate"):
+            result = await service.generate(entity_id)
 
-    return result
+        return result
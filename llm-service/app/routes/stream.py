@@ -2,6 +2,8 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import json
 import logging
 from app.services.extraction import get_extraction_service
+from app.services.llm_usage import collect_llm_calls, summarize_calls
+from app.services.metrics import WEBSOCKET_CONNECTIONS, stage, track_request
 from app.services.supabase_sync import SupabaseSyncService
 from app.services.auth import verify_supabase_jwt, create_service_role_client
 
@@ -20,7 +22,7 @@ async def websocket_extract(websocket: WebSocket):
     1. Client connects
     2. Client sends: {"token": "jwt_token"}
     3. Server verifies token and responds: {"status": "authenticated", "user_id": "..."}
-    4. Client sends: {"text": "...", "context": "...", "source_code": "..."}
+    4. Client sends: {"text": "...", "context": "...", "source_code": "...", "idempotency_key": "..."}
     5. Server sends: {"status": "extracting"}
     6. Server sends: {"type": "extraction", "data": {...}}
     7. Server sends: {"status": "syncing"}
@@ -28,6 +30,7 @@ async def websocket_extract(websocket: WebSocket):
     9. Repeat from step 4 or close connection
     """
     await websocket.accept()
+    WEBSOCKET_CONNECTIONS.inc()
 
     try:
         user_id = None
@@ -42,7 +45,8 @@ async def websocket_extract(websocket: WebSocket):
             return
 
         # Verify JWT token
-        user_id = verify_supabase_jwt(auth_data["token"])
+        with stage("auth"):
+            user_id = verify_supabase_jwt(auth_data["token"])
         if not user_id:
             await websocket.send_json({"error": "Invalid token"})
             await websocket.close()
@@ -64,59 +68,66 @@ async def websocket_extract(websocket: WebSocket):
             text = data["text"]
             context = data.get("context")
             source_code = data.get("source_code", "LLM")
+            idempotency_key = data.get("idempotency_key")
 
             # Extraction phase
             await websocket.send_json({"status": "extracting"})
 
-            try:
-                # Extract intelligence
-                extraction_service = get_extraction_service()
-                extraction = extraction_service.extract_intelligence(text, context)
-
-                # Send extraction result
-                await websocket.send_json(
-                    {
-                        "type": "extraction",
-                        "data": extraction.model_dump(),
-                    }
-                )
-
-                # Sync phase
-                await websocket.send_json({"status": "syncing"})
-
-                # Create authenticated Supabase client
-                supabase = create_service_role_client()
-
-                # Sync to database
-                sync_service = SupabaseSyncService(supabase, user_id)
-                sync_results = sync_service.sync_extraction(extraction, source_code)
-
-                # Send sync results
-                await websocket.send_json(
-                    {
-                        "type": "sync_results",
-                        "data": sync_results.model_dump(),
-                    }
-                )
-
-                # Send completion
-                await websocket.send_json({"status": "complete"})
-
-            except (ValueError, TypeError) as e:
-                logger.warning(f"Extraction validation error: {e}")
-                await websocket.send_json(
-                    {"error": f"Extraction failed: {str(e)}"}
-                )
-            except RuntimeError as e:
-                logger.error(f"Extraction/sync runtime error: {e}")
-                await websocket.send_json(
-                    {"error": f"Extraction/sync failed: {str(e)}"}
-                )
-            except Exception as e:
-                logger.error(f"Unexpected extraction/sync error: {type(e).__name__}: {e}")
-                await websocket.send_json(
-                    {"error": "An internal error occurred during extraction"}
-                )
+            # One metrics request per extraction message
+            with track_request("ws_extract"):
+                try:
+                    # Extract intelligence
+                    extraction_service = get_extraction_service()
+                    with collect_llm_calls() as llm_calls, stage("llm_extract"):
+                        extraction = extraction_service.extract_intelligence(text, context)
+
+                    # Send extraction result
+                    await websocket.send_json(
+                        {
+                            "type": "extraction",
+                            "data": extraction.model_dump(),
+                            "llm_usage": summarize_calls(llm_calls).model_dump(),
+                        }
+                    )
+
+                    # Sync phase
+                    await websocket.send_json({"status": "syncing"})
+
+                    # Create authenticated Supabase client
+                    supabase = create_service_role_client()
+
+                    # Sync to database
+                    sync_service = SupabaseSyncService(supabase, user_id)
+                    sync_results = sync_service.sync_extraction(
+                        extraction, source_code, idempotency_key=idempotency_key
+                    )
+
+                    # Send sync results
+                    await websocket.send_json(
+                        {
+                            "type": "sync_results",
+                            "data": sync_results.model_dump(),
+                        }
+                    )
+
+                    # Send completion
+                    await websocket.send_json({"status": "complete"})
+
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Extraction validation error: {e}")
+                    await websocket.send_json(
+                        {"error": f"Extraction failed: {str(e)}"}
+                    )
+                except RuntimeError as e:
+                    logger.error(f"Extraction/sync runtime error: {e}")
+                    await websocket.send_json(
+                        {"error": f"Extraction/sync failed: {str(e)}"}
+                    )
+                except Exception as e:
+                    logger.error(f"Unexpected extraction/sync error: {type(e).__name__}: {e}")
+                    await websocket.send_json(
+                        {"error": "An internal error occurred during extraction"}
+                    )
 
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for user: {user_id}")
@@ -132,3 +143,5 @@ async def websocket_extract(websocket: WebSocket):
             await websocket.send_json({"error": "An internal error occurred"})
         except Exception:
             pass
+    finally:
+        WEBSOCKET_CONNECTIONS.dec()
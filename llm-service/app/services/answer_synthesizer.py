@@ -4,6 +4,8 @@ import logging
 from typing import Any
 
 from app.models.query import QueryIntent
+from app.services.llm import chat_messages
+from app.services.llm_usage import track_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -41,14 +43,15 @@ class AnswerSynthesizer:
         # Build context for the LLM
         context = self._format_results(data_type, data, intent)
 
-        user_prompt = f"""Original question: {question}
-
-Query results:
-{context}
+        # Static instruction first, per-request parts last (prompt caching)
+        user_prompt = f"""Please provide a natural language answer to the question based on these results.
 
 {f'The user asking is: {user_name}' if user_name else ''}
 
-Please provide a natural language answer to the question based on these results."""
+Original question: {question}
+
+Query results:
+{context}"""
 
         # Use the extract method's underlying client for a simple completion
         try:
@@ -63,14 +66,14 @@ Please provide a natural language answer to the question based on these results.
             client = self.provider.client
             # Try instructor client's underlying create
             if hasattr(client, "chat"):
-                response = client.chat.completions.create(
-                    model=getattr(self.provider, "model", "gpt-4o"),
-                    messages=[
-                        {"role": "system", "content": SYNTHESIS_SYSTEM_PROMPT},
-                        {"role": "user", "content": user_prompt},
-                    ],
-                    max_tokens=1024,
-                )
+                model = getattr(self.provider, "model", "gpt-4o")
+                with track_llm_call(self.provider, "synthesis", model=model) as call:
+                    response = client.chat.completions.create(
+                        model=model,
+                        **chat_messages(self.provider, SYNTHESIS_SYSTEM_PROMPT, user_prompt),
+                        max_tokens=1024,
+                    )
+                    call.record(response)
                 # instructor wraps response; for raw completion we need to handle both cases
                 if hasattr(response, "choices"):
                     return response.choices[0].message.content
@@ -125,7 +128,18 @@ Please provide a natural language answer to the question based on these results.
 
         if data_type == "count":
             row = data[0] if data else {}
-            return f"Entities: {row.get('entities', 0)}, Relations: {row.get('relations', 0)}, Intel: {row.get('intel', 0)}"
+            lines = [f"Entities: {row.get('entities', 0)}, Relations: {row.get('relations', 0)}, Intel: {row.get('intel', 0)}"]
+            for key, label in (
+                ("by_entity_type", "Entities by type"),
+                ("by_relation_type", "Relations by type"),
+                ("by_intel_type", "Intel by type"),
+            ):
+                breakdown = row.get(key) or {}
+                if breakdown:
+                    lines.append(f"{label}: " + ", ".join(f"{k}: {v}" for k, v in breakdown.items()))
+            for window, counts in (row.get("recent") or {}).items():
+                lines.append(f"Added in {window.replace('_', ' ')}: " + ", ".join(f"{k}: {v}" for k, v in counts.items()))
+            return "\n".join(lines)
 
         # Generic
         return str(data[:10])
@@ -5,6 +5,7 @@ import httpx
 from jose import jwt, JWTError, jwk
 
 from app.config import settings
+from app.services.metrics import instrument_client
 
 logger = logging.getLogger(__name__)
 
@@ -100,14 +101,15 @@ def create_service_role_client():
     """
     Create a Supabase client with service role (admin) privileges.
 
-    Use this ONLY when you need to bypass RLS policies.
+    Use this ONLY when you need to bypass RLS policies. Requests made by the
+    client are counted as database round-trips in the metrics.
 
     Returns:
         Service role Supabase client
     """
     from supabase import create_client
 
-    return create_client(settings.supabase_url, settings.supabase_service_role_key)
+    return instrument_client(create_client(settings.supabase_url, settings.supabase_service_role_key))
 
 
 def get_user_info(user_id: str) -> dict | None:
@@ -6,6 +6,8 @@ from typing import Any
 from supabase import Client
 
 from app.models.briefing import BriefingResult
+from app.services.llm import chat_messages
+from app.services.llm_usage import track_llm_call
 
 logger = logging.getLogger(__name__)
 
@@ -28,14 +30,20 @@ class BriefingService:
         self.llm_provider = llm_provider
 
     async def generate(self, entity_id: str) -> BriefingResult:
-        """Generate a comprehensive briefing for an entity."""
-        # Parallel data gathering
+        """
+        Generate a comprehensive briefing for an entity.
+
+        Makes at most five database round-trips: the entity (with identifiers and
+        attributes), the user's entity, the relations of both, linked intel, and
+        either the names of connecting entities or, when the user is more than
+        two hops away, the shortest path (which carries its own names).
+        """
         entity = self._get_entity(entity_id)
-        identifiers = self._get_identifiers(entity_id)
-        attributes = self._get_attributes(entity_id)
-        relations = self._get_relations(entity_id)
-        intel = self._get_linked_intel(entity_id)
+        identifiers = self._live((entity or {}).get("identifiers"))
+        attributes = self._live((entity or {}).get("entity_attributes"))
         user_entity_id = self._get_user_entity_id()
+        relations, user_relations = self._get_relations(entity_id, user_entity_id)
+        intel = self._get_linked_intel(entity_id)
 
         # Build result
         entity_data = entity or {}
@@ -62,16 +70,33 @@ class BriefingService:
             connection_count=len(relations),
         )
 
-        # Path from user to entity
-        if user_entity_id and user_entity_id != entity_id:
-            path_data = self._find_path(user_entity_id, entity_id)
-            if path_data:
-                result.relationship_to_user = path_data
-
-        # Find mutual connections
         if user_entity_id:
-            mutual = self._find_mutual_connections(user_entity_id, entity_id, relations)
-            result.mutual_connections = mutual
+            target_neighbors = self._neighbors(entity_id, relations)
+            user_neighbors = self._neighbors(user_entity_id, user_relations)
+            mutual_ids = sorted(set(user_neighbors) & set(target_neighbors) - {user_entity_id, entity_id})[:10]
+
+            # Path from user to entity: direct or through a mutual connection is known
+            # from the relations; anything longer needs the shortest-path search
+            path_ids: list[str] = []
+            rel_types: list[str] = []
+            if user_entity_id != entity_id:
+                if entity_id in user_neighbors:
+                    path_ids, rel_types = [user_entity_id, entity_id], [user_neighbors[entity_id]]
+                elif mutual_ids:
+                    via = mutual_ids[0]
+                    path_ids = [user_entity_id, via, entity_id]
+                    rel_types = [user_neighbors[via], target_neighbors[via]]
+                else:
+                    result.relationship_to_user = self._find_path(user_entity_id, entity_id)
+
+            names = self._resolve_names(set(path_ids) | set(mutual_ids) - {entity_id})
+            names[entity_id] = entity_name
+            if path_ids:
+                result.relationship_to_user = {
+                    "path": [{"entity_id": pid, "name": names[pid]} for pid in path_ids],
+                    "relation_types": rel_types,
+                }
+            result.mutual_connections = [{"entity_id": mid, "name": names[mid]} for mid in mutual_ids]
 
         # Key dates from attributes and intel
         key_dates = []
@@ -100,56 +125,53 @@ class BriefingService:
         return result
 
     def _get_entity(self, entity_id: str) -> dict[str, Any] | None:
+        # Identifiers and attributes are embedded (deleted rows are dropped by _live)
         data = self.supabase.from_("entities") \
-            .select("*") \
+            .select(
+                "*,"
+                "identifiers(type,value,deleted_at),"
+                "entity_attributes(key,value,valid_from,valid_to,confidence,deleted_at)"
+            ) \
             .eq("id", entity_id) \
             .is_("deleted_at", "null") \
             .limit(1) \
             .execute()
         return data.data[0] if data.data else None
 
-    def _get_identifiers(self, entity_id: str) -> list[dict]:
-        data = self.supabase.from_("identifiers") \
-            .select("type,value") \
-            .eq("entity_id", entity_id) \
-            .is_("deleted_at", "null") \
-            .execute()
-        return data.data or []
+    @staticmethod
+    def _live(rows: list[dict] | None) -> list[dict]:
+        return [r for r in rows or [] if r.get("deleted_at") is None]
 
-    def _get_attributes(self, entity_id: str) -> list[dict]:
-        data = self.supabase.from_("entity_attributes") \
-            .select("key,value,valid_from,valid_to,confidence") \
-            .eq("entity_id", entity_id) \
-            .is_("deleted_at", "null") \
-            .execute()
-        return data.data or []
-
-    def _get_relations(self, entity_id: str) -> list[dict]:
+    def _get_relations(self, entity_id: str, user_entity_id: str | None) -> tuple[list[dict], list[dict]]:
+        """Relations of the entity and of the user's entity, fetched together."""
+        ids = [entity_id] if not user_entity_id or user_entity_id == entity_id else [entity_id, user_entity_id]
+        conditions = ",".join(f"source_id.eq.{i},target_id.eq.{i}" for i in ids)
         data = self.supabase.from_("relations") \
-            .select("*") \
-            .or_(f"source_id.eq.{entity_id},target_id.eq.{entity_id}") \
+            .select("id,source_id,target_id,type") \
+            .or_(conditions) \
             .is_("deleted_at", "null") \
             .execute()
-        return data.data or []
 
-    def _get_linked_intel(self, entity_id: str) -> list[dict]:
-        ie_data = self.supabase.from_("intel_entities") \
-            .select("intel_id") \
-            .eq("entity_id", entity_id) \
-            .is_("deleted_at", "null") \
-            .execute()
+        rows = data.data or []
+        relations = [r for r in rows if entity_id in (r["source_id"], r["target_id"])]
+        user_relations = [r for r in rows if user_entity_id in (r["source_id"], r["target_id"])]
+        return relations, user_relations
 
-        if not ie_data.data:
-            return []
+    @staticmethod
+    def _neighbors(entity_id: str, relations: list[dict]) -> dict[str, str]:
+        """Map each entity related to entity_id to the type of (one of) their relations."""
+        neighbors = {}
+        for r in relations:
+            other = r["target_id"] if r["source_id"] == entity_id else r["source_id"]
+            neighbors.setdefault(other, r["type"])
+        return neighbors
 
-        intel_ids = [ie["intel_id"] for ie in ie_data.data]
-        intel_data = self.supabase.from_("intel") \
-            .select("*") \
-            .in_("id", intel_ids) \
-            .is_("deleted_at", "null") \
-            .order("occurred_at", desc=True) \
-            .limit(20) \
-            .execute()
+    def _get_linked_intel(self, entity_id: str) -> list[dict]:
+        # Latest linked intel in one round-trip (see get_entity_intel)
+        intel_data = self.supabase.rpc(
+            "get_entity_intel",
+            {"p_entity_ids": [entity_id], "p_limit": 20}
+        ).execute()
 
         return intel_data.data or []
 
@@ -175,58 +197,39 @@ class BriefingService:
                 row = data.data[0] if isinstance(data.data, list) else data.data
                 path_ids = row.get("path", [])
                 rel_types = row.get("relation_types", [])
+                # Names come with the path (find_shortest_path returns path_names)
+                path_names = row.get("path_names") or [None] * len(path_ids)
 
-                # Resolve names
-                resolved = []
-                for pid in path_ids:
-                    name = self._resolve_name(pid)
-                    resolved.append({"entity_id": pid, "name": name})
-
+                resolved = [
+                    {"entity_id": pid, "name": name or pid[:8]}
+                    for pid, name in zip(path_ids, path_names, strict=False)
+                ]
                 return {"path": resolved, "relation_types": rel_types}
         except Exception as e:
             logger.warning(f"Path finding failed: {e}")
         return None
 
-    def _find_mutual_connections(
-        self, user_entity_id: str, target_entity_id: str, target_relations: list[dict]
-    ) -> list[dict[str, str]]:
-        # Get user's direct connections
-        user_rels = self.supabase.from_("relations") \
-            .select("source_id,target_id") \
-            .or_(f"source_id.eq.{user_entity_id},target_id.eq.{user_entity_id}") \
-            .is_("deleted_at", "null") \
-            .execute()
-
-        user_connections = set()
-        for r in (user_rels.data or []):
-            other = r["target_id"] if r["source_id"] == user_entity_id else r["source_id"]
-            user_connections.add(other)
+    def _resolve_names(self, entity_ids: set[str]) -> dict[str, str]:
+        """Resolve entity UUIDs to display names with a single query."""
+        names = {entity_id: entity_id[:8] for entity_id in entity_ids}
+        if not entity_ids:
+            return names
 
-        target_connections = set()
-        for r in target_relations:
-            other = r["target_id"] if r["source_id"] == target_entity_id else r["source_id"]
-            target_connections.add(other)
-
-        mutual_ids = user_connections & target_connections
-        mutual_ids.discard(user_entity_id)
-        mutual_ids.discard(target_entity_id)
-
-        mutual = []
-        for mid in list(mutual_ids)[:10]:
-            name = self._resolve_name(mid)
-            mutual.append({"entity_id": mid, "name": name})
-
-        return mutual
-
-    def _resolve_name(self, entity_id: str) -> str:
         data = self.supabase.from_("identifiers") \
-            .select("value") \
-            .eq("entity_id", entity_id) \
+            .select("entity_id,value") \
+            .in_("entity_id", list(entity_ids)) \
             .eq("type", "name") \
             .is_("deleted_at", "null") \
-            .limit(1) \
+            .order("created_at") \
             .execute()
-        return data.data[0]["value"] if data.data else entity_id[:8]
+
+        # Keep the first name identifier per entity
+        seen = set()
+        for row in data.data or []:
+            if row["entity_id"] not in seen:
+                seen.add(row["entity_id"])
+                names[row["entity_id"]] = row["value"]
+        return names
 
     def _extract_name(self, entity_id: str, identifiers: list[dict]) -> str:
         for i in identifiers:
@@ -274,14 +277,18 @@ class BriefingService:
             try:
                 client = self.llm_provider.client
                 if hasattr(client, "chat"):
-                    response = client.chat.completions.create(
-                        model=getattr(self.llm_provider, "model", "gpt-4o"),
-                        messages=[
-                            {"role": "system", "content": BRIEFING_PROMPT},
-                            {"role": "user", "content": f"Prepare a meeting briefing based on this data:\n\n{context}"},
-                        ],
-                        max_tokens=1024,
-                    )
+                    model = getattr(self.llm_provider, "model", "gpt-4o")
+                    with track_llm_call(self.llm_provider, "briefing", model=model) as call:
+                        response = client.chat.completions.create(
+                            model=model,
+                            **chat_messages(
+                                self.llm_provider,
+                                BRIEFING_PROMPT,
+                                f"Prepare a meeting briefing based on this data:\n\n{context}",
+                            ),
+                            max_tokens=1024,
+                        )
+                        call.record(response)
                     if hasattr(response, "choices"):
                         return response.choices[0].message.content
                     return str(response)
@@ -13,6 +13,7 @@ from app.models.resolution import (
     ResolutionContext
 )
 from app.config import settings
+from app.services.tracing import traced
 
 
 class EntityResolverService:
@@ -28,12 +29,15 @@ class EntityResolverService:
         self.supabase = supabase_client
         self.config = settings
 
-    async def query_persons_from_database(self, user_id: str | None = None) -> list[PersonEntity]:
+    async def query_persons_from_database(
+        self, user_id: str | None = None, created_by: str | None = None
+    ) -> list[PersonEntity]:
         """
         Fetch all person entities and their identifiers from Supabase.
 
         Args:
             user_id: Optional user ID for RLS filtering
+            created_by: Only fetch persons created by this user
 
         Returns:
             List of PersonEntity objects with flattened identifiers
@@ -45,6 +49,8 @@ class EntityResolverService:
             .eq("type", "person")
             .is_("deleted_at", "null")
         )
+        if created_by:
+            query = query.eq("created_by", created_by)
 
         response = query.execute()
 
@@ -191,6 +197,10 @@ class EntityResolverService:
 
         return matches
 
+    @traced("entity_resolver.resolve_person_reference", lambda result: {
+        "resolution.method": result.resolution_method,
+        "resolution.candidates": len(result.candidates),
+    })
     async def resolve_person_reference(
         self,
         reference: str,
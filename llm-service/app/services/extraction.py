@@ -1,6 +1,8 @@
 from supabase import Client
 from app.services.llm import get_llm_provider
 from app.services.entity_resolver import EntityResolverService
+from app.services.metrics import stage
+from app.services.tracing import traced
 from app.models.extraction import (
     IntelligenceExtraction,
     ExtractionClassification,
@@ -121,6 +123,12 @@ class ExtractionService:
             sync_results=None,
         )
 
+    @traced("extraction.extract_and_classify_with_resolution", lambda result: {
+        "extraction.entities": len(result.extraction.entities),
+        "extraction.relations": len(result.extraction.relations),
+        "extraction.intel": len(result.extraction.intel),
+        "resolution.references": len(result.entity_resolutions),
+    })
     async def extract_and_classify_with_resolution(
         self,
         text: str,
@@ -145,7 +153,8 @@ class ExtractionService:
             ClassifiedExtraction with classification, chain_of_thought, extraction, and entity_resolutions
         """
         # Step 1: Perform normal extraction
-        extraction = self.extract_intelligence(text, context, user_name=user_name)
+        with stage("llm_extract"):
+            extraction = self.extract_intelligence(text, context, user_name=user_name)
 
         # Step 2: Perform entity resolution on person references
         entity_resolutions: list[EntityResolutionResult] = []
@@ -156,7 +165,8 @@ class ExtractionService:
         entity_resolver = EntityResolverService(supabase_client)
 
         # Build resolution context
-        resolution_context = await entity_resolver.build_resolution_context(user_id=user_id)
+        with stage("resolution_context"):
+            resolution_context = await entity_resolver.build_resolution_context(user_id=user_id)
 
         # Collect all person names from extraction
         person_references = set()
@@ -173,9 +183,10 @@ class ExtractionService:
 
         # Resolve each person reference
         for reference in person_references:
-            resolution_result = await entity_resolver.resolve_person_reference(
-                reference, resolution_context
-            )
+            with stage("resolve_reference"):
+                resolution_result = await entity_resolver.resolve_person_reference(
+                    reference, resolution_context
+                )
             entity_resolutions.append(resolution_result)
 
             # Check if any resolution needs clarification
@@ -0,0 +1,517 @@
+"""
+Local Intent Classifier for Natural Language Queries
+
+A CPU-only intent/slot model that replaces the LLM intent-parsing call for
+questions it is confident about. Intents are scored by a small multinomial
+logistic regression over keyword/regex cue features and token n-grams; slots
+(entity names, relation types, temporal filter, search terms) are filled with
+rules and the resolver's name index.
+
+The model is trained at construction from SEED_EXAMPLES and can be retrained
+from plans logged by the LLM path (see settings.intent_log_path).
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import logging
+import math
+import re
+from collections.abc import Iterable
+from pathlib import Path
+
+from app.models.extraction import RelationType
+from app.models.query import QueryIntent, QueryPlan
+
+logger = logging.getLogger(__name__)
+
+SELF_REFERENCE = "(the user)"
+
+# Keyword/regex cues that carry most of the signal for each intent
+CUE_PATTERNS: dict[str, re.Pattern] = {
+    "cue:path": re.compile(r"\b(connected|connection|path|link(ed)? between|know each other|degrees? of separation)\b"),
+    "cue:temporal": re.compile(r"\b(when|last time|recently|recent|lately|last (talk|talked|spoke|met|saw|seen)|since|ago)\b"),
+    "cue:briefing": re.compile(r"\b(brief|briefing|dossier|everything about|prep me|prepare me|rundown|background on)\b"),
+    "cue:aggregation": re.compile(r"\b(how many|count|stats|statistics|total|number of)\b"),
+    "cue:relation": re.compile(r"\b(who (works|worked|lives|lived|knows|introduced)|works at|lives in|introduced|colleagues?|friends? of|married to|related to|family)\b"),
+    "cue:intel": re.compile(r"\b(what happened|event|events|meeting|meetup|conference|party|notes?|tips?|discussed|talked about)\b"),
+    "cue:entity": re.compile(r"^\s*(who is|who's|find|look up|search for|show me)\b"),
+}
+
+TEMPORAL_PATTERN = re.compile(
+    r"\b((since )?(today|yesterday|tonight|this (morning|week|month|year)|"
+    r"last (week|month|year|night|monday|tuesday|wednesday|thursday|friday|saturday|sunday)|"
+    r"(past|last) \d+ (days|weeks|months|years)|\d+ (days|weeks|months|years) ago|"
+    r"(in |during )?(january|february|march|april|may|june|july|august|september|october|november|december)( \d{4})?|"
+    r"in \d{4}))\b",
+    re.IGNORECASE,
+)
+
+# Intents whose handlers look up the named entities and return nothing without one
+ENTITY_INTENTS = {QueryIntent.TEMPORAL_QUERY, QueryIntent.RELATION_QUERY, QueryIntent.BRIEFING}
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+WORD_PATTERN = re.compile(r"\w+")
+
+SELF_TOKENS = {"i", "me", "my", "myself", "mine"}
+
+# Capitalized words that start questions or commands rather than name entities
+NON_NAME_WORDS = {
+    "Who", "Whom", "Whose", "What", "When", "Where", "Why", "How", "Which",
+    "Is", "Are", "Was", "Were", "Do", "Does", "Did", "Has", "Have", "Can", "Could",
+    "Tell", "Brief", "Find", "Show", "List", "Give", "Look", "Search", "Prep", "Prepare",
+    "I", "Me", "My", "The", "A", "An", "And", "Or", "In", "On", "At", "Of", "To", "With",
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+    "January", "February", "March", "April", "May", "June", "July", "August",
+    "September", "October", "November", "December",
+}
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "at", "with", "for", "about",
+    "what", "who", "when", "where", "why", "how", "which", "is", "are", "was", "were",
+    "do", "does", "did", "i", "me", "my", "you", "tell", "find", "show", "happened",
+    "from", "everything", "anything", "all", "any",
+}
+
+# Time words left over once TEMPORAL_PATTERN spans are removed; they belong to
+# temporal_filter, not to full-text search terms
+TEMPORAL_WORDS = {
+    "last", "latest", "recent", "recently", "lately", "ago", "since", "past",
+    "today", "yesterday", "tonight", "morning", "night",
+    "day", "days", "week", "weeks", "month", "months", "year", "years",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+    "january", "february", "march", "april", "may", "june", "july", "august",
+    "september", "october", "november", "december",
+}
+
+# Phrases that map onto RelationType values
+RELATION_PHRASES: dict[str, str] = {
+    "works at": RelationType.WORKS_AT.value,
+    "worked at": RelationType.WORKS_AT.value,
+    "lives in": RelationType.LIVES_IN.value,
+    "lived in": RelationType.LIVES_IN.value,
+    "introduced": RelationType.INTRODUCED_BY.value,
+    "married": RelationType.SPOUSE.value,
+    "invested in": RelationType.INVESTED_IN.value,
+    "founded": RelationType.FOUNDER.value,
+}
+
+# Seed training set: representative questions per intent
+SEED_EXAMPLES: list[tuple[str, QueryIntent]] = [
+    ("Who is John Smith?", QueryIntent.ENTITY_SEARCH),
+    ("Find people named Sarah", QueryIntent.ENTITY_SEARCH),
+    ("Look up Acme Corp", QueryIntent.ENTITY_SEARCH),
+    ("Do I know anyone called Lukas?", QueryIntent.ENTITY_SEARCH),
+    ("Show me Maria", QueryIntent.ENTITY_SEARCH),
+    ("Search for Bob's email", QueryIntent.ENTITY_SEARCH),
+    ("What is Alice's phone number?", QueryIntent.ENTITY_SEARCH),
+    ("Who's Tim?", QueryIntent.ENTITY_SEARCH),
+    ("Find the organization Globex", QueryIntent.ENTITY_SEARCH),
+    ("Which people do I know in Berlin?", QueryIntent.ENTITY_SEARCH),
+    ("What happened at the conference?", QueryIntent.INTEL_SEARCH),
+    ("Tell me about the meetup", QueryIntent.INTEL_SEARCH),
+    ("What did we discuss at the meeting about the budget?", QueryIntent.INTEL_SEARCH),
+    ("Any notes about the product launch?", QueryIntent.INTEL_SEARCH),
+    ("What events happened in Stockholm?", QueryIntent.INTEL_SEARCH),
+    ("Show tips about restaurants", QueryIntent.INTEL_SEARCH),
+    ("What was talked about at the party?", QueryIntent.INTEL_SEARCH),
+    ("Find meetings about fundraising", QueryIntent.INTEL_SEARCH),
+    ("What happened at the offsite?", QueryIntent.INTEL_SEARCH),
+    ("Search notes mentioning the hackathon", QueryIntent.INTEL_SEARCH),
+    ("What did I do last week?", QueryIntent.INTEL_SEARCH),
+    ("Show me everything from last month", QueryIntent.INTEL_SEARCH),
+    ("What happened yesterday?", QueryIntent.INTEL_SEARCH),
+    ("What did I do in March?", QueryIntent.INTEL_SEARCH),
+    ("How am I connected to Sarah?", QueryIntent.PATH_FINDING),
+    ("What's the link between Alice and Bob?", QueryIntent.PATH_FINDING),
+    ("How do John and Maria know each other?", QueryIntent.PATH_FINDING),
+    ("Is there a path from me to Elon?", QueryIntent.PATH_FINDING),
+    ("How is Tim connected to Acme Corp?", QueryIntent.PATH_FINDING),
+    ("Degrees of separation between me and Lukas", QueryIntent.PATH_FINDING),
+    ("How are Anna and Peter connected?", QueryIntent.PATH_FINDING),
+    ("Connection between Bob and Globex", QueryIntent.PATH_FINDING),
+    ("Who works at Acme Corp?", QueryIntent.RELATION_QUERY),
+    ("Who introduced me to Sarah?", QueryIntent.RELATION_QUERY),
+    ("Who lives in Berlin?", QueryIntent.RELATION_QUERY),
+    ("Who knows Lukas?", QueryIntent.RELATION_QUERY),
+    ("Who are John's colleagues?", QueryIntent.RELATION_QUERY),
+    ("Who is Maria married to?", QueryIntent.RELATION_QUERY),
+    ("Which friends of Bob do I know?", QueryIntent.RELATION_QUERY),
+    ("Who founded Globex?", QueryIntent.RELATION_QUERY),
+    ("Where does Anna work?", QueryIntent.RELATION_QUERY),
+    ("Who is related to Peter?", QueryIntent.RELATION_QUERY),
+    ("When did I last talk to John?", QueryIntent.TEMPORAL_QUERY),
+    ("Recent interactions with Sarah", QueryIntent.TEMPORAL_QUERY),
+    ("When did I last meet Lukas?", QueryIntent.TEMPORAL_QUERY),
+    ("What did I do with Bob last week?", QueryIntent.TEMPORAL_QUERY),
+    ("When was the last time I saw Maria?", QueryIntent.TEMPORAL_QUERY),
+    ("What have I done with Anna recently?", QueryIntent.TEMPORAL_QUERY),
+    ("Timeline of my interactions with Tim", QueryIntent.TEMPORAL_QUERY),
+    ("When did Alice and I last speak?", QueryIntent.TEMPORAL_QUERY),
+    ("How long since I talked to Peter?", QueryIntent.TEMPORAL_QUERY),
+    ("Latest activity with Acme Corp", QueryIntent.TEMPORAL_QUERY),
+    ("Brief me on John Smith", QueryIntent.BRIEFING),
+    ("Tell me everything about Sarah", QueryIntent.BRIEFING),
+    ("Prepare me for my meeting with Lukas", QueryIntent.BRIEFING),
+    ("Give me a dossier on Acme Corp", QueryIntent.BRIEFING),
+    ("Briefing on Maria before our call", QueryIntent.BRIEFING),
+    ("Everything you know about Bob", QueryIntent.BRIEFING),
+    ("Prep me for lunch with Anna", QueryIntent.BRIEFING),
+    ("Background on Peter please", QueryIntent.BRIEFING),
+    ("Give me a rundown of Tim", QueryIntent.BRIEFING),
+    ("Full profile of Alice", QueryIntent.BRIEFING),
+    ("How many contacts do I have?", QueryIntent.AGGREGATION),
+    ("Network stats", QueryIntent.AGGREGATION),
+    ("How many people are in my network?", QueryIntent.AGGREGATION),
+    ("Count my relations", QueryIntent.AGGREGATION),
+    ("Total number of notes", QueryIntent.AGGREGATION),
+    ("How many organizations do I know?", QueryIntent.AGGREGATION),
+    ("Give me statistics about my graph", QueryIntent.AGGREGATION),
+    ("How many events have I logged?", QueryIntent.AGGREGATION),
+    ("What is the size of my network?", QueryIntent.AGGREGATION),
+    ("Number of intel records", QueryIntent.AGGREGATION),
+]
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def extract_features(question: str) -> dict[str, float]:
+    """
+    Build a sparse feature vector for a question.
+
+    Features are a bias term, regex cue hits, unigrams and bigrams.
+
+    Args:
+        question: Natural language question
+
+    Returns:
+        Dict mapping feature name to value
+    """
+    lowered = question.lower()
+    features: dict[str, float] = {"bias": 1.0}
+
+    for name, pattern in CUE_PATTERNS.items():
+        if pattern.search(lowered):
+            features[name] = 1.0
+
+    tokens = tokenize(question)
+    for token in tokens:
+        features[f"w:{token}"] = 1.0
+    for first, second in itertools.pairwise(tokens):
+        features[f"b:{first}_{second}"] = 1.0
+
+    if SELF_TOKENS.intersection(tokens):
+        features["self_reference"] = 1.0
+    if TEMPORAL_PATTERN.search(question):
+        features["temporal_phrase"] = 1.0
+
+    return features
+
+
+class NameIndex:
+    """
+    Known entity names keyed by their lowercased text, for matching in questions.
+
+    A question is matched with one dict lookup per word n-gram, so the cost
+    depends on the question's length rather than on the number of names. Build
+    one per name set and reuse it across questions.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self._names: dict[str, str] = {}
+        self._max_words = 0
+        for name in names:
+            words = list(WORD_PATTERN.finditer(name.lower()))
+            if len(name) < 2 or not words:
+                continue
+            key = name.lower()[words[0].start():words[-1].end()]
+            self._names.setdefault(key, name)
+            self._max_words = max(self._max_words, len(words))
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def find(self, lowered: str) -> list[tuple[int, int, str]]:
+        """
+        Find known names in a lowercased question, longest match first at each word.
+
+        Returns:
+            Non-overlapping (start, end, name) matches in order of appearance
+        """
+        words = [(m.start(), m.end()) for m in WORD_PATTERN.finditer(lowered)]
+        found: list[tuple[int, int, str]] = []
+        i = 0
+        while i < len(words):
+            for n in range(min(self._max_words, len(words) - i), 0, -1):
+                start, end = words[i][0], words[i + n - 1][1]
+                name = self._names.get(lowered[start:end])
+                if name is not None:
+                    found.append((start, end, name))
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+
+def extract_entity_names(question: str, known_names: NameIndex | list[str] | None = None) -> list[str]:
+    """
+    Extract entity names mentioned in a question, in order of appearance.
+
+    Names from the resolver's name index are matched first (longest match wins);
+    remaining capitalized spans are used as a fallback for unknown entities.
+
+    Args:
+        question: Natural language question
+        known_names: Names from the resolver's name index (pass a NameIndex to
+            reuse it across questions)
+
+    Returns:
+        List of entity names
+    """
+    found: list[tuple[int, str]] = []
+    taken: list[tuple[int, int]] = []
+
+    def overlaps(start: int, end: int) -> bool:
+        return any(start < t_end and t_start < end for t_start, t_end in taken)
+
+    index = known_names if isinstance(known_names, NameIndex) else NameIndex(known_names or [])
+    for start, end, name in index.find(question.lower()):
+        if name not in (n for _, n in found):
+            taken.append((start, end))
+            found.append((start, name))
+
+    for match in re.finditer(r"[A-Z][\w&.-]*(?:\s+[A-Z][\w&.-]*)*", question):
+        words = [w for w in match.group(0).split() if w not in NON_NAME_WORDS]
+        if not words:
+            continue
+        span = " ".join(words).rstrip(".")
+        start = match.start() + match.group(0).find(words[0])
+        if len(span) > 1 and not overlaps(start, start + len(span)):
+            taken.append((start, start + len(span)))
+            found.append((start, span))
+
+    found.sort(key=lambda item: item[0])
+    return [name for _, name in found]
+
+
+def extract_relation_types(question: str) -> list[str]:
+    """Map relation phrases and RelationType values in a question to relation types."""
+    lowered = question.lower()
+    relation_types = []
+    for phrase, relation_type in RELATION_PHRASES.items():
+        if phrase in lowered and relation_type not in relation_types:
+            relation_types.append(relation_type)
+    for relation_type in RelationType:
+        value = relation_type.value
+        if value not in relation_types and re.search(rf"\b{re.escape(value.replace('_', ' '))}s?\b", lowered):
+            relation_types.append(value)
+    return relation_types
+
+
+def extract_temporal_filter(question: str) -> str | None:
+    """Return the first temporal phrase in a question (e.g. 'last week'), if any."""
+    match = TEMPORAL_PATTERN.search(question)
+    return match.group(0).strip() if match else None
+
+
+def extract_search_terms(question: str, entity_names: list[str]) -> list[str]:
+    """Content words of a question that are not part of an entity name or a time phrase."""
+    name_tokens = {t for name in entity_names for t in tokenize(name)}
+    without_time = TEMPORAL_PATTERN.sub(" ", question)
+    return [
+        t for t in tokenize(without_time)
+        if t not in STOPWORDS and t not in TEMPORAL_WORDS and t not in name_tokens
+    ]
+
+
+class IntentClassifier:
+    """Multinomial logistic regression over sparse question features."""
+
+    def __init__(self, examples: list[tuple[str, QueryIntent]] | None = None):
+        """
+        Initialize and train the classifier.
+
+        Args:
+            examples: (question, intent) training pairs (defaults to SEED_EXAMPLES)
+        """
+        self.intents = list(QueryIntent)
+        self.weights: dict[QueryIntent, dict[str, float]] = {i: {} for i in self.intents}
+        self.fit(examples if examples is not None else SEED_EXAMPLES)
+
+    def fit(
+        self,
+        examples: list[tuple[str, QueryIntent]],
+        epochs: int = 30,
+        learning_rate: float = 0.5,
+        l2: float = 0.001,
+    ) -> None:
+        """
+        Train weights with plain SGD on the softmax cross-entropy loss.
+
+        Training is deterministic: examples are visited in the given order.
+
+        Args:
+            examples: (question, intent) training pairs
+            epochs: Number of passes over the examples
+            learning_rate: SGD step size
+            l2: L2 penalty, keeps confidences calibrated on unseen wording
+        """
+        self.weights = {i: {} for i in self.intents}
+        data = [(extract_features(q), QueryIntent(intent)) for q, intent in examples]
+
+        for _ in range(epochs):
+            for features, label in data:
+                probs = self._probabilities(features)
+                for intent in self.intents:
+                    gradient = probs[intent] - (1.0 if intent == label else 0.0)
+                    weights = self.weights[intent]
+                    for name, value in features.items():
+                        current = weights.get(name, 0.0)
+                        weights[name] = current - learning_rate * (gradient * value + l2 * current)
+
+    def _probabilities(self, features: dict[str, float]) -> dict[QueryIntent, float]:
+        scores = {
+            intent: sum(self.weights[intent].get(name, 0.0) * value for name, value in features.items())
+            for intent in self.intents
+        }
+        top = max(scores.values())
+        exp_scores = {intent: math.exp(score - top) for intent, score in scores.items()}
+        total = sum(exp_scores.values())
+        return {intent: value / total for intent, value in exp_scores.items()}
+
+    def predict(self, question: str) -> tuple[QueryIntent, float]:
+        """
+        Predict the intent of a question.
+
+        Args:
+            question: Natural language question
+
+        Returns:
+            Tuple of (intent, confidence) where confidence is the softmax probability
+        """
+        probs = self._probabilities(extract_features(question))
+        intent = max(probs, key=probs.get)
+        return intent, probs[intent]
+
+    def parse(
+        self, question: str, known_names: NameIndex | list[str] | None = None
+    ) -> tuple[QueryPlan, float]:
+        """
+        Parse a question into a QueryPlan with intent and slots filled locally.
+
+        Args:
+            question: Natural language question
+            known_names: Names from the resolver's name index
+
+        Returns:
+            Tuple of (QueryPlan, confidence)
+        """
+        intent, confidence = self.predict(question)
+        entity_names = extract_entity_names(question, known_names)
+
+        temporal_filter = extract_temporal_filter(question)
+
+        # "What did I do last week?" has no one to build a timeline for; it is a
+        # search of the user's own intel within the time range
+        if intent == QueryIntent.TEMPORAL_QUERY and not entity_names and temporal_filter:
+            intent = QueryIntent.INTEL_SEARCH
+
+        if intent == QueryIntent.PATH_FINDING and SELF_TOKENS.intersection(tokenize(question)):
+            entity_names = [SELF_REFERENCE] + entity_names
+
+        plan = QueryPlan(
+            intent=intent,
+            entity_names=entity_names[:2] if intent == QueryIntent.PATH_FINDING else entity_names,
+            search_terms=extract_search_terms(question, entity_names),
+            relation_types=extract_relation_types(question) if intent == QueryIntent.RELATION_QUERY else [],
+            temporal_filter=temporal_filter,
+            reasoning=f"Local intent classifier: {intent.value} (confidence {confidence:.2f})",
+        )
+        return plan, confidence
+
+    def classify(
+        self, question: str, threshold: float, known_names: NameIndex | list[str] | None = None
+    ) -> QueryPlan | None:
+        """
+        Parse a question locally, returning None when confidence is below threshold
+        or a required slot is empty.
+
+        Args:
+            question: Natural language question
+            threshold: Minimum confidence to accept the local parse
+            known_names: Names from the resolver's name index
+
+        Returns:
+            QueryPlan, or None if the caller should fall back to the LLM
+        """
+        plan, confidence = self.parse(question, known_names)
+        if confidence < threshold:
+            logger.info(f"Intent classifier below threshold ({confidence:.2f} < {threshold}) for: {question}")
+            return None
+        if plan.intent == QueryIntent.PATH_FINDING and len(plan.entity_names) < 2:
+            return None
+        if plan.intent in ENTITY_INTENTS and not [n for n in plan.entity_names if n != SELF_REFERENCE]:
+            logger.info(f"Intent classifier found no entity for {plan.intent.value}: {question}")
+            return None
+        if plan.intent == QueryIntent.ENTITY_SEARCH and not (plan.entity_names or plan.search_terms):
+            return None
+        if plan.intent == QueryIntent.INTEL_SEARCH and not (
+            plan.entity_names or plan.search_terms or plan.temporal_filter
+        ):
+            return None
+        return plan
+
+
+def load_logged_examples(path: str) -> list[tuple[str, QueryIntent]]:
+    """
+    Load (question, intent) pairs from a JSONL log of LLM-parsed plans.
+
+    Args:
+        path: Path to the log written by log_parsed_plan
+
+    Returns:
+        List of training pairs (malformed lines are skipped)
+    """
+    examples = []
+    log_file = Path(path)
+    if not log_file.exists():
+        return examples
+
+    for line in log_file.read_text().splitlines():
+        try:
+            record = json.loads(line)
+            examples.append((record["question"], QueryIntent(record["intent"])))
+        except (ValueError, KeyError):
+            continue
+    return examples
+
+
+def log_parsed_plan(path: str, question: str, plan: QueryPlan) -> None:
+    """Append an LLM-parsed plan to the JSONL training log."""
+    try:
+        with open(path, "a") as log_file:
+            log_file.write(json.dumps({"question": question, **plan.model_dump(mode="json")}) + "\n")
+    except OSError as e:
+        logger.warning(f"Could not write intent log {path}: {e}")
+
+
+# Global classifier instance
+_intent_classifier: IntentClassifier | None = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Get the global intent classifier, trained on seed plus logged examples."""
+    global _intent_classifier
+    if _intent_classifier is None:
+        from app.config import settings
+
+        examples = list(SEED_EXAMPLES)
+        if settings.intent_log_path:
+            examples.extend(load_logged_examples(settings.intent_log_path))
+        _intent_classifier = IntentClassifier(examples)
+    return _intent_classifier
@@ -1,11 +1,18 @@
-import instructor
-from openai import OpenAI
-import anthropic
-import outlines
-from outlines.inputs import Chat
-from ollama import Client as OllamaClient
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+
+import httpx
+
 from app.config import settings
 from app.models.extraction import IntelligenceExtraction
+from app.services.llm_usage import register_instructor_hooks, track_llm_call
+from app.services.metrics import MODEL_LOAD_SECONDS, MODEL_LOADS
+
+logger = logging.getLogger(__name__)
 
 
 # Shared system prompt for cloud providers (OpenAI, Anthropic)
@@ -55,21 +62,46 @@ USER-CENTRIC TEXT HANDLING:
 
 
 def build_user_prompt(text: str, context: str | None = None, user_name: str | None = None) -> str:
-    """Build user prompt with optional user name and context prepended."""
-    prompt = f"Extract structured intelligence from the following text:\n\n{text}"
+    """Build user prompt with optional user name and context.
+
+    The fixed instruction comes first and per-request parts after it, so the
+    longest possible prefix is identical across calls (prompt caching).
+    """
+    parts = ["Extract structured intelligence from the following text."]
 
     if user_name:
-        prompt = f"The authenticated user is: {user_name}\n\n{prompt}"
+        parts.append(f"The authenticated user is: {user_name}")
 
     if context:
-        prompt = f"Context: {context}\n\n{prompt}"
+        parts.append(f"Context: {context}")
 
-    return prompt
+    parts.append(f"Text:\n\n{text}")
+    return "\n\n".join(parts)
+
+
+@dataclass
+class ModelLoadStats:
+    """Model load events observed for a local provider."""
+    loads: int = 0
+    total_seconds: float = 0.0
+    last_seconds: float = 0.0
+    last_loaded_at: float | None = None
+
+    def record(self, seconds: float) -> None:
+        self.loads += 1
+        self.total_seconds += seconds
+        self.last_seconds = seconds
+        self.last_loaded_at = time.time()
+
+    def as_dict(self) -> dict:
+        return asdict(self)
 
 
 class LLMProvider:
     """Base class for LLM providers with instructor integration."""
 
+    provider_name = ""
+
     def __init__(self):
         self.client = None
 
@@ -90,43 +122,65 @@ class LLMProvider:
         """
         raise NotImplementedError
 
+    def warm_up(self) -> None:
+        """
+        Prepare the provider so the first real request runs at steady-state latency.
+
+        Cloud providers need nothing beyond client construction; local providers
+        override this to load the model.
+        """
+
+    def stats(self) -> dict:
+        """Provider runtime stats for the health endpoint."""
+        return {}
+
 
 class OpenAIProvider(LLMProvider):
     """OpenAI provider with instructor integration."""
 
+    provider_name = "openai"
+
     def __init__(self, model: str = "gpt-4o", api_key: str | None = None):
         super().__init__()
         self.model = model
 
+        # Provider SDKs are imported on first use to keep worker start-up fast
+        import instructor
+        from openai import OpenAI
+
         # Create OpenAI client
         openai_client = OpenAI(api_key=api_key or settings.openai_api_key)
 
         # Patch with instructor for structured outputs
         self.client = instructor.from_openai(openai_client)
+        register_instructor_hooks(self.client)
 
     def extract(
         self, text: str, context: str | None = None, max_retries: int = 3, user_name: str | None = None
     ) -> IntelligenceExtraction:
         """Extract structured intelligence using OpenAI with instructor."""
-        return self.client.chat.completions.create(
-            model=self.model,
-            response_model=IntelligenceExtraction,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": build_user_prompt(text, context, user_name)},
-            ],
-            max_retries=max_retries,
-        )
+        with track_llm_call(self, "extract") as call:
+            result = self.client.chat.completions.create(
+                model=self.model,
+                response_model=IntelligenceExtraction,
+                **chat_messages(self, SYSTEM_PROMPT, build_user_prompt(text, context, user_name)),
+                max_retries=max_retries,
+            )
+            call.record(result)
+        return result
 
 
 class OllamaProvider(LLMProvider):
-    """Ollama provider with Outlines structured generation.
+    """Ollama provider with schema-constrained structured generation.
 
-    Uses outlines.from_ollama for grammar-constrained decoding, guaranteeing
-    schema-valid JSON output from local models without retries.
+    Passes the IntelligenceExtraction JSON schema as the chat format, so Ollama
+    uses grammar-constrained decoding and guarantees schema-valid JSON output
+    from local models without retries.
     """
 
-    # System prompt for Ollama — kept concise since Outlines enforces the schema
+    provider_name = "ollama"
+
+    # System prompt for Ollama — kept concise since the format enforces the schema
     OLLAMA_SYSTEM_PROMPT = """You are a personal intelligence analyst. Extract structured data from text for a life graph database.
 
 Your task is to:
@@ -154,59 +208,222 @@ USER-CENTRIC TEXT HANDLING:
         base = base_url or settings.ollama_base_url
         host = base.rstrip("/").removesuffix("/v1")
 
-        # Create native Ollama client and wrap with Outlines for structured generation
-        ollama_client = OllamaClient(host=host)
-        self.outlines_model = outlines.from_ollama(ollama_client, model)
+        from ollama import Client as OllamaClient
+
+        self.ollama_client = OllamaClient(host=host)
+        self.extraction_schema = IntelligenceExtraction.model_json_schema()
+
+        # Context size the model is kept loaded with (see _options). Requests and
+        # residency pings all use it, because Ollama reloads the model whenever
+        # num_ctx changes; it only grows
+        self.resident_num_ctx = settings.ollama_num_ctx_min
+        self._num_ctx_lock = threading.Lock()
+        self.load_stats = ModelLoadStats()
+        self._ping_stop: threading.Event | None = None
+
+    def _options(self, prompt: str) -> dict:
+        """Build Ollama options for a prompt.
+
+        num_ctx is a sticky bucket: resident_num_ctx, doubled from
+        ollama_num_ctx_min until it holds the estimated prompt tokens (~3 chars
+        per token) plus as many for the answer. It only grows, so a short prompt
+        after a long one keeps the loaded context size instead of reloading the
+        model. num_predict is counted within num_ctx: it is capped at the room
+        left after the prompt, and at least a quarter of the context.
+        """
+        prompt_tokens = len(prompt) // 3
+        with self._num_ctx_lock:
+            num_ctx = self.resident_num_ctx
+            while num_ctx < 2 * prompt_tokens and num_ctx < settings.ollama_num_ctx_max:
+                num_ctx *= 2
+            num_ctx = min(num_ctx, settings.ollama_num_ctx_max)
+            self.resident_num_ctx = num_ctx
+        num_predict = min(settings.ollama_num_predict, max(num_ctx - prompt_tokens, num_ctx // 4))
+        return {"num_ctx": num_ctx, "num_predict": num_predict}
 
     def extract(
         self, text: str, context: str | None = None, max_retries: int = 3, user_name: str | None = None
     ) -> IntelligenceExtraction:
-        """Extract structured intelligence using Ollama with Outlines.
+        """Extract structured intelligence using Ollama.
+
+        The IntelligenceExtraction schema is enforced at the token level via
+        grammar-constrained decoding, so max_retries is not needed for
+        validation — output is guaranteed to match the schema. The native chat
+        response carries prompt_eval_count and eval_count, so token usage is
+        recorded.
+        """
+        user_prompt = build_user_prompt(text, context, user_name)
+
+        with track_llm_call(self, "extract") as call:
+            response = self.ollama_client.chat(
+                model=self.model_name,
+                messages=[
+                    {"role": "system", "content": self.OLLAMA_SYSTEM_PROMPT},
+                    {"role": "user", "content": user_prompt},
+                ],
+                format=self.extraction_schema,
+                options=self._options(self.OLLAMA_SYSTEM_PROMPT + user_prompt),
+                keep_alive=settings.ollama_keep_alive,
+            )
+            call.record(response)
+        return IntelligenceExtraction.model_validate_json(response.message.content)
+
+    def ensure_resident(self, num_ctx: int | None = None) -> bool:
+        """Make sure the model is loaded with a context size and refresh its keep-alive.
+
+        Args:
+            num_ctx: Context size to load with (defaults to resident_num_ctx)
 
-        Outlines enforces the IntelligenceExtraction schema at the token level
-        via grammar-constrained decoding, so max_retries is not needed for
-        validation — output is guaranteed to match the schema.
+        Returns:
+            True if the model had to be (re)loaded
         """
-        chat = Chat([
-            {"role": "system", "content": self.OLLAMA_SYSTEM_PROMPT},
-            {"role": "user", "content": build_user_prompt(text, context, user_name)},
-        ])
+        num_ctx = num_ctx or self.resident_num_ctx
+        loaded = any(
+            m.model == self.model_name and (not m.context_length or m.context_length == num_ctx)
+            for m in self.ollama_client.ps().models
+        )
+
+        # An empty prompt loads the model (if needed) and resets its keep-alive timer
+        response = self.ollama_client.generate(
+            model=self.model_name,
+            prompt="",
+            options={"num_ctx": num_ctx},
+            keep_alive=settings.ollama_keep_alive,
+        )
+
+        if not loaded:
+            seconds = (response.load_duration or 0) / 1e9
+            self.load_stats.record(seconds)
+            MODEL_LOADS.labels(self.provider_name, self.model_name).inc()
+            MODEL_LOAD_SECONDS.labels(self.provider_name, self.model_name).inc(seconds)
+            logger.info(f"Loaded Ollama model {self.model_name} (num_ctx={num_ctx}) in {seconds:.1f}s")
+        return not loaded
+
+    def warm_up(self) -> None:
+        """Load the model into Ollama's memory and exercise the structured output path.
+
+        Generates a single token against the IntelligenceExtraction schema so
+        the model load and grammar compilation happen before the first request.
+        """
+        num_ctx = self._options(self.OLLAMA_SYSTEM_PROMPT)["num_ctx"]
+        self.ensure_resident(num_ctx)
+        self.ollama_client.chat(
+            model=self.model_name,
+            messages=[{"role": "user", "content": "ping"}],
+            format=self.extraction_schema,
+            options={"num_ctx": num_ctx, "num_predict": 1},
+            keep_alive=settings.ollama_keep_alive,
+        )
+
+    def start_residency_ping(self, interval_seconds: float) -> None:
+        """Ping the model every interval_seconds from a daemon thread so it is never unloaded."""
+        if self._ping_stop is not None:
+            return
+        self._ping_stop = threading.Event()
+
+        from ollama import ResponseError
 
-        result = self.outlines_model(chat, IntelligenceExtraction)
-        return IntelligenceExtraction.model_validate_json(result)
+        def ping(stop: threading.Event) -> None:
+            while not stop.wait(interval_seconds):
+                try:
+                    self.ensure_resident()
+                except (ResponseError, httpx.HTTPError, ConnectionError) as e:
+                    logger.warning(f"Ollama residency ping failed: {e}")
+
+        threading.Thread(target=ping, args=(self._ping_stop,), name="ollama-residency", daemon=True).start()
+
+    def stop_residency_ping(self) -> None:
+        """Stop the residency ping thread, if running."""
+        if self._ping_stop is not None:
+            self._ping_stop.set()
+            self._ping_stop = None
+
+    def stats(self) -> dict:
+        return {"num_ctx": self.resident_num_ctx, "model_loads": self.load_stats.as_dict()}
 
 
 class AnthropicProvider(LLMProvider):
     """Anthropic provider with instructor integration."""
 
+    provider_name = "anthropic"
+
     def __init__(self, model: str = "claude-sonnet-4-5-20250514", api_key: str | None = None):
         super().__init__()
         self.model = model
 
+        import anthropic
+        import instructor
+
         anthropic_client = anthropic.Anthropic(api_key=api_key or settings.anthropic_api_key)
         self.client = instructor.from_anthropic(anthropic_client)
+        register_instructor_hooks(self.client)
 
     def extract(
         self, text: str, context: str | None = None, max_retries: int = 3, user_name: str | None = None
     ) -> IntelligenceExtraction:
         """Extract structured intelligence using Anthropic with instructor."""
-        return self.client.chat.completions.create(
-            model=self.model,
-            response_model=IntelligenceExtraction,
-            messages=[
-                {"role": "user", "content": build_user_prompt(text, context, user_name)},
-            ],
-            system=SYSTEM_PROMPT,
-            max_tokens=4096,
-            max_retries=max_retries,
-        )
+        with track_llm_call(self, "extract") as call:
+            result = self.client.chat.completions.create(
+                model=self.model,
+                response_model=IntelligenceExtraction,
+                **chat_messages(self, SYSTEM_PROMPT, build_user_prompt(text, context, user_name)),
+                max_tokens=4096,
+                max_retries=max_retries,
+            )
+            call.record(result)
+        return result
+
+
+def chat_messages(provider: LLMProvider | None, system_prompt: str, user_prompt: str) -> dict:
+    """
+    Build cache-friendly chat arguments for a static system prompt and a per-request user prompt.
+
+    For Anthropic the system prompt is sent as a system block with
+    cache_control, so tools + system are cached across calls. Other providers
+    get the system prompt as the first message; OpenAI caches identical
+    prefixes automatically.
+
+    Returns:
+        Keyword arguments for client.chat.completions.create
+    """
+    if isinstance(provider, AnthropicProvider):
+        return {
+            "system": [{"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": user_prompt}],
+        }
+    return {
+        "messages": [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+    }
+
+
+# Provider registry. Providers hold SDK clients and HTTP connection pools, so
+# they are built once per (provider, model, api-key hash) and reused. Providers
+# using the configured keys are kept for the process lifetime; providers built
+# with user-supplied keys are evicted LRU beyond settings.llm_user_key_cache_size.
+_providers: dict[tuple[str, str, str], LLMProvider] = {}
+_user_key_providers: OrderedDict[tuple[str, str, str], LLMProvider] = OrderedDict()
+_providers_lock = threading.Lock()
+
+
+def _build_provider(provider: str, model: str, api_key: str | None) -> LLMProvider:
+    if provider == "openai":
+        return OpenAIProvider(model=model, api_key=api_key)
+    if provider == "ollama":
+        return OllamaProvider(model=model)
+    if provider == "anthropic":
+        return AnthropicProvider(model=model, api_key=api_key)
+
+    raise ValueError(f"Unknown LLM provider: {provider}")
 
 
 def get_llm_provider(
     provider: str | None = None, model: str | None = None, api_key: str | None = None
 ) -> LLMProvider:
     """
-    Factory function to get the appropriate LLM provider.
+    Get the appropriate LLM provider from the registry, building it on first use.
 
     Args:
         provider: "openai", "ollama", or "anthropic" (defaults to settings.llm_provider)
@@ -214,16 +431,91 @@ def get_llm_provider(
         api_key: Optional API key override for cloud providers
 
     Returns:
-        LLMProvider instance
+        Shared LLMProvider instance
     """
     provider = provider or settings.llm_provider
     model = model or settings.llm_model
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest() if api_key else ""
+    key = (provider, model, key_hash)
+
+    with _providers_lock:
+        existing = _lookup_provider(key, api_key)
+    if existing is not None:
+        return existing
+
+    # Built outside the lock: SDK imports and client construction are slow and
+    # must not block lookups of other providers
+    instance = _build_provider(provider, model, api_key)
+
+    with _providers_lock:
+        # Another thread may have built the same provider meanwhile; keep the first
+        existing = _lookup_provider(key, api_key)
+        if existing is not None:
+            return existing
+        if not api_key:
+            _providers[key] = instance
+            return instance
+
+        _user_key_providers[key] = instance
+        while len(_user_key_providers) > settings.llm_user_key_cache_size:
+            _user_key_providers.popitem(last=False)
+        return instance
+
+
+def _lookup_provider(key: tuple[str, str, str], api_key: str | None) -> LLMProvider | None:
+    """Registry lookup (caller holds _providers_lock); refreshes the LRU position of user-key providers."""
+    if not api_key:
+        return _providers.get(key)
+    instance = _user_key_providers.get(key)
+    if instance is not None:
+        _user_key_providers.move_to_end(key)
+    return instance
+
+
+def warm_up_llm_provider() -> None:
+    """
+    Build and warm up the configured provider.
 
-    if provider == "openai":
-        return OpenAIProvider(model=model, api_key=api_key)
-    if provider == "ollama":
-        return OllamaProvider(model=model)
-    if provider == "anthropic":
-        return AnthropicProvider(model=model, api_key=api_key)
+    Called from the app lifespan so the first request does not pay for client
+    construction or (for Ollama) loading the model. Failures are logged, not
+    raised, so the service still starts when the provider is misconfigured or
+    the LLM backend is down.
+    """
+    from ollama import ResponseError
 
-    raise ValueError(f"Unknown LLM provider: {provider}")
+    try:
+        get_llm_provider().warm_up()
+    except (ValueError, ImportError, ResponseError, httpx.HTTPError, ConnectionError) as e:
+        logger.warning(f"LLM provider warm-up failed: {e}")
+
+
+def _configured_provider() -> LLMProvider | None:
+    """The configured provider if it has been built, without building it."""
+    return _providers.get((settings.llm_provider, settings.llm_model, ""))
+
+
+def get_provider_stats() -> dict:
+    """Runtime stats of the configured provider, or {} if it has not been built yet."""
+    provider = _configured_provider()
+    return provider.stats() if provider else {}
+
+
+def start_residency_ping() -> None:
+    """
+    Keep the configured Ollama model loaded (no-op for cloud providers).
+
+    Uses the provider built by warm_up_llm_provider and does nothing if it
+    could not be built, so a misconfigured provider does not stop start-up.
+    The ping still starts when only the warm-up call failed: it loads the
+    model once the backend is reachable.
+    """
+    provider = _configured_provider()
+    if isinstance(provider, OllamaProvider) and settings.ollama_residency_ping_seconds > 0:
+        provider.start_residency_ping(settings.ollama_residency_ping_seconds)
+
+
+def stop_residency_ping() -> None:
+    """Stop the residency ping started by start_residency_ping."""
+    provider = _configured_provider()
+    if isinstance(provider, OllamaProvider):
+        provider.stop_residency_ping()
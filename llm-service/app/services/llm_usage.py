@@ -0,0 +1,309 @@
+"""
+LLM call accounting.
+
+Every provider call (extract, intent parse, synthesis, briefing) runs inside
+track_llm_call(), which records token usage (including prompt-cache hits),
+time to first response, total latency, attempts, validation failures and
+estimated cost, labeled by provider, model and endpoint.
+
+Records are aggregated into process-wide totals (get_usage_totals, served by
+the metrics route) and, inside collect_llm_calls(), gathered per request so a
+summary can be attached to the API response.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+from app.models.usage import LLMUsageSummary, TokenUsage
+from app.services.tracing import span
+
+logger = logging.getLogger(__name__)
+
+# USD per million tokens: (uncached input, cached input, output, cache write).
+# Matched by model-name prefix, longest first; unknown and local models have no cost.
+MODEL_PRICES_PER_MTOK: dict[str, tuple[float, float, float, float]] = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60, 0.0),
+    "gpt-4o": (2.50, 1.25, 10.00, 0.0),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60, 0.0),
+    "gpt-4.1": (2.00, 0.50, 8.00, 0.0),
+    "claude-haiku-4-5": (1.00, 0.10, 5.00, 1.25),
+    "claude-sonnet-4": (3.00, 0.30, 15.00, 3.75),
+    "claude-opus-4": (15.00, 1.50, 75.00, 18.75),
+}
+
+
+@dataclass
+class LLMCall:
+    """Accounting record for one logical LLM call (all retry attempts included)."""
+    provider: str
+    model: str
+    endpoint: str
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    attempts: int = 0
+    validation_failures: int = 0
+    first_response_ms: float | None = None
+    latency_ms: float = 0.0
+    error: str | None = None
+    started_at: float = field(default_factory=time.perf_counter)
+
+    @property
+    def retries(self) -> int:
+        return max(self.attempts - 1, 0)
+
+    @property
+    def cost_usd(self) -> float | None:
+        return estimate_cost(self.model, self.usage)
+
+    def add_response(self, response: Any) -> None:
+        """Record one completion response (one attempt)."""
+        self.attempts += 1
+        # Calls are not streamed: this is the latency of the first attempt, not time to first token
+        if self.first_response_ms is None:
+            self.first_response_ms = (time.perf_counter() - self.started_at) * 1000
+        usage = usage_from_response(response)
+        if usage is not None:
+            _add_usage(self.usage, usage)
+
+    def record(self, result: Any) -> None:
+        """Record the final result, unless instructor hooks already reported its responses."""
+        if self.attempts == 0:
+            self.add_response(result)
+
+
+@dataclass
+class CallTotals:
+    """Aggregated accounting for one (provider, model, endpoint)."""
+    calls: int = 0
+    errors: int = 0
+    attempts: int = 0
+    validation_failures: int = 0
+    usage: TokenUsage = field(default_factory=TokenUsage)
+    latency_ms_sum: float = 0.0
+    first_response_ms_sum: float = 0.0
+    latency_ms_max: float = 0.0
+    cost_usd: float = 0.0
+
+
+_totals: dict[tuple[str, str, str], CallTotals] = {}
+_totals_lock = threading.Lock()
+
+_current_call: ContextVar[LLMCall | None] = ContextVar("current_llm_call", default=None)
+_request_calls: ContextVar[list[LLMCall] | None] = ContextVar("request_llm_calls", default=None)
+
+
+def _count(obj: Any, name: str) -> int | None:
+    """Read an integer token count attribute, ignoring missing or non-integer values."""
+    value = getattr(obj, name, None)
+    return value if isinstance(value, int) else None
+
+
+def _add_usage(total: TokenUsage, usage: TokenUsage) -> None:
+    total.prompt += usage.prompt
+    total.completion += usage.completion
+    total.total += usage.total
+    total.cached_prompt += usage.cached_prompt
+    total.cache_write += usage.cache_write
+
+
+def usage_from_response(response: Any) -> TokenUsage | None:
+    """
+    Extract token usage from a provider response.
+
+    Accepts raw OpenAI/Anthropic completions, Ollama chat/generate responses,
+    and instructor results (which carry the raw completion as _raw_response).
+
+    Returns:
+        TokenUsage, or None if the response carries no usage information
+    """
+    response = getattr(response, "_raw_response", None) or response
+
+    # Ollama: counts are on the response itself
+    if _count(response, "prompt_eval_count") is not None:
+        prompt = _count(response, "prompt_eval_count")
+        completion = _count(response, "eval_count") or 0
+        return TokenUsage(prompt=prompt, completion=completion, total=prompt + completion)
+
+    usage = getattr(response, "usage", None)
+
+    # Anthropic: input_tokens excludes cache reads and writes
+    if _count(usage, "input_tokens") is not None:
+        cached = _count(usage, "cache_read_input_tokens") or 0
+        written = _count(usage, "cache_creation_input_tokens") or 0
+        prompt = _count(usage, "input_tokens") + cached + written
+        completion = _count(usage, "output_tokens") or 0
+        return TokenUsage(
+            prompt=prompt, completion=completion, total=prompt + completion,
+            cached_prompt=cached, cache_write=written,
+        )
+
+    # OpenAI: prompt_tokens includes cached tokens
+    if _count(usage, "prompt_tokens") is not None:
+        prompt = _count(usage, "prompt_tokens")
+        completion = _count(usage, "completion_tokens") or 0
+        cached = _count(getattr(usage, "prompt_tokens_details", None), "cached_tokens") or 0
+        return TokenUsage(prompt=prompt, completion=completion, total=prompt + completion, cached_prompt=cached)
+
+    return None
+
+
+def estimate_cost(model: str, usage: TokenUsage) -> float | None:
+    """Estimate the USD cost of a call from MODEL_PRICES_PER_MTOK, or None if the model is unpriced."""
+    for prefix in sorted(MODEL_PRICES_PER_MTOK, key=len, reverse=True):
+        if model.startswith(prefix):
+            uncached, cached, output, write = MODEL_PRICES_PER_MTOK[prefix]
+            uncached_tokens = usage.prompt - usage.cached_prompt - usage.cache_write
+            return (
+                uncached_tokens * uncached
+                + usage.cached_prompt * cached
+                + usage.cache_write * write
+                + usage.completion * output
+            ) / 1_000_000
+    return None
+
+
+def register_instructor_hooks(client: Any) -> None:
+    """
+    Report every attempt of an instructor client to the active LLMCall.
+
+    Instructor retries on validation errors internally; its hooks are the only
+    place where per-attempt responses and parse failures are visible.
+    """
+    def on_response(response: Any, *args: Any, **kwargs: Any) -> None:
+        call = _current_call.get()
+        if call is not None:
+            call.add_response(response)
+
+    def on_parse_error(*args: Any, **kwargs: Any) -> None:
+        call = _current_call.get()
+        if call is not None:
+            call.validation_failures += 1
+
+    client.on("completion:response", on_response)
+    client.on("parse:error", on_parse_error)
+
+
+def _finish(call: LLMCall) -> None:
+    """Aggregate a finished call into the totals and the current request."""
+    cost = call.cost_usd
+    key = (call.provider, call.model, call.endpoint)
+    with _totals_lock:
+        totals = _totals.setdefault(key, CallTotals())
+        totals.calls += 1
+        totals.errors += call.error is not None
+        totals.attempts += call.attempts
+        totals.validation_failures += call.validation_failures
+        _add_usage(totals.usage, call.usage)
+        totals.latency_ms_sum += call.latency_ms
+        totals.first_response_ms_sum += call.first_response_ms or 0.0
+        totals.latency_ms_max = max(totals.latency_ms_max, call.latency_ms)
+        totals.cost_usd += cost or 0.0
+
+    request_calls = _request_calls.get()
+    if request_calls is not None:
+        request_calls.append(call)
+
+    logger.debug(
+        f"LLM call {call.provider}/{call.model} [{call.endpoint}]: {call.latency_ms:.0f} ms, "
+        f"attempts={call.attempts}, prompt={call.usage.prompt} (cached={call.usage.cached_prompt}), "
+        f"completion={call.usage.completion}"
+    )
+
+
+@contextmanager
+def track_llm_call(provider: Any, endpoint: str, model: str | None = None) -> Iterator[LLMCall]:
+    """
+    Account for one LLM call made inside the block.
+
+    Usage:
+        with track_llm_call(provider, "intent") as call:
+            result = client.chat.completions.create(...)
+            call.record(result)
+
+    Args:
+        provider: LLMProvider making the call (labels come from provider_name and model)
+        endpoint: Call site label ("extract", "intent", "synthesis", "briefing")
+        model: Model name override (defaults to the provider's model)
+    """
+    provider_name = getattr(provider, "provider_name", None)
+    model = model or getattr(provider, "model", None) or getattr(provider, "model_name", None)
+    call = LLMCall(
+        provider=provider_name if isinstance(provider_name, str) else "unknown",
+        model=model if isinstance(model, str) else "unknown",
+        endpoint=endpoint,
+    )
+    token = _current_call.set(call)
+    with span(f"llm.{endpoint}", **{"llm.provider": call.provider, "llm.model": call.model}) as llm_span:
+        try:
+            yield call
+        except Exception as e:
+            call.error = type(e).__name__
+            raise
+        finally:
+            _current_call.reset(token)
+            call.latency_ms = (time.perf_counter() - call.started_at) * 1000
+            _finish(call)
+            llm_span.set_attributes({
+                "llm.attempts": call.attempts,
+                "llm.prompt_tokens": call.usage.prompt,
+                "llm.completion_tokens": call.usage.completion,
+                "llm.cached_prompt_tokens": call.usage.cached_prompt,
+            })
+
+
+@contextmanager
+def collect_llm_calls() -> Iterator[list[LLMCall]]:
+    """Collect the LLMCalls made inside the block (e.g. one API request)."""
+    calls: list[LLMCall] = []
+    token = _request_calls.set(calls)
+    try:
+        yield calls
+    finally:
+        _request_calls.reset(token)
+
+
+def summarize_calls(calls: list[LLMCall]) -> LLMUsageSummary:
+    """Summarize a request's LLM calls for the API response."""
+    costs = [c.cost_usd for c in calls]
+    return LLMUsageSummary(
+        calls=len(calls),
+        prompt_tokens=sum(c.usage.prompt for c in calls),
+        completion_tokens=sum(c.usage.completion for c in calls),
+        cached_prompt_tokens=sum(c.usage.cached_prompt for c in calls),
+        retries=sum(c.retries for c in calls),
+        validation_failures=sum(c.validation_failures for c in calls),
+        latency_ms=round(sum(c.latency_ms for c in calls), 1),
+        cost_usd=round(sum(c for c in costs if c is not None), 6) if any(c is not None for c in costs) else None,
+        endpoints=[c.endpoint for c in calls],
+    )
+
+
+def get_usage_totals() -> list[dict[str, Any]]:
+    """Return accumulated accounting per (provider, model, endpoint)."""
+    with _totals_lock:
+        return [
+            {
+                "provider": provider,
+                "model": model,
+                "endpoint": endpoint,
+                "calls": totals.calls,
+                "errors": totals.errors,
+                "retries": max(totals.attempts - totals.calls, 0),
+                "validation_failures": totals.validation_failures,
+                **totals.usage.model_dump(),
+                "latency_ms_avg": round(totals.latency_ms_sum / totals.calls, 1) if totals.calls else 0.0,
+                "latency_ms_max": round(totals.latency_ms_max, 1),
+                "first_response_ms_avg": (
+                    round(totals.first_response_ms_sum / totals.calls, 1) if totals.calls else 0.0
+                ),
+                "cost_usd": round(totals.cost_usd, 6),
+            }
+            for (provider, model, endpoint), totals in _totals.items()
+        ]
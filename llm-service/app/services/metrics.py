@@ -0,0 +1,193 @@
+"""
+Prometheus metrics for the extract and query pipelines.
+
+Each API request runs inside track_request(path), which labels the stage
+timings recorded with stage() and counts the database round-trips made by
+the Supabase clients created through instrument_client(). Gauges for the
+worker thread pool, event loop tasks and websocket connections are sampled
+when /metrics is scraped; event loop lag is sampled by monitor_event_loop()
+and local LLM model loads are counted as they happen.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+
+from app.services.profiling import record_round_trip, record_stage
+from app.services.tracing import trace_http_request, trace_http_response
+
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+ROUND_TRIP_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+STAGE_SECONDS = Histogram(
+    "tether_stage_duration_seconds",
+    "Duration of a pipeline stage",
+    ["path", "stage"],
+    buckets=STAGE_BUCKETS,
+)
+REQUEST_SECONDS = Histogram(
+    "tether_request_duration_seconds",
+    "Duration of an API request or websocket message",
+    ["path"],
+    buckets=STAGE_BUCKETS,
+)
+DB_ROUND_TRIPS = Counter(
+    "tether_db_round_trips",
+    "Database round-trips (PostgREST and auth HTTP requests)",
+    ["path"],
+)
+DB_ROUND_TRIPS_PER_REQUEST = Histogram(
+    "tether_db_round_trips_per_request",
+    "Database round-trips made by one request",
+    ["path"],
+    buckets=ROUND_TRIP_BUCKETS,
+)
+EXECUTOR_QUEUE_DEPTH = Gauge(
+    "tether_executor_queue_depth",
+    "Work waiting for an executor",
+    ["executor"],
+)
+EXECUTOR_BUSY = Gauge(
+    "tether_executor_busy",
+    "Executor workers currently in use",
+    ["executor"],
+)
+EVENT_LOOP_LAG = Gauge(
+    "tether_event_loop_lag_seconds",
+    "How late a timer on the event loop fired (time the loop was blocked)",
+)
+EVENT_LOOP_TASKS = Gauge(
+    "tether_event_loop_tasks",
+    "Tasks scheduled on the event loop",
+)
+WEBSOCKET_CONNECTIONS = Gauge(
+    "tether_websocket_connections",
+    "Open websocket connections",
+)
+MODEL_LOADS = Counter(
+    "tether_llm_model_loads",
+    "Times a local LLM was (re)loaded into memory",
+    ["provider", "model"],
+)
+MODEL_LOAD_SECONDS = Counter(
+    "tether_llm_model_load_seconds",
+    "Time spent loading local LLMs into memory",
+    ["provider", "model"],
+)
+
+
+class _RequestMetrics:
+    """Per-request state: path label and round-trip count."""
+
+    __slots__ = ("db_round_trips", "path")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db_round_trips = 0
+
+
+_current_request: ContextVar[_RequestMetrics | None] = ContextVar("current_request_metrics", default=None)
+
+
+def _current_path() -> str:
+    request = _current_request.get()
+    return request.path if request is not None else "other"
+
+
+@contextmanager
+def track_request(path: str) -> Iterator[_RequestMetrics]:
+    """
+    Label the stages and round-trips inside the block with path ("extract", "query", ...).
+
+    On exit the request duration and its round-trip count are observed.
+    """
+    request = _RequestMetrics(path)
+    token = _current_request.set(request)
+    start = time.perf_counter()
+    try:
+        yield request
+    finally:
+        _current_request.reset(token)
+        REQUEST_SECONDS.labels(path).observe(time.perf_counter() - start)
+        DB_ROUND_TRIPS_PER_REQUEST.labels(path).observe(request.db_round_trips)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Observe the duration of the block as pipeline stage name of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.labels(_current_path(), name).observe(seconds)
+        record_stage(name, seconds)
+
+
+def record_db_round_trip(*args: Any) -> None:
+    """Count one database round-trip for the current request (httpx request hook)."""
+    request = _current_request.get()
+    if request is not None:
+        request.db_round_trips += 1
+    DB_ROUND_TRIPS.labels(_current_path()).inc()
+    record_round_trip()
+
+
+def instrument_client(client: Any) -> Any:
+    """
+    Count the HTTP requests a Supabase client makes as database round-trips
+    and trace them as spans.
+
+    Hooks the httpx sessions behind PostgREST and auth; returns the client.
+    Clients without httpx sessions (e.g. test doubles) are returned unchanged.
+    """
+    for session in (client.postgrest.session, client.auth._http_client):
+        hooks = getattr(session, "event_hooks", None)
+        if isinstance(hooks, dict) and record_db_round_trip not in hooks["request"]:
+            session.event_hooks = {
+                "request": [*hooks["request"], record_db_round_trip, trace_http_request],
+                "response": [*hooks["response"], trace_http_response],
+            }
+    return client
+
+
+def _sample_executors() -> None:
+    """Sample the worker thread pool and event loop (must run on the event loop)."""
+    limiter = to_thread.current_default_thread_limiter().statistics()
+    EXECUTOR_QUEUE_DEPTH.labels("threadpool").set(limiter.tasks_waiting)
+    EXECUTOR_BUSY.labels("threadpool").set(limiter.borrowed_tokens)
+    EVENT_LOOP_TASKS.set(len(asyncio.all_tasks()))
+
+
+async def monitor_event_loop(interval_seconds: float = 1.0) -> None:
+    """
+    Sample event loop lag until cancelled.
+
+    Sleeps for interval_seconds and records how much later than requested it
+    woke up: the time the loop spent running callbacks instead of timers.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval_seconds)
+        EVENT_LOOP_LAG.set(max(loop.time() - start - interval_seconds, 0.0))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Return the Prometheus exposition payload and its content type."""
+    _sample_executors()
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,208 @@
+"""
+In-process sampling profiler and slow-request capture.
+
+StackSampler samples the Python stacks of running threads at a fixed interval
+and aggregates them as collapsed ("folded") stacks, one "frame;frame;frame count"
+line per distinct stack, which flamegraph.pl, speedscope and inferno read
+directly.
+
+SlowRequestMiddleware tracks in-flight HTTP requests. A single watchdog thread
+starts sampling the worker thread of any request that has been running longer
+than settings.slow_request_threshold_ms; when such a request finishes, its
+stack samples, stage breakdown (from metrics.stage) and database round-trip
+count are stored in a bounded ring buffer (get_slow_requests). Samples are
+taken from the thread running the request, so with concurrent requests on the
+same event loop they may include frames of other requests.
+
+Both are opt-in (settings.profiling_enabled) and cost nothing when disabled.
+"""
+
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from types import FrameType
+from typing import Any
+
+from app.config import settings
+
+MAX_STACK_DEPTH = 128
+
+
+def _fold(frame: FrameType | None, root: str | None = None) -> str:
+    """Collapse a frame chain into a root-first "frame;frame" string."""
+    names: list[str] = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        filename = code.co_filename.rsplit("site-packages/", 1)[-1]
+        names.append(f"{getattr(code, 'co_qualname', code.co_name)} ({filename}:{frame.f_lineno})")
+        frame = frame.f_back
+    if root:
+        names.append(root)
+    return ";".join(reversed(names))
+
+
+def render_folded(samples: Counter[str]) -> str:
+    """Render stack samples in collapsed-stack format, most frequent first."""
+    return "".join(f"{stack} {count}\n" for stack, count in samples.most_common())
+
+
+class StackSampler:
+    """Background thread sampling thread stacks every interval_s seconds."""
+
+    def __init__(self, interval_s: float = 0.01, thread_ids: set[int] | None = None):
+        """
+        Args:
+            interval_s: Seconds between samples
+            thread_ids: Threads to sample (default: all threads except the sampler)
+        """
+        self.interval_s = interval_s
+        self.thread_ids = thread_ids
+        self.samples: Counter[str] = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> StackSampler:
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.samples
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval_s):
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id or (self.thread_ids is not None and thread_id not in self.thread_ids):
+                    continue
+                self.samples[_fold(frame, names.get(thread_id, str(thread_id)))] += 1
+            self.sample_count += 1
+
+
+class RequestProfile:
+    """Timing, stage breakdown and stack samples of one in-flight request."""
+
+    __slots__ = ("db_round_trips", "method", "path", "samples", "stages", "started", "started_at", "thread_id")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.thread_id = threading.get_ident()
+        self.started = time.perf_counter()
+        self.started_at = datetime.now(UTC)
+        self.stages: list[tuple[str, float]] = []
+        self.db_round_trips = 0
+        self.samples: Counter[str] = Counter()
+
+
+_current_profile: ContextVar[RequestProfile | None] = ContextVar("current_request_profile", default=None)
+_in_flight: dict[int, RequestProfile] = {}
+_in_flight_lock = threading.Lock()
+_slow_requests: deque[dict[str, Any]] = deque(maxlen=settings.slow_request_buffer_size)
+_watchdog: threading.Thread | None = None
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Add a stage timing to the current request's profile, if it is being profiled."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.stages.append((name, seconds))
+
+
+def record_round_trip() -> None:
+    """Count a database round-trip on the current request's profile, if it is being profiled."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.db_round_trips += 1
+
+
+def get_slow_requests() -> list[dict[str, Any]]:
+    """Return captured slow requests, newest first."""
+    return list(reversed(_slow_requests))
+
+
+def _watch_in_flight(interval_s: float) -> None:
+    """Sample the threads of requests running longer than the slow-request threshold."""
+    while True:
+        time.sleep(interval_s)
+        threshold_s = settings.slow_request_threshold_ms / 1000
+        now = time.perf_counter()
+        with _in_flight_lock:
+            slow = [p for p in _in_flight.values() if now - p.started >= threshold_s]
+        if not slow:
+            continue
+        frames = sys._current_frames()
+        for profile in slow:
+            profile.samples[_fold(frames.get(profile.thread_id))] += 1
+
+
+def _ensure_watchdog() -> None:
+    global _watchdog
+    if _watchdog is None:
+        _watchdog = threading.Thread(
+            target=_watch_in_flight,
+            args=(settings.profiling_sample_interval_ms / 1000,),
+            name="slow-request-watchdog",
+            daemon=True,
+        )
+        _watchdog.start()
+
+
+def _finish(profile: RequestProfile, status: int | None) -> None:
+    with _in_flight_lock:
+        _in_flight.pop(id(profile), None)
+    duration_ms = (time.perf_counter() - profile.started) * 1000
+    if duration_ms < settings.slow_request_threshold_ms:
+        return
+    _slow_requests.append({
+        "method": profile.method,
+        "path": profile.path,
+        "status": status,
+        "started_at": profile.started_at.isoformat(),
+        "duration_ms": round(duration_ms, 1),
+        "db_round_trips": profile.db_round_trips,
+        "stages": [{"stage": name, "ms": round(seconds * 1000, 2)} for name, seconds in profile.stages],
+        "samples": sum(profile.samples.values()),
+        "profile": render_folded(profile.samples),
+    })
+
+
+class SlowRequestMiddleware:
+    """ASGI middleware capturing profiles of HTTP requests slower than the threshold."""
+
+    def __init__(self, app: Any):
+        self.app = app
+        _ensure_watchdog()
+
+    async def __call__(self, scope: dict, receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        status: int | None = None
+
+        async def send_with_status(message: dict) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = _current_profile.set(profile)
+        with _in_flight_lock:
+            _in_flight[id(profile)] = profile
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            _current_profile.reset(token)
+            _finish(profile, status)
@@ -1,14 +1,27 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import AsyncIterator
 from typing import Any
 
 from supabase import Client
 
 from app.models.query import QueryPlan, QueryIntent
+from app.services.tracing import current_span, traced
+from app.utils.date_parser import format_datetime_for_db, parse_date_range
+from app.utils.pagination import decode_cursor, keyset_filter, paginate
 
 logger = logging.getLogger(__name__)
 
+# Default and maximum page sizes for paginated intents
+INTEL_PAGE_SIZE = 20
+RELATION_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Keyset sort keys (descending) for paginated result types
+INTEL_KEYS = ("occurred_at", "id")
+RELATION_KEYS = ("created_at", "id")
+
 
 class QueryExecutor:
     """Translates a QueryPlan into Supabase calls and returns raw results."""
@@ -16,15 +29,42 @@ class QueryExecutor:
     def __init__(self, supabase: Client, user_id: str):
         self.supabase = supabase
         self.user_id = user_id
+        self._entity_id_cache: dict[str, str | None] = {}
+
+    @traced("query_executor.execute", lambda result: {
+        "query.result_type": result.get("type"),
+        "db.rows": len(result.get("data", [])),
+    })
+    async def execute(
+        self, plan: QueryPlan, cursor: str | None = None, page_size: int | None = None
+    ) -> dict[str, Any]:
+        """
+        Execute the query plan and return raw data.
+
+        Intel search, relation and temporal queries are keyset-paginated: the
+        result includes "next_cursor" when more rows are available, which can be
+        passed back as cursor to fetch the next page.
+
+        Args:
+            plan: Parsed query plan
+            cursor: Cursor from a previous page (paginated intents only)
+            page_size: Rows per page (defaults per intent, capped at MAX_PAGE_SIZE)
+        """
+        current_span().set_attribute("query.intent", plan.intent.value)
+        paginated = {
+            QueryIntent.INTEL_SEARCH: (self._intel_search, INTEL_PAGE_SIZE),
+            QueryIntent.RELATION_QUERY: (self._relation_query, RELATION_PAGE_SIZE),
+            QueryIntent.TEMPORAL_QUERY: (self._temporal_query, INTEL_PAGE_SIZE),
+        }.get(plan.intent)
+
+        if paginated:
+            handler, default_size = paginated
+            size = min(page_size or default_size, MAX_PAGE_SIZE)
+            return await handler(plan, cursor, size)
 
-    async def execute(self, plan: QueryPlan) -> dict[str, Any]:
-        """Execute the query plan and return raw data."""
         handler = {
             QueryIntent.ENTITY_SEARCH: self._entity_search,
-            QueryIntent.INTEL_SEARCH: self._intel_search,
             QueryIntent.PATH_FINDING: self._path_finding,
-            QueryIntent.RELATION_QUERY: self._relation_query,
-            QueryIntent.TEMPORAL_QUERY: self._temporal_query,
             QueryIntent.BRIEFING: self._briefing,
             QueryIntent.AGGREGATION: self._aggregation,
         }.get(plan.intent)
@@ -34,6 +74,22 @@ class QueryExecutor:
 
         return await handler(plan)
 
+    async def stream(self, plan: QueryPlan, page_size: int | None = None) -> AsyncIterator[dict[str, Any]]:
+        """
+        Yield result rows page by page until the result set is exhausted.
+
+        Only one page is held in memory at a time. Non-paginated intents yield
+        the rows of their single result.
+        """
+        cursor = None
+        while True:
+            result = await self.execute(plan, cursor=cursor, page_size=page_size)
+            for row in result.get("data", []):
+                yield row
+            cursor = result.get("next_cursor")
+            if not cursor:
+                break
+
     async def _entity_search(self, plan: QueryPlan) -> dict[str, Any]:
         results = []
         for name in plan.entity_names + plan.search_terms:
@@ -55,19 +111,34 @@ class QueryExecutor:
 
         return {"type": "entities", "data": deduped}
 
-    async def _intel_search(self, plan: QueryPlan) -> dict[str, Any]:
+    async def _intel_search(self, plan: QueryPlan, cursor: str | None, page_size: int) -> dict[str, Any]:
         search_query = " ".join(plan.search_terms + plan.entity_names)
-        if not search_query.strip():
-            return {"type": "intel", "data": []}
+        time_range = parse_date_range(plan.temporal_filter)
+        if not search_query.strip() and not time_range:
+            return {"type": "intel", "data": [], "next_cursor": None}
 
-        data = self.supabase.from_("intel") \
+        query = self.supabase.from_("intel") \
             .select("*") \
-            .text_search("search_vector", search_query, config="english") \
-            .is_("deleted_at", "null") \
-            .limit(20) \
+            .is_("deleted_at", "null")
+
+        if search_query.strip():
+            query = query.text_search("search_vector", search_query, config="english")
+        if time_range:
+            # Range predicates on occurred_at use idx_intel_occurred_at
+            query = query \
+                .gte("occurred_at", format_datetime_for_db(time_range[0])) \
+                .lt("occurred_at", format_datetime_for_db(time_range[1]))
+        if cursor:
+            query = query.or_(keyset_filter(cursor, INTEL_KEYS))
+
+        data = query \
+            .order("occurred_at", desc=True) \
+            .order("id", desc=True) \
+            .limit(page_size + 1) \
             .execute()
 
-        return {"type": "intel", "data": data.data or []}
+        rows, next_cursor = paginate(data.data or [], page_size, INTEL_KEYS)
+        return {"type": "intel", "data": rows, "next_cursor": next_cursor}
 
     async def _path_finding(self, plan: QueryPlan) -> dict[str, Any]:
         if len(plan.entity_names) < 2:
@@ -92,16 +163,17 @@ class QueryExecutor:
 
         path_data = data.data or []
 
-        # Resolve names for each entity in the path
         if path_data:
             row = path_data[0] if isinstance(path_data, list) else path_data
             path_ids = row.get("path", [])
             rel_types = row.get("relation_types", [])
+            # Names come with the path (find_shortest_path returns path_names)
+            path_names = row.get("path_names") or [None] * len(path_ids)
 
-            resolved_path = []
-            for pid in path_ids:
-                name = await self._resolve_entity_name(pid)
-                resolved_path.append({"entity_id": pid, "name": name})
+            resolved_path = [
+                {"entity_id": pid, "name": name or pid[:8]}
+                for pid, name in zip(path_ids, path_names, strict=False)
+            ]
 
             return {
                 "type": "path",
@@ -114,64 +186,78 @@ class QueryExecutor:
 
         return {"type": "path", "data": [], "message": "No path found"}
 
-    async def _relation_query(self, plan: QueryPlan) -> dict[str, Any]:
-        results = []
+    async def _relation_query(self, plan: QueryPlan, cursor: str | None, page_size: int) -> dict[str, Any]:
+        entity_ids = []
         for name in plan.entity_names:
             entity_id = await self._resolve_entity_id(name)
-            if not entity_id:
-                continue
+            if entity_id and entity_id not in entity_ids:
+                entity_ids.append(entity_id)
 
-            query = self.supabase.from_("relations") \
-                .select("*") \
-                .or_(f"source_id.eq.{entity_id},target_id.eq.{entity_id}") \
-                .is_("deleted_at", "null")
+        if not entity_ids:
+            return {"type": "relations", "data": [], "next_cursor": None}
 
-            if plan.relation_types:
-                query = query.in_("type", plan.relation_types)
+        id_list = ",".join(entity_ids)
+        query = self.supabase.from_("relations") \
+            .select("*") \
+            .or_(f"source_id.in.({id_list}),target_id.in.({id_list})") \
+            .is_("deleted_at", "null")
+
+        if plan.relation_types:
+            query = query.in_("type", plan.relation_types)
+        if cursor:
+            query = query.or_(keyset_filter(cursor, RELATION_KEYS))
+
+        data = query \
+            .order("created_at", desc=True) \
+            .order("id", desc=True) \
+            .limit(page_size + 1) \
+            .execute()
 
-            data = query.limit(50).execute()
-            if data.data:
-                for rel in data.data:
-                    # Resolve names for source and target
-                    source_name = await self._resolve_entity_name(rel["source_id"])
-                    target_name = await self._resolve_entity_name(rel["target_id"])
-                    rel["source_name"] = source_name
-                    rel["target_name"] = target_name
-                results.extend(data.data)
+        rows, next_cursor = paginate(data.data or [], page_size, RELATION_KEYS)
+
+        # Resolve names for sources and targets of this page in one call
+        names = await self._resolve_entity_names(
+            {rel["source_id"] for rel in rows} | {rel["target_id"] for rel in rows}
+        )
+        for rel in rows:
+            rel["source_name"] = names[rel["source_id"]]
+            rel["target_name"] = names[rel["target_id"]]
 
-        return {"type": "relations", "data": results}
+        return {"type": "relations", "data": rows, "next_cursor": next_cursor}
 
-    async def _temporal_query(self, plan: QueryPlan) -> dict[str, Any]:
+    async def _temporal_query(self, plan: QueryPlan, cursor: str | None, page_size: int) -> dict[str, Any]:
         # Find intel related to entities, sorted by time
-        results = []
+        entity_names_by_id: dict[str, str] = {}
         for name in plan.entity_names:
             entity_id = await self._resolve_entity_id(name)
-            if not entity_id:
-                continue
+            if entity_id:
+                entity_names_by_id.setdefault(entity_id, name)
 
-            # Get intel linked to this entity
-            ie_data = self.supabase.from_("intel_entities") \
-                .select("intel_id") \
-                .eq("entity_id", entity_id) \
-                .is_("deleted_at", "null") \
-                .execute()
+        if not entity_names_by_id:
+            return {"type": "intel", "data": [], "next_cursor": None}
 
-            if ie_data.data:
-                intel_ids = [ie["intel_id"] for ie in ie_data.data]
-                intel_data = self.supabase.from_("intel") \
-                    .select("*") \
-                    .in_("id", intel_ids) \
-                    .is_("deleted_at", "null") \
-                    .order("occurred_at", desc=True) \
-                    .limit(20) \
-                    .execute()
+        params: dict[str, Any] = {
+            "p_entity_ids": list(entity_names_by_id),
+            "p_limit": page_size + 1,
+        }
+        time_range = parse_date_range(plan.temporal_filter)
+        if time_range:
+            params["p_from"] = format_datetime_for_db(time_range[0])
+            params["p_to"] = format_datetime_for_db(time_range[1])
+        if cursor:
+            params["p_before_occurred_at"], params["p_before_id"] = decode_cursor(cursor)
+
+        # Join intel_entities -> intel in the database (see get_entity_intel)
+        intel_data = self.supabase.rpc("get_entity_intel", params).execute()
 
-                if intel_data.data:
-                    for intel in intel_data.data:
-                        intel["related_entity_name"] = name
-                    results.extend(intel_data.data)
+        rows, next_cursor = paginate(intel_data.data or [], page_size, INTEL_KEYS)
+        for intel in rows:
+            linked = intel.pop("entity_ids", None) or []
+            intel["related_entity_name"] = next(
+                (entity_names_by_id[eid] for eid in linked if eid in entity_names_by_id), None
+            )
 
-        return {"type": "intel", "data": results}
+        return {"type": "intel", "data": rows, "next_cursor": next_cursor}
 
     async def _briefing(self, plan: QueryPlan) -> dict[str, Any]:
         # Delegate to entity search + gather all info
@@ -185,33 +271,30 @@ class QueryExecutor:
         return {"type": "briefing", "data": [{"entity_id": entity_id, "name": plan.entity_names[0]}]}
 
     async def _aggregation(self, plan: QueryPlan) -> dict[str, Any]:
-        # Count entities, relations, etc.
-        entity_count = self.supabase.from_("entities") \
-            .select("id", count="exact") \
-            .is_("deleted_at", "null") \
-            .execute()
-
-        relation_count = self.supabase.from_("relations") \
-            .select("id", count="exact") \
-            .is_("deleted_at", "null") \
-            .execute()
-
-        intel_count = self.supabase.from_("intel") \
-            .select("id", count="exact") \
-            .is_("deleted_at", "null") \
-            .execute()
+        # Per-user counters maintained by triggers (see get_user_stats)
+        data = self.supabase.rpc("get_user_stats", {"p_user_id": self.user_id}).execute()
+        stats = data.data or {}
 
         return {
             "type": "count",
             "data": [{
-                "entities": entity_count.count or 0,
-                "relations": relation_count.count or 0,
-                "intel": intel_count.count or 0,
+                "entities": stats.get("entities", 0),
+                "relations": stats.get("relations", 0),
+                "intel": stats.get("intel", 0),
+                "by_entity_type": stats.get("by_entity_type", {}),
+                "by_relation_type": stats.get("by_relation_type", {}),
+                "by_intel_type": stats.get("by_intel_type", {}),
+                "recent": stats.get("recent", {}),
             }]
         }
 
     async def _resolve_entity_id(self, name: str) -> str | None:
-        """Resolve an entity name to its UUID."""
+        """Resolve an entity name to its UUID (memoized per executor)."""
+        if name not in self._entity_id_cache:
+            self._entity_id_cache[name] = await self._lookup_entity_id(name)
+        return self._entity_id_cache[name]
+
+    async def _lookup_entity_id(self, name: str) -> str | None:
         # Check if the user is referring to themselves
         if name.lower() in ("me", "my", "i", "myself", "the user", "(the user)"):
             user_data = self.supabase.from_("entities") \
@@ -233,16 +316,24 @@ class QueryExecutor:
             return data.data[0]["entity_id"]
         return None
 
-    async def _resolve_entity_name(self, entity_id: str) -> str:
-        """Resolve an entity UUID to its display name."""
+    async def _resolve_entity_names(self, entity_ids: set[str]) -> dict[str, str]:
+        """Resolve many entity UUIDs to display names with a single query."""
+        names = {entity_id: entity_id[:8] for entity_id in entity_ids}
+        if not entity_ids:
+            return names
+
         data = self.supabase.from_("identifiers") \
-            .select("value") \
-            .eq("entity_id", entity_id) \
+            .select("entity_id,value") \
+            .in_("entity_id", list(entity_ids)) \
             .eq("type", "name") \
             .is_("deleted_at", "null") \
-            .limit(1) \
+            .order("created_at") \
             .execute()
 
-        if data.data and len(data.data) > 0:
-            return data.data[0]["value"]
-        return entity_id[:8]
+        # Keep the first name identifier per entity
+        seen = set()
+        for row in data.data or []:
+            if row["entity_id"] not in seen:
+                seen.add(row["entity_id"])
+                names[row["entity_id"]] = row["value"]
+        return names
@@ -1,6 +1,15 @@
 from supabase import Client
+import hashlib
 import json
 import logging
+import threading
+from collections.abc import Callable
+from datetime import date, datetime
+from typing import Any
+import httpx
+from postgrest.exceptions import APIError
+from pydantic import ValidationError
+from app.config import settings
 from app.models.extraction import (
     IntelligenceExtraction,
     EntityExtraction,
@@ -10,12 +19,82 @@ from app.models.extraction import (
     IdentifierExtraction,
 )
 from app.models.resolution import EntityResolutionResult
-from app.utils.date_parser import parse_and_format_date
-from app.utils.entity_matcher import find_entity_by_identifier
+from app.services.auth import create_service_role_client
+from app.services.metrics import stage
+from app.services.tracing import traced
+from app.utils.date_parser import format_datetime_for_db, normalize_dates
+from app.utils.entity_matcher import (
+    find_entities_by_identifiers,
+    find_entity_by_identifier,
+    normalize_identifier_value,
+)
 
 # Configure logger for sync operations
 logger = logging.getLogger(__name__)
 
+# Source code -> ID, shared by every sync in the process. An entry goes stale
+# if its source is deleted or re-created; a write rejected for it (foreign key
+# violation on source_id) evicts it, resolves the source again and retries.
+_source_ids: dict[str, str] = {}
+_source_ids_lock = threading.Lock()
+
+
+def preload_source_ids(supabase: Client | None = None) -> int:
+    """
+    Load every source's ID into the process-wide cache (called at startup).
+
+    Returns the number of sources cached; 0 when the database is unavailable,
+    in which case sources are cached as syncs first use them.
+    """
+    try:
+        client = supabase or create_service_role_client()
+        response = client.table("sources").select("id, code").execute()
+    except (APIError, httpx.HTTPError) as e:
+        logger.warning(f"Could not preload sources: {e}")
+        return 0
+
+    with _source_ids_lock:
+        _source_ids.update({row["code"]: row["id"] for row in response.data or []})
+        return len(_source_ids)
+
+
+def _is_stale_source_error(error: APIError) -> bool:
+    """Whether a write was rejected because its source_id no longer exists."""
+    return error.code == "23503" and "source_id" in f"{error.message} {error.details}"
+
+
+def clear_source_cache() -> None:
+    """Forget cached source IDs (e.g. after switching databases)."""
+    with _source_ids_lock:
+        _source_ids.clear()
+
+
+def extraction_fingerprint(
+    user_id: str,
+    source_code: str,
+    extraction: IntelligenceExtraction,
+    entity_resolutions: list[EntityResolutionResult] | None = None,
+    reference_date: date | None = None,
+) -> str:
+    """
+    Fingerprint a sync request: a hash of (user, source, extraction, resolutions,
+    reference date).
+
+    Relative dates in the extraction ("today") resolve against the reference
+    date, so the same note sent on another day fingerprints differently.
+    """
+    payload = json.dumps(
+        {
+            "user_id": user_id,
+            "source": source_code,
+            "extraction": extraction.model_dump(mode="json"),
+            "resolutions": [r.model_dump(mode="json") for r in entity_resolutions or []],
+            "reference_date": (reference_date or date.today()).isoformat(),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
 
 class SupabaseSyncService:
     """Service for syncing extracted intelligence to Supabase database."""
@@ -30,104 +109,278 @@ class SupabaseSyncService:
         """
         self.supabase = supabase
         self.user_id = user_id
-
+        # Code of the source being synced (set by _sync), to re-resolve a stale ID
+        self._source_code: str | None = None
+
+    @traced("sync.extraction", lambda results: {
+        "sync.entities_created": len(results.entities_created),
+        "sync.entities_updated": len(results.entities_updated),
+        "sync.relations_created": len(results.relations_created),
+        "sync.intel_created": len(results.intel_created),
+        "sync.errors": len(results.errors),
+        "sync.replayed": results.replayed,
+    })
     def sync_extraction(
-        self, extraction: IntelligenceExtraction, default_source: str = "LLM", entity_resolutions: list[EntityResolutionResult] | None = None
+        self,
+        extraction: IntelligenceExtraction,
+        default_source: str = "LLM",
+        entity_resolutions: list[EntityResolutionResult] | None = None,
+        idempotency_key: str | None = None,
     ) -> SyncResults:
         """
         Sync entire extraction to database.
 
         Syncs in order: entities → relations → intel
 
+        Syncs are idempotent: the idempotency key (or, without one, a
+        fingerprint of the request) is claimed before anything is written and
+        the results are stored on the claim. A replay within the key's TTL
+        (settings.sync_idempotency_ttl_seconds for client keys,
+        settings.sync_fingerprint_ttl_seconds for fingerprints) returns the
+        stored results (replayed=True) without writing anything; a duplicate
+        arriving while the first sync runs gets an error instead.
+
         Args:
             extraction: Intelligence extraction to sync
             default_source: Default source code if none specified
             entity_resolutions: Optional list of entity resolution results (Feature 003)
+            idempotency_key: Optional client-supplied key identifying this sync
 
         Returns:
             SyncResults with created/updated entities, relations, intel, and errors
         """
+        # One reference time for relative dates and the fingerprint
+        reference_time = datetime.now()
+        if idempotency_key:
+            key, ttl = f"key:{idempotency_key}", settings.sync_idempotency_ttl_seconds
+        else:
+            fingerprint = extraction_fingerprint(
+                self.user_id, default_source, extraction, entity_resolutions, reference_time.date()
+            )
+            key, ttl = f"fp:{fingerprint}", settings.sync_fingerprint_ttl_seconds
+
+        claimed, stored = self._claim_key(key, ttl)
+        if stored is not None:
+            logger.info(f"Replayed sync {key[:20]} for user {self.user_id}")
+            return stored
+
+        results = self._sync(extraction, default_source, entity_resolutions, reference_time)
+        if claimed:
+            self._store_results(key, results)
+        return results
+
+    def _claim_key(self, key: str, ttl_seconds: int) -> tuple[bool, SyncResults | None]:
+        """
+        Claim an idempotency key (claim_sync_idempotency_key) before syncing.
+
+        Returns:
+            (True, None) when the key was claimed and the caller must sync;
+            (False, results) for the stored results of an earlier sync, or an
+            error result while that sync is still running;
+            (False, None) when idempotency is disabled or the claim failed, in
+            which case the caller syncs without storing results
+        """
+        if settings.sync_idempotency_ttl_seconds <= 0 or ttl_seconds <= 0:
+            return False, None
+
+        try:
+            response = self.supabase.rpc("claim_sync_idempotency_key", {
+                "p_user_id": self.user_id,
+                "p_key": key,
+                "p_ttl_seconds": ttl_seconds,
+            }).execute()
+        except (APIError, httpx.HTTPError) as e:
+            logger.warning(f"Idempotency key claim failed, syncing: {e}")
+            return False, None
+
+        rows = response.data
+        if not isinstance(rows, list) or not rows or not isinstance(rows[0], dict):
+            return False, None
+        if rows[0].get("claimed") is True:
+            return True, None
+
+        stored = rows[0].get("results")
+        if stored is None:
+            logger.info(f"Sync {key[:20]} for user {self.user_id} is already in progress")
+            return False, SyncResults(errors=[{
+                "type": "idempotency",
+                "error": "An earlier sync of this request is still in progress",
+            }])
+        if not isinstance(stored, dict):
+            return False, None
+        try:
+            return False, SyncResults.model_validate({**stored, "replayed": True})
+        except ValidationError as e:
+            logger.warning(f"Ignoring unreadable stored results for {key[:20]}: {e}")
+            return False, None
+
+    def _store_results(self, key: str, results: SyncResults) -> None:
+        """
+        Store results on a claimed key. A sync with errors releases its claim
+        instead, so a retry re-attempts it.
+        """
+        claim = self.supabase.table("sync_idempotency_keys")
+        try:
+            if results.errors:
+                claim.delete().eq("user_id", self.user_id).eq("key", key).execute()
+            else:
+                claim.update(
+                    {"results": results.model_dump(mode="json", exclude={"replayed"})}
+                ).eq("user_id", self.user_id).eq("key", key).execute()
+        except (APIError, httpx.HTTPError) as e:
+            # The claim expires on its own; until then duplicates see it as in progress
+            logger.warning(f"Failed to store idempotency key: {e}")
+
+    def _sync(
+        self,
+        extraction: IntelligenceExtraction,
+        default_source: str,
+        entity_resolutions: list[EntityResolutionResult] | None,
+        reference_time: datetime | None = None,
+    ) -> SyncResults:
+        """Write an extraction: entities, then relations, then intel."""
         results = SyncResults()
 
+        # Resolve every date in the note once, against a single reference time
+        extraction = self._normalize_dates(extraction, reference_time)
+
         # Create or get source
+        self._source_code = default_source
         source_id = self._get_or_create_source(default_source)
 
         # Map entity names to IDs (for relations and intel linking)
         entity_name_to_id: dict[str, str] = {}
 
         # T019: Process entity resolutions first to populate entity_name_to_id
-        if entity_resolutions:
-            self._process_entity_resolutions(entity_resolutions, entity_name_to_id, source_id, results)
+        with stage("sync_resolutions"):
+            if entity_resolutions:
+                self._process_entity_resolutions(entity_resolutions, entity_name_to_id, source_id, results)
 
         # Sync all entities (Fact Updates - FR-004, FR-006)
-        for entity in extraction.entities:
-            # Skip entities that were already resolved (T019)
-            # Their IDs are already in entity_name_to_id from _process_entity_resolutions
-            if entity.name in entity_name_to_id:
-                logger.info(f"Skipping entity sync for '{entity.name}' - already resolved to {entity_name_to_id[entity.name]}")
-                continue
+        with stage("sync_entities"):
+            # One indexed lookup for the names of every entity not already resolved
+            unresolved_names = [e.name for e in extraction.entities if e.name not in entity_name_to_id]
+            known_entity_ids: dict[str, str] | None = {}
+            if unresolved_names:
+                try:
+                    known_entity_ids = find_entities_by_identifiers(
+                        self.supabase, "name", unresolved_names, self.user_id
+                    )
+                except (APIError, httpx.HTTPError) as e:
+                    # Without knowing which entities exist, creating them could duplicate them
+                    known_entity_ids = None
+                    for name in dict.fromkeys(unresolved_names):
+                        error_msg = f"Failed to look up entity '{name}': {e}"
+                        logger.error(error_msg)
+                        results.errors.append(
+                            {
+                                "type": "entity",
+                                "entity_name": name,
+                                "error_message": error_msg,
+                            }
+                        )
+
+            for entity in extraction.entities:
+                # Skip entities that were already resolved (T019)
+                # Their IDs are already in entity_name_to_id from _process_entity_resolutions
+                if entity.name in entity_name_to_id:
+                    logger.debug(f"Skipping entity sync for '{entity.name}' - already resolved to {entity_name_to_id[entity.name]}")
+                    continue
+                if known_entity_ids is None:
+                    continue  # Lookup failed (reported above)
 
-            try:
-                logger.info(f"Syncing entity: {entity.name} (type={entity.entity_type.value})")
-                entity_sync_result = self._sync_entity(entity, source_id)
-
-                # Track in name-to-id map
-                entity_name_to_id[entity.name] = entity_sync_result["entity_id"]
-
-                # Track in results
-                if entity_sync_result.get("created"):
-                    logger.info(f"Created new entity: {entity.name} (id={entity_sync_result['entity_id']})")
-                    results.entities_created.append(entity_sync_result)
-                else:
-                    logger.info(f"Updated existing entity: {entity.name} (id={entity_sync_result['entity_id']})")
-                    results.entities_updated.append(entity_sync_result)
-            except Exception as e:
-                error_msg = f"Failed to sync entity '{entity.name}': {str(e)}"
-                logger.error(error_msg)
-                results.errors.append(
-                    {
-                        "type": "entity",
-                        "entity_name": entity.name,
-                        "error_message": error_msg,
-                    }
-                )
+                try:
+                    logger.debug(f"Syncing entity: {entity.name} (type={entity.entity_type.value})")
+                    entity_sync_result = self._sync_entity(entity, source_id, known_entity_ids)
+
+                    # Track in name-to-id map
+                    entity_name_to_id[entity.name] = entity_sync_result["entity_id"]
+
+                    # Track in results
+                    if entity_sync_result.get("created"):
+                        logger.debug(f"Created new entity: {entity.name} (id={entity_sync_result['entity_id']})")
+                        results.entities_created.append(entity_sync_result)
+                    else:
+                        logger.debug(f"Updated existing entity: {entity.name} (id={entity_sync_result['entity_id']})")
+                        results.entities_updated.append(entity_sync_result)
+                except Exception as e:
+                    error_msg = f"Failed to sync entity '{entity.name}': {str(e)}"
+                    logger.error(error_msg)
+                    results.errors.append(
+                        {
+                            "type": "entity",
+                            "entity_name": entity.name,
+                            "error_message": error_msg,
+                        }
+                    )
 
         # Sync all relations
-        for relation in extraction.relations:
-            try:
-                relation_sync_result = self._sync_relation(
-                    relation, entity_name_to_id, source_id
-                )
-                results.relations_created.append(relation_sync_result)
-            except Exception as e:
-                results.errors.append(
-                    {
-                        "type": "relation",
-                        "entity_name": f"{relation.source_entity_name} -> {relation.target_entity_name}",
-                        "error_message": str(e),
-                    }
-                )
+        with stage("sync_relations"):
+            if extraction.relations:
+                self._sync_relations(extraction.relations, entity_name_to_id, source_id, results)
 
         # Sync all intel (Event Logs - FR-005)
-        for intel in extraction.intel:
-            try:
-                logger.info(f"Syncing intel: {intel.intel_type.value} - {intel.description[:50]}...")
-                intel_sync_result = self._sync_intel(intel, entity_name_to_id, source_id)
-                logger.info(f"Created intel record: {intel_sync_result['intel_id']} (linked {intel_sync_result['entities_linked']} entities)")
-                results.intel_created.append(intel_sync_result)
-            except Exception as e:
-                error_msg = f"Failed to sync intel '{intel.description[:50]}...': {str(e)}"
-                logger.error(error_msg)
-                results.errors.append(
-                    {
-                        "type": "intel",
-                        "entity_name": intel.description,
-                        "error_message": error_msg,
-                    }
-                )
+        with stage("sync_intel"):
+            for intel in extraction.intel:
+                try:
+                    logger.debug(f"Syncing intel: {intel.intel_type.value} - {intel.description[:50]}...")
+                    intel_sync_result = self._sync_intel(intel, entity_name_to_id, source_id)
+                    logger.debug(f"Created intel record: {intel_sync_result['intel_id']} (linked {intel_sync_result['entities_linked']} entities)")
+                    results.intel_created.append(intel_sync_result)
+                except Exception as e:
+                    error_msg = f"Failed to sync intel '{intel.description[:50]}...': {str(e)}"
+                    logger.error(error_msg)
+                    results.errors.append(
+                        {
+                            "type": "intel",
+                            "entity_name": intel.description,
+                            "error_message": error_msg,
+                        }
+                    )
 
         return results
 
+    def _normalize_dates(
+        self, extraction: IntelligenceExtraction, relative_base: datetime | None = None
+    ) -> IntelligenceExtraction:
+        """
+        Rewrite all relation and intel dates in an extraction to ISO format.
+
+        Distinct date strings are parsed once against one reference time.
+        Intel without occurred_at gets the reference time. The extraction
+        passed in is not modified.
+
+        Args:
+            extraction: Intelligence extraction to normalize
+            relative_base: Reference time for relative dates (defaults to current time)
+
+        Returns:
+            Copy of the extraction with ISO formatted dates
+        """
+        relative_base = relative_base or datetime.now()
+        parsed = normalize_dates(
+            [r.valid_from for r in extraction.relations]
+            + [r.valid_to for r in extraction.relations]
+            + [i.occurred_at for i in extraction.intel],
+            relative_base,
+        )
+        default = format_datetime_for_db(relative_base)
+
+        return extraction.model_copy(update={
+            "relations": [
+                r.model_copy(update={
+                    "valid_from": parsed.get(r.valid_from),
+                    "valid_to": parsed.get(r.valid_to),
+                })
+                for r in extraction.relations
+            ],
+            "intel": [
+                i.model_copy(update={"occurred_at": parsed.get(i.occurred_at, default)})
+                for i in extraction.intel
+            ],
+        })
+
+    @traced("sync.entity_resolutions")
     def _process_entity_resolutions(
         self,
         resolutions: list[EntityResolutionResult],
@@ -153,11 +406,11 @@ class SupabaseSyncService:
                 # T019: Use resolved entity ID
                 entity_id_str = str(resolution.resolved_entity_id)
                 entity_name_to_id[reference] = entity_id_str
-                logger.info(f"Resolved '{reference}' to existing entity {entity_id_str} (confidence: {resolution.confidence:.2f})")
+                logger.debug(f"Resolved '{reference}' to existing entity {entity_id_str} (confidence: {resolution.confidence:.2f})")
 
             elif resolution.resolution_method == "new_entity":
                 # T020: Create new entity when confidence < threshold
-                logger.info(f"Creating new entity for unresolved reference '{reference}'")
+                logger.debug(f"Creating new entity for unresolved reference '{reference}'")
                 try:
                     # Create minimal person entity
                     entity_data = {
@@ -199,7 +452,7 @@ class SupabaseSyncService:
                             "resolution_confidence": resolution.confidence,
                         })
 
-                        logger.info(f"Created new entity for '{reference}': {new_entity_id}")
+                        logger.debug(f"Created new entity for '{reference}': {new_entity_id}")
 
                 except Exception as e:
                     error_msg = f"Failed to create entity for '{reference}': {str(e)}"
@@ -210,8 +463,12 @@ class SupabaseSyncService:
                         "error_message": error_msg,
                     })
 
+    @traced("sync.entity")
     def _sync_entity(
-        self, entity: EntityExtraction, source_id: str
+        self,
+        entity: EntityExtraction,
+        source_id: str,
+        known_entity_ids: dict[str, str] | None = None,
     ) -> dict:
         """
         Sync an entity to the database.
@@ -219,14 +476,22 @@ class SupabaseSyncService:
         Args:
             entity: Entity extraction
             source_id: Source ID
+            known_entity_ids: Normalized name -> entity ID from a batch lookup
+                (find_entities_by_identifiers); the name is looked up on its own
+                if omitted. A created entity is added to it, so a later entity
+                with the same name updates it instead of creating a duplicate.
 
         Returns:
             Entity sync result with entity_id and created status
         """
         # Try to find existing entity by name identifier
-        existing_entity_id = find_entity_by_identifier(
-            self.supabase, "name", entity.name, self.user_id
-        )
+        name_norm = normalize_identifier_value(entity.name)
+        if known_entity_ids is None:
+            existing_entity_id = find_entity_by_identifier(
+                self.supabase, "name", entity.name, self.user_id
+            )
+        else:
+            existing_entity_id = known_entity_ids.get(name_norm)
 
         if existing_entity_id:
             # Entity exists - update it
@@ -241,6 +506,8 @@ class SupabaseSyncService:
         else:
             # Entity doesn't exist - create it
             new_entity_id = self._create_entity(entity, source_id)
+            if known_entity_ids is not None:
+                known_entity_ids[name_norm] = new_entity_id
             return {
                 "entity_id": new_entity_id,
                 "name": entity.name,
@@ -318,8 +585,8 @@ class SupabaseSyncService:
             {"data": updated_data}
         ).eq("id", entity_id).execute()
 
-        # Add new identifiers (skip duplicates)
-        self._create_identifiers(entity_id, entity.identifiers, skip_duplicates=True)
+        # Add new identifiers (ones the entity already has are skipped)
+        self._create_identifiers(entity_id, entity.identifiers)
 
         # Write attributes to entity_attributes table
         self._sync_entity_attributes(entity_id, entity.attributes, source_id, entity.confidence.value)
@@ -328,64 +595,39 @@ class SupabaseSyncService:
         self,
         entity_id: str,
         identifiers: list[IdentifierExtraction],
-        skip_duplicates: bool = False,
     ) -> list[str]:
-        """Create identifiers for an entity."""
-        created_ids = []
-
-        for identifier in identifiers:
-            # Check if identifier already exists
-            if skip_duplicates:
-                # T038: Upsert logic - check if same type exists for this entity
-                existing = (
-                    self.supabase.table("identifiers")
-                    .select("id, value")
-                    .eq("entity_id", entity_id)
-                    .eq("type", identifier.identifier_type.value)
-                    .execute()
-                )
-
-                if existing.data and len(existing.data) > 0:
-                    # Check if value differs - if so, update it (upsert)
-                    existing_id = existing.data[0]["id"]
-                    existing_value = existing.data[0]["value"]
-
-                    if existing_value.lower() != identifier.value.lower():
-                        # Update existing identifier with new value
-                        self.supabase.table("identifiers").update(
-                            {"value": identifier.value}
-                        ).eq("id", existing_id).execute()
-                        logger.info(f"Updated identifier {identifier.identifier_type.value} for entity {entity_id}: {existing_value} -> {identifier.value}")
-
-                    continue  # Skip creating new one
-
-            # Create identifier
-            response = (
-                self.supabase.table("identifiers")
-                .insert(
-                    {
-                        "entity_id": entity_id,
-                        "type": identifier.identifier_type.value,
-                        "value": identifier.value,
-                        "metadata": (
-                            json.dumps(identifier.metadata)
-                            if identifier.metadata
-                            else None
-                        ),
-                    }
-                )
-                .execute()
-            )
+        """
+        Create identifiers for an entity in one upsert_identifiers call.
 
-            if response.data and len(response.data) > 0:
-                created_ids.append(response.data[0]["id"])
+        Identifiers the entity already has (same type and normalized value,
+        see normalize_identifier_value) are skipped. Returns the IDs of the
+        identifiers created.
+        """
+        if not identifiers:
+            return []
 
-        return created_ids
+        rows = [
+            {
+                "entity_id": entity_id,
+                "type": identifier.identifier_type.value,
+                "value": identifier.value,
+                "metadata": identifier.metadata or None,
+            }
+            for identifier in identifiers
+        ]
+        response = self.supabase.rpc("upsert_identifiers", {"p_rows": rows}).execute()
+        return [row["id"] for row in response.data or []]
 
     def _sync_entity_attributes(
         self, entity_id: str, attributes: dict, source_id: str, confidence: str
     ):
-        """Write extracted attributes to entity_attributes table."""
+        """
+        Write extracted attributes to entity_attributes in one upsert_entity_attributes call.
+
+        A changed value closes the current one and becomes current; an
+        unchanged value is left alone.
+        """
+        rows = []
         for key, value in attributes.items():
             if key.startswith("_"):
                 continue  # Skip internal metadata keys
@@ -394,75 +636,115 @@ class SupabaseSyncService:
             if not str_value:
                 continue
 
-            # Check if attribute already exists with same key and current value
-            existing = (
-                self.supabase.table("entity_attributes")
-                .select("id, value")
-                .eq("entity_id", entity_id)
-                .eq("key", key)
-                .is_("valid_to", "null")
-                .is_("deleted_at", "null")
-                .execute()
-            )
-
-            if existing.data and len(existing.data) > 0:
-                if existing.data[0]["value"] == str_value:
-                    continue  # Same value, skip
-                # Close the old attribute by setting valid_to
-                self.supabase.table("entity_attributes").update(
-                    {"valid_to": "now()"}
-                ).eq("id", existing.data[0]["id"]).execute()
-
-            # Create new attribute record
-            self.supabase.table("entity_attributes").insert({
+            rows.append({
                 "entity_id": entity_id,
                 "key": key,
                 "value": str_value,
                 "confidence": confidence,
                 "source_id": source_id,
-            }).execute()
+            })
+
+        if rows:
+            self._write_with_source(
+                lambda sid: self.supabase.rpc(
+                    "upsert_entity_attributes",
+                    {"p_rows": [{**row, "source_id": sid} for row in rows]},
+                ).execute(),
+                source_id,
+            )
+
+    @traced("sync.relations")
+    def _sync_relations(
+        self,
+        relations: list[RelationExtraction],
+        entity_name_to_id: dict[str, str],
+        source_id: str,
+        results: SyncResults,
+    ):
+        """
+        Sync relations in one upsert_relations call.
+
+        A relation that already exists (same source, target and type) is not
+        duplicated; it is reported with its existing ID and created=False.
+
+        Args:
+            relations: Relations to sync
+            entity_name_to_id: Entity name -> ID mapping for resolving endpoints
+            source_id: Source ID
+            results: SyncResults to track created relations and errors
+        """
+        def add_error(relation: RelationExtraction, message: str):
+            results.errors.append(
+                {
+                    "type": "relation",
+                    "entity_name": f"{relation.source_entity_name} -> {relation.target_entity_name}",
+                    "error_message": message,
+                }
+            )
 
-    def _sync_relation(
+        pending: list[tuple[RelationExtraction, dict]] = []
+        for relation in relations:
+            try:
+                pending.append((relation, self._relation_row(relation, entity_name_to_id, source_id)))
+            except ValueError as e:
+                add_error(relation, str(e))
+
+        if not pending:
+            return
+
+        try:
+            response = self.supabase.rpc(
+                "upsert_relations", {"p_rows": [row for _, row in pending]}
+            ).execute()
+        except (APIError, httpx.HTTPError) as e:
+            for relation, _ in pending:
+                add_error(relation, str(e))
+            return
+
+        written = {
+            (row["source_id"], row["target_id"], row["type"]): row
+            for row in response.data or []
+        }
+        for relation, row in pending:
+            relation_row = written.get((row["source_id"], row["target_id"], row["type"]))
+            if relation_row is None:
+                add_error(relation, "Failed to create relation")
+                continue
+            results.relations_created.append(
+                {
+                    "relation_id": relation_row["id"],
+                    "source_name": relation.source_entity_name,
+                    "target_name": relation.target_entity_name,
+                    "type": relation.relation_type.value,
+                    "created": relation_row["created"],
+                }
+            )
+
+    def _relation_row(
         self, relation: RelationExtraction, entity_name_to_id: dict[str, str], source_id: str
     ) -> dict:
-        """Sync a relation to the database."""
+        """
+        Row for upsert_relations, with entity names resolved to IDs.
+
+        Dates are used as is: _normalize_dates has already made them ISO.
+
+        Raises:
+            ValueError: If either endpoint has no entity ID, or both resolve to
+                the same entity (no_self_relation would reject the whole batch)
+        """
         # Resolve entity names to IDs
         source_entity_id = entity_name_to_id.get(relation.source_entity_name)
         target_entity_id = entity_name_to_id.get(relation.target_entity_name)
 
         if not source_entity_id:
-            raise Exception(f"Source entity not found: {relation.source_entity_name}")
+            raise ValueError(f"Source entity not found: {relation.source_entity_name}")
         if not target_entity_id:
-            raise Exception(f"Target entity not found: {relation.target_entity_name}")
-
-        # Check if relation already exists
-        existing = (
-            self.supabase.table("relations")
-            .select("id")
-            .eq("source_id", source_entity_id)
-            .eq("target_id", target_entity_id)
-            .eq("type", relation.relation_type.value)
-            .is_("deleted_at", "null")
-            .execute()
-        )
-
-        if existing.data and len(existing.data) > 0:
-            # Relation already exists, skip
-            return {
-                "relation_id": existing.data[0]["id"],
-                "source_name": relation.source_entity_name,
-                "target_name": relation.target_entity_name,
-                "type": relation.relation_type.value,
-                "created": False,
-            }
-
-        # Parse dates if provided
-        valid_from = (
-            parse_and_format_date(relation.valid_from) if relation.valid_from else None
-        )
-        valid_to = (
-            parse_and_format_date(relation.valid_to) if relation.valid_to else None
-        )
+            raise ValueError(f"Target entity not found: {relation.target_entity_name}")
+        if source_entity_id == target_entity_id:
+            raise ValueError(
+                f"Source and target are the same entity: {relation.source_entity_name}, "
+                f"{relation.target_entity_name}"
+            )
 
         # Prepare relation data
         relation_data = {
@@ -472,40 +754,21 @@ class SupabaseSyncService:
         if relation.description:
             relation_data["description"] = relation.description
 
-        # Create relation
-        response = (
-            self.supabase.table("relations")
-            .insert(
-                {
-                    "source_id": source_entity_id,
-                    "target_id": target_entity_id,
-                    "type": relation.relation_type.value,
-                    "strength": relation.strength,
-                    "valid_from": valid_from,
-                    "valid_to": valid_to,
-                    "data": relation_data,
-                }
-            )
-            .execute()
-        )
-
-        if not response.data or len(response.data) == 0:
-            raise Exception("Failed to create relation")
-
         return {
-            "relation_id": response.data[0]["id"],
-            "source_name": relation.source_entity_name,
-            "target_name": relation.target_entity_name,
+            "source_id": source_entity_id,
+            "target_id": target_entity_id,
             "type": relation.relation_type.value,
-            "created": True,
+            "strength": relation.strength,
+            "valid_from": relation.valid_from,
+            "valid_to": relation.valid_to,
+            "data": relation_data,
         }
 
+    @traced("sync.intel")
     def _sync_intel(
         self, intel: IntelExtraction, entity_name_to_id: dict[str, str], source_id: str
     ) -> dict:
-        """Sync intel to the database."""
-        # Parse occurred_at date
-        occurred_at = parse_and_format_date(intel.occurred_at)
+        """Sync intel to the database (occurred_at already normalized by _normalize_dates)."""
 
         # Prepare intel data
         intel_data = {
@@ -516,19 +779,20 @@ class SupabaseSyncService:
             intel_data["location"] = intel.location
 
         # Create intel
-        response = (
-            self.supabase.table("intel")
+        response = self._write_with_source(
+            lambda sid: self.supabase.table("intel")
             .insert(
                 {
                     "type": intel.intel_type.value,
-                    "occurred_at": occurred_at,
+                    "occurred_at": intel.occurred_at,
                     "data": intel_data,
-                    "source_id": source_id,
+                    "source_id": sid,
                     "confidence": intel.confidence.value,
                     "created_by": self.user_id,
                 }
             )
-            .execute()
+            .execute(),
+            source_id,
         )
 
         if not response.data or len(response.data) == 0:
@@ -536,19 +800,19 @@ class SupabaseSyncService:
 
         intel_id = response.data[0]["id"]
 
-        # Link entities
-        entities_linked = 0
-        for entity_name in intel.entities_involved:
-            entity_id = entity_name_to_id.get(entity_name)
-            if entity_id:
-                self.supabase.table("intel_entities").insert(
-                    {
-                        "intel_id": intel_id,
-                        "entity_id": entity_id,
-                        "role": "participant",
-                    }
-                ).execute()
-                entities_linked += 1
+        # Link entities in one insert
+        links = [
+            {
+                "intel_id": intel_id,
+                "entity_id": entity_name_to_id[entity_name],
+                "role": "participant",
+            }
+            for entity_name in intel.entities_involved
+            if entity_name_to_id.get(entity_name)
+        ]
+        if links:
+            self.supabase.table("intel_entities").insert(links).execute()
+        entities_linked = len(links)
 
         return {
             "intel_id": intel_id,
@@ -557,35 +821,67 @@ class SupabaseSyncService:
             "entities_linked": entities_linked,
         }
 
+    def _write_with_source(self, write: Callable[[str], Any], source_id: str) -> Any:
+        """
+        Run a write that references source_id.
+
+        If the database rejects the ID (the cached source was deleted or
+        re-created), the cache entry is evicted and the write retried once
+        with the source resolved again.
+        """
+        try:
+            return write(source_id)
+        except APIError as e:
+            if self._source_code is None or not _is_stale_source_error(e):
+                raise
+            logger.warning(f"Source '{self._source_code}' ID {source_id} is stale; resolving it again")
+            with _source_ids_lock:
+                if _source_ids.get(self._source_code) == source_id:
+                    del _source_ids[self._source_code]
+            return write(self._get_or_create_source(self._source_code))
+
+    @traced("sync.source")
     def _get_or_create_source(self, source_code: str) -> str:
-        """Get or create a source by code."""
-        # Search for existing source
-        existing = (
-            self.supabase.table("sources")
-            .select("id")
-            .eq("code", source_code)
-            .execute()
-        )
+        """
+        Get or create a source by code.
 
-        if existing.data and len(existing.data) > 0:
-            return existing.data[0]["id"]
+        IDs come from the process-wide cache; a miss upserts the source
+        (ON CONFLICT (code) DO NOTHING, so concurrent first syncs do not race)
+        and only reads it back if it already existed.
+        """
+        source_id = _source_ids.get(source_code)
+        if source_id is not None:
+            return source_id
 
-        # Create new source
         response = (
             self.supabase.table("sources")
-            .insert(
+            .upsert(
                 {
                     "code": source_code,
                     "type": "human",
                     "reliability": "C",  # Fairly reliable by default
                     "data": {},
                     "active": True,
-                }
+                },
+                on_conflict="code",
+                ignore_duplicates=True,
             )
             .execute()
         )
 
+        if not response.data:
+            # Already existed (the upsert wrote nothing)
+            response = (
+                self.supabase.table("sources")
+                .select("id")
+                .eq("code", source_code)
+                .execute()
+            )
+
         if not response.data or len(response.data) == 0:
             raise Exception("Failed to create source")
 
-        return response.data[0]["id"]
+        source_id = response.data[0]["id"]
+        with _source_ids_lock:
+            _source_ids[source_code] = source_id
+        return source_id
@@ -0,0 +1,274 @@
+"""
+Lightweight tracing.
+
+Spans follow the OpenTelemetry data model (trace/span ids, parent links,
+attributes, status) and are exported by the exporter selected with
+settings.tracing_exporter:
+
+- "none" (default): span() returns a shared no-op span; nothing is recorded
+- "console": one JSON line per finished span on stderr
+- "file": one JSON line per finished span appended to settings.tracing_file_path
+- "otel": spans are created through the OpenTelemetry API, so any configured
+  OTel SDK exporter receives them (requires opentelemetry-api)
+
+PostgREST requests made by instrumented Supabase clients are traced as child
+spans of the active span via the trace_http_request/trace_http_response hooks
+(console and file exporters; with "otel" use the OTel httpx instrumentation).
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import random
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    """A finished-on-exit unit of work with attributes."""
+
+    __slots__ = ("attributes", "end_ns", "name", "parent_id", "span_id", "start_ns", "status", "trace_id")
+
+    def __init__(self, name: str, parent: Span | None, attributes: dict[str, Any]):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else f"{random.getrandbits(128):032x}"
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.status = "OK"
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self.attributes.update(attributes)
+
+    def record_exception(self, exc: BaseException) -> None:
+        self.status = "ERROR"
+        self.attributes["exception.type"] = type(exc).__name__
+        self.attributes["exception.message"] = str(exc)
+
+    def end(self) -> None:
+        self.end_ns = time.time_ns()
+        _export(self)
+
+    def to_dict(self) -> dict[str, Any]:
+        """Serialize in OTLP/JSON field naming."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+        }
+
+
+class _NoopSpan:
+    """Span returned when tracing is disabled; every method is a no-op."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        pass
+
+    def record_exception(self, exc: BaseException) -> None:
+        pass
+
+
+class _OTelSpan:
+    """Adapter exposing an OpenTelemetry span through the Span interface."""
+
+    __slots__ = ("_span",)
+
+    def __init__(self, span: Any):
+        self._span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._span.set_attribute(key, value)
+
+    def set_attributes(self, attributes: dict[str, Any]) -> None:
+        self._span.set_attributes(attributes)
+
+    def record_exception(self, exc: BaseException) -> None:
+        from opentelemetry.trace import Status, StatusCode
+
+        self._span.record_exception(exc)
+        self._span.set_status(Status(StatusCode.ERROR))
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+_export_lock = threading.Lock()
+_otel_tracer: Any = None
+
+
+def _export(span: Span) -> None:
+    line = json.dumps(span.to_dict(), default=str)
+    with _export_lock:
+        if settings.tracing_exporter == "file":
+            with open(settings.tracing_file_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        else:
+            print(line, file=sys.stderr)
+
+
+def _get_otel_tracer() -> Any:
+    global _otel_tracer
+    if _otel_tracer is None:
+        from opentelemetry import trace
+
+        _otel_tracer = trace.get_tracer("tether.llm-service")
+    return _otel_tracer
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span | _NoopSpan | _OTelSpan]:
+    """
+    Trace the block as a span, child of the active span.
+
+    Usage:
+        with span("sync.entity", **{"entity.type": "person"}) as s:
+            ...
+            s.set_attribute("db.rows", len(rows))
+
+    Exceptions are recorded on the span and re-raised.
+    """
+    exporter = settings.tracing_exporter
+    if exporter == "none":
+        yield NOOP_SPAN
+        return
+
+    if exporter == "otel":
+        with _get_otel_tracer().start_as_current_span(
+            name, attributes=attributes, record_exception=True, set_status_on_exception=True
+        ) as otel_span:
+            yield _OTelSpan(otel_span)
+        return
+
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.record_exception(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end()
+
+
+def current_span() -> Span | _NoopSpan | _OTelSpan:
+    """Return the active span (NOOP_SPAN when tracing is off or no span is active)."""
+    if settings.tracing_exporter == "otel":
+        from opentelemetry import trace
+
+        return _OTelSpan(trace.get_current_span())
+    return _current_span.get() or NOOP_SPAN
+
+
+def traced(name: str, result_attributes: Callable[[Any], dict[str, Any]] | None = None) -> Callable:
+    """
+    Decorator tracing every call of a sync or async function as a span.
+
+    Args:
+        name: Span name
+        result_attributes: Optional function mapping the return value to span attributes
+    """
+    def decorate(func: Callable) -> Callable:
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                if settings.tracing_exporter == "none":
+                    return await func(*args, **kwargs)
+                with span(name) as s:
+                    result = await func(*args, **kwargs)
+                    if result_attributes is not None:
+                        s.set_attributes(result_attributes(result))
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if settings.tracing_exporter == "none":
+                return func(*args, **kwargs)
+            with span(name) as s:
+                result = func(*args, **kwargs)
+                if result_attributes is not None:
+                    s.set_attributes(result_attributes(result))
+                return result
+        return wrapper
+
+    return decorate
+
+
+def _postgrest_target(path: str) -> tuple[str, str | None]:
+    """Map a PostgREST URL path to (kind, name): ("table", "entities") or ("rpc", "get_user_stats")."""
+    parts = path.rstrip("/").split("/")
+    if "rpc" in parts[:-1]:
+        return "rpc", parts[-1]
+    if "rest" in parts:
+        return "table", parts[-1]
+    return "http", None
+
+
+_OPERATIONS = {"GET": "select", "HEAD": "select", "POST": "insert", "PATCH": "update", "PUT": "upsert", "DELETE": "delete"}
+
+
+def trace_http_request(request: Any) -> None:
+    """httpx request hook: start a span for a PostgREST or auth request."""
+    if settings.tracing_exporter in ("none", "otel"):
+        return
+    kind, target = _postgrest_target(request.url.path)
+    attributes: dict[str, Any] = {"http.method": request.method}
+    if kind == "rpc":
+        name = f"postgrest.rpc {target}"
+        attributes.update({"db.operation": "rpc", "db.function": target})
+    elif kind == "table":
+        operation = _OPERATIONS.get(request.method, request.method.lower())
+        if operation == "insert" and "resolution=merge-duplicates" in request.headers.get("prefer", ""):
+            operation = "upsert"
+        name = f"postgrest.{operation} {target}"
+        attributes.update({"db.operation": operation, "db.sql.table": target})
+    else:
+        name = f"http {request.method} {request.url.path}"
+    request.extensions["tracing_span"] = Span(name, _current_span.get(), attributes)
+
+
+def trace_http_response(response: Any) -> None:
+    """httpx response hook: finish the request's span with status and row count."""
+    http_span = response.request.extensions.get("tracing_span")
+    if http_span is None:
+        return
+    http_span.set_attribute("http.status_code", response.status_code)
+    if response.status_code >= 400:
+        http_span.status = "ERROR"
+    # PostgREST reports the returned range as "first-last/total"
+    content_range = response.headers.get("content-range", "")
+    first, sep, last = content_range.partition("/")[0].partition("-")
+    if sep and first.isdigit() and last.isdigit():
+        http_span.set_attribute("db.rows", int(last) - int(first) + 1)
+    elif content_range.startswith("*/"):
+        http_span.set_attribute("db.rows", 0)
+    http_span.end()
@@ -1,11 +1,152 @@
-import dateparser
-from datetime import datetime
+"""
+Natural Language Date Parsing
+
+Dates are parsed in tiers, cheapest first:
+1. ISO-8601 and common numeric formats via datetime.fromisoformat / regex
+2. Frequent relative phrases ("yesterday", "last Friday", "3 days ago"),
+   computed directly and memoized per (phrase, reference day)
+3. dateparser, restricted to DATEPARSER_LANGUAGES, for everything else
+
+Results match what dateparser returns for the phrases handled by the fast
+tiers: relative offsets keep the reference time of day, weekdays resolve to
+midnight of the most recent past occurrence, and UTC offsets are dropped.
+"""
+
+import re
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 import logging
+from collections.abc import Iterable
 
 logger = logging.getLogger(__name__)
 
+# Languages dateparser may try; without a restriction it runs language
+# detection over every locale it ships, which takes up to seconds per phrase
+DATEPARSER_LANGUAGES = ["en"]
+
+MONTHS = [
+    "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_YMD_PATTERN = re.compile(r"^(\d{4})[/.](\d{1,2})[/.](\d{1,2})$")
+_MDY_PATTERN = re.compile(r"^(\d{1,2})/(\d{1,2})/(\d{4})$")
+_WEEKDAY_PATTERN = re.compile(r"^(?:(?:last|on|this past) )?(" + "|".join(WEEKDAYS) + r")$")
+_OFFSET_PATTERN = re.compile(r"^(?:(\d+)|an?) (day|week|month|year)s? ago$")
+_LAST_N_PATTERN = re.compile(r"^(?:past|last) (\d+) (day|week|month|year)s?$")
+_AGO_PATTERN = re.compile(r"^(\d+) (day|week|month|year)s? ago$")
+_SINCE_PATTERN = re.compile(r"^since (?:the )?(.+)$")
+_MONTH_PATTERN = re.compile(r"^(" + "|".join(MONTHS) + r")(?: (\d{4}))?$")
+_YEAR_PATTERN = re.compile(r"^(\d{4})$")
+
+# Relative phrases resolving to a fixed day offset (time of day is kept)
+_DAY_OFFSETS = {
+    "now": 0,
+    "today": 0,
+    "tonight": 0,
+    "this morning": 0,
+    "this afternoon": 0,
+    "this evening": 0,
+    "yesterday": -1,
+    "last night": -1,
+    "tomorrow": 1,
+}
+
+# "last <period>" is the same as "1 <period> ago"
+_LAST_PERIODS = {"last week": "week", "last month": "month", "last year": "year"}
+
+
+def _parse_fast(text: str) -> datetime | None:
+    """Parse ISO-8601 and numeric dates without dateparser."""
+    if not text[:1].isdigit():
+        return None
+
+    try:
+        return datetime.fromisoformat(text).replace(tzinfo=None)
+    except ValueError:
+        pass
+
+    match = _YMD_PATTERN.match(text)
+    if match:
+        year, month, day = (int(g) for g in match.groups())
+    else:
+        match = _MDY_PATTERN.match(text)
+        if not match:
+            return None
+        month, day, year = (int(g) for g in match.groups())
+
+    try:
+        return datetime(year, month, day)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _resolve_relative(text: str, reference_day: date) -> tuple[date, bool] | None:
+    """
+    Resolve a relative phrase against a reference day.
+
+    Returns:
+        Tuple of (resolved day, keep reference time of day), or None if the
+        phrase is not a known relative form
+    """
+    if text in _DAY_OFFSETS:
+        return reference_day + timedelta(days=_DAY_OFFSETS[text]), True
+
+    match = _WEEKDAY_PATTERN.match(text)
+    if match:
+        days_back = (reference_day.weekday() - WEEKDAYS.index(match.group(1))) % 7 or 7
+        return reference_day - timedelta(days=days_back), False
 
-def parse_natural_date(date_str: str) -> datetime:
+    if text in _LAST_PERIODS:
+        count, unit = 1, _LAST_PERIODS[text]
+    else:
+        match = _OFFSET_PATTERN.match(text)
+        if not match:
+            return None
+        count, unit = int(match.group(1) or 1), match.group(2)
+
+    reference = datetime.combine(reference_day, datetime.min.time())
+    return _unit_delta(reference, count, unit).date(), True
+
+
+def _parse_relative(text: str, relative_base: datetime) -> datetime | None:
+    """Parse a frequent relative phrase via the memoized resolver."""
+    resolved = _resolve_relative(text, relative_base.date())
+    if resolved is None:
+        return None
+    day, keep_time = resolved
+    return datetime.combine(day, relative_base.time() if keep_time else datetime.min.time())
+
+
+def _parse_with_dateparser(text: str, relative_base: datetime) -> datetime | None:
+    """Fallback parse with dateparser, restricted to DATEPARSER_LANGUAGES."""
+    # Imported on first fallback: loading dateparser's tables takes ~0.5s
+    import dateparser
+
+    return dateparser.parse(
+        text,
+        languages=DATEPARSER_LANGUAGES,
+        settings={
+            "PREFER_DATES_FROM": "past",  # Assume past dates by default
+            "RELATIVE_BASE": relative_base,
+            "RETURN_AS_TIMEZONE_AWARE": False,
+        },
+    )
+
+
+def preload_date_parser() -> None:
+    """
+    Load dateparser's language data ahead of the first fallback parse.
+
+    Called once at startup (in lifespan, not at import) so the first request
+    does not pay the load cost.
+    """
+    _parse_with_dateparser("31st December 2024", datetime.now())
+
+
+def parse_natural_date(date_str: str, relative_base: datetime | None = None) -> datetime:
     """
     Parse natural language dates to datetime objects.
 
@@ -16,27 +157,26 @@ def parse_natural_date(date_str: str) -> datetime:
 
     Args:
         date_str: Natural language date string
+        relative_base: Reference time for relative dates (defaults to current time)
 
     Returns:
-        datetime object (defaults to current time if parsing fails)
+        datetime object (defaults to the reference time if parsing fails)
     """
+    relative_base = relative_base or datetime.now()
     if not date_str or not date_str.strip():
-        return datetime.now()
+        return relative_base
 
-    # Use dateparser library for robust parsing
-    parsed_date = dateparser.parse(
-        date_str,
-        settings={
-            "PREFER_DATES_FROM": "past",  # Assume past dates by default
-            "RELATIVE_BASE": datetime.now(),
-            "RETURN_AS_TIMEZONE_AWARE": False,
-        },
+    text = " ".join(date_str.lower().split())
+    parsed_date = (
+        _parse_fast(text)
+        or _parse_relative(text, relative_base)
+        or _parse_with_dateparser(text, relative_base)
     )
 
-    # If parsing fails, default to current time
+    # If parsing fails, default to the reference time
     if parsed_date is None:
         logger.warning(f"Could not parse date '{date_str}', defaulting to current time")
-        return datetime.now()
+        return relative_base
 
     return parsed_date
 
@@ -54,15 +194,152 @@ def format_datetime_for_db(dt: datetime) -> str:
     return dt.isoformat()
 
 
-def parse_and_format_date(date_str: str) -> str:
+def parse_and_format_date(date_str: str, relative_base: datetime | None = None) -> str:
     """
     Parse natural language date and format for database storage.
 
     Args:
         date_str: Natural language date string
+        relative_base: Reference time for relative dates (defaults to current time)
 
     Returns:
         ISO formatted date string
     """
-    dt = parse_natural_date(date_str)
+    dt = parse_natural_date(date_str, relative_base)
     return format_datetime_for_db(dt)
+
+
+def normalize_dates(date_strs: Iterable[str | None], relative_base: datetime | None = None) -> dict[str, str]:
+    """
+    Parse a batch of date strings against one reference time.
+
+    Each distinct string is parsed once, and all relative dates resolve
+    against the same relative_base, so dates within one note stay consistent
+    even if processing crosses midnight.
+
+    Args:
+        date_strs: Date strings (None and blank values are skipped)
+        relative_base: Reference time for relative dates (defaults to current time)
+
+    Returns:
+        Dict mapping each distinct input string to its ISO formatted date
+    """
+    relative_base = relative_base or datetime.now()
+    return {
+        date_str: parse_and_format_date(date_str, relative_base)
+        for date_str in dict.fromkeys(date_strs)
+        if date_str and date_str.strip()
+    }
+
+
+def _add_months(dt: datetime, months: int) -> datetime:
+    """Shift a first-of-month datetime by a number of months."""
+    index = dt.year * 12 + dt.month - 1 + months
+    return dt.replace(year=index // 12, month=index % 12 + 1)
+
+
+def _unit_delta(today: datetime, count: int, unit: str) -> datetime:
+    """Return today minus count units (months/years are calendar-aware)."""
+    if unit == "day":
+        return today - timedelta(days=count)
+    if unit == "week":
+        return today - timedelta(weeks=count)
+    months = count if unit == "month" else count * 12
+    index = today.year * 12 + today.month - 1 - months
+    year, month = index // 12, index % 12 + 1
+    # Clamp the day for shorter months (e.g. March 31 -> February 28)
+    next_month = datetime(year + month // 12, month % 12 + 1, 1)
+    return today.replace(year=year, month=month, day=min(today.day, (next_month - timedelta(days=1)).day))
+
+
+def parse_date_range(phrase: str | None, now: datetime | None = None) -> tuple[datetime, datetime] | None:
+    """
+    Convert a temporal phrase into a half-open [from, to) datetime range.
+
+    Handles:
+    - Days: "today", "tonight", "this morning", "yesterday", "last night", "last Friday"
+    - Calendar periods: "this week", "last week", "this month", "last month", "this year", "last year"
+    - Rolling windows: "past 3 days", "last 2 weeks"; "5 days ago" is that single day
+    - Months and years: "January", "in March 2024", "during June", "in 2023"
+    - Open-ended: "since last week", "since March" run from the start of the period until now
+    - Anything else dateparser understands, as the single day it resolves to
+
+    Weeks start on Monday. A month without a year refers to its latest
+    occurrence that is not in the future.
+
+    Args:
+        phrase: Temporal phrase, e.g. QueryPlan.temporal_filter
+        now: Reference time (defaults to current time)
+
+    Returns:
+        Tuple of (start inclusive, end exclusive), or None if the phrase is empty
+        or cannot be parsed
+    """
+    if not phrase or not phrase.strip():
+        return None
+
+    now = now or datetime.now()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    one_day = timedelta(days=1)
+    normalized = " ".join(phrase.lower().split())
+
+    match = _SINCE_PATTERN.match(normalized)
+    if match:
+        period = parse_date_range(match.group(1), now)
+        return (period[0], now) if period else None
+
+    text = re.sub(r"^(in|during|from|over) (the )?", "", normalized)
+
+    if text in ("today", "tonight", "this morning", "this afternoon", "this evening"):
+        return today, today + one_day
+    if text in ("yesterday", "last night"):
+        return today - one_day, today
+
+    if text.startswith(("this ", "last ")):
+        which, _, period = text.partition(" ")
+        back = 1 if which == "last" else 0
+        if period == "week":
+            start = today - timedelta(days=today.weekday()) - timedelta(weeks=back)
+            return start, start + timedelta(weeks=1)
+        if period == "month":
+            start = _add_months(today.replace(day=1), -back)
+            return start, _add_months(start, 1)
+        if period == "year":
+            start = today.replace(month=1, day=1, year=today.year - back)
+            return start, start.replace(year=start.year + 1)
+        if period in WEEKDAYS and which == "last":
+            days_back = (today.weekday() - WEEKDAYS.index(period)) % 7 or 7
+            start = today - timedelta(days=days_back)
+            return start, start + one_day
+
+    match = _LAST_N_PATTERN.match(text)
+    if match:
+        return _unit_delta(today, int(match.group(1)), match.group(2)), today + one_day
+
+    match = _AGO_PATTERN.match(text)
+    if match:
+        start = _unit_delta(today, int(match.group(1)), match.group(2))
+        return start, start + one_day
+
+    match = _MONTH_PATTERN.match(text)
+    if match:
+        month = MONTHS.index(match.group(1)) + 1
+        if match.group(2):
+            year = int(match.group(2))
+        else:
+            year = today.year if month <= today.month else today.year - 1
+        start = datetime(year, month, 1)
+        return start, _add_months(start, 1)
+
+    match = _YEAR_PATTERN.match(text)
+    if match:
+        start = datetime(int(match.group(1)), 1, 1)
+        return start, start.replace(year=start.year + 1)
+
+    parsed = _parse_fast(text) or _parse_relative(text, now) or _parse_with_dateparser(text, now)
+    if parsed is None:
+        logger.warning(f"Could not parse temporal filter '{phrase}', ignoring it")
+        return None
+
+    start = parsed.replace(hour=0, minute=0, second=0, microsecond=0)
+    return start, start + one_day
@@ -1,7 +1,34 @@
 from supabase import Client
-import logging
+import re
+import unicodedata
 
-logger = logging.getLogger(__name__)
+_WHITESPACE = re.compile(r"\s+")
+
+# Letters and punctuation unaccent transliterates that have no Unicode
+# decomposition (so NFKD leaves them alone); entries follow unaccent.rules.
+_UNACCENT_RULES = str.maketrans({
+    "Æ": "AE", "æ": "ae", "Œ": "OE", "œ": "oe", "ß": "ss", "ẞ": "SS",
+    "Þ": "TH", "þ": "th", "Ð": "D", "ð": "d", "Đ": "D", "đ": "d",
+    "Ø": "O", "ø": "o", "Ł": "L", "ł": "l", "Ŀ": "L", "ŀ": "l",
+    "Ħ": "H", "ħ": "h", "Ŧ": "T", "ŧ": "t", "Ŋ": "N", "ŋ": "n",
+    "ı": "i", "ĸ": "q", "ŉ": "'n", "ƒ": "f",
+    "‘": "'", "’": "'", "‚": "'", "‛": "'", "“": '"', "”": '"', "„": '"',
+    "‐": "-", "‑": "-", "‒": "-", "–": "-", "—": "-", "―": "-",
+})
+
+
+def normalize_identifier_value(value: str) -> str:
+    """
+    Normalize an identifier value the way identifiers.value_norm is generated:
+    accents removed, whitespace collapsed and trimmed, lowercased.
+
+    Mirrors the SQL function normalize_identifier_value: letters unaccent
+    transliterates (ø, ł, ß, æ, ...) use its rules, other accented letters
+    are decomposed and their accents dropped.
+    """
+    decomposed = unicodedata.normalize("NFKD", value.translate(_UNACCENT_RULES))
+    unaccented = "".join(c for c in decomposed if not unicodedata.combining(c))
+    return _WHITESPACE.sub(" ", unaccented).strip().lower()
 
 
 def find_entity_by_identifier(
@@ -17,27 +44,63 @@ def find_entity_by_identifier(
         supabase: Supabase client
         identifier_type: Type of identifier (e.g., "name", "email", "phone")
         identifier_value: Value to search for
-        user_id: User ID for RLS enforcement
+        user_id: Only entities created by this user are matched
 
     Returns:
         Entity ID if found, None otherwise
+
+    Raises:
+        APIError, httpx.HTTPError: If the lookup fails
+    """
+    matches = find_entities_by_identifiers(supabase, identifier_type, [identifier_value], user_id)
+    return matches.get(normalize_identifier_value(identifier_value))
+
+
+def find_entities_by_identifiers(
+    supabase: Client,
+    identifier_type: str,
+    identifier_values: list[str],
+    user_id: str,
+) -> dict[str, str]:
     """
-    try:
-        # Case-insensitive search for identifier
-        response = (
-            supabase.table("identifiers")
-            .select("entity_id, entities!inner(data)")
-            .ilike("value", identifier_value)
-            .eq("type", identifier_type)
-            .is_("deleted_at", "null")
-            .limit(1)
-            .execute()
-        )
-
-        if response.data and len(response.data) > 0:
-            return response.data[0]["entity_id"]
-
-        return None
-    except Exception as e:
-        logger.error(f"Error finding entity by identifier: {e}")
-        return None
+    Find entities for many identifier values of one type in a single query.
+
+    Values are matched on value_norm (see normalize_identifier_value), an
+    indexed equality match: case, accents and extra whitespace are ignored,
+    and "%" or "_" in a value are literal characters.
+
+    Errors are raised rather than reported as "not found": callers create
+    entities for values not found, so a failed lookup would duplicate them.
+
+    Args:
+        supabase: Supabase client
+        identifier_type: Type of identifier (e.g., "name", "email", "phone")
+        identifier_values: Values to search for
+        user_id: Only entities created by this user are matched
+
+    Returns:
+        Normalized value -> entity ID for every value found (the oldest
+        identifier wins when several entities share a value)
+
+    Raises:
+        APIError, httpx.HTTPError: If the lookup fails
+    """
+    normalized = sorted({normalize_identifier_value(v) for v in identifier_values} - {""})
+    if not normalized:
+        return {}
+
+    response = (
+        supabase.table("identifiers")
+        .select("entity_id, value_norm, entities!inner(created_by)")
+        .eq("type", identifier_type)
+        .in_("value_norm", normalized)
+        .eq("entities.created_by", user_id)
+        .is_("deleted_at", "null")
+        .order("created_at")
+        .execute()
+    )
+
+    matches: dict[str, str] = {}
+    for row in response.data or []:
+        matches.setdefault(row["value_norm"], row["entity_id"])
+    return matches
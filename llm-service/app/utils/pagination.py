@@ -0,0 +1,173 @@
+"""
+Keyset Pagination Helpers
+
+Cursors are opaque URL-safe tokens encoding the sort key of the last row of a
+page, e.g. (occurred_at, id) for intel. The next page is fetched with a
+PostgREST filter selecting rows strictly after that key in sort order, so
+page N costs the same as page 1 regardless of offset.
+
+A cursor can be bound to the context it was produced in (e.g. the parsed query
+plan), so later pages are fetched without repeating the work of the first.
+
+Cursors are signed (HMAC-SHA256 with settings.cursor_signing_secret), so a
+client cannot forge one: the sort key is placed into a PostgREST filter and the
+bound context is trusted as a parsed plan. Sort keys are also checked to be an
+ISO timestamp and a UUID before they reach a filter.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import uuid
+from datetime import datetime
+from typing import Any
+
+from app.config import settings
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded."""
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode((data + "=" * (-len(data) % 4)).encode())
+
+
+def _signature(payload: str) -> str:
+    secret = settings.cursor_signing_secret or settings.supabase_service_role_key
+    return _b64encode(hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest())
+
+
+def _sign(value: Any) -> str:
+    """Serialize a value as a signed, URL-safe token ("<payload>.<signature>")."""
+    payload = _b64encode(json.dumps(value, separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload)}"
+
+
+def _verify(token: str) -> Any:
+    """Return the value of a token produced by _sign, or raise InvalidCursorError."""
+    payload, _, signature = token.partition(".")
+    if not hmac.compare_digest(signature.encode(), _signature(payload).encode()):
+        raise InvalidCursorError(f"Invalid cursor: {token}")
+    try:
+        return json.loads(_b64decode(payload))
+    except ValueError as e:
+        raise InvalidCursorError(f"Invalid cursor: {token}") from e
+
+
+def encode_cursor(row: dict[str, Any], keys: tuple[str, str]) -> str:
+    """
+    Encode the sort key of a row as an opaque cursor.
+
+    Args:
+        row: Last row of the current page
+        keys: (sort_column, tiebreaker_column), e.g. ("occurred_at", "id")
+
+    Returns:
+        URL-safe cursor string
+    """
+    return _sign([row.get(keys[0]), row.get(keys[1])])
+
+
+def decode_cursor(cursor: str) -> tuple[Any, Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string
+
+    Returns:
+        Tuple of (sort_value, tiebreaker_value): an ISO timestamp and a UUID
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed, unsigned or its key is
+            not a (timestamp, UUID) pair
+    """
+    try:
+        sort_value, tiebreaker = _verify(cursor)
+        datetime.fromisoformat(sort_value)
+        return sort_value, str(uuid.UUID(tiebreaker))
+    except (ValueError, TypeError, AttributeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def encode_bound_cursor(cursor: str, context: dict[str, Any]) -> str:
+    """
+    Bind a cursor to the context needed to fetch the next page.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+        context: JSON-serializable context, e.g. a dumped QueryPlan
+
+    Returns:
+        URL-safe cursor string
+    """
+    return _sign({"cursor": cursor, "context": context})
+
+
+def decode_bound_cursor(bound_cursor: str) -> tuple[str, dict[str, Any]]:
+    """
+    Decode a cursor produced by encode_bound_cursor.
+
+    Args:
+        bound_cursor: Cursor string
+
+    Returns:
+        Tuple of (cursor, context)
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed or unsigned
+    """
+    try:
+        payload = _verify(bound_cursor)
+        cursor, context = payload["cursor"], payload["context"]
+    except (TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {bound_cursor}") from e
+    if not isinstance(cursor, str) or not isinstance(context, dict):
+        raise InvalidCursorError(f"Invalid cursor: {bound_cursor}")
+    return cursor, context
+
+
+def keyset_filter(cursor: str, keys: tuple[str, str]) -> str:
+    """
+    Build a PostgREST or() filter selecting rows after the cursor in descending order.
+
+    Args:
+        cursor: Cursor from the previous page
+        keys: (sort_column, tiebreaker_column)
+
+    Returns:
+        Filter string for query.or_(), e.g.
+        'occurred_at.lt."2025-01-01T00:00:00",and(occurred_at.eq."2025-01-01T00:00:00",id.lt.<uuid>)'
+    """
+    sort_value, tiebreaker = decode_cursor(cursor)
+    sort_col, tie_col = keys
+    return (
+        f'{sort_col}.lt."{sort_value}",'
+        f'and({sort_col}.eq."{sort_value}",{tie_col}.lt.{tiebreaker})'
+    )
+
+
+def paginate(rows: list[dict[str, Any]], page_size: int, keys: tuple[str, str]) -> tuple[list[dict[str, Any]], str | None]:
+    """
+    Split a page fetched with limit(page_size + 1) into rows and a next cursor.
+
+    Args:
+        rows: Rows returned by the query (at most page_size + 1)
+        page_size: Requested page size
+        keys: (sort_column, tiebreaker_column)
+
+    Returns:
+        Tuple of (page rows, next cursor or None if this is the last page)
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    return page, encode_cursor(page[-1], keys)
@@ -0,0 +1,87 @@
+"""
+Date parsing microbenchmark.
+
+Times parse_natural_date against plain dateparser (all languages, as before
+the tiered parser) over the date phrases found in the VCR cassettes, plus the
+examples the extraction prompt asks the LLM to produce.
+
+Usage:
+    python -m benchmarks.date_parser
+    python -m benchmarks.date_parser --repeat 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import time
+from datetime import datetime
+from pathlib import Path
+
+import dateparser
+
+from app.utils.date_parser import parse_natural_date, preload_date_parser
+
+CASSETTE_DIR = Path(__file__).parent.parent / "tests" / "cassettes"
+
+# Date fields as they appear in recorded tool-call arguments and request bodies
+DATE_FIELD_PATTERN = re.compile(r'(?:occurred_at|valid_from|valid_to)\\*"\s*:\s*\\*"([^"\\]+)')
+
+# Examples from the IntelExtraction.occurred_at field description
+PROMPT_PHRASES = ["today", "yesterday", "March 31", "last Friday"]
+
+
+def load_phrases(cassette_dir: Path = CASSETTE_DIR) -> list[str]:
+    """Collect distinct date strings from cassettes and prompt examples."""
+    phrases = set(PROMPT_PHRASES)
+    for path in sorted(cassette_dir.glob("*")):
+        phrases.update(DATE_FIELD_PATTERN.findall(path.read_text()))
+    return sorted(phrases)
+
+
+def time_calls(parse, phrases: list[str], repeat: int) -> list[float]:
+    """Return per-call latencies (ms) of parse over phrases, repeated."""
+    latencies = []
+    for _ in range(repeat):
+        for phrase in phrases:
+            start = time.perf_counter()
+            parse(phrase)
+            latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the phrase set")
+    args = parser.parse_args()
+
+    phrases = load_phrases()
+    base = datetime.now()
+
+    def baseline(phrase):
+        return dateparser.parse(
+            phrase,
+            settings={"PREFER_DATES_FROM": "past", "RELATIVE_BASE": base, "RETURN_AS_TIMEZONE_AWARE": False},
+        )
+
+    def tiered(phrase):
+        return parse_natural_date(phrase, base)
+
+    start = time.perf_counter()
+    preload_date_parser()
+    preload_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{len(phrases)} phrases, {args.repeat} passes, dateparser preload {preload_ms:.1f} ms")
+    print(f"{'parser':<12}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'total ms':>12}")
+    for name, parse in (("dateparser", baseline), ("tiered", tiered)):
+        latencies = time_calls(parse, phrases, args.repeat)
+        ordered = sorted(latencies)
+        print(
+            f"{name:<12}{statistics.median(latencies):>10.4f}{ordered[int(0.95 * (len(ordered) - 1))]:>10.4f}"
+            f"{ordered[-1]:>10.2f}{sum(latencies):>12.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
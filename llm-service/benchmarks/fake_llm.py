@@ -0,0 +1,611 @@
+"""
+Deterministic fake LLM server.
+
+Speaks enough of three provider APIs for the service to run unchanged against it:
+
+    POST /v1/chat/completions   OpenAI (tool calls, json_schema and plain text; SSE streaming)
+    POST /v1/messages           Anthropic (tool_use and text blocks; SSE streaming)
+    POST /api/chat              Ollama (format schema; NDJSON streaming)
+    POST /api/generate, GET /api/ps, GET /api/tags   Ollama warm-up and residency checks
+
+Structured responses are built from templates: IntelligenceExtraction from the
+capitalized names and date phrases in the note, QueryPlan from the keyword
+heuristic used as the query route's fallback, and any other schema from its
+JSON schema. Output depends only on the request (and --seed), so runs are
+repeatable. Latency is time-to-first-token drawn from a distribution plus a
+per-token delay, applied while streaming or before a non-streamed response;
+a fraction of requests can fail with HTTP errors or return malformed JSON.
+
+Point the service at it with:
+    LLM_PROVIDER=openai OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake
+    LLM_PROVIDER=anthropic ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=fake
+    LLM_PROVIDER=ollama OLLAMA_BASE_URL=http://127.0.0.1:8765/v1
+
+Usage:
+    python -m benchmarks.fake_llm --port 8765
+    python -m benchmarks.fake_llm --ttft lognormal:400,0.5 --tokens-per-second 30 --error-rate 0.02
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import time
+import uuid
+from collections.abc import AsyncIterator, Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from app.models.extraction import (
+    ConfidenceLevel,
+    EntityExtraction,
+    EntityType,
+    IdentifierExtraction,
+    IdentifierType,
+    IntelExtraction,
+    IntelligenceExtraction,
+    IntelType,
+    Reasoning,
+    RelationExtraction,
+    RelationType,
+)
+from app.models.query import QueryIntent, QueryPlan
+from app.routes.query import _heuristic_parse
+
+CHARS_PER_TOKEN = 4
+
+_NAME = re.compile(r"\b[A-Z][a-z]+(?: [A-Z][a-z]+)*\b")
+_DATE_PHRASE = re.compile(
+    r"\b(yesterday|today|tonight|last (?:week|month|year|monday|tuesday|wednesday|thursday|friday|saturday|sunday)"
+    r"|(?:on )?(?:monday|tuesday|wednesday|thursday|friday|saturday|sunday))\b",
+    re.IGNORECASE,
+)
+_NOT_NAMES = {
+    "I", "The", "A", "An", "We", "He", "She", "They", "It", "My", "Our", "His", "Her", "Their", "This", "That",
+    "Met", "Had", "Went", "Talked", "Called", "Saw", "Got", "Today", "Yesterday", "Tonight", "Last", "Next",
+    "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday",
+    "January", "February", "March", "April", "May", "June", "July", "August", "September", "October",
+    "November", "December", "Text", "Context", "Extract", "Parse", "Question",
+    "Who", "What", "When", "Where", "Why", "How", "Did", "Do", "Does", "Is", "Are", "Has", "Have",
+    "Tell", "Give", "Show", "Find", "List", "Brief",
+    "Lunch", "Dinner", "Breakfast", "Coffee", "Drinks", "Meeting", "Call", "Caught", "Ran", "Spoke", "Heard",
+    "Just", "Also", "Apparently", "Note",
+}
+_ORG_SUFFIXES = ("Inc", "Corp", "Labs", "Group", "Bank", "University", "Ltd", "AB", "GmbH")
+
+
+# Latency
+
+def parse_distribution(spec: str) -> Callable[[random.Random], float]:
+    """
+    Parse a latency distribution spec into a sampler returning milliseconds.
+
+    Specs:
+        "250"                 fixed
+        "fixed:250"           fixed
+        "uniform:100,400"     uniform between bounds
+        "normal:300,50"       normal (mean, stddev), clipped at 0
+        "lognormal:300,0.5"   lognormal with median 300 and sigma 0.5
+    """
+    kind, _, args = spec.partition(":")
+    if not args:
+        kind, args = "fixed", kind
+    params = [float(p) for p in args.split(",")]
+    if kind == "fixed":
+        return lambda rng: params[0]
+    if kind == "uniform":
+        return lambda rng: rng.uniform(params[0], params[1])
+    if kind == "normal":
+        return lambda rng: max(0.0, rng.gauss(params[0], params[1]))
+    if kind == "lognormal":
+        return lambda rng: rng.lognormvariate(math.log(params[0]), params[1])
+    raise ValueError(f"Unknown latency distribution: {spec}")
+
+
+@dataclass
+class FakeLLMConfig:
+    """Latency, streaming and error-injection settings of the fake server."""
+    ttft_ms: str = "0"
+    tokens_per_second: float = 0.0
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (429, 500, 503)
+    malformed_rate: float = 0.0
+    seed: int = 0
+    model: str = "fake-llm"
+    stats: dict[str, int] = field(default_factory=lambda: {"requests": 0, "errors": 0, "malformed": 0})
+
+
+# Templates
+
+def _note_text(prompt: str) -> str:
+    """Return the note part of an extraction prompt (after "Text:"), or the whole prompt."""
+    return prompt.rsplit("Text:", 1)[-1].strip()
+
+
+def _names(text: str) -> list[str]:
+    names: list[str] = []
+    for match in _NAME.finditer(text):
+        # Drop sentence-initial verbs and pronouns ("Met Anna Berg" -> "Anna Berg")
+        words = [w for w in match.group(0).split() if w not in _NOT_NAMES][:3]
+        name = " ".join(words)
+        if name and name not in names:
+            names.append(name)
+    return names
+
+
+def extraction_from_text(prompt: str, rng: random.Random) -> IntelligenceExtraction:
+    """Build an IntelligenceExtraction for the names and date phrases found in a note."""
+    text = _note_text(prompt)
+    user_match = re.search(r"The authenticated user is: (.+)", prompt)
+    names = _names(text)[:8]
+    date_match = _DATE_PHRASE.search(text)
+
+    entities = []
+    for name in names:
+        entity_type = EntityType.ORGANIZATION if name.endswith(_ORG_SUFFIXES) else EntityType.PERSON
+        entities.append(EntityExtraction(
+            name=name,
+            entity_type=entity_type,
+            identifiers=[IdentifierExtraction(identifier_type=IdentifierType.NAME, value=name)],
+            attributes={},
+            confidence=rng.choice([ConfidenceLevel.HIGH, ConfidenceLevel.MEDIUM]),
+        ))
+
+    people = [e.name for e in entities if e.entity_type == EntityType.PERSON]
+    orgs = [e.name for e in entities if e.entity_type == EntityType.ORGANIZATION]
+    relations = [
+        RelationExtraction(
+            source_entity_name=people[i],
+            target_entity_name=people[i + 1],
+            relation_type=RelationType.KNOWS,
+            strength=rng.randint(3, 8),
+            confidence=ConfidenceLevel.MEDIUM,
+        )
+        for i in range(len(people) - 1)
+    ]
+    if people and orgs:
+        relations.append(RelationExtraction(
+            source_entity_name=people[0],
+            target_entity_name=orgs[0],
+            relation_type=RelationType.WORKS_AT,
+            confidence=ConfidenceLevel.MEDIUM,
+        ))
+    if user_match and people:
+        relations.append(RelationExtraction(
+            source_entity_name=user_match.group(1).strip(),
+            target_entity_name=people[0],
+            relation_type=RelationType.KNOWS,
+            confidence=ConfidenceLevel.LOW,
+        ))
+
+    intel = []
+    if entities:
+        sentence = text.split(".")[0].strip()[:200] or text[:200]
+        intel.append(IntelExtraction(
+            intel_type=IntelType.EVENT if date_match else IntelType.NOTE,
+            description=sentence,
+            occurred_at=date_match.group(0) if date_match else None,
+            entities_involved=[e.name for e in entities],
+            details={},
+            confidence=ConfidenceLevel.MEDIUM,
+        ))
+
+    return IntelligenceExtraction(
+        reasoning=Reasoning(
+            entities_identified=", ".join(f"{e.name} ({e.entity_type.value})" for e in entities) or "None",
+            relationships_identified=", ".join(
+                f"{r.source_entity_name} {r.relation_type.value} {r.target_entity_name}" for r in relations
+            ) or "None",
+            facts_identified="None",
+            events_identified=intel[0].description if intel else "None",
+            sources_identified="Note",
+            confidence_rationale="Template response from the fake LLM server",
+        ),
+        entities=entities,
+        relations=relations,
+        intel=intel,
+    )
+
+
+def query_plan_from_text(prompt: str) -> QueryPlan:
+    """Build a QueryPlan for the question in an intent-parsing prompt."""
+    question = prompt.rsplit("Question:", 1)[-1].strip()
+    plan = _heuristic_parse(question)
+    names = _names(question)
+    if plan.entity_names and names:
+        user = ["(the user)"] if "(the user)" in plan.entity_names else []
+        plan.entity_names = (user + names)[:2] if plan.intent == QueryIntent.PATH_FINDING else user + names
+    return plan
+
+
+def instance_from_schema(schema: dict, defs: dict | None = None) -> Any:
+    """Build a minimal instance of a JSON schema (required properties only)."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return instance_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return instance_from_schema(options[0], defs)
+    kind = schema.get("type", "object")
+    if kind == "object":
+        properties = schema.get("properties", {})
+        return {name: instance_from_schema(properties[name], defs) for name in schema.get("required", [])}
+    return {"array": [], "string": "", "integer": 0, "number": 0.0, "boolean": False}.get(kind)
+
+
+def structured_output(name: str | None, schema: dict | None, prompt: str, rng: random.Random) -> dict:
+    """Render the structured output for a response model name/schema."""
+    title = name or (schema or {}).get("title")
+    if title == IntelligenceExtraction.__name__:
+        return extraction_from_text(prompt, rng).model_dump(mode="json")
+    if title == QueryPlan.__name__:
+        return query_plan_from_text(prompt).model_dump(mode="json")
+    return instance_from_schema(schema or {})
+
+
+def text_answer(prompt: str) -> str:
+    """Plain-text answer listing the results the prompt contains."""
+    results = prompt.rsplit("Query results:", 1)[-1].strip().splitlines()
+    lines = [line.lstrip("- ").strip() for line in results if line.strip()][:5]
+    return "Here is what I found: " + "; ".join(lines) + "." if lines else "I could not find anything relevant."
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+def _chunks(text: str) -> list[str]:
+    return [text[i:i + CHARS_PER_TOKEN] for i in range(0, len(text), CHARS_PER_TOKEN)] or [""]
+
+
+def _message_text(content: Any) -> str:
+    """Flatten OpenAI/Anthropic message content (string or content blocks) to text."""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return "\n".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return ""
+
+
+# Server
+
+class FakeLLM:
+    """Request handling shared by the three API flavours."""
+
+    def __init__(self, config: FakeLLMConfig):
+        self.config = config
+        self.ttft = parse_distribution(config.ttft_ms)
+        self._rng = random.Random(config.seed)
+        self._seen_prefixes: set[str] = set()
+
+    def request_rng(self, body: dict) -> random.Random:
+        """Per-request RNG derived from the request body, so identical requests get identical output."""
+        digest = hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], "big") ^ self.config.seed)
+
+    def injected_error(self) -> JSONResponse | None:
+        self.config.stats["requests"] += 1
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            self.config.stats["errors"] += 1
+            status = self._rng.choice(self.config.error_statuses)
+            return JSONResponse(
+                {"error": {"type": "fake_error", "message": f"Injected error {status}"}},
+                status_code=status,
+                headers={"retry-after": "0"} if status == 429 else None,
+            )
+        return None
+
+    def maybe_malform(self, payload: str) -> str:
+        if self.config.malformed_rate and self._rng.random() < self.config.malformed_rate:
+            self.config.stats["malformed"] += 1
+            return payload[: len(payload) // 2]
+        return payload
+
+    def cached_tokens(self, system: str) -> int:
+        """Tokens of a system prompt already seen (simulates provider prompt caching)."""
+        key = hashlib.sha256(system.encode()).hexdigest()
+        if key in self._seen_prefixes:
+            return _count_tokens(system)
+        self._seen_prefixes.add(key)
+        return 0
+
+    async def first_token_delay(self) -> None:
+        delay = self.ttft(self._rng) / 1000
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    async def token_delay(self, tokens: int = 1) -> None:
+        if self.config.tokens_per_second > 0:
+            await asyncio.sleep(tokens / self.config.tokens_per_second)
+
+    async def complete_delay(self, output: str) -> None:
+        await self.first_token_delay()
+        await self.token_delay(_count_tokens(output))
+
+    async def stream_chunks(self, output: str) -> AsyncIterator[str]:
+        await self.first_token_delay()
+        for chunk in _chunks(output):
+            yield chunk
+            await self.token_delay()
+
+
+def _sse(event: dict, name: str | None = None) -> str:
+    prefix = f"event: {name}\n" if name else ""
+    return f"{prefix}data: {json.dumps(event)}\n\n"
+
+
+def create_app(config: FakeLLMConfig | None = None) -> FastAPI:
+    """Build the fake LLM ASGI app."""
+    fake = FakeLLM(config or FakeLLMConfig())
+    app = FastAPI(title="Fake LLM")
+    app.state.fake = fake
+
+    @app.post("/v1/chat/completions")
+    async def openai_chat(request: Request):
+        body = await request.json()
+        if (error := fake.injected_error()) is not None:
+            return error
+        rng = fake.request_rng(body)
+        messages = body.get("messages", [])
+        prompt = _message_text(messages[-1].get("content")) if messages else ""
+        system = next((_message_text(m.get("content")) for m in messages if m.get("role") == "system"), "")
+        prompt_tokens = sum(_count_tokens(_message_text(m.get("content"))) for m in messages)
+        model = body.get("model", fake.config.model)
+
+        tool = (body.get("tools") or [{}])[0].get("function")
+        response_format = body.get("response_format") or {}
+        if tool:
+            output = json.dumps(structured_output(tool["name"], tool.get("parameters"), prompt, rng))
+        elif response_format.get("type") == "json_schema":
+            json_schema = response_format["json_schema"]
+            output = json.dumps(structured_output(json_schema.get("name"), json_schema.get("schema"), prompt, rng))
+        else:
+            output = text_answer(prompt)
+        output = fake.maybe_malform(output)
+
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": _count_tokens(output),
+            "total_tokens": prompt_tokens + _count_tokens(output),
+            "prompt_tokens_details": {"cached_tokens": fake.cached_tokens(system)},
+        }
+        finish_reason = "tool_calls" if tool else "stop"
+
+        if body.get("stream"):
+            async def events() -> AsyncIterator[str]:
+                base = {"id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+                first = True
+                async for chunk in fake.stream_chunks(output):
+                    if tool:
+                        call = {"index": 0, "function": {"arguments": chunk}}
+                        if first:
+                            call.update({"id": f"call_{completion_id[-12:]}", "type": "function"})
+                            call["function"]["name"] = tool["name"]
+                        delta = {"tool_calls": [call]}
+                    else:
+                        delta = {"content": chunk}
+                    if first:
+                        delta["role"] = "assistant"
+                        first = False
+                    yield _sse({**base, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                yield _sse({**base, "choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}], "usage": usage})
+                yield "data: [DONE]\n\n"
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await fake.complete_delay(output)
+        if tool:
+            message = {
+                "role": "assistant",
+                "content": None,
+                "tool_calls": [{
+                    "id": f"call_{completion_id[-12:]}",
+                    "type": "function",
+                    "function": {"name": tool["name"], "arguments": output},
+                }],
+            }
+        else:
+            message = {"role": "assistant", "content": output}
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        }
+
+    @app.post("/v1/messages")
+    async def anthropic_messages(request: Request):
+        body = await request.json()
+        if (error := fake.injected_error()) is not None:
+            return error
+        rng = fake.request_rng(body)
+        messages = body.get("messages", [])
+        prompt = _message_text(messages[-1].get("content")) if messages else ""
+        system = _message_text(body.get("system", ""))
+        input_tokens = _count_tokens(system) + sum(_count_tokens(_message_text(m.get("content"))) for m in messages)
+        cached = fake.cached_tokens(system)
+
+        tool = (body.get("tools") or [None])[0]
+        if tool:
+            output = json.dumps(structured_output(tool["name"], tool.get("input_schema"), prompt, rng))
+        else:
+            output = text_answer(prompt)
+        output = fake.maybe_malform(output)
+
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        usage = {
+            "input_tokens": input_tokens - cached,
+            "output_tokens": _count_tokens(output),
+            "cache_read_input_tokens": cached,
+            "cache_creation_input_tokens": 0 if cached else _count_tokens(system),
+        }
+        stop_reason = "tool_use" if tool else "end_turn"
+
+        if body.get("stream"):
+            async def events() -> AsyncIterator[str]:
+                start = {
+                    "id": message_id, "type": "message", "role": "assistant", "model": body.get("model"),
+                    "content": [], "stop_reason": None, "stop_sequence": None,
+                    "usage": {**usage, "output_tokens": 0},
+                }
+                yield _sse({"type": "message_start", "message": start}, "message_start")
+                if tool:
+                    block = {"type": "tool_use", "id": f"toolu_{message_id[-12:]}", "name": tool["name"], "input": {}}
+                else:
+                    block = {"type": "text", "text": ""}
+                yield _sse({"type": "content_block_start", "index": 0, "content_block": block}, "content_block_start")
+                async for chunk in fake.stream_chunks(output):
+                    delta = {"type": "input_json_delta", "partial_json": chunk} if tool else {"type": "text_delta", "text": chunk}
+                    yield _sse({"type": "content_block_delta", "index": 0, "delta": delta}, "content_block_delta")
+                yield _sse({"type": "content_block_stop", "index": 0}, "content_block_stop")
+                yield _sse({
+                    "type": "message_delta",
+                    "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                    "usage": {"output_tokens": usage["output_tokens"]},
+                }, "message_delta")
+                yield _sse({"type": "message_stop"}, "message_stop")
+
+            return StreamingResponse(events(), media_type="text/event-stream")
+
+        await fake.complete_delay(output)
+        if tool:
+            try:
+                tool_input = json.loads(output)
+            except json.JSONDecodeError:
+                tool_input = {"raw": output}
+            content = [{"type": "tool_use", "id": f"toolu_{message_id[-12:]}", "name": tool["name"], "input": tool_input}]
+        else:
+            content = [{"type": "text", "text": output}]
+        return {
+            "id": message_id,
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model"),
+            "content": content,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": usage,
+        }
+
+    @app.post("/api/chat")
+    async def ollama_chat(request: Request):
+        body = await request.json()
+        if (error := fake.injected_error()) is not None:
+            return error
+        rng = fake.request_rng(body)
+        messages = body.get("messages", [])
+        prompt = messages[-1].get("content", "") if messages else ""
+        prompt_tokens = sum(_count_tokens(m.get("content", "")) for m in messages)
+        model = body.get("model", fake.config.model)
+
+        output_format = body.get("format")
+        if isinstance(output_format, dict):
+            output = json.dumps(structured_output(None, output_format, prompt, rng))
+        else:
+            output = text_answer(prompt)
+        output = fake.maybe_malform(output)
+        num_predict = (body.get("options") or {}).get("num_predict")
+        if num_predict:
+            output = output[: num_predict * CHARS_PER_TOKEN]
+
+        def final(started: float) -> dict:
+            return {
+                "model": model,
+                "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "message": {"role": "assistant", "content": ""},
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((time.perf_counter() - started) * 1e9),
+                "load_duration": 0,
+                "prompt_eval_count": prompt_tokens,
+                "eval_count": _count_tokens(output),
+            }
+
+        started = time.perf_counter()
+        if body.get("stream", True):
+            async def lines() -> AsyncIterator[str]:
+                async for chunk in fake.stream_chunks(output):
+                    yield json.dumps({
+                        "model": model,
+                        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                        "message": {"role": "assistant", "content": chunk},
+                        "done": False,
+                    }) + "\n"
+                yield json.dumps(final(started)) + "\n"
+
+            return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+        await fake.complete_delay(output)
+        response = final(started)
+        response["message"]["content"] = output
+        return response
+
+    @app.post("/api/generate")
+    async def ollama_generate(request: Request):
+        body = await request.json()
+        return {
+            "model": body.get("model", fake.config.model),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "response": "",
+            "done": True,
+            "load_duration": 0,
+        }
+
+    @app.get("/api/ps")
+    async def ollama_ps():
+        return {"models": [{"name": fake.config.model, "model": fake.config.model, "context_length": 0}]}
+
+    @app.get("/api/tags")
+    async def ollama_tags():
+        return {"models": [{"name": fake.config.model, "model": fake.config.model}]}
+
+    @app.get("/stats")
+    async def stats():
+        return fake.config.stats
+
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--ttft", default="0", help="Time-to-first-token distribution in ms (see parse_distribution)")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Output token rate (0: no per-token delay)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests failing with an HTTP error")
+    parser.add_argument("--error-statuses", default="429,500,503", help="Comma-separated statuses for injected errors")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="Fraction of responses with truncated JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeLLMConfig(
+        ttft_ms=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate,
+        error_statuses=tuple(int(s) for s in args.error_statuses.split(",")),
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,790 @@
+"""
+In-memory Supabase stand-in.
+
+FakeSupabase implements the subset of the supabase-py client used by
+SupabaseSyncService, QueryExecutor, BriefingService, EntityResolverService
+and the entity matcher, against tables held in memory:
+
+    table/from_ -> select/insert/update/upsert/delete
+                -> eq/neq/gt/gte/lt/lte/is_/like/ilike/in_/or_/text_search
+                -> order/limit/single/maybe_single -> execute
+    rpc(search_entities_by_identifier | find_shortest_path | get_entity_intel | get_user_stats
+        | upsert_identifiers | upsert_relations | upsert_entity_attributes)
+
+Embedded selects such as "id, identifiers(type, value)" and
+"entity_id, entities!inner(data)" are resolved through FOREIGN_KEYS.
+
+Every execute() is one round-trip: it is counted (round_trips, calls),
+reported to app.services.metrics like a real PostgREST request, and delayed by
+the configured latency, so sync and query code paths can be measured and
+regression-tested offline.
+
+Usage:
+    db = FakeSupabase(latency_ms=2)
+    db.load("entities", [{"id": "...", "type": "person", "data": {}}])
+    SupabaseSyncService(db, user_id).sync_extraction(extraction)
+    print(db.round_trips, db.calls)
+"""
+
+from __future__ import annotations
+
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from collections import deque
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any
+
+from postgrest.exceptions import APIError
+
+from app.services.metrics import record_db_round_trip
+from app.utils.entity_matcher import normalize_identifier_value
+
+# child table -> parent table -> foreign key column on the child
+FOREIGN_KEYS: dict[str, dict[str, str]] = {
+    "identifiers": {"entities": "entity_id"},
+    "entity_attributes": {"entities": "entity_id", "sources": "source_id"},
+    "intel_entities": {"entities": "entity_id", "intel": "intel_id"},
+    "intel": {"sources": "source_id"},
+}
+
+# Unique constraints enforced on insert (table -> column tuples)
+UNIQUE_CONSTRAINTS: dict[str, list[tuple[str, ...]]] = {
+    "sources": [("code",)],
+    "sync_idempotency_keys": [("user_id", "key")],
+}
+
+# Stored generated columns (table -> column -> function of the row)
+GENERATED_COLUMNS: dict[str, dict[str, Callable[[dict], Any]]] = {
+    "identifiers": {"value_norm": lambda row: normalize_identifier_value(str(row.get("value") or ""))},
+}
+
+_OR_CONDITION = re.compile(r"^(?P<column>[\w.]+)\.(?P<negate>not\.)?(?P<op>\w+)\.(?P<value>.*)$", re.DOTALL)
+
+
+@dataclass
+class FakeResponse:
+    """Mirror of postgrest's APIResponse."""
+    data: Any
+    count: int | None = None
+
+
+def _now() -> str:
+    return datetime.now(UTC).isoformat()
+
+
+def _comparable(row_value: Any, value: Any) -> tuple[Any, Any]:
+    """Coerce two values the way PostgREST compares a column with a filter string."""
+    if row_value is None or value is None:
+        return row_value, value
+    if isinstance(row_value, bool) or isinstance(value, bool):
+        return str(row_value).lower(), str(value).lower()
+    if isinstance(row_value, int | float) or isinstance(value, int | float):
+        try:
+            return float(row_value), float(value)
+        except (TypeError, ValueError):
+            pass
+    return str(row_value), str(value)
+
+
+def _like_regex(pattern: str, flags: int = 0) -> re.Pattern:
+    regex = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.compile(f"^{regex}$", flags | re.DOTALL)
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+def _predicate(column: str, op: str, value: Any) -> Callable[[dict], bool]:
+    """Build a row predicate for one PostgREST operator."""
+    if op == "is":
+        expected = {"null": None, "true": True, "false": False}.get(str(value).lower(), value)
+        return lambda row: row.get(column) is expected or row.get(column) == expected
+    if op in ("like", "ilike"):
+        regex = _like_regex(str(value), re.IGNORECASE if op == "ilike" else 0)
+        return lambda row: row.get(column) is not None and bool(regex.match(str(row.get(column))))
+    if op == "in":
+        values = [str(v) for v in value]
+        return lambda row: row.get(column) is not None and str(row.get(column)) in values
+
+    def compare(row: dict) -> bool:
+        left, right = _comparable(row.get(column), value)
+        if left is None or right is None:
+            return False
+        if op == "eq":
+            return left == right
+        if op == "neq":
+            return left != right
+        if op == "gt":
+            return left > right
+        if op == "gte":
+            return left >= right
+        if op == "lt":
+            return left < right
+        if op == "lte":
+            return left <= right
+        raise ValueError(f"Unsupported operator: {op}")
+
+    return compare
+
+
+def _split_top_level(expr: str) -> list[str]:
+    """Split a PostgREST logic expression on commas outside parentheses and quotes."""
+    parts, depth, quoted, start = [], 0, False, 0
+    for i, c in enumerate(expr):
+        if c == '"':
+            quoted = not quoted
+        elif not quoted and c == "(":
+            depth += 1
+        elif not quoted and c == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and c == ",":
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts if p.strip()]
+
+
+def _negate(predicate: Callable[[dict], bool]) -> Callable[[dict], bool]:
+    return lambda row: not predicate(row)
+
+
+def _parse_logic(expr: str, combine: Callable = any) -> Callable[[dict], bool]:
+    """Parse an or_() filter string ("a.eq.1,and(b.lt.2,c.is.null)") into a predicate."""
+    predicates = []
+    for part in _split_top_level(expr):
+        if part.startswith(("and(", "or(")) and part.endswith(")"):
+            inner = part[part.index("(") + 1:-1]
+            predicates.append(_parse_logic(inner, all if part.startswith("and(") else any))
+            continue
+        match = _OR_CONDITION.match(part)
+        if not match:
+            raise ValueError(f"Unsupported filter: {part}")
+        op, value = match["op"], match["value"]
+        if op == "in":
+            value = [_unquote(v.strip()) for v in value.strip("()").split(",") if v.strip()]
+        else:
+            value = _unquote(value)
+        predicate = _predicate(match["column"], op, value)
+        if match["negate"]:
+            predicate = _negate(predicate)
+        predicates.append(predicate)
+    return lambda row: combine(p(row) for p in predicates)
+
+
+def _parse_select(columns: str) -> list[tuple[str, str | None, bool, str | None]]:
+    """
+    Parse a select list into (name, alias, inner, sub_columns) items.
+
+    "id, data, identifiers(type, value)" -> [("id", None, False, None), ...,
+    ("identifiers", None, False, "type, value")]
+    """
+    items = []
+    for part in _split_top_level(columns):
+        sub_columns = None
+        if part.endswith(")") and "(" in part:
+            sub_columns = part[part.index("(") + 1:-1]
+            part = part[:part.index("(")]
+        alias = None
+        if ":" in part:
+            alias, part = part.split(":", 1)
+        inner = part.endswith("!inner")
+        name = part.split("!", 1)[0].strip()
+        items.append((name, alias, inner, sub_columns))
+    return items
+
+
+class FakeQueryBuilder:
+    """Chainable query against one table; executed by execute()."""
+
+    def __init__(self, db: FakeSupabase, table: str):
+        self._db = db
+        self._table = table
+        self._operation = "select"
+        self._columns = "*"
+        self._count: str | None = None
+        self._payload: Any = None
+        self._on_conflict: tuple[str, ...] = ()
+        self._ignore_duplicates = False
+        self._filters: list[Callable[[dict], bool]] = []
+        # Filters on an embedded resource ("entities.created_by"), applied to !inner embeds
+        self._embedded_filters: list[tuple[str, Callable[[dict], bool]]] = []
+        self._order: list[tuple[str, bool, bool | None]] = []
+        self._limit: int | None = None
+        self._offset = 0
+        self._single: str | None = None
+
+    # Operations
+
+    def select(self, *columns: str, count: str | None = None) -> FakeQueryBuilder:
+        self._columns = ",".join(columns) if columns else "*"
+        self._count = count
+        return self
+
+    def insert(self, rows: dict | list[dict], **kwargs: Any) -> FakeQueryBuilder:
+        self._operation = "insert"
+        self._payload = rows
+        return self
+
+    def upsert(
+        self, rows: dict | list[dict], on_conflict: str = "", ignore_duplicates: bool = False, **kwargs: Any
+    ) -> FakeQueryBuilder:
+        self._operation = "upsert"
+        self._payload = rows
+        self._on_conflict = tuple(c.strip() for c in on_conflict.split(",") if c.strip()) or ("id",)
+        self._ignore_duplicates = ignore_duplicates
+        return self
+
+    def update(self, values: dict, **kwargs: Any) -> FakeQueryBuilder:
+        self._operation = "update"
+        self._payload = values
+        return self
+
+    def delete(self, **kwargs: Any) -> FakeQueryBuilder:
+        self._operation = "delete"
+        return self
+
+    # Filters
+
+    def eq(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "eq", value)
+
+    def neq(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "neq", value)
+
+    def gt(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "gte", value)
+
+    def lt(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "lt", value)
+
+    def lte(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "lte", value)
+
+    def is_(self, column: str, value: Any) -> FakeQueryBuilder:
+        return self._filter(column, "is", "null" if value is None else value)
+
+    def like(self, column: str, pattern: str) -> FakeQueryBuilder:
+        return self._filter(column, "like", pattern)
+
+    def ilike(self, column: str, pattern: str) -> FakeQueryBuilder:
+        return self._filter(column, "ilike", pattern)
+
+    def in_(self, column: str, values: list) -> FakeQueryBuilder:
+        return self._filter(column, "in", list(values))
+
+    def or_(self, filters: str, reference_table: str | None = None) -> FakeQueryBuilder:
+        self._filters.append(_parse_logic(filters))
+        return self
+
+    def text_search(self, column: str, query: str, options: dict | None = None, **kwargs: Any) -> FakeQueryBuilder:
+        """Match rows whose text (description and data) contains every query term."""
+        terms = [t for t in re.findall(r"\w+", query.lower()) if t]
+
+        def matches(row: dict) -> bool:
+            text = f"{row.get('description', '')} {json.dumps(row.get('data'), default=str)}".lower()
+            return all(term in text for term in terms)
+
+        self._filters.append(matches)
+        return self
+
+    def _filter(self, column: str, op: str, value: Any) -> FakeQueryBuilder:
+        if "." in column:
+            resource, column = column.split(".", 1)
+            self._embedded_filters.append((resource, _predicate(column, op, value)))
+            return self
+        self._filters.append(_predicate(column, op, value))
+        return self
+
+    # Modifiers
+
+    def order(self, column: str, desc: bool = False, nullsfirst: bool | None = None, **kwargs: Any) -> FakeQueryBuilder:
+        self._order.append((column, desc, nullsfirst))
+        return self
+
+    def limit(self, size: int, **kwargs: Any) -> FakeQueryBuilder:
+        self._limit = size
+        return self
+
+    def range(self, start: int, end: int, **kwargs: Any) -> FakeQueryBuilder:
+        self._offset, self._limit = start, end - start + 1
+        return self
+
+    def single(self) -> FakeQueryBuilder:
+        self._single = "single"
+        return self
+
+    def maybe_single(self) -> FakeQueryBuilder:
+        self._single = "maybe_single"
+        return self
+
+    # Execution
+
+    def execute(self) -> FakeResponse:
+        self._db._round_trip(self._operation, self._table)
+        with self._db._lock:
+            if self._operation == "select":
+                return self._execute_select()
+            if self._operation in ("insert", "upsert"):
+                return FakeResponse(data=self._execute_write())
+            return FakeResponse(data=self._execute_update_or_delete())
+
+    def _matching(self) -> list[dict]:
+        return [row for row in self._db.tables.setdefault(self._table, []) if all(f(row) for f in self._filters)]
+
+    def _execute_select(self) -> FakeResponse:
+        rows = self._matching()
+        for column, desc, nullsfirst in reversed(self._order):
+            nulls_first = desc if nullsfirst is None else nullsfirst
+            present = sorted(
+                (r for r in rows if r.get(column) is not None),
+                key=lambda r, c=column: _comparable(r[c], r[c])[0],
+                reverse=desc,
+            )
+            missing = [r for r in rows if r.get(column) is None]
+            rows = missing + present if nulls_first else present + missing
+        # Project after ordering so sort columns need not be selected
+        rows = self._db._embed(self._table, rows, self._columns)
+        rows = [
+            row for row in rows
+            if all(row.get(resource) is not None and predicate(row[resource])
+                   for resource, predicate in self._embedded_filters)
+        ]
+        count = len(rows) if self._count else None
+        end = None if self._limit is None else self._offset + self._limit
+        rows = rows[self._offset:end]
+
+        if self._single == "single":
+            if len(rows) != 1:
+                raise APIError({
+                    "code": "PGRST116",
+                    "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(rows)} rows",
+                })
+            return FakeResponse(data=rows[0], count=count)
+        if self._single == "maybe_single":
+            return FakeResponse(data=rows[0] if rows else None, count=count)
+        return FakeResponse(data=rows, count=count)
+
+    def _execute_write(self) -> list[dict]:
+        payload = self._payload if isinstance(self._payload, list) else [self._payload]
+        table = self._db.tables.setdefault(self._table, [])
+        written = []
+        for values in payload:
+            if self._operation == "upsert":
+                key = [str(values.get(c)) for c in self._on_conflict]
+                existing = next((row for row in table if [str(row.get(c)) for c in self._on_conflict] == key), None)
+                if existing is not None:
+                    if not self._ignore_duplicates:
+                        existing.update({**values, "updated_at": _now()})
+                        _generate(self._table, existing)
+                        written.append(dict(existing))
+                    continue
+            row = self._db._with_defaults(self._table, values)
+            self._db._check_unique(self._table, row)
+            table.append(row)
+            written.append(dict(row))
+        return written
+
+    def _execute_update_or_delete(self) -> list[dict]:
+        matched = self._matching()
+        if self._operation == "update":
+            for row in matched:
+                row.update({**self._payload, "updated_at": _now()})
+                _generate(self._table, row)
+            return [dict(row) for row in matched]
+        ids = {id(row) for row in matched}
+        self._db.tables[self._table] = [row for row in self._db.tables[self._table] if id(row) not in ids]
+        return [dict(row) for row in matched]
+
+
+class FakeRPC:
+    """Pending RPC call; executed by execute()."""
+
+    def __init__(self, db: FakeSupabase, name: str, params: dict):
+        self._db = db
+        self._name = name
+        self._params = params
+
+    def execute(self) -> FakeResponse:
+        self._db._round_trip("rpc", self._name)
+        function = self._db.rpc_functions.get(self._name)
+        if function is None:
+            raise APIError({"code": "PGRST202", "message": f"Could not find the function public.{self._name}"})
+        with self._db._lock:
+            return FakeResponse(data=function(self._db, **self._params))
+
+
+class _FakeAdmin:
+    def __init__(self, db: FakeSupabase):
+        self._db = db
+
+    def get_user_by_id(self, user_id: str) -> Any:
+        from types import SimpleNamespace
+
+        self._db._round_trip("auth", "users")
+        user = self._db.users.get(user_id)
+        if user is None:
+            return None
+        return SimpleNamespace(user=SimpleNamespace(
+            id=user_id, email=user.get("email"), user_metadata=user.get("user_metadata", {}),
+        ))
+
+
+class _FakeAuth:
+    def __init__(self, db: FakeSupabase):
+        self.admin = _FakeAdmin(db)
+
+
+class FakeSupabase:
+    """
+    In-memory Supabase client with injectable latency and a round-trip counter.
+
+    Args:
+        latency_ms: Fixed delay per round-trip
+        jitter_ms: Uniform random extra delay per round-trip (0..jitter_ms)
+        latency: Callable returning the delay in seconds for (operation, target);
+            overrides latency_ms/jitter_ms
+        seed: Seed for jitter, for reproducible runs
+    """
+
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        latency: Callable[[str, str], float] | None = None,
+        seed: int | None = None,
+    ):
+        self.tables: dict[str, list[dict]] = {}
+        self.users: dict[str, dict] = {}
+        self.rpc_functions: dict[str, Callable[..., Any]] = dict(RPC_FUNCTIONS)
+        self.round_trips = 0
+        self.calls: deque[tuple[str, str]] = deque(maxlen=100_000)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.latency = latency
+        self.auth = _FakeAuth(self)
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._counter_lock = threading.Lock()
+
+    def table(self, name: str) -> FakeQueryBuilder:
+        return FakeQueryBuilder(self, name)
+
+    def from_(self, name: str) -> FakeQueryBuilder:
+        return FakeQueryBuilder(self, name)
+
+    def rpc(self, name: str, params: dict | None = None, **kwargs: Any) -> FakeRPC:
+        return FakeRPC(self, name, params or {})
+
+    def load(self, table: str, rows: list[dict]) -> None:
+        """Bulk-load rows (no round-trips, no latency); missing defaults are filled in."""
+        with self._lock:
+            self.tables.setdefault(table, []).extend(self._with_defaults(table, row) for row in rows)
+
+    def add_user(self, user_id: str, email: str, name: str | None = None) -> None:
+        """Register an auth user for auth.admin.get_user_by_id."""
+        self.users[user_id] = {"email": email, "user_metadata": {"full_name": name} if name else {}}
+
+    def reset_round_trips(self) -> None:
+        with self._counter_lock:
+            self.round_trips = 0
+            self.calls.clear()
+
+    def _round_trip(self, operation: str, target: str) -> None:
+        with self._counter_lock:
+            self.round_trips += 1
+            self.calls.append((operation, target))
+        record_db_round_trip()
+        if self.latency is not None:
+            delay = self.latency(operation, target)
+        else:
+            delay = (self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+    def _with_defaults(self, table: str, values: dict) -> dict:
+        now = _now()
+        row = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, "deleted_at": None}
+        row.update(values)
+        return _generate(table, row)
+
+    def _check_unique(self, table: str, row: dict) -> None:
+        for columns in UNIQUE_CONSTRAINTS.get(table, []):
+            key = tuple(row.get(c) for c in columns)
+            if any(tuple(other.get(c) for c in columns) == key for other in self.tables.get(table, [])):
+                raise APIError({
+                    "code": "23505",
+                    "message": f'duplicate key value violates unique constraint "{table}_{"_".join(columns)}_key"',
+                })
+
+    def _embed(self, table: str, rows: list[dict], columns: str) -> list[dict]:
+        """Project rows onto a select list, resolving embedded resources."""
+        items = _parse_select(columns)
+        # Index each embedded table once per select instead of scanning it per row
+        indexes = {
+            name: self._relation_index(table, name)
+            for name, _, _, sub_columns in items if sub_columns is not None
+        }
+        result = []
+        for row in rows:
+            out: dict[str, Any] = {}
+            keep = True
+            for name, alias, inner, sub_columns in items:
+                if name == "*":
+                    out.update(row)
+                    continue
+                if sub_columns is None:
+                    out[alias or name] = row.get(name)
+                    continue
+                many, key, index = indexes[name]
+                if many:
+                    embedded = self._embed(name, index.get(row.get("id"), []), sub_columns)
+                else:
+                    parent = index.get(row.get(key))
+                    embedded = self._embed(name, [parent], sub_columns)[0] if parent else None
+                if inner and not embedded:
+                    keep = False
+                    break
+                out[alias or name] = embedded
+            if keep:
+                result.append(out)
+        return result
+
+    def _relation_index(self, table: str, other: str) -> tuple[bool, str, dict]:
+        """Index other for embedding under table: (one-to-many, join column, index)."""
+        # One-to-many: other has a foreign key to table
+        fk = FOREIGN_KEYS.get(other, {}).get(table)
+        if fk is not None:
+            children: dict[Any, list[dict]] = {}
+            for r in self.tables.get(other, []):
+                children.setdefault(r.get(fk), []).append(r)
+            return True, fk, children
+        # Many-to-one: table has a foreign key to other
+        fk = FOREIGN_KEYS.get(table, {}).get(other)
+        if fk is not None:
+            return False, fk, {r.get("id"): r for r in self.tables.get(other, [])}
+        raise ValueError(f"No relationship between {table} and {other}")
+
+
+def _generate(table: str, row: dict) -> dict:
+    """Compute the table's generated columns for row, in place."""
+    for column, function in GENERATED_COLUMNS.get(table, {}).items():
+        row[column] = function(row)
+    return row
+
+
+# RPC functions (mirroring the SQL functions in supabase/migrations)
+
+def _live(rows: list[dict]) -> list[dict]:
+    return [r for r in rows if r.get("deleted_at") is None]
+
+
+def _search_entities_by_identifier(db: FakeSupabase, p_search_value: str, p_identifier_type: str | None = None) -> list[dict]:
+    entities = {e["id"]: e for e in _live(db.tables.get("entities", []))}
+    needle = p_search_value.lower()
+    rows = [
+        {
+            "entity_id": i["entity_id"],
+            "entity_type": entities[i["entity_id"]].get("type"),
+            "entity_data": entities[i["entity_id"]].get("data"),
+            "identifier_type": i.get("type"),
+            "identifier_value": i.get("value"),
+            "identifier_id": i["id"],
+        }
+        for i in _live(db.tables.get("identifiers", []))
+        if i.get("entity_id") in entities
+        and needle in str(i.get("value", "")).lower()
+        and (p_identifier_type is None or i.get("type") == p_identifier_type)
+    ]
+    rows.sort(key=lambda r: (str(r["identifier_value"]).lower() != needle, str(r["identifier_value"])))
+    return rows
+
+
+def _first_names(db: FakeSupabase, entity_ids: list[str]) -> dict[str, str]:
+    """First live name identifier (by created_at) of each entity."""
+    wanted = set(entity_ids)
+    names: dict[str, str] = {}
+    rows = (i for i in _live(db.tables.get("identifiers", [])) if i["type"] == "name" and i["entity_id"] in wanted)
+    for row in sorted(rows, key=lambda i: i.get("created_at") or ""):
+        names.setdefault(row["entity_id"], row["value"])
+    return names
+
+
+def _find_shortest_path(db: FakeSupabase, p_source_id: str, p_target_id: str, p_max_depth: int = 6) -> list[dict]:
+    adjacency: dict[str, list[tuple[str, str]]] = {}
+    for r in _live(db.tables.get("relations", [])):
+        adjacency.setdefault(r["source_id"], []).append((r["target_id"], r["type"]))
+        adjacency.setdefault(r["target_id"], []).append((r["source_id"], r["type"]))
+
+    # Breadth-first search returns a shortest path first, like the recursive CTE's ORDER BY depth
+    queue = deque([(p_source_id, [p_source_id], [])])
+    visited = {p_source_id}
+    while queue:
+        node, path, types = queue.popleft()
+        if node == p_target_id:
+            names = _first_names(db, path)
+            return [{
+                "path": path,
+                "depth": len(path) - 1,
+                "relation_types": types,
+                "path_names": [names.get(entity_id) for entity_id in path],
+            }]
+        if len(path) - 1 >= p_max_depth:
+            continue
+        for neighbor, rel_type in adjacency.get(node, []):
+            if neighbor not in visited:
+                visited.add(neighbor)
+                queue.append((neighbor, path + [neighbor], types + [rel_type]))
+    return []
+
+
+def _get_entity_intel(
+    db: FakeSupabase,
+    p_entity_ids: list[str],
+    p_limit: int = 20,
+    p_from: str | None = None,
+    p_to: str | None = None,
+    p_before_occurred_at: str | None = None,
+    p_before_id: str | None = None,
+) -> list[dict]:
+    wanted = set(p_entity_ids)
+    linked: dict[str, list[str]] = {}
+    for link in _live(db.tables.get("intel_entities", [])):
+        if link.get("entity_id") in wanted:
+            linked.setdefault(link["intel_id"], []).append(link["entity_id"])
+
+    columns = ("id", "type", "occurred_at", "data", "source_id", "confidence", "created_at")
+    rows = []
+    for intel in _live(db.tables.get("intel", [])):
+        if intel["id"] not in linked:
+            continue
+        occurred_at = str(intel.get("occurred_at"))
+        if p_from and occurred_at < p_from:
+            continue
+        if p_to and occurred_at >= p_to:
+            continue
+        if p_before_occurred_at and (occurred_at, intel["id"]) >= (p_before_occurred_at, p_before_id or ""):
+            continue
+        rows.append({**{c: intel.get(c) for c in columns}, "entity_ids": linked[intel["id"]]})
+    rows.sort(key=lambda r: (str(r["occurred_at"]), r["id"]), reverse=True)
+    return rows[:min(max(p_limit, 1), 1000)]
+
+
+def _get_user_stats(db: FakeSupabase, p_user_id: str) -> dict:
+    def counts(rows: list[dict]) -> dict[str, int]:
+        by_type: dict[str, int] = {}
+        for r in rows:
+            by_type[r.get("type")] = by_type.get(r.get("type"), 0) + 1
+        return by_type
+
+    entities = [e for e in _live(db.tables.get("entities", [])) if e.get("created_by") == p_user_id]
+    owned = {e["id"] for e in entities}
+    relations = [r for r in _live(db.tables.get("relations", [])) if r.get("source_id") in owned]
+    intel = [i for i in _live(db.tables.get("intel", [])) if i.get("created_by") == p_user_id]
+    totals = {"entities": len(entities), "relations": len(relations), "intel": len(intel)}
+    return {
+        **totals,
+        "by_entity_type": counts(entities),
+        "by_relation_type": counts(relations),
+        "by_intel_type": counts(intel),
+        "recent": {"last_7_days": totals, "last_30_days": totals},
+    }
+
+
+def _upsert_identifiers(db: FakeSupabase, p_rows: list[dict]) -> list[dict]:
+    table = db.tables.setdefault("identifiers", [])
+    existing = {(i["entity_id"], i["type"], normalize_identifier_value(str(i["value"]))) for i in _live(table)}
+    created = []
+    for row in p_rows:
+        key = (row["entity_id"], row["type"], normalize_identifier_value(str(row["value"])))
+        if key in existing:
+            continue
+        existing.add(key)
+        new = db._with_defaults("identifiers", {**row, "metadata": row.get("metadata") or {}})
+        table.append(new)
+        created.append({c: new[c] for c in ("id", "entity_id", "type", "value")})
+    return created
+
+
+def _upsert_relations(db: FakeSupabase, p_rows: list[dict]) -> list[dict]:
+    table = db.tables.setdefault("relations", [])
+    live = {(r["source_id"], r["target_id"], r["type"]): r for r in _live(table)}
+    result: dict[tuple, dict] = {}
+    for row in p_rows:
+        key = (row["source_id"], row["target_id"], row["type"])
+        if key in result:
+            continue
+        relation = live.get(key)
+        created = relation is None
+        if created:
+            relation = db._with_defaults("relations", {**row, "data": row.get("data") or {}})
+            table.append(relation)
+        result[key] = {**{c: relation[c] for c in ("id", "source_id", "target_id", "type")}, "created": created}
+    return list(result.values())
+
+
+def _upsert_entity_attributes(db: FakeSupabase, p_rows: list[dict]) -> int:
+    table = db.tables.setdefault("entity_attributes", [])
+    current = {(a["entity_id"], a["key"]): a for a in _live(table) if a.get("valid_to") is None}
+    today = datetime.now(UTC).date().isoformat()
+    written = 0
+    for row in p_rows:
+        key = (row["entity_id"], row["key"])
+        existing = current.get(key)
+        if existing is not None:
+            if existing["value"] == row["value"]:
+                continue
+            existing["valid_to"] = max(today, str(existing.get("valid_from") or today))
+        attribute = db._with_defaults("entity_attributes", {
+            "valid_from": None, "valid_to": None, "confidence": "medium", **row,
+        })
+        table.append(attribute)
+        current[key] = attribute
+        written += 1
+    return written
+
+
+def _claim_sync_idempotency_key(db: FakeSupabase, p_user_id: str, p_key: str, p_ttl_seconds: int) -> list[dict]:
+    table = db.tables.setdefault("sync_idempotency_keys", [])
+    now = datetime.now(UTC)
+    abandoned = (now - timedelta(minutes=5)).isoformat()
+    table[:] = [
+        k for k in table
+        if not (
+            k["expires_at"] < now.isoformat()
+            or (
+                k["user_id"] == p_user_id and k["key"] == p_key
+                and k.get("results") is None and k["created_at"] < abandoned
+            )
+        )
+    ]
+    existing = next((k for k in table if k["user_id"] == p_user_id and k["key"] == p_key), None)
+    if existing is not None:
+        return [{"claimed": False, "results": existing.get("results")}]
+    expires_at = (now + timedelta(seconds=p_ttl_seconds)).isoformat()
+    table.append(db._with_defaults(
+        "sync_idempotency_keys", {"user_id": p_user_id, "key": p_key, "results": None, "expires_at": expires_at}
+    ))
+    return [{"claimed": True, "results": None}]
+
+
+RPC_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "search_entities_by_identifier": _search_entities_by_identifier,
+    "find_shortest_path": _find_shortest_path,
+    "get_entity_intel": _get_entity_intel,
+    "get_user_stats": _get_user_stats,
+    "upsert_identifiers": _upsert_identifiers,
+    "upsert_relations": _upsert_relations,
+    "upsert_entity_attributes": _upsert_entity_attributes,
+    "claim_sync_idempotency_key": _claim_sync_idempotency_key,
+}
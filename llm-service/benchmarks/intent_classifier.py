@@ -0,0 +1,119 @@
+"""
+Intent parsing benchmark: accuracy vs latency.
+
+Compares the local intent classifier against the keyword heuristic (and,
+with --llm, the configured LLM provider) on a labeled question set.
+
+Usage:
+    python -m benchmarks.intent_classifier
+    python -m benchmarks.intent_classifier --llm --threshold 0.7
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+from app.models.query import QueryIntent
+from app.services.intent_classifier import IntentClassifier
+
+EVAL_PATH = Path(__file__).parent / "data" / "intent_eval.jsonl"
+
+
+def load_eval_set(path: Path = EVAL_PATH) -> list[tuple[str, QueryIntent]]:
+    """Load (question, intent) pairs from a JSONL file."""
+    rows = [json.loads(line) for line in path.read_text().splitlines() if line.strip()]
+    return [(row["question"], QueryIntent(row["intent"])) for row in rows]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def run_parser(name: str, parse, eval_set: list[tuple[str, QueryIntent]]) -> dict:
+    """
+    Time a parser over the eval set and score its intents.
+
+    Args:
+        name: Label for the report
+        parse: Callable mapping question -> (QueryIntent | None, accepted: bool)
+        eval_set: Labeled questions
+
+    Returns:
+        Dict with accuracy, coverage and latency percentiles (ms)
+    """
+    latencies = []
+    correct = 0
+    accepted = 0
+    accepted_correct = 0
+
+    for question, expected in eval_set:
+        start = time.perf_counter()
+        intent, was_accepted = parse(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        correct += intent == expected
+        if was_accepted:
+            accepted += 1
+            accepted_correct += intent == expected
+
+    total = len(eval_set)
+    return {
+        "parser": name,
+        "accuracy": correct / total,
+        "coverage": accepted / total,
+        "accepted_accuracy": accepted_correct / accepted if accepted else 0.0,
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": _percentile(latencies, 95),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threshold", type=float, default=None, help="Confidence threshold (defaults to settings)")
+    parser.add_argument("--llm", action="store_true", help="Also benchmark the configured LLM provider")
+    args = parser.parse_args()
+
+    from app.config import settings
+    from app.routes.query import _heuristic_parse
+
+    threshold = args.threshold if args.threshold is not None else settings.intent_classifier_threshold
+    eval_set = load_eval_set()
+
+    start = time.perf_counter()
+    classifier = IntentClassifier()
+    train_ms = (time.perf_counter() - start) * 1000
+
+    def classify(question):
+        intent, confidence = classifier.predict(question)
+        return intent, confidence >= threshold
+
+    reports = [
+        run_parser("classifier", classify, eval_set),
+        run_parser("heuristic", lambda q: (_heuristic_parse(q).intent, True), eval_set),
+    ]
+
+    if args.llm:
+        from app.routes.query import _parse_intent
+        from app.services.llm import get_llm_provider
+
+        provider = get_llm_provider()
+        settings.intent_classifier_enabled = False
+        reports.append(run_parser("llm", lambda q: (_parse_intent(provider, q, None).intent, True), eval_set))
+
+    print(f"Eval set: {len(eval_set)} questions, threshold {threshold}, training {train_ms:.1f} ms")
+    print(f"{'parser':<12}{'accuracy':>10}{'coverage':>10}{'acc@cov':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for r in reports:
+        print(
+            f"{r['parser']:<12}{r['accuracy']:>10.2%}{r['coverage']:>10.2%}"
+            f"{r['accepted_accuracy']:>10.2%}{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
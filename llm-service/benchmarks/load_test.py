@@ -0,0 +1,428 @@
+"""
+End-to-end load test for /api/extract, /api/query and /ws/extract.
+
+Serves the real ASGI app with uvicorn in a background thread, backed by the
+fake LLM server (benchmarks.fake_llm, OpenAI API) and a synthetic graph in the
+in-memory Supabase stand-in (benchmarks.fake_supabase), so it runs offline.
+Requests carry ES256 test JWTs signed with a local keypair whose public key is
+injected into the auth module's JWKS cache, as in tests/conftest.py.
+
+Concurrency ramps through --stages; in each stage that many virtual users loop
+for --stage-seconds, picking endpoints by --mix weights. Websocket users keep
+one authenticated connection and time each message until "complete". Reports
+throughput, p50/p95/p99 latency and error rate per endpoint and stage, plus
+database round-trips per request.
+
+Usage:
+    python -m benchmarks.load_test
+    python -m benchmarks.load_test --stages 1,8,32 --stage-seconds 20 --mix extract=1,query=3,ws=1
+    python -m benchmarks.load_test --llm-ttft lognormal:400,0.5 --llm-tokens-per-second 40 --db-latency-ms 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import statistics
+import threading
+import time
+from collections.abc import Callable
+from contextlib import ExitStack, contextmanager, suppress
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from unittest.mock import patch
+
+import httpx
+import uvicorn
+from websockets.asyncio.client import connect
+from websockets.exceptions import WebSocketException
+
+ENDPOINTS = ("extract", "query", "ws")
+
+# Failures counted as request errors (JSON decode errors are ValueErrors)
+REQUEST_ERRORS = (httpx.HTTPError, WebSocketException, OSError, ValueError, RuntimeError)
+
+TEST_KID = "load-test-key"
+
+QUERY_TEMPLATES = (
+    "Who is {person}?",
+    "How am I connected to {person}?",
+    "Brief me on {person}",
+    "When did I last talk to {person}?",
+    "Who works at {org}?",
+    "How many contacts do I have?",
+)
+
+
+@dataclass
+class Sample:
+    """One timed request."""
+
+    endpoint: str
+    latency_ms: float
+    ok: bool
+
+
+@dataclass
+class StageResult:
+    """Samples and database round-trips of one concurrency stage."""
+
+    concurrency: int
+    seconds: float
+    samples: list[Sample] = field(default_factory=list)
+    db_round_trips: int = 0
+
+    def summary(self) -> dict:
+        """Per-endpoint throughput, latency percentiles (ms) and error rate."""
+        endpoints = {}
+        for endpoint in ENDPOINTS:
+            samples = [s for s in self.samples if s.endpoint == endpoint]
+            if not samples:
+                continue
+            latencies = [s.latency_ms for s in samples]
+            endpoints[endpoint] = {
+                "requests": len(samples),
+                "throughput_rps": len(samples) / self.seconds,
+                "p50_ms": statistics.median(latencies),
+                "p95_ms": _percentile(latencies, 95),
+                "p99_ms": _percentile(latencies, 99),
+                "error_rate": sum(not s.ok for s in samples) / len(samples),
+            }
+        return {
+            "concurrency": self.concurrency,
+            "seconds": self.seconds,
+            "requests": len(self.samples),
+            "throughput_rps": len(self.samples) / self.seconds,
+            "db_round_trips_per_request": self.db_round_trips / len(self.samples) if self.samples else 0.0,
+            "endpoints": endpoints,
+        }
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse "extract=1,query=2,ws=1" into endpoint weights."""
+    mix = {}
+    for part in spec.split(","):
+        endpoint, _, weight = part.partition("=")
+        endpoint = endpoint.strip()
+        if endpoint not in ENDPOINTS:
+            raise ValueError(f"Unknown endpoint {endpoint!r} (expected one of {', '.join(ENDPOINTS)})")
+        mix[endpoint] = float(weight or 1)
+    return mix
+
+
+def mint_token(user_id: str) -> tuple[str, dict]:
+    """
+    Mint an ES256 JWT for user_id, signed with a fresh local keypair.
+
+    Returns:
+        The token and the JWKS keys (by kid) that verify it
+    """
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from jose import jwt
+
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    nums = private_key.public_key().public_numbers()
+    jwks = {
+        TEST_KID: {
+            "kty": "EC",
+            "crv": "P-256",
+            "x": base64.urlsafe_b64encode(nums.x.to_bytes(32, "big")).rstrip(b"=").decode(),
+            "y": base64.urlsafe_b64encode(nums.y.to_bytes(32, "big")).rstrip(b"=").decode(),
+            "kid": TEST_KID,
+            "alg": "ES256",
+            "use": "sig",
+        }
+    }
+
+    now = datetime.now(UTC)
+    payload = {
+        "sub": user_id,
+        "aud": "authenticated",
+        "exp": now + timedelta(hours=1),
+        "iat": now,
+        "role": "authenticated",
+    }
+    return jwt.encode(payload, private_key, algorithm="ES256", headers={"kid": TEST_KID}), jwks
+
+
+@contextmanager
+def serve(app, host: str = "127.0.0.1"):
+    """Serve an ASGI app with uvicorn in a daemon thread; yields its base URL."""
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=0, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("uvicorn failed to start")
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+@contextmanager
+def offline_service(db, llm_url: str, jwks: dict):
+    """
+    Point the service at the fakes: every service-role client is db, the LLM
+    provider is OpenAI-compatible at llm_url, and tokens are verified against
+    jwks instead of Supabase's. Restores everything on exit.
+    """
+    import app.routes.query as query_routes
+    import app.services.auth as auth_module
+    import app.services.extraction as extraction_module
+    import app.services.supabase_sync as sync_module
+    from app.config import settings
+
+    with ExitStack() as stack:
+        for module in (
+            "app.services.auth",
+            "app.services.supabase_sync",
+            "app.routes.extract",
+            "app.routes.query",
+            "app.routes.stream",
+        ):
+            stack.enter_context(patch(f"{module}.create_service_role_client", return_value=db))
+        stack.enter_context(patch.dict(os.environ, {"OPENAI_BASE_URL": f"{llm_url}/v1"}))
+        stack.enter_context(patch.object(settings, "llm_provider", "openai"))
+        stack.enter_context(patch.object(settings, "llm_model", "fake-llm"))
+        stack.enter_context(patch.object(settings, "openai_api_key", "fake"))
+        stack.enter_context(patch.object(settings, "llm_warm_up", False))
+        stack.enter_context(patch.object(auth_module, "_jwks_keys", jwks))
+        stack.enter_context(patch.object(auth_module, "_jwks_fetched_at", time.monotonic()))
+        # Drop process-wide caches built against the real backends
+        stack.enter_context(patch.object(extraction_module, "_extraction_service", None))
+        stack.enter_context(patch.object(query_routes, "_known_names", {}))
+        stack.enter_context(patch.object(sync_module, "_source_ids", {}))
+        yield
+
+
+class VirtualUser:
+    """One simulated client looping over the endpoint mix until a deadline."""
+
+    def __init__(self, base_url: str, token: str, texts: list[str], questions: list[str],
+                 mix: dict[str, float], rng: random.Random):
+        self.base_url = base_url
+        self.token = token
+        self.texts = texts
+        self.questions = questions
+        self.endpoints = list(mix)
+        self.weights = list(mix.values())
+        self.rng = rng
+        self.ws = None
+
+    async def run(self, client: httpx.AsyncClient, deadline: float, samples: list[Sample]) -> None:
+        try:
+            while time.perf_counter() < deadline:
+                endpoint = self.rng.choices(self.endpoints, self.weights)[0]
+                start = time.perf_counter()
+                try:
+                    ok = await getattr(self, f"_{endpoint}")(client)
+                except REQUEST_ERRORS:
+                    ok = False
+                    await self._close_ws()
+                samples.append(Sample(endpoint, (time.perf_counter() - start) * 1000, ok))
+        finally:
+            await self._close_ws()
+
+    async def warm_up(self, client: httpx.AsyncClient) -> None:
+        """Hit each endpoint of the mix once, unrecorded (provider and client construction, caches)."""
+        try:
+            for endpoint in self.endpoints:
+                await getattr(self, f"_{endpoint}")(client)
+        finally:
+            await self._close_ws()
+
+    async def _extract(self, client: httpx.AsyncClient) -> bool:
+        response = await client.post(
+            "/api/extract",
+            json={"text": self.rng.choice(self.texts), "sync_to_db": True},
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        return response.status_code == 200
+
+    async def _query(self, client: httpx.AsyncClient) -> bool:
+        response = await client.post(
+            "/api/query",
+            json={"question": self.rng.choice(self.questions)},
+            headers={"Authorization": f"Bearer {self.token}"},
+        )
+        return response.status_code == 200
+
+    async def _ws(self, client: httpx.AsyncClient) -> bool:
+        if self.ws is None:
+            self.ws = await connect(self.base_url.replace("http", "ws", 1) + "/api/ws/extract")
+            await self.ws.send(json.dumps({"token": self.token}))
+            if json.loads(await self.ws.recv()).get("status") != "authenticated":
+                raise RuntimeError("Websocket authentication failed")
+
+        await self.ws.send(json.dumps({"text": self.rng.choice(self.texts)}))
+        while True:
+            message = json.loads(await self.ws.recv())
+            if "error" in message:
+                return False
+            if message.get("status") == "complete":
+                return True
+
+    async def _close_ws(self) -> None:
+        if self.ws is not None:
+            ws, self.ws = self.ws, None
+            with suppress(WebSocketException, OSError):
+                await ws.close()
+
+
+async def run_stage(base_url: str, token: str, texts: list[str], questions: list[str], mix: dict[str, float],
+                    concurrency: int, seconds: float, seed: int = 0, warm_up: bool = False,
+                    on_start: Callable[[], None] | None = None) -> StageResult:
+    """
+    Run concurrency virtual users against base_url for seconds.
+
+    With warm_up, each endpoint of the mix is hit once before timing starts;
+    on_start is called when it does (e.g. to reset round-trip counters).
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=120, limits=limits) as client:
+        users = [
+            VirtualUser(base_url, token, texts, questions, mix, random.Random(seed * 1000 + i))
+            for i in range(concurrency)
+        ]
+        if warm_up:
+            await users[0].warm_up(client)
+
+        if on_start:
+            on_start()
+        samples: list[Sample] = []
+        start = time.perf_counter()
+        await asyncio.gather(*(user.run(client, start + seconds, samples) for user in users))
+        # Requests in flight at the deadline run over; count the full elapsed time
+        elapsed = time.perf_counter() - start
+    return StageResult(concurrency=concurrency, seconds=elapsed, samples=samples)
+
+
+def build_workload(graph, n_questions: int = 200, seed: int = 0) -> tuple[list[str], list[str]]:
+    """Note texts and questions about people and organizations in the graph."""
+    rng = random.Random(seed)
+    persons = [p["data"]["name"] for p in graph.persons]
+    orgs = [e["data"]["name"] for e in graph.tables["entities"] if e["type"] == "organization"]
+    questions = [
+        rng.choice(QUERY_TEMPLATES).format(person=rng.choice(persons), org=rng.choice(orgs))
+        for _ in range(n_questions)
+    ]
+    return [note.text for note in graph.notes], questions
+
+
+def run_load_test(stages: list[int], stage_seconds: float, mix: dict[str, float], size: str = "1k",
+                  llm_ttft: str = "0", llm_tokens_per_second: float = 0.0, llm_error_rate: float = 0.0,
+                  db_latency_ms: float = 1.0, seed: int = 0) -> list[StageResult]:
+    """
+    Ramp through stages against the app served offline.
+
+    Args:
+        stages: Concurrent virtual users per stage
+        stage_seconds: Duration of each stage
+        mix: Endpoint weights (see parse_mix)
+        size: Synthetic graph size ("1k", "10k", ... or a number of entities)
+        llm_ttft: Fake LLM time-to-first-token distribution (ms)
+        llm_tokens_per_second: Fake LLM output rate (0: no per-token delay)
+        llm_error_rate: Fraction of fake LLM requests failing with an HTTP error
+        db_latency_ms: Fake Supabase latency per round-trip
+        seed: Seed for the graph, the fake LLM and the virtual users
+
+    Returns:
+        One StageResult per stage
+    """
+    from app.main import app
+    from benchmarks.fake_llm import FakeLLMConfig, create_app
+    from benchmarks.fake_supabase import FakeSupabase
+    from benchmarks.synthetic_graph import SIZES, generate, load_into_fake
+
+    graph = generate(SIZES.get(size.lower()) or int(size), seed=seed)
+    db = FakeSupabase(latency_ms=db_latency_ms, seed=seed)
+    load_into_fake(graph, db)
+    texts, questions = build_workload(graph, seed=seed)
+    llm_config = FakeLLMConfig(
+        ttft_ms=llm_ttft, tokens_per_second=llm_tokens_per_second, error_rate=llm_error_rate, seed=seed
+    )
+
+    token, jwks = mint_token(graph.user_id)
+
+    results = []
+    with serve(create_app(llm_config)) as llm_url, offline_service(db, llm_url, jwks), serve(app) as base_url:
+        for i, concurrency in enumerate(stages):
+            result = asyncio.run(run_stage(
+                base_url, token, texts, questions, mix, concurrency, stage_seconds, seed,
+                warm_up=i == 0, on_start=db.reset_round_trips,
+            ))
+            result.db_round_trips = db.round_trips
+            results.append(result)
+    return results
+
+
+def print_report(results: list[StageResult]) -> None:
+    header = f"{'users':>5}  {'endpoint':<8} {'reqs':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        summary = result.summary()
+        for endpoint, row in summary["endpoints"].items():
+            print(
+                f"{result.concurrency:>5}  {endpoint:<8} {row['requests']:>6} {row['throughput_rps']:>8.1f} "
+                f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f} {row['error_rate']:>7.1%}"
+            )
+        print(
+            f"{result.concurrency:>5}  {'total':<8} {summary['requests']:>6} {summary['throughput_rps']:>8.1f}"
+            f"   ({summary['db_round_trips_per_request']:.1f} DB round-trips/request)"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stages", default="1,4,16", help="Comma-separated virtual users per stage")
+    parser.add_argument("--stage-seconds", type=float, default=10.0)
+    parser.add_argument("--mix", default="extract=1,query=2,ws=1", help="Endpoint weights")
+    parser.add_argument("--size", default="1k", help="Synthetic graph size (1k, 10k, 100k, 1m or a number)")
+    parser.add_argument("--llm-ttft", default="0", help="Fake LLM time-to-first-token distribution in ms")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--db-latency-ms", type=float, default=1.0, help="Fake Supabase latency per round-trip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write the summaries to this file")
+    args = parser.parse_args()
+
+    # Settings require Supabase credentials at import; offline, none are used
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    os.environ.setdefault("SUPABASE_ANON_KEY", "offline")
+    os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "offline")
+
+    results = run_load_test(
+        stages=[int(s) for s in args.stages.split(",")],
+        stage_seconds=args.stage_seconds,
+        mix=parse_mix(args.mix),
+        size=args.size,
+        llm_ttft=args.llm_ttft,
+        llm_tokens_per_second=args.llm_tokens_per_second,
+        llm_error_rate=args.llm_error_rate,
+        db_latency_ms=args.db_latency_ms,
+        seed=args.seed,
+    )
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump([result.summary() for result in results], f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/bin/bash
+
+# Benchmark runner for the LLM service hot paths (tests/bench)
+#
+# Runs offline against synthetic graphs in the in-memory Supabase stand-in;
+# no Ollama or Supabase required.
+#
+# Usage:
+#   ./run_benchmarks.sh           # Compare against the latest saved baseline, fail on >10% p50 regression
+#   ./run_benchmarks.sh --save    # Record a new baseline
+#
+# Environment:
+#   BENCH_SIZES          Graph sizes to benchmark (default: 1k,10k)
+#   BENCH_DB_LATENCY_MS  Injected latency per database round-trip (default: 1)
+#   BENCH_THRESHOLD      Allowed median regression (default: 10%)
+#
+# Baselines are stored under .benchmarks/ and are machine-specific: compare
+# only against baselines recorded on the same machine.
+
+MODE="compare"
+
+# Parse arguments
+if [ "$1" = "--save" ] || [ "$1" = "-s" ]; then
+    MODE="save"
+fi
+
+export BENCH_SIZES="${BENCH_SIZES:-1k,10k}"
+THRESHOLD="${BENCH_THRESHOLD:-10%}"
+STORAGE="file://.benchmarks"
+
+echo "=========================================="
+echo "LLM Service Benchmarks"
+echo "Mode: $MODE"
+echo "Sizes: $BENCH_SIZES"
+echo "=========================================="
+echo ""
+
+ARGS=(tests/bench/ --benchmark-enable --benchmark-only --benchmark-storage="$STORAGE" --benchmark-columns=min,median,mean,max,rounds)
+
+if [ "$MODE" = "save" ]; then
+    echo "Recording new baseline..."
+    echo ""
+    python -m pytest "${ARGS[@]}" --benchmark-autosave
+elif [ -z "$(find .benchmarks -name '*.json' 2>/dev/null)" ]; then
+    echo "No baseline found; recording one (run again to compare)..."
+    echo ""
+    python -m pytest "${ARGS[@]}" --benchmark-autosave
+else
+    echo "Comparing against latest baseline (fail on median regression > $THRESHOLD)..."
+    echo ""
+    python -m pytest "${ARGS[@]}" --benchmark-compare --benchmark-compare-fail="median:$THRESHOLD"
+fi
+STATUS=$?
+
+echo ""
+echo "=========================================="
+echo "Benchmarks completed!"
+echo "=========================================="
+exit $STATUS
@@ -0,0 +1,58 @@
+"""
+Fixtures for the benchmark suite.
+
+Benchmarks run against synthetic graphs (benchmarks.synthetic_graph) loaded
+into the in-memory Supabase stand-in. Graph sizes come from BENCH_SIZES
+(default "1k"; run_benchmarks.sh uses "1k,10k"); every size-dependent benchmark runs once per size.
+"""
+
+import asyncio
+import os
+
+import pytest
+
+from app.services.entity_resolver import EntityResolverService
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.synthetic_graph import SIZES, generate, load_into_fake
+
+BENCH_SIZES = [size.strip() for size in os.environ.get("BENCH_SIZES", "1k").split(",") if size.strip()]
+
+# Per-round-trip latency (ms) injected for database-bound benchmarks
+DB_LATENCY_MS = float(os.environ.get("BENCH_DB_LATENCY_MS", "1"))
+
+
+@pytest.fixture(scope="session", params=BENCH_SIZES)
+def graph(request):
+    """Synthetic graph for one of BENCH_SIZES."""
+    return generate(SIZES.get(request.param.lower()) or int(request.param), seed=0)
+
+
+@pytest.fixture(scope="session")
+def loaded_db(graph):
+    """FakeSupabase holding the graph, without latency (shared; do not write to it)."""
+    db = FakeSupabase()
+    load_into_fake(graph, db)
+    return db
+
+
+@pytest.fixture
+def latency_db(graph):
+    """Fresh FakeSupabase holding the graph, with DB_LATENCY_MS per round-trip."""
+    db = FakeSupabase(latency_ms=DB_LATENCY_MS)
+    load_into_fake(graph, db)
+    return db
+
+
+@pytest.fixture(scope="session")
+def event_loop_runner():
+    """Run coroutines on one long-lived event loop (cheaper than asyncio.run per round)."""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def resolution_context(loaded_db, graph, event_loop_runner):
+    """ResolutionContext with every person in the graph."""
+    return event_loop_runner(EntityResolverService(loaded_db).build_resolution_context(graph.user_id))
+
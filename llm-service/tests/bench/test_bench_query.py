@@ -0,0 +1,71 @@
+"""
+Benchmarks for query execution and briefings.
+"""
+
+import pytest
+
+from app.models.query import QueryIntent, QueryPlan
+from app.services.briefing import BriefingService
+from app.services.query_executor import QueryExecutor
+
+
+def _plan(intent: QueryIntent, graph) -> QueryPlan:
+    """Query plan for intent, referencing people of the graph."""
+    hub = graph.persons[0]["data"]["name"]
+    other = graph.persons[len(graph.persons) // 2]["data"]["name"]
+    return {
+        QueryIntent.ENTITY_SEARCH: QueryPlan(intent=intent, entity_names=[other]),
+        QueryIntent.INTEL_SEARCH: QueryPlan(intent=intent, search_terms=["fundraising"]),
+        QueryIntent.PATH_FINDING: QueryPlan(intent=intent, entity_names=[other, hub]),
+        QueryIntent.RELATION_QUERY: QueryPlan(intent=intent, entity_names=[hub]),
+        QueryIntent.TEMPORAL_QUERY: QueryPlan(intent=intent, entity_names=[hub], temporal_filter="last year"),
+        QueryIntent.BRIEFING: QueryPlan(intent=intent, entity_names=[other]),
+        QueryIntent.AGGREGATION: QueryPlan(intent=intent),
+    }[intent]
+
+
+class TestQueryBenchmarks:
+    """Benchmarks for QueryExecutor and BriefingService against a latency-injected fake."""
+
+    @pytest.mark.parametrize("intent", list(QueryIntent), ids=lambda intent: intent.value)
+    def test_query_executor(self, benchmark, intent, graph, latency_db, event_loop_runner):
+        """Benchmark QueryExecutor.execute for each intent, recording round-trips per query."""
+        # ARRANGE
+        plan = _plan(intent, graph)
+        calls = 0
+
+        def execute():
+            nonlocal calls
+            calls += 1
+            # A new executor per query, as in the query route (no warm entity-id cache)
+            return event_loop_runner(QueryExecutor(latency_db, graph.user_id).execute(plan))
+
+        # ACT
+        latency_db.reset_round_trips()
+        result = benchmark(execute)
+
+        # ASSERT
+        benchmark.extra_info["round_trips"] = latency_db.round_trips / calls
+        benchmark.extra_info["db_latency_ms"] = latency_db.latency_ms
+        assert result["type"] != "error"
+
+    def test_briefing_generate(self, benchmark, graph, latency_db, event_loop_runner):
+        """Benchmark BriefingService.generate without LLM synthesis, recording round-trips."""
+        # ARRANGE
+        service = BriefingService(latency_db, graph.user_id)
+        entity_id = graph.persons[0]["id"]
+        calls = 0
+
+        def generate():
+            nonlocal calls
+            calls += 1
+            return event_loop_runner(service.generate(entity_id))
+
+        # ACT
+        latency_db.reset_round_trips()
+        result = benchmark(generate)
+
+        # ASSERT
+        benchmark.extra_info["round_trips"] = latency_db.round_trips / calls
+        benchmark.extra_info["db_latency_ms"] = latency_db.latency_ms
+        assert result.connection_count > 0
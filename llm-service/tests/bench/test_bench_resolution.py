@@ -0,0 +1,87 @@
+"""
+Benchmarks for entity resolution hot paths.
+"""
+
+import random
+from unittest.mock import patch
+
+import pytest
+
+from app.services.entity_resolver import EntityResolverService
+from app.services.extraction import ExtractionService
+from app.services.llm import LLMProvider, build_user_prompt
+from benchmarks.fake_llm import extraction_from_text
+
+
+class TemplateProvider(LLMProvider):
+    """LLM provider stub returning the fake LLM server's template extraction instantly."""
+
+    provider_name = "template"
+
+    def extract(self, text, context=None, max_retries=3, user_name=None):
+        return extraction_from_text(build_user_prompt(text, context, user_name), random.Random(0))
+
+
+class TestResolutionBenchmarks:
+    """Benchmarks for EntityResolverService and extraction with resolution."""
+
+    def test_exact_match(self, benchmark, graph, loaded_db, resolution_context):
+        """Benchmark exact_match of a full name against every person."""
+        # ARRANGE
+        resolver = EntityResolverService(loaded_db)
+        name = graph.persons[len(graph.persons) // 2]["data"]["name"]
+
+        # ACT
+        matches = benchmark(resolver.exact_match, name, resolution_context.persons)
+
+        # ASSERT
+        assert matches
+
+    def test_fuzzy_match_single_name(self, benchmark, loaded_db, resolution_context):
+        """Benchmark fuzzy_match_single_name of a misspelled first name against every person."""
+        # ARRANGE
+        resolver = EntityResolverService(loaded_db)
+
+        # ACT
+        matches = benchmark(
+            resolver.fuzzy_match_single_name,
+            "Katherin",
+            resolution_context.persons,
+            resolution_context.fuzzy_first_name_threshold,
+        )
+
+        # ASSERT
+        assert matches
+
+    @pytest.mark.parametrize("kind", ["full", "first", "nickname", "typo"])
+    def test_resolve_person_reference(self, benchmark, kind, graph, loaded_db, resolution_context, event_loop_runner):
+        """Benchmark resolve_person_reference for each kind of note reference."""
+        # ARRANGE
+        resolver = EntityResolverService(loaded_db)
+        reference = next(
+            ref
+            for note in graph.notes
+            for ref, ref_kind in zip(note.references, note.reference_kinds, strict=True)
+            if ref_kind == kind
+        )
+
+        # ACT
+        result = benchmark(lambda: event_loop_runner(resolver.resolve_person_reference(reference, resolution_context)))
+
+        # ASSERT
+        assert result.input_reference == reference
+
+    def test_extract_and_classify_with_resolution(self, benchmark, graph, loaded_db, event_loop_runner):
+        """Benchmark extraction + resolution of a note with an instant stub provider."""
+        # ARRANGE
+        with patch("app.services.extraction.get_llm_provider", return_value=TemplateProvider()):
+            service = ExtractionService()
+        text = graph.notes[0].text
+
+        # ACT
+        result = benchmark(lambda: event_loop_runner(
+            service.extract_and_classify_with_resolution(text, loaded_db, user_id=graph.user_id)
+        ))
+
+        # ASSERT
+        assert result.entity_resolutions
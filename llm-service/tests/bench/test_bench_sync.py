@@ -0,0 +1,37 @@
+"""
+Benchmarks for syncing extractions to the database.
+"""
+
+import itertools
+import random
+
+from app.services.llm import build_user_prompt
+from app.services.supabase_sync import SupabaseSyncService
+from benchmarks.fake_llm import extraction_from_text
+
+
+class TestSyncBenchmarks:
+    """Benchmarks for SupabaseSyncService against a latency-injected fake."""
+
+    def test_sync_extraction(self, benchmark, graph, latency_db):
+        """Benchmark sync_extraction of note extractions, recording round-trips per sync."""
+        # ARRANGE
+        sync_service = SupabaseSyncService(latency_db, user_id=graph.user_id)
+        extractions = itertools.cycle([
+            extraction_from_text(build_user_prompt(note.text), random.Random(0)) for note in graph.notes[:20]
+        ])
+        calls = 0
+
+        def sync():
+            nonlocal calls
+            calls += 1
+            return sync_service.sync_extraction(next(extractions))
+
+        # ACT
+        latency_db.reset_round_trips()
+        results = benchmark(sync)
+
+        # ASSERT
+        benchmark.extra_info["round_trips"] = latency_db.round_trips / calls
+        benchmark.extra_info["db_latency_ms"] = latency_db.latency_ms
+        assert not results.errors
@@ -1,5 +1,6 @@
 import pytest
 import os
+from contextlib import contextmanager
 from unittest.mock import MagicMock
 from datetime import datetime, timedelta, timezone
 from jose import jwt
@@ -11,6 +12,15 @@ def force_test_settings():
     os.environ["LLM_MODEL"] = "qwen2.5:7b"
     os.environ["LLM_PROVIDER"] = "ollama"
 
+@pytest.fixture(autouse=True)
+def clear_source_cache():
+    """Source IDs are cached per process; every test starts from its own database."""
+    from app.services.supabase_sync import clear_source_cache
+
+    clear_source_cache()
+    yield
+    clear_source_cache()
+
 @pytest.fixture(scope="module")
 def vcr_config():
     """
@@ -43,6 +53,7 @@ def pytest_collection_modifyitems(items):
     VCR is NOT applied to:
     - Integration tests that use Supabase (VCR has async compatibility issues with httpx)
     - Unit tests that use mocks (e.g., test_retry.py)
+    - Benchmarks (they run offline against in-memory fakes)
     """
     for item in items:
         # Skip tests that use mocks
@@ -54,6 +65,9 @@ def pytest_collection_modifyitems(items):
         # Skip unit tests (they use mocks)
         if "/unit/" in str(item.fspath):
             continue
+        # Skip benchmarks (offline fakes, no HTTP)
+        if "/bench/" in str(item.fspath):
+            continue
         # Auto-apply VCR to classification and other non-database tests
         item.add_marker(pytest.mark.vcr)
 
@@ -162,6 +176,7 @@ def mock_supabase_insert_tracker():
 
     Useful for verifying that relations use resolved entity IDs.
     Returns a client with client._operations dict tracking all database operations.
+    Rows passed to the upsert RPCs are tracked as inserts into their table.
     """
     from uuid import uuid4
 
@@ -175,8 +190,14 @@ def mock_supabase_insert_tracker():
         "intel_insert": [],
         "intel_entities_insert": [],
         "identifiers_insert": [],
+        "entity_attributes_insert": [],
         "sources_insert": [],
     }
+    upsert_tables = {
+        "upsert_identifiers": "identifiers",
+        "upsert_relations": "relations",
+        "upsert_entity_attributes": "entity_attributes",
+    }
 
     def create_table_mock(table_name):
         """Create table-specific mock with operation tracking."""
@@ -184,12 +205,13 @@ def mock_supabase_insert_tracker():
 
         # Track inserts
         def track_insert(data):
-            client._operations[f"{table_name}_insert"].append(data)
             response = MagicMock()
-            # Handle both single dict and list of dicts
+            # Handle both single dict and list of dicts (one tracked row each)
             if isinstance(data, list):
+                client._operations[f"{table_name}_insert"].extend(data)
                 response.data = [{"id": str(uuid4()), **item} for item in data]
             else:
+                client._operations[f"{table_name}_insert"].append(data)
                 response.data = [{"id": str(uuid4()), **data}]
             return response
 
@@ -201,6 +223,7 @@ def mock_supabase_insert_tracker():
             return execute_mock
 
         table_mock.insert = insert
+        table_mock.upsert = lambda data, **kwargs: insert(data)
 
         # Track updates
         def track_update(data):
@@ -227,6 +250,20 @@ def mock_supabase_insert_tracker():
 
     client.table = create_table_mock
 
+    def rpc(name, params=None):
+        """Track upsert RPC rows; every row is reported as newly created."""
+        rows = (params or {}).get("p_rows", [])
+        table_name = upsert_tables.get(name)
+        if table_name:
+            client._operations[f"{table_name}_insert"].extend(rows)
+        response = MagicMock()
+        response.data = [{"id": str(uuid4()), **row, "created": True} for row in rows] if table_name else []
+        rpc_mock = MagicMock()
+        rpc_mock.execute.return_value = response
+        return rpc_mock
+
+    client.rpc = rpc
+
     return client
 
 
@@ -432,6 +469,55 @@ def resolution_context_factory(sample_person_entities):
     return create_context
 
 
+# ============================================================================
+# Round-Trip Budgets
+# ============================================================================
+
+@contextmanager
+def _round_trip_budget(supabase, budget: int):
+    """
+    Assert a block makes at most `budget` database round-trips on a Supabase client.
+
+    Works with FakeSupabase (benchmarks.fake_supabase) and real clients (via
+    httpx request hooks). Yields the list of calls made, filled in when the
+    block exits; a failed budget lists every call, so N+1 patterns stand out.
+
+    Usage:
+        with round_trip_budget(supabase, 3) as calls:
+            await executor.execute(plan)
+    """
+    calls: list[str] = []
+
+    if hasattr(supabase, "round_trips"):
+        # FakeSupabase: count its round-trips, read its call log afterwards
+        start = supabase.round_trips
+        yield calls
+        made = supabase.round_trips - start
+        calls.extend(f"{op} {target}" for op, target in list(supabase.calls)[len(supabase.calls) - made:])
+    else:
+        def record(request):
+            calls.append(f"{request.method} {request.url.path}")
+
+        sessions = [supabase.postgrest.session, supabase.auth._http_client]
+        for session in sessions:
+            session.event_hooks["request"].append(record)
+        try:
+            yield calls
+        finally:
+            for session in sessions:
+                session.event_hooks["request"].remove(record)
+
+    assert len(calls) <= budget, (
+        f"{len(calls)} round-trips (budget {budget}):\n" + "\n".join(f"  {call}" for call in calls)
+    )
+
+
+@pytest.fixture
+def round_trip_budget():
+    """Context manager asserting a maximum number of round-trips (see _round_trip_budget)."""
+    return _round_trip_budget
+
+
 # ============================================================================
 # Helper Functions
 # ============================================================================
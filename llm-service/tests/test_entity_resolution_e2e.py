@@ -131,8 +131,8 @@ class TestEntityResolutionE2E:
                         operations["intel_created"].append(data)
                         response.data = [{"id": new_id, **data}]
                     elif table_name == "intel_entities":
-                        operations["intel_entities_linked"].append(data)
-                        response.data = [{"id": new_id, **data}]
+                        operations["intel_entities_linked"].extend(data)
+                        response.data = [{"id": str(uuid4()), **link} for link in data]
                     elif table_name == "identifiers":
                         operations["identifiers_created"].append(data)
                         response.data = [{"id": new_id, **data}]
@@ -145,6 +145,7 @@ class TestEntityResolutionE2E:
                 return insert_mock
 
             table_mock.insert = handle_insert
+            table_mock.upsert = lambda data, **kwargs: handle_insert(data)
 
             # Handle updates
             def handle_update(data):
@@ -158,6 +159,21 @@ class TestEntityResolutionE2E:
             return table_mock
 
         client.table = create_table_mock
+
+        # Track upsert RPCs (rows are reported as newly created)
+        def handle_rpc(name, params=None):
+            rows = (params or {}).get("p_rows", [])
+            if name == "upsert_relations":
+                operations["relations_created"].extend(rows)
+            elif name == "upsert_identifiers":
+                operations["identifiers_created"].extend(rows)
+            rpc_mock = MagicMock()
+            rpc_mock.execute.return_value = MagicMock(
+                data=[{"id": str(uuid4()), **row, "created": True} for row in rows]
+            )
+            return rpc_mock
+
+        client.rpc = handle_rpc
         return client
 
     @pytest.mark.asyncio
@@ -713,17 +729,30 @@ class TestRequesterRelationshipScenario:
                     elif table_name == "intel_entities_linked":
                         operations["intel_entities_linked"].append(data)
 
-                    response.data = [{"id": new_id, **data}]
+                    rows = data if isinstance(data, list) else [data]
+                    response.data = [{"id": new_id, **row} for row in rows]
                     return response
 
                 insert_mock.execute = execute
                 return insert_mock
 
             table_mock.insert = handle_insert
+            table_mock.upsert = lambda data, **kwargs: handle_insert(data)
             return table_mock
 
+        def handle_rpc(name, params=None):
+            rows = (params or {}).get("p_rows", [])
+            if name == "upsert_relations":
+                operations["relations_created"].extend(rows)
+            rpc_mock = MagicMock()
+            rpc_mock.execute.return_value = MagicMock(
+                data=[{"id": str(uuid4()), **row, "created": True} for row in rows]
+            )
+            return rpc_mock
+
         sync_client = MagicMock()
         sync_client.table = create_table_mock
+        sync_client.rpc = handle_rpc
 
         # Create extraction representing "I met John, we're now colleagues"
         extraction = IntelligenceExtraction(
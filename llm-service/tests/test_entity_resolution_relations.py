@@ -449,11 +449,11 @@ class TestRelationsResolutionMapping:
         mock_resolution_results
     ):
         """
-        Test _sync_relation() uses IDs from entity_name_to_id.
+        Test _sync_relations() uses IDs from entity_name_to_id.
 
         Scenario:
         - Relation extraction with resolved entities
-        - Expected: _sync_relation gets IDs from entity_name_to_id mapping
+        - Expected: _sync_relations gets IDs from entity_name_to_id mapping
 
         What breaks if untested:
         - Relations sync bypasses resolution
@@ -144,7 +144,7 @@ class TestEntityResolutionSyncIntegration:
 
                 # Mock source creation
                 mock_source_id = str(uuid4())
-                mock_supabase.table.return_value.select.return_value.eq.return_value.execute.return_value.data = [
+                mock_supabase.table.return_value.upsert.return_value.execute.return_value.data = [
                     {"id": mock_source_id}
                 ]
 
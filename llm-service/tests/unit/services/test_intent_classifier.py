@@ -0,0 +1,171 @@
+"""
+Unit tests for the local intent classifier.
+
+Tests intent prediction, slot filling and LLM fallback in _parse_intent.
+"""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from app.models.query import QueryIntent, QueryPlan
+from app.routes import query as query_routes
+from app.routes.query import _load_known_names, _parse_intent
+from app.services.intent_classifier import (
+    IntentClassifier,
+    NameIndex,
+    extract_entity_names,
+    extract_relation_types,
+    extract_search_terms,
+    extract_temporal_filter,
+)
+
+
+class TestIntentPrediction:
+    """Unit tests for IntentClassifier.predict."""
+
+    def test_predicts_each_intent(self):
+        """Test typical phrasings map to the expected intent."""
+        classifier = IntentClassifier()
+
+        cases = {
+            "Who is Erik Lind?": QueryIntent.ENTITY_SEARCH,
+            "What happened at the Web Summit?": QueryIntent.INTEL_SEARCH,
+            "How am I connected to Lena?": QueryIntent.PATH_FINDING,
+            "Who works at Initech?": QueryIntent.RELATION_QUERY,
+            "When did I last see Johan?": QueryIntent.TEMPORAL_QUERY,
+            "Brief me on Maja": QueryIntent.BRIEFING,
+            "How many contacts do I have?": QueryIntent.AGGREGATION,
+        }
+
+        for question, expected in cases.items():
+            intent, confidence = classifier.predict(question)
+            assert intent == expected, f"{question!r} -> {intent}"
+            assert 0.0 <= confidence <= 1.0
+
+    def test_low_confidence_for_unfamiliar_wording(self):
+        """Test questions without cues return None so the caller uses the LLM."""
+        classifier = IntentClassifier()
+
+        assert classifier.classify("qwerty asdf", threshold=0.6) is None
+
+    def test_training_is_deterministic(self):
+        """Test two classifiers trained on the same data agree exactly."""
+        first = IntentClassifier()
+        second = IntentClassifier()
+
+        assert first.predict("Who knows Ali?") == second.predict("Who knows Ali?")
+
+
+class TestSlotExtraction:
+    """Unit tests for slot filling helpers."""
+
+    def test_known_names_take_precedence(self):
+        """Test names from the resolver's index are matched case-insensitively."""
+        names = extract_entity_names("how do i know erik lind?", known_names=["Erik Lind", "Erik"])
+        assert names == ["Erik Lind"]
+
+    def test_name_index_matches_word_ngrams(self):
+        """Test a NameIndex finds punctuated and multi-word names among many, once each."""
+        # ARRANGE
+        index = NameIndex([f"Person {i}" for i in range(10_000)] + ["Jean-Luc Picard", "Acme Inc.", "O'Neil"])
+
+        # ACT
+        names = extract_entity_names("Did jean-luc picard meet o'neil at acme inc. or jean-luc picard?", index)
+
+        # ASSERT
+        assert len(index) == 10_003
+        assert names == ["Jean-Luc Picard", "O'Neil", "Acme Inc."]
+
+    def test_name_index_cached_per_user(self, monkeypatch):
+        """Test _load_known_names builds the index once and reuses it within the TTL."""
+        # ARRANGE
+        person = MagicMock(names=["Erik Lind"])
+        fetches = []
+
+        async def fake_query(self, user_id=None, created_by=None):
+            fetches.append(created_by)
+            return [person]
+
+        monkeypatch.setattr(query_routes, "_known_names", {})
+        monkeypatch.setattr(query_routes.EntityResolverService, "query_persons_from_database", fake_query)
+
+        # ACT
+        first = asyncio.run(_load_known_names(MagicMock(), "user-1"))
+        second = asyncio.run(_load_known_names(MagicMock(), "user-1"))
+
+        # ASSERT
+        assert second is first
+        assert fetches == ["user-1"]
+        assert extract_entity_names("when did i meet erik lind?", first) == ["Erik Lind"]
+
+    def test_capitalized_spans_fallback(self):
+        """Test unknown capitalized names are extracted in order."""
+        names = extract_entity_names("How do Nora Berg and Ali know each other?")
+        assert names == ["Nora Berg", "Ali"]
+
+    def test_self_reference_for_path_finding(self):
+        """Test first-person path questions start from the user."""
+        plan, _ = IntentClassifier().parse("How am I connected to Lena?")
+        assert plan.entity_names == ["(the user)", "Lena"]
+
+    def test_relation_and_temporal_slots(self):
+        """Test relation phrases and temporal phrases are extracted."""
+        assert extract_relation_types("Who works at Initech?") == ["works_at"]
+        assert extract_temporal_filter("What did I do with Bob last week?") == "last week"
+        assert extract_temporal_filter("Who is Bob?") is None
+
+    def test_search_terms_exclude_time_words(self):
+        """Test time phrases go to temporal_filter, not to search terms."""
+        assert extract_search_terms("What happened at the conference last week?", []) == ["conference"]
+        assert extract_search_terms("Show me everything from last month", []) == []
+
+    def test_time_only_question_is_intel_search(self):
+        """Test 'what did I do <time>' searches the user's intel within the range."""
+        plan, _ = IntentClassifier().parse("What did I do last week?")
+
+        assert plan.intent == QueryIntent.INTEL_SEARCH
+        assert plan.temporal_filter == "last week"
+        assert plan.search_terms == []
+
+
+class TestRequiredSlots:
+    """Unit tests for IntentClassifier.classify rejecting plans with empty slots."""
+
+    def test_entity_intent_without_entity_falls_back(self):
+        """Test temporal, relation and briefing plans need a resolved entity."""
+        classifier = IntentClassifier()
+
+        assert classifier.classify("When did I last talk to someone?", 0.6) is None
+        assert classifier.classify("When did I last talk to John?", 0.6) is not None
+
+    def test_time_range_alone_is_enough_for_intel_search(self):
+        """Test intel search with only a temporal filter is accepted."""
+        plan = IntentClassifier().classify("Show me everything from last month", 0.6)
+
+        assert plan is not None
+        assert plan.intent == QueryIntent.INTEL_SEARCH
+        assert plan.temporal_filter == "last month"
+
+
+class TestParseIntentFallback:
+    """Unit tests for the classifier/LLM split in _parse_intent."""
+
+    def test_confident_question_skips_llm(self):
+        """Test the LLM is not called when the classifier is confident."""
+        provider = MagicMock()
+
+        plan = _parse_intent(provider, "Brief me on Maja", None)
+
+        assert plan.intent == QueryIntent.BRIEFING
+        provider.client.chat.completions.create.assert_not_called()
+
+    def test_unconfident_question_uses_llm(self):
+        """Test the LLM parses questions the classifier is unsure about."""
+        provider = MagicMock()
+        llm_plan = QueryPlan(intent=QueryIntent.INTEL_SEARCH, search_terms=["qwerty"])
+        provider.client.chat.completions.create.return_value = llm_plan
+
+        plan = _parse_intent(provider, "qwerty asdf", None)
+
+        assert plan is llm_plan
+        provider.client.chat.completions.create.assert_called_once()
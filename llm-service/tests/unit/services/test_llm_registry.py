@@ -0,0 +1,204 @@
+"""
+Unit tests for the LLM provider registry.
+
+Tests provider reuse, LRU eviction of user-key providers and warm-up.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services import llm
+
+
+@pytest.fixture
+def registry():
+    """Empty provider registry with provider construction mocked out."""
+    with patch.object(llm, "_providers", {}), \
+            patch.object(llm, "_user_key_providers", llm.OrderedDict()), \
+            patch.object(llm, "_build_provider", side_effect=lambda *args: MagicMock(args=args)) as build:
+        yield build
+
+
+class TestProviderRegistry:
+    """Unit tests for get_llm_provider."""
+
+    def test_configured_provider_is_reused(self, registry):
+        """Test repeated calls return the same instance and build it once."""
+        first = llm.get_llm_provider("ollama", "qwen2.5:7b")
+        second = llm.get_llm_provider("ollama", "qwen2.5:7b")
+
+        assert first is second
+        registry.assert_called_once_with("ollama", "qwen2.5:7b", None)
+
+    def test_keys_and_models_get_separate_instances(self, registry):
+        """Test the registry is keyed by provider, model and API key."""
+        base = llm.get_llm_provider("anthropic", "claude")
+
+        assert llm.get_llm_provider("anthropic", "claude", api_key="sk-a") is not base
+        assert llm.get_llm_provider("anthropic", "other") is not base
+        assert llm.get_llm_provider("anthropic", "claude", api_key="sk-a") is \
+            llm.get_llm_provider("anthropic", "claude", api_key="sk-a")
+
+    def test_user_key_providers_are_evicted_lru(self, registry):
+        """Test user-key providers beyond the cache size evict the least recently used."""
+        with patch.object(llm.settings, "llm_user_key_cache_size", 2):
+            a = llm.get_llm_provider("anthropic", "claude", api_key="sk-a")
+            llm.get_llm_provider("anthropic", "claude", api_key="sk-b")
+            llm.get_llm_provider("anthropic", "claude", api_key="sk-a")  # refresh a
+            llm.get_llm_provider("anthropic", "claude", api_key="sk-c")  # evicts b
+
+            assert llm.get_llm_provider("anthropic", "claude", api_key="sk-a") is a
+            assert len(llm._user_key_providers) == 2
+            assert registry.call_count == 3
+
+            llm.get_llm_provider("anthropic", "claude", api_key="sk-b")
+            assert registry.call_count == 4
+
+    def test_api_key_is_not_stored_in_registry_key(self, registry):
+        """Test only a hash of user API keys is kept as the registry key."""
+        llm.get_llm_provider("openai", "gpt-4o", api_key="sk-secret")
+
+        (key,) = llm._user_key_providers
+        assert "sk-secret" not in key
+
+    def test_providers_are_built_outside_the_lock(self, registry):
+        """Test building a provider does not hold the registry lock."""
+        registry.side_effect = lambda *args: MagicMock(args=args, locked=llm._providers_lock.locked())
+
+        provider = llm.get_llm_provider("openai", "gpt-4o")
+
+        assert provider.locked is False
+
+    def test_concurrent_build_keeps_first_instance(self, registry):
+        """Test a provider registered while another was building wins the double-check."""
+        first = MagicMock()
+
+        def build(*args):
+            llm._providers[("openai", "gpt-4o", "")] = first
+            return MagicMock()
+
+        registry.side_effect = build
+
+        assert llm.get_llm_provider("openai", "gpt-4o") is first
+
+
+class TestWarmUp:
+    """Unit tests for warm_up_llm_provider."""
+
+    def test_warm_up_failure_is_logged(self, registry):
+        """Test a failing warm-up does not prevent start-up."""
+        llm.get_llm_provider().warm_up.side_effect = ConnectionError("ollama down")
+
+        llm.warm_up_llm_provider()
+
+        llm.get_llm_provider().warm_up.assert_called_once()
+
+    def test_unbuildable_provider_does_not_stop_start_up(self, registry):
+        """Test a provider that cannot be built is logged and gets no residency ping."""
+        registry.side_effect = ValueError("Unknown LLM provider: olama")
+
+        llm.warm_up_llm_provider()
+        llm.start_residency_ping()
+        llm.stop_residency_ping()
+
+        assert registry.call_count == 1
+        assert llm.get_provider_stats() == {}
+
+
+@pytest.fixture
+def ollama_provider():
+    """OllamaProvider with a mocked Ollama client."""
+    provider = llm.OllamaProvider.__new__(llm.OllamaProvider)
+    provider.model_name = "qwen2.5:7b"
+    provider.ollama_client = MagicMock()
+    provider.extraction_schema = llm.IntelligenceExtraction.model_json_schema()
+    provider.resident_num_ctx = 4096
+    provider._num_ctx_lock = llm.threading.Lock()
+    provider.load_stats = llm.ModelLoadStats()
+    provider._ping_stop = None
+    return provider
+
+
+class TestOllamaResidency:
+    """Unit tests for OllamaProvider context sizing and residency."""
+
+    def test_num_ctx_is_a_sticky_bucket(self, ollama_provider):
+        """Test num_ctx doubles to fit the prompt, is capped, and never shrinks."""
+        ollama_provider.resident_num_ctx = 2048
+        with patch.object(llm.settings, "ollama_num_predict", 1024), \
+                patch.object(llm.settings, "ollama_num_ctx_max", 16384):
+            assert ollama_provider._options("x" * 300)["num_ctx"] == 2048
+            assert ollama_provider._options("x" * 9000)["num_ctx"] == 8192
+            assert ollama_provider._options("x" * 300)["num_ctx"] == 8192
+            assert ollama_provider._options("x" * 10**6)["num_ctx"] == 16384
+            assert ollama_provider.resident_num_ctx == 16384
+
+    def test_num_predict_fits_within_num_ctx(self, ollama_provider):
+        """Test the minimum context is used and num_predict is capped by the room left."""
+        with patch.object(llm.settings, "ollama_num_predict", 4096):
+            options = ollama_provider._options("x" * 3000)
+
+        assert options == {"num_ctx": 4096, "num_predict": 3096}
+
+    def test_cold_model_records_load(self, ollama_provider):
+        """Test a model missing from ps() is loaded and the load is recorded."""
+        ollama_provider.ollama_client.ps.return_value.models = []
+        ollama_provider.ollama_client.generate.return_value.load_duration = 7_500_000_000
+
+        labels = {"provider": "ollama", "model": "qwen2.5:7b"}
+        before = REGISTRY.get_sample_value("tether_llm_model_loads_total", labels) or 0.0
+
+        reloaded = ollama_provider.ensure_resident()
+
+        assert reloaded
+        assert ollama_provider.load_stats.loads == 1
+        assert REGISTRY.get_sample_value("tether_llm_model_loads_total", labels) == before + 1
+        assert ollama_provider.load_stats.last_seconds == 7.5
+        kwargs = ollama_provider.ollama_client.generate.call_args.kwargs
+        assert kwargs["options"] == {"num_ctx": 4096}
+        assert kwargs["keep_alive"] == llm.settings.ollama_keep_alive
+
+    def test_resident_model_only_refreshes_keep_alive(self, ollama_provider):
+        """Test a loaded model with matching context is pinged without a load event."""
+        ollama_provider.ollama_client.ps.return_value.models = [
+            MagicMock(model="qwen2.5:7b", context_length=4096)
+        ]
+
+        reloaded = ollama_provider.ensure_resident()
+
+        assert not reloaded
+        assert ollama_provider.load_stats.loads == 0
+        ollama_provider.ollama_client.generate.assert_called_once()
+
+
+class TestOllamaExtract:
+    """Unit tests for OllamaProvider.extract."""
+
+    def test_schema_format_and_token_usage(self, ollama_provider):
+        """Test extraction is schema-constrained and records Ollama's token counts."""
+        # ARRANGE
+        from app.models.extraction import Reasoning
+        from app.services.llm_usage import collect_llm_calls
+
+        extraction = llm.IntelligenceExtraction(reasoning=Reasoning(
+            entities_identified="", facts_identified="", events_identified="",
+            relationships_identified="", sources_identified="", confidence_rationale="",
+        ))
+        ollama_provider.ollama_client.chat.return_value = SimpleNamespace(
+            message=SimpleNamespace(content=extraction.model_dump_json()),
+            prompt_eval_count=900,
+            eval_count=150,
+        )
+
+        # ACT
+        with collect_llm_calls() as calls:
+            result = ollama_provider.extract("Had lunch with Sarah")
+
+        # ASSERT
+        assert result == extraction
+        kwargs = ollama_provider.ollama_client.chat.call_args.kwargs
+        assert kwargs["format"] == llm.IntelligenceExtraction.model_json_schema()
+        assert (calls[0].usage.prompt, calls[0].usage.completion) == (900, 150)
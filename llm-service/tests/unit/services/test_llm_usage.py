@@ -0,0 +1,150 @@
+"""
+Unit tests for prompt-cache-friendly messages and LLM call accounting.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from app.services import llm_usage
+from app.services.llm import (
+    SYSTEM_PROMPT,
+    AnthropicProvider,
+    build_user_prompt,
+    chat_messages,
+)
+from app.services.llm_usage import (
+    collect_llm_calls,
+    get_usage_totals,
+    register_instructor_hooks,
+    summarize_calls,
+    track_llm_call,
+    usage_from_response,
+)
+
+
+class TestCacheFriendlyMessages:
+    """Unit tests for chat_messages and prompt layout."""
+
+    def test_anthropic_system_block_has_cache_control(self):
+        """Test Anthropic gets the system prompt as a cacheable block."""
+        provider = AnthropicProvider.__new__(AnthropicProvider)
+
+        kwargs = chat_messages(provider, SYSTEM_PROMPT, "hello")
+
+        assert kwargs["system"] == [
+            {"type": "text", "text": SYSTEM_PROMPT, "cache_control": {"type": "ephemeral"}}
+        ]
+        assert kwargs["messages"] == [{"role": "user", "content": "hello"}]
+
+    def test_other_providers_get_system_message_first(self):
+        """Test OpenAI-style providers get the static system prompt as the first message."""
+        kwargs = chat_messages(None, SYSTEM_PROMPT, "hello")
+
+        assert kwargs["messages"][0] == {"role": "system", "content": SYSTEM_PROMPT}
+        assert "system" not in kwargs
+
+    def test_user_prompt_starts_with_static_instruction(self):
+        """Test per-user parts come after the fixed instruction."""
+        plain = build_user_prompt("Met Bob")
+        personal = build_user_prompt("Met Bob", context="work", user_name="Alice")
+
+        prefix = "Extract structured intelligence from the following text."
+        assert plain.startswith(prefix) and personal.startswith(prefix)
+        assert personal.index("Alice") < personal.index("Met Bob")
+
+
+class TestUsageFromResponse:
+    """Unit tests for usage_from_response."""
+
+    def test_openai_cached_tokens(self):
+        """Test OpenAI prompt_tokens_details.cached_tokens is reported as cached."""
+        response = SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=2000, completion_tokens=100,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1536),
+        ))
+
+        usage = usage_from_response(response)
+
+        assert (usage.prompt, usage.cached_prompt, usage.uncached_prompt) == (2000, 1536, 464)
+        assert usage.total == 2100
+
+    def test_anthropic_cache_reads_and_writes(self):
+        """Test Anthropic cache reads/writes are added to the prompt total."""
+        response = SimpleNamespace(usage=SimpleNamespace(
+            input_tokens=50, output_tokens=300,
+            cache_read_input_tokens=1800, cache_creation_input_tokens=0,
+        ))
+
+        usage = usage_from_response(response)
+
+        assert (usage.prompt, usage.cached_prompt, usage.completion) == (1850, 1800, 300)
+
+    def test_instructor_result_uses_raw_response(self):
+        """Test instructor models are unwrapped via _raw_response."""
+        raw = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5))
+        result = SimpleNamespace(_raw_response=raw)
+
+        assert usage_from_response(result).total == 15
+
+    def test_response_without_usage(self):
+        """Test responses without usage return None."""
+        assert usage_from_response("plain text") is None
+
+
+class TestTrackLLMCall:
+    """Unit tests for per-call accounting."""
+
+    def test_call_is_recorded_in_totals_and_request(self):
+        """Test a tracked call lands in process totals and the request summary."""
+        # ARRANGE
+        provider = SimpleNamespace(provider_name="openai", model="gpt-4o")
+        response = SimpleNamespace(usage=SimpleNamespace(
+            prompt_tokens=1000, completion_tokens=200,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=800),
+        ))
+
+        # ACT
+        with patch.object(llm_usage, "_totals", {}):
+            with collect_llm_calls() as calls, track_llm_call(provider, "intent") as call:
+                call.record(response)
+            totals = get_usage_totals()
+        summary = summarize_calls(calls)
+
+        # ASSERT
+        assert len(calls) == 1 and calls[0].first_response_ms is not None
+        assert (summary.calls, summary.prompt_tokens, summary.cached_prompt_tokens) == (1, 1000, 800)
+        # 200 uncached * 2.50 + 800 cached * 1.25 + 200 output * 10.00 per million
+        assert summary.cost_usd == 0.0035
+        assert totals[0]["endpoint"] == "intent" and totals[0]["calls"] == 1
+
+    def test_instructor_hooks_count_retries_and_validation_failures(self):
+        """Test per-attempt hook events are attributed to the active call."""
+        # ARRANGE
+        handlers = {}
+        client = SimpleNamespace(on=lambda name, handler: handlers.setdefault(name, handler))
+        register_instructor_hooks(client)
+        attempt = SimpleNamespace(usage=SimpleNamespace(prompt_tokens=100, completion_tokens=50))
+
+        # ACT
+        provider = SimpleNamespace(provider_name="openai", model="gpt-4o")
+        with patch.object(llm_usage, "_totals", {}), track_llm_call(provider, "extract") as call:
+            handlers["completion:response"](attempt)
+            handlers["parse:error"](ValueError("bad json"))
+            handlers["completion:response"](attempt)
+            call.record(SimpleNamespace(_raw_response=attempt))
+
+        # ASSERT
+        assert (call.attempts, call.retries, call.validation_failures) == (2, 1, 1)
+        assert call.usage.total == 300, "Usage of both attempts counts, final result not double counted"
+
+    def test_failed_call_records_error(self):
+        """Test exceptions are recorded on the call and re-raised."""
+        provider = SimpleNamespace(provider_name="anthropic", model="claude-sonnet-4-5")
+        with patch.object(llm_usage, "_totals", {}):
+            with pytest.raises(TimeoutError), track_llm_call(provider, "synthesis"):
+                raise TimeoutError
+
+            (totals,) = get_usage_totals()
+        assert totals["errors"] == 1
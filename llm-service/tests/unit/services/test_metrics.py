@@ -0,0 +1,88 @@
+"""
+Unit tests for Prometheus pipeline metrics.
+"""
+
+import asyncio
+import time
+
+import httpx
+from prometheus_client import REGISTRY
+
+from app.services.metrics import (
+    monitor_event_loop,
+    record_db_round_trip,
+    stage,
+    track_request,
+)
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+class TestPipelineMetrics:
+    """Unit tests for stage timings and round-trip counting."""
+
+    def test_stages_are_labeled_with_request_path(self):
+        """Test stage observations inside track_request carry its path label."""
+        # ARRANGE
+        labels = {"path": "query", "stage": "intent_parse"}
+        before = _sample("tether_stage_duration_seconds_count", labels)
+
+        # ACT
+        with track_request("query"), stage("intent_parse"):
+            pass
+
+        # ASSERT
+        assert _sample("tether_stage_duration_seconds_count", labels) == before + 1
+
+    def test_round_trips_counted_per_request(self):
+        """Test each HTTP request of a hooked client counts as one round-trip."""
+        # ARRANGE
+        client = httpx.Client(
+            transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])),
+            event_hooks={"request": [record_db_round_trip]},
+        )
+        total_before = _sample("tether_db_round_trips_total", {"path": "extract"})
+        sum_before = _sample("tether_db_round_trips_per_request_sum", {"path": "extract"})
+
+        # ACT
+        with track_request("extract") as request:
+            client.get("http://db/rest/v1/entities")
+            client.get("http://db/rest/v1/relations")
+
+        # ASSERT
+        assert request.db_round_trips == 2
+        assert _sample("tether_db_round_trips_total", {"path": "extract"}) == total_before + 2
+        assert _sample("tether_db_round_trips_per_request_sum", {"path": "extract"}) == sum_before + 2
+
+    def test_metrics_endpoint_exposes_gauges(self, test_client):
+        """Test /metrics serves the Prometheus text format with executor gauges."""
+        # ACT
+        response = test_client.get("/metrics")
+
+        # ASSERT
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert 'tether_executor_queue_depth{executor="threadpool"}' in response.text
+        assert "tether_websocket_connections" in response.text
+        assert "tether_event_loop_tasks" in response.text
+        assert 'executor="event_loop"' not in response.text
+
+    def test_event_loop_lag_measures_blocking(self):
+        """Test a callback blocking the loop shows up as event loop lag."""
+        # ARRANGE
+        async def run() -> float:
+            monitor = asyncio.create_task(monitor_event_loop(interval_seconds=0.05))
+            await asyncio.sleep(0)
+            # Block the loop past the monitor's timer, then wake up right after its sample
+            asyncio.get_running_loop().call_soon(time.sleep, 0.1)
+            await asyncio.sleep(0.07)
+            monitor.cancel()
+            return _sample("tether_event_loop_lag_seconds", {})
+
+        # ACT
+        lag = asyncio.run(run())
+
+        # ASSERT
+        assert lag >= 0.03
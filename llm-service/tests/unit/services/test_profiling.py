@@ -0,0 +1,108 @@
+"""
+Unit tests for the profiling endpoints and slow-request capture.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routes import debug
+from app.services.metrics import stage
+from app.services.profiling import SlowRequestMiddleware, get_slow_requests
+
+
+def _debug_app() -> FastAPI:
+    app = FastAPI()
+    app.include_router(debug.router, prefix="/api")
+    return app
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestProfilingEndpoints:
+    """Unit tests for the admin-guarded profiling routes."""
+
+    def test_disabled_by_default(self):
+        """Test profiling routes are hidden unless profiling is enabled."""
+        response = TestClient(_debug_app()).get("/api/debug/slow-requests")
+
+        assert response.status_code == 404
+
+    def test_requires_admin_token(self):
+        """Test a missing or wrong admin token is rejected."""
+        # ARRANGE
+        client = TestClient(_debug_app())
+
+        # ACT
+        with patch.object(settings, "profiling_enabled", True), \
+                patch.object(settings, "profiling_admin_token", "secret"):
+            missing = client.get("/api/debug/slow-requests")
+            wrong = client.get("/api/debug/slow-requests", headers={"X-Admin-Token": "guess"})
+            ok = client.get("/api/debug/slow-requests", headers={"X-Admin-Token": "secret"})
+
+        # ASSERT
+        assert (missing.status_code, wrong.status_code, ok.status_code) == (403, 403, 200)
+
+    def test_cpu_profile_returns_folded_stacks(self):
+        """Test on-demand sampling returns collapsed stacks including a busy thread."""
+        # ARRANGE
+        stop = threading.Event()
+        threading.Thread(target=_busy_loop, args=(stop,), name="busy", daemon=True).start()
+
+        # ACT
+        with patch.object(settings, "profiling_enabled", True), \
+                patch.object(settings, "profiling_admin_token", "secret"):
+            response = TestClient(_debug_app()).get(
+                "/api/debug/profile", params={"seconds": 0.2, "interval_ms": 5}, headers={"X-Admin-Token": "secret"}
+            )
+        stop.set()
+
+        # ASSERT
+        assert response.status_code == 200
+        busy = [line for line in response.text.splitlines() if line.startswith("busy;")]
+        assert busy, "Busy thread should appear as a root frame"
+        stack, count = busy[0].rsplit(" ", 1)
+        assert "_busy_loop" in stack and int(count) > 0
+
+
+class TestSlowRequestCapture:
+    """Unit tests for SlowRequestMiddleware."""
+
+    def test_slow_request_is_captured_with_stages(self):
+        """Test a request over the threshold is stored with stages and stack samples."""
+        # ARRANGE
+        app = FastAPI()
+        app.add_middleware(SlowRequestMiddleware)
+
+        @app.get("/slow")
+        async def slow():
+            with stage("sync_entities"):
+                time.sleep(0.2)  # noqa: ASYNC251 - blocks the loop like the sync Supabase calls
+            return {}
+
+        @app.get("/fast")
+        async def fast():
+            return {}
+
+        # ACT
+        with patch.object(settings, "slow_request_threshold_ms", 50):
+            client = TestClient(app)
+            client.get("/fast")
+            client.get("/slow")
+
+        # ASSERT
+        captured = get_slow_requests()[0]
+        assert captured["path"] == "/slow"
+        assert captured["status"] == 200
+        assert captured["duration_ms"] >= 200
+        assert [s["stage"] for s in captured["stages"]] == ["sync_entities"]
+        assert captured["samples"] > 0
+        assert "slow (" in captured["profile"]
+        assert all(r["path"] != "/fast" for r in get_slow_requests())
@@ -0,0 +1,321 @@
+"""
+Unit tests for QueryExecutor intent handlers.
+
+Tests individual handlers in isolation against a mocked Supabase client.
+"""
+
+import asyncio
+import base64
+import json
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from app.models.query import QueryIntent, QueryPlan
+from app.routes.query import _decode_query_cursor, _encode_query_cursor
+from app.services.query_executor import QueryExecutor
+from app.utils.date_parser import parse_date_range
+from app.utils.pagination import (
+    InvalidCursorError,
+    decode_bound_cursor,
+    decode_cursor,
+    encode_bound_cursor,
+    encode_cursor,
+    keyset_filter,
+)
+
+
+class TestAggregation:
+    """Unit tests for _aggregation."""
+
+    def test_reads_user_stats_rpc(self):
+        """Test aggregation reads per-user counters in a single RPC call."""
+        # ARRANGE
+        supabase = MagicMock()
+        supabase.rpc.return_value.execute.return_value.data = {
+            "entities": 12,
+            "relations": 30,
+            "intel": 7,
+            "by_entity_type": {"person": 10, "organization": 2},
+            "by_relation_type": {"knows": 30},
+            "by_intel_type": {"event": 7},
+            "recent": {"last_7_days": {"entities": 1, "relations": 2, "intel": 3}},
+        }
+        executor = QueryExecutor(supabase, user_id="user-1")
+
+        # ACT
+        result = asyncio.run(executor.execute(QueryPlan(intent=QueryIntent.AGGREGATION)))
+
+        # ASSERT
+        supabase.rpc.assert_called_once_with("get_user_stats", {"p_user_id": "user-1"})
+        supabase.from_.assert_not_called()
+        row = result["data"][0]
+        assert result["type"] == "count"
+        assert (row["entities"], row["relations"], row["intel"]) == (12, 30, 7)
+        assert row["by_entity_type"] == {"person": 10, "organization": 2}
+        assert row["recent"]["last_7_days"]["intel"] == 3
+
+    def test_empty_stats_default_to_zero(self):
+        """Test a user without counters gets zero totals."""
+        # ARRANGE
+        supabase = MagicMock()
+        supabase.rpc.return_value.execute.return_value.data = None
+        executor = QueryExecutor(supabase, user_id="user-1")
+
+        # ACT
+        result = asyncio.run(executor.execute(QueryPlan(intent=QueryIntent.AGGREGATION)))
+
+        # ASSERT
+        row = result["data"][0]
+        assert (row["entities"], row["relations"], row["intel"]) == (0, 0, 0)
+
+
+def _intel_id(i: int) -> str:
+    return f"00000000-0000-0000-0000-{i:012d}"
+
+
+def _intel_rows(count: int) -> list[dict]:
+    return [
+        {"id": _intel_id(i), "occurred_at": f"2025-01-{28 - i:02d}T00:00:00+00:00", "description": f"note {i}"}
+        for i in range(count)
+    ]
+
+
+class TestKeysetPagination:
+    """Unit tests for cursor helpers and paginated intents."""
+
+    def test_cursor_round_trip(self):
+        """Test a cursor decodes to the sort key of the last row."""
+        # ARRANGE
+        row = {"occurred_at": "2025-01-01T10:00:00+00:00", "id": _intel_id(7)}
+
+        # ACT
+        cursor = encode_cursor(row, ("occurred_at", "id"))
+
+        # ASSERT
+        assert decode_cursor(cursor) == ("2025-01-01T10:00:00+00:00", _intel_id(7))
+        assert keyset_filter(cursor, ("occurred_at", "id")) == (
+            'occurred_at.lt."2025-01-01T10:00:00+00:00",'
+            f'and(occurred_at.eq."2025-01-01T10:00:00+00:00",id.lt.{_intel_id(7)})'
+        )
+
+    def test_invalid_cursor_raises(self):
+        """Test malformed cursors raise InvalidCursorError."""
+        with pytest.raises(InvalidCursorError):
+            decode_cursor("not-a-cursor")
+
+    def test_forged_cursor_rejected(self):
+        """Test cursors built or altered by a client are rejected before reaching a filter."""
+        # ARRANGE
+        cursor = encode_cursor({"occurred_at": "2025-01-01T10:00:00+00:00", "id": _intel_id(7)}, ("occurred_at", "id"))
+        payload, _, signature = cursor.partition(".")
+        injected = base64.urlsafe_b64encode(
+            json.dumps(["2025-01-01", "x),created_by.neq.me,and(id.lt.y"]).encode()
+        ).decode().rstrip("=")
+        bound = encode_bound_cursor(cursor, {"intent": "intel_search"})
+
+        # ACT / ASSERT
+        for forged in (payload, f"{injected}.{signature}", cursor + "x", bound[:-2] + "AA"):
+            with pytest.raises(InvalidCursorError):
+                decode_cursor(forged)
+            with pytest.raises(InvalidCursorError):
+                decode_bound_cursor(forged)
+
+    def test_cursor_key_types_validated(self):
+        """Test signed cursors whose key is not a (timestamp, UUID) pair are rejected."""
+        for row in ({"occurred_at": "2025-01-01", "id": "abc"}, {"occurred_at": "soon", "id": _intel_id(1)}):
+            cursor = encode_cursor(row, ("occurred_at", "id"))
+            with pytest.raises(InvalidCursorError):
+                keyset_filter(cursor, ("occurred_at", "id"))
+
+    def test_query_cursor_carries_plan(self):
+        """Test a /query next_cursor restores the plan and the executor cursor."""
+        # ARRANGE
+        plan = QueryPlan(intent=QueryIntent.INTEL_SEARCH, search_terms=["budget"], temporal_filter="last week")
+        cursor = encode_cursor({"occurred_at": "2025-01-01T10:00:00+00:00", "id": _intel_id(7)}, ("occurred_at", "id"))
+
+        # ACT
+        restored_plan, restored_cursor = _decode_query_cursor(_encode_query_cursor(plan, cursor))
+
+        # ASSERT
+        assert restored_plan == plan
+        assert restored_cursor == cursor
+        assert _encode_query_cursor(plan, None) is None
+
+    def test_query_cursor_without_plan_raises(self):
+        """Test executor cursors and bound cursors with a bad plan are rejected."""
+        cursor = encode_cursor({"occurred_at": "2025-01-01", "id": _intel_id(7)}, ("occurred_at", "id"))
+
+        with pytest.raises(InvalidCursorError):
+            _decode_query_cursor(cursor)
+        with pytest.raises(InvalidCursorError):
+            _decode_query_cursor(encode_bound_cursor(cursor, {"intent": "nonsense"}))
+
+    def test_intel_search_returns_next_cursor(self):
+        """Test a full page fetches one extra row and returns a cursor."""
+        # ARRANGE
+        supabase = MagicMock()
+        query = supabase.from_.return_value.select.return_value.is_.return_value.text_search.return_value
+        query.order.return_value.order.return_value.limit.return_value.execute.return_value.data = _intel_rows(3)
+        executor = QueryExecutor(supabase, user_id="user-1")
+        plan = QueryPlan(intent=QueryIntent.INTEL_SEARCH, search_terms=["meetup"])
+
+        # ACT
+        result = asyncio.run(executor.execute(plan, page_size=2))
+
+        # ASSERT
+        query.order.return_value.order.return_value.limit.assert_called_once_with(3)
+        assert [row["id"] for row in result["data"]] == [_intel_id(0), _intel_id(1)]
+        assert decode_cursor(result["next_cursor"]) == ("2025-01-27T00:00:00+00:00", _intel_id(1))
+
+    def test_last_page_has_no_cursor(self):
+        """Test a short page ends pagination and applies the cursor filter."""
+        # ARRANGE
+        supabase = MagicMock()
+        query = supabase.from_.return_value.select.return_value.is_.return_value.text_search.return_value
+        query.or_.return_value.order.return_value.order.return_value.limit.return_value.execute.return_value.data = (
+            _intel_rows(1)
+        )
+        executor = QueryExecutor(supabase, user_id="user-1")
+        plan = QueryPlan(intent=QueryIntent.INTEL_SEARCH, search_terms=["meetup"])
+        cursor = encode_cursor({"occurred_at": "2025-01-29T00:00:00+00:00", "id": _intel_id(99)}, ("occurred_at", "id"))
+
+        # ACT
+        result = asyncio.run(executor.execute(plan, cursor=cursor, page_size=2))
+
+        # ASSERT
+        query.or_.assert_called_once_with(keyset_filter(cursor, ("occurred_at", "id")))
+        assert result["next_cursor"] is None
+        assert len(result["data"]) == 1
+
+    def test_stream_follows_cursors(self):
+        """Test stream yields rows from every page until the cursor runs out."""
+        # ARRANGE
+        executor = QueryExecutor(MagicMock(), user_id="user-1")
+        pages = [
+            {"type": "intel", "data": [{"id": 1}, {"id": 2}], "next_cursor": "c1"},
+            {"type": "intel", "data": [{"id": 3}], "next_cursor": None},
+        ]
+        cursors = []
+
+        async def fake_execute(plan, cursor=None, page_size=None):
+            cursors.append(cursor)
+            return pages[len(cursors) - 1]
+
+        executor.execute = fake_execute
+
+        async def collect():
+            return [row async for row in executor.stream(QueryPlan(intent=QueryIntent.INTEL_SEARCH))]
+
+        # ACT
+        rows = asyncio.run(collect())
+
+        # ASSERT
+        assert [row["id"] for row in rows] == [1, 2, 3]
+        assert cursors == [None, "c1"]
+
+
+class TestTemporalQuery:
+    """Unit tests for _temporal_query."""
+
+    def test_single_rpc_for_all_entities(self):
+        """Test linked intel for several entities is fetched in one RPC call."""
+        # ARRANGE
+        supabase = MagicMock()
+        executor = QueryExecutor(supabase, user_id="user-1")
+        executor._resolve_entity_id = AsyncMock(side_effect=["ent-a", "ent-b"])
+        rows = _intel_rows(2)
+        rows[0]["entity_ids"] = ["ent-b"]
+        rows[1]["entity_ids"] = ["ent-a", "ent-b"]
+        supabase.rpc.return_value.execute.return_value.data = rows
+        plan = QueryPlan(intent=QueryIntent.TEMPORAL_QUERY, entity_names=["Anna", "Bo"])
+
+        # ACT
+        result = asyncio.run(executor.execute(plan))
+
+        # ASSERT
+        supabase.rpc.assert_called_once_with(
+            "get_entity_intel", {"p_entity_ids": ["ent-a", "ent-b"], "p_limit": 21}
+        )
+        supabase.from_.assert_not_called()
+        assert [row["related_entity_name"] for row in result["data"]] == ["Bo", "Anna"]
+        assert "entity_ids" not in result["data"][0]
+        assert result["next_cursor"] is None
+
+    def test_cursor_maps_to_keyset_params(self):
+        """Test the cursor is passed to the RPC as before-key parameters."""
+        # ARRANGE
+        supabase = MagicMock()
+        executor = QueryExecutor(supabase, user_id="user-1")
+        executor._resolve_entity_id = AsyncMock(return_value="ent-a")
+        supabase.rpc.return_value.execute.return_value.data = []
+        cursor = encode_cursor({"occurred_at": "2025-01-05T00:00:00+00:00", "id": _intel_id(9)}, ("occurred_at", "id"))
+        plan = QueryPlan(intent=QueryIntent.TEMPORAL_QUERY, entity_names=["Anna"])
+
+        # ACT
+        asyncio.run(executor.execute(plan, cursor=cursor, page_size=5))
+
+        # ASSERT
+        params = supabase.rpc.call_args.args[1]
+        assert params["p_limit"] == 6
+        assert params["p_before_occurred_at"] == "2025-01-05T00:00:00+00:00"
+        assert params["p_before_id"] == _intel_id(9)
+
+
+class TestTemporalFilter:
+    """Unit tests for temporal_filter pushdown."""
+
+    def test_parse_date_range_phrases(self):
+        """Test common phrases map to half-open ranges around the reference time."""
+        now = datetime(2025, 3, 12, 15, 30)  # Wednesday
+
+        assert parse_date_range("yesterday", now) == (datetime(2025, 3, 11), datetime(2025, 3, 12))
+        assert parse_date_range("last week", now) == (datetime(2025, 3, 3), datetime(2025, 3, 10))
+        assert parse_date_range("this month", now) == (datetime(2025, 3, 1), datetime(2025, 4, 1))
+        assert parse_date_range("last Friday", now) == (datetime(2025, 3, 7), datetime(2025, 3, 8))
+        assert parse_date_range("past 3 days", now) == (datetime(2025, 3, 9), datetime(2025, 3, 13))
+        assert parse_date_range("in December", now) == (datetime(2024, 12, 1), datetime(2025, 1, 1))
+        assert parse_date_range("January 2024", now) == (datetime(2024, 1, 1), datetime(2024, 2, 1))
+        assert parse_date_range("in 2023", now) == (datetime(2023, 1, 1), datetime(2024, 1, 1))
+        assert parse_date_range(None, now) is None
+
+    def test_since_runs_until_now(self):
+        """Test "since X" starts at the start of X and ends at the reference time."""
+        now = datetime(2025, 3, 12, 15, 30)  # Wednesday
+
+        assert parse_date_range("since last week", now) == (datetime(2025, 3, 3), now)
+        assert parse_date_range("since March", now) == (datetime(2025, 3, 1), now)
+        assert parse_date_range("since 3 days ago", now) == (datetime(2025, 3, 9), now)
+
+    def test_intel_search_pushes_range(self):
+        """Test a temporal filter becomes occurred_at range predicates."""
+        # ARRANGE
+        supabase = MagicMock()
+        executor = QueryExecutor(supabase, user_id="user-1")
+        plan = QueryPlan(intent=QueryIntent.INTEL_SEARCH, temporal_filter="in 2023")
+
+        # ACT
+        asyncio.run(executor.execute(plan))
+
+        # ASSERT
+        query = supabase.from_.return_value.select.return_value.is_.return_value
+        query.text_search.assert_not_called()
+        query.gte.assert_called_once_with("occurred_at", "2023-01-01T00:00:00")
+        query.gte.return_value.lt.assert_called_once_with("occurred_at", "2024-01-01T00:00:00")
+
+    def test_temporal_query_passes_window(self):
+        """Test the temporal query RPC receives the [from, to) window."""
+        # ARRANGE
+        supabase = MagicMock()
+        executor = QueryExecutor(supabase, user_id="user-1")
+        executor._resolve_entity_id = AsyncMock(return_value="ent-a")
+        supabase.rpc.return_value.execute.return_value.data = []
+        plan = QueryPlan(intent=QueryIntent.TEMPORAL_QUERY, entity_names=["Anna"], temporal_filter="March 2024")
+
+        # ACT
+        asyncio.run(executor.execute(plan))
+
+        # ASSERT
+        params = supabase.rpc.call_args.args[1]
+        assert (params["p_from"], params["p_to"]) == ("2024-03-01T00:00:00", "2024-04-01T00:00:00")
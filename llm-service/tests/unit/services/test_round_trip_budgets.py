@@ -0,0 +1,195 @@
+"""
+Round-trip budgets for key database operations.
+
+Each test runs an operation against the in-memory Supabase stand-in and asserts
+the maximum number of round-trips it may make, so N+1 query patterns cannot
+creep back in unnoticed. Tighten a budget when an operation gets cheaper.
+"""
+
+import asyncio
+from collections import Counter, deque
+from itertools import pairwise
+
+import pytest
+
+from app.models.extraction import (
+    ConfidenceLevel,
+    EntityExtraction,
+    EntityType,
+    IdentifierExtraction,
+    IdentifierType,
+    IntelExtraction,
+    IntelligenceExtraction,
+    IntelType,
+    Reasoning,
+    RelationExtraction,
+    RelationType,
+)
+from app.models.query import QueryIntent, QueryPlan
+from app.services.briefing import BriefingService
+from app.services.query_executor import QueryExecutor
+from app.services.supabase_sync import SupabaseSyncService
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.synthetic_graph import generate, load_into_fake
+
+# sync_extraction of new entities: idempotency key claim and store, the source
+# upsert (first use only, then cached), one batched name lookup, one batched
+# relation upsert, and the intel insert with one batched insert of its entity
+# links, then per entity the insert and one batched identifier upsert
+SYNC_FIXED = 7
+SYNC_PER_ENTITY = 2
+# A replayed sync only claims its idempotency key
+SYNC_REPLAY_BUDGET = 1
+
+RELATION_QUERY_BUDGET = 3
+BRIEFING_BUDGET = 5
+
+
+@pytest.fixture(scope="module")
+def graph():
+    # No name collisions, so the relation query resolves to the intended hub
+    return generate(1000, seed=0, n_notes=0, collision_rate=0.0)
+
+
+@pytest.fixture
+def db(graph):
+    db = FakeSupabase()
+    load_into_fake(graph, db)
+    return db
+
+
+def _extraction(n_entities: int) -> IntelligenceExtraction:
+    """Extraction of n new people, each with a name and an email, who know the next one and all met once."""
+    names = [f"Newcomer Person{i}" for i in range(n_entities)]
+    return IntelligenceExtraction(
+        reasoning=Reasoning(
+            entities_identified="people",
+            facts_identified="emails",
+            events_identified="none",
+            relationships_identified="knows",
+            confidence_rationale="test",
+        ),
+        entities=[
+            EntityExtraction(
+                name=name,
+                entity_type=EntityType.PERSON,
+                identifiers=[
+                    IdentifierExtraction(identifier_type=IdentifierType.NAME, value=name),
+                    IdentifierExtraction(identifier_type=IdentifierType.EMAIL, value=f"person{i}@example.com"),
+                ],
+                confidence=ConfidenceLevel.HIGH,
+            )
+            for i, name in enumerate(names)
+        ],
+        relations=[
+            RelationExtraction(
+                source_entity_name=source,
+                target_entity_name=target,
+                relation_type=RelationType.KNOWS,
+                confidence=ConfidenceLevel.HIGH,
+            )
+            for source, target in pairwise(names)
+        ],
+        intel=[
+            IntelExtraction(
+                intel_type=IntelType.EVENT,
+                description="Everyone met at the meetup",
+                entities_involved=names,
+                confidence=ConfidenceLevel.HIGH,
+            )
+        ],
+    )
+
+
+def _hops_from(graph, start: str) -> dict[str, int]:
+    """Breadth-first hop counts from start over the graph's relations."""
+    adjacency: dict[str, set[str]] = {}
+    for r in graph.tables["relations"]:
+        adjacency.setdefault(r["source_id"], set()).add(r["target_id"])
+        adjacency.setdefault(r["target_id"], set()).add(r["source_id"])
+    hops = {start: 0}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for neighbor in adjacency.get(node, ()):
+            if neighbor not in hops:
+                hops[neighbor] = hops[node] + 1
+                queue.append(neighbor)
+    return hops
+
+
+class TestRoundTripBudgets:
+    """Maximum database round-trips for sync, relation queries and briefings."""
+
+    @pytest.mark.parametrize("n_entities", [1, 5, 20])
+    def test_sync_extraction(self, graph, db, round_trip_budget, n_entities):
+        """Test syncing n new entities stays within a per-entity budget, however many relations and intel links they have."""
+        # ARRANGE
+        extraction = _extraction(n_entities)
+        budget = SYNC_FIXED + SYNC_PER_ENTITY * n_entities
+        sync_service = SupabaseSyncService(db, user_id=graph.user_id)
+
+        # ACT
+        with round_trip_budget(db, budget):
+            results = sync_service.sync_extraction(extraction)
+
+        # ASSERT
+        assert not results.errors
+        assert len(results.entities_created) == n_entities
+        assert results.intel_created[0]["entities_linked"] == n_entities
+
+    def test_replayed_sync(self, graph, db, round_trip_budget):
+        """Test replaying a sync makes one round-trip and writes nothing."""
+        # ARRANGE
+        extraction = _extraction(5)
+        sync_service = SupabaseSyncService(db, user_id=graph.user_id)
+        first = sync_service.sync_extraction(extraction)
+        entity_count = len(db.tables["entities"])
+
+        # ACT
+        with round_trip_budget(db, SYNC_REPLAY_BUDGET):
+            replayed = sync_service.sync_extraction(extraction)
+
+        # ASSERT
+        assert replayed.replayed
+        assert replayed.entities_created == first.entities_created
+        assert len(db.tables["entities"]) == entity_count
+
+    def test_relation_query_with_50_results(self, graph, db, round_trip_budget):
+        """Test a relation query returning 50 relations makes at most 3 round-trips."""
+        # ARRANGE
+        degrees = Counter()
+        for r in graph.tables["relations"]:
+            degrees[r["source_id"]] += 1
+            degrees[r["target_id"]] += 1
+        hub = max(graph.persons, key=lambda p: degrees[p["id"]])
+        plan = QueryPlan(intent=QueryIntent.RELATION_QUERY, entity_names=[hub["data"]["name"]])
+
+        # ACT
+        with round_trip_budget(db, RELATION_QUERY_BUDGET):
+            result = asyncio.run(QueryExecutor(db, graph.user_id).execute(plan, page_size=50))
+
+        # ASSERT
+        assert len(result["data"]) == 50
+
+    @pytest.mark.parametrize("distance", [1, 2, 3])
+    def test_briefing(self, graph, db, round_trip_budget, distance):
+        """Test a briefing makes at most 5 round-trips, however far the entity is from the user."""
+        # ARRANGE
+        user_entity_id = graph.persons[0]["id"]
+        hops = _hops_from(graph, user_entity_id)
+        entity_id = next(p["id"] for p in graph.persons if hops.get(p["id"]) == distance)
+
+        # ACT
+        with round_trip_budget(db, BRIEFING_BUDGET):
+            result = asyncio.run(BriefingService(db, graph.user_id).generate(entity_id))
+
+        # ASSERT
+        path = result.relationship_to_user["path"]
+        assert len(path) == distance + 1
+        assert path[0]["entity_id"] == user_entity_id
+        assert path[-1]["entity_id"] == entity_id
+        assert all(node["name"] != node["entity_id"][:8] for node in path)
+        if distance > 1:
+            # Two hops away means connected through mutual connections; three, through none
+            assert bool(result.mutual_connections) == (distance == 2)
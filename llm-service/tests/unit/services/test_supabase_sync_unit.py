@@ -4,11 +4,13 @@ Unit tests for SupabaseSyncService methods.
 Tests individual sync methods in isolation.
 """
 
+from unittest.mock import MagicMock, patch
 from uuid import UUID
-from unittest.mock import MagicMock
 
-from app.services.supabase_sync import SupabaseSyncService
+import pytest
+
 from app.models.extraction import SyncResults
+from app.services.supabase_sync import SupabaseSyncService
 
 
 class TestProcessEntityResolutions:
@@ -169,8 +171,8 @@ class TestProcessEntityResolutions:
             "Failed entity should not be in mapping"
 
 
-class TestSyncRelation:
-    """Unit tests for _sync_relation method (tested via integration tests)."""
+class TestSyncRelations:
+    """Unit tests for _sync_relations method (tested via integration tests)."""
 
     def test_relation_created_with_resolved_ids(
         self,
@@ -192,10 +194,14 @@ class TestSyncRelation:
 
         sync_service = SupabaseSyncService(mock_supabase_insert_tracker, user_id="test")
 
+        results = SyncResults()
+
         # ACT
-        result = sync_service._sync_relation(relation, entity_name_to_id, source_id="test-source")
+        sync_service._sync_relations([relation], entity_name_to_id, source_id="test-source", results=results)
 
         # ASSERT
+        assert not results.errors
+        result = results.relations_created[0]
         assert result["source_name"] == "John"
         assert result["target_name"] == "Sarah"
         assert result["created"] is True
@@ -206,6 +212,41 @@ class TestSyncRelation:
         assert relation_inserts[0]["source_id"] == john_id
         assert relation_inserts[0]["target_id"] == sarah_id
 
+    def test_self_relation_skipped_without_failing_batch(
+        self,
+        mock_supabase_insert_tracker,
+        extraction_with_relations_factory
+    ):
+        """Test a relation whose endpoints resolve to one entity is reported and left out of the batch."""
+        # ARRANGE
+        john_id = "11111111-1111-1111-1111-111111111111"
+        sarah_id = "22222222-2222-2222-2222-222222222222"
+
+        entity_name_to_id = {
+            "John": john_id,
+            "Johnny": john_id,
+            "Sarah": sarah_id
+        }
+
+        valid = extraction_with_relations_factory().relations[0]
+        self_relation = valid.model_copy(update={"target_entity_name": "Johnny"})
+
+        sync_service = SupabaseSyncService(mock_supabase_insert_tracker, user_id="test")
+
+        results = SyncResults()
+
+        # ACT
+        sync_service._sync_relations([self_relation, valid], entity_name_to_id, source_id="test-source", results=results)
+
+        # ASSERT
+        assert len(results.errors) == 1
+        assert results.errors[0]["entity_name"] == "John -> Johnny"
+        assert "same entity" in results.errors[0]["error_message"]
+        assert [r["target_name"] for r in results.relations_created] == ["Sarah"]
+
+        relation_inserts = mock_supabase_insert_tracker._operations["relations_insert"]
+        assert [(r["source_id"], r["target_id"]) for r in relation_inserts] == [(john_id, sarah_id)]
+
 
 class TestSyncIntel:
     """Unit tests for _sync_intel method."""
@@ -216,7 +257,7 @@ class TestSyncIntel:
     ):
         """Test intel links to entities via entity_name_to_id mapping."""
         # ARRANGE
-        from app.models.extraction import IntelExtraction, IntelType, ConfidenceLevel
+        from app.models.extraction import ConfidenceLevel, IntelExtraction, IntelType
 
         alice_id = "22222222-2222-2222-2222-222222222222"
         bob_id = "44444444-4444-4444-4444-444444444444"
@@ -229,7 +270,7 @@ class TestSyncIntel:
         intel = IntelExtraction(
             intel_type=IntelType.EVENT,
             description="Alice and Bob attended meeting",
-            occurred_at="yesterday",
+            occurred_at="2025-03-11T00:00:00",
             entities_involved=["Alice", "Bob"],
             location="Office",
             details={},
@@ -257,7 +298,7 @@ class TestSyncIntel:
     ):
         """Test intel with multiple participants all linked correctly."""
         # ARRANGE
-        from app.models.extraction import IntelExtraction, IntelType, ConfidenceLevel
+        from app.models.extraction import ConfidenceLevel, IntelExtraction, IntelType
 
         entity_name_to_id = {
             "Alice": "111",
@@ -268,7 +309,7 @@ class TestSyncIntel:
         intel = IntelExtraction(
             intel_type=IntelType.EVENT,
             description="Team meeting",
-            occurred_at="today",
+            occurred_at="2025-03-12T00:00:00",
             entities_involved=["Alice", "Bob", "Charlie"],
             location=None,
             details={},
@@ -289,7 +330,7 @@ class TestSyncIntel:
     ):
         """Test all participants have role='participant'."""
         # ARRANGE
-        from app.models.extraction import IntelExtraction, IntelType, ConfidenceLevel
+        from app.models.extraction import ConfidenceLevel, IntelExtraction, IntelType
 
         entity_name_to_id = {
             "Alice": "111",
@@ -299,7 +340,7 @@ class TestSyncIntel:
         intel = IntelExtraction(
             intel_type=IntelType.EVENT,
             description="Meeting",
-            occurred_at="today",
+            occurred_at="2025-03-12T00:00:00",
             entities_involved=["Alice", "Bob"],
             location=None,
             details={},
@@ -324,7 +365,7 @@ class TestSyncIntel:
     ):
         """Test intel handles missing entities gracefully."""
         # ARRANGE
-        from app.models.extraction import IntelExtraction, IntelType, ConfidenceLevel
+        from app.models.extraction import ConfidenceLevel, IntelExtraction, IntelType
 
         entity_name_to_id = {
             "Alice": "111"
@@ -334,7 +375,7 @@ class TestSyncIntel:
         intel = IntelExtraction(
             intel_type=IntelType.EVENT,
             description="Meeting",
-            occurred_at="today",
+            occurred_at="2025-03-12T00:00:00",
             entities_involved=["Alice", "Bob"],  # Bob not in mapping
             location=None,
             details={},
@@ -350,3 +391,505 @@ class TestSyncIntel:
         # Should only link Alice (Bob skipped)
         assert result["entities_linked"] == 1, \
             "Should only link entities found in mapping"
+
+
+class TestNormalizeDates:
+    """Unit tests for _normalize_dates method."""
+
+    def test_dates_resolve_against_one_reference_time(self):
+        """Test all relative dates in a note use the same reference time, parsed once each."""
+        # ARRANGE
+        from datetime import datetime
+
+        from app.models.extraction import (
+            ConfidenceLevel,
+            IntelExtraction,
+            IntelligenceExtraction,
+            IntelType,
+            Reasoning,
+            RelationExtraction,
+            RelationType,
+        )
+        from app.utils import date_parser
+
+        def intel(occurred_at):
+            return IntelExtraction(
+                intel_type=IntelType.EVENT,
+                description="Met for coffee",
+                occurred_at=occurred_at,
+                entities_involved=["Alice"],
+                confidence=ConfidenceLevel.HIGH,
+            )
+
+        extraction = IntelligenceExtraction(
+            reasoning=Reasoning(
+                entities_identified="Alice, Bob",
+                facts_identified="",
+                events_identified="coffee",
+                relationships_identified="friends",
+                sources_identified="",
+                confidence_rationale="explicit",
+            ),
+            relations=[
+                RelationExtraction(
+                    source_entity_name="Alice",
+                    target_entity_name="Bob",
+                    relation_type=RelationType.FRIEND,
+                    valid_from="2020-05-01",
+                    confidence=ConfidenceLevel.HIGH,
+                )
+            ],
+            intel=[intel("yesterday"), intel("yesterday"), intel(None)],
+        )
+        base = datetime(2025, 3, 14, 23, 59, 59)
+        sync_service = SupabaseSyncService(MagicMock(), user_id="test")
+
+        # ACT
+        with patch.object(date_parser, "parse_and_format_date", wraps=date_parser.parse_and_format_date) as parse:
+            normalized = sync_service._normalize_dates(extraction, relative_base=base)
+
+        # ASSERT
+        assert parse.call_count == 2, "Each distinct date string is parsed once"
+        assert [i.occurred_at for i in normalized.intel] == [
+            "2025-03-13T23:59:59",
+            "2025-03-13T23:59:59",
+            "2025-03-14T23:59:59",
+        ]
+        assert normalized.relations[0].valid_from == "2020-05-01T00:00:00"
+        assert normalized.relations[0].valid_to is None
+        assert extraction.intel[0].occurred_at == "yesterday", "Input extraction is not modified"
+
+    def test_rows_use_normalized_dates(self):
+        """Test relation rows take the normalized dates without parsing them again."""
+        # ARRANGE
+        from app.models.extraction import (
+            ConfidenceLevel,
+            RelationExtraction,
+            RelationType,
+        )
+        from app.utils import date_parser
+
+        relation = RelationExtraction(
+            source_entity_name="Alice",
+            target_entity_name="Bob",
+            relation_type=RelationType.FRIEND,
+            valid_from="2020-05-01T00:00:00",
+            confidence=ConfidenceLevel.HIGH,
+        )
+        sync_service = SupabaseSyncService(MagicMock(), user_id="test")
+
+        # ACT
+        with patch.object(date_parser, "parse_and_format_date") as parse:
+            row = sync_service._relation_row(relation, {"Alice": "a", "Bob": "b"}, source_id="s")
+
+        # ASSERT
+        parse.assert_not_called()
+        assert row["valid_from"] == "2020-05-01T00:00:00"
+        assert row["valid_to"] is None
+
+
+def _single_entity_extraction(name: str):
+    from app.models.extraction import (
+        ConfidenceLevel,
+        EntityExtraction,
+        EntityType,
+        IntelligenceExtraction,
+        Reasoning,
+    )
+
+    return IntelligenceExtraction(
+        reasoning=Reasoning(
+            entities_identified=name,
+            facts_identified="",
+            events_identified="",
+            relationships_identified="",
+            confidence_rationale="explicit",
+        ),
+        entities=[
+            EntityExtraction(name=name, entity_type=EntityType.PERSON, identifiers=[], confidence=ConfidenceLevel.HIGH)
+        ],
+    )
+
+
+class TestSyncIdempotency:
+    """Unit tests for idempotent sync_extraction."""
+
+    USER_ID = "00000000-0000-0000-0000-0000000000aa"
+
+    def test_fingerprint_is_stable_and_scoped(self):
+        """Test the fingerprint depends on user, source, extraction and reference date, and nothing else."""
+        # ARRANGE
+        from datetime import date
+
+        from app.services.supabase_sync import extraction_fingerprint
+
+        extraction = _single_entity_extraction("Alice")
+        day = date(2025, 3, 14)
+
+        # ACT
+        fingerprint = extraction_fingerprint(self.USER_ID, "LLM", extraction, reference_date=day)
+
+        # ASSERT
+        assert fingerprint == extraction_fingerprint(
+            self.USER_ID, "LLM", _single_entity_extraction("Alice"), reference_date=day
+        )
+        assert fingerprint != extraction_fingerprint("other-user", "LLM", extraction, reference_date=day)
+        assert fingerprint != extraction_fingerprint(self.USER_ID, "NOTES", extraction, reference_date=day)
+        assert fingerprint != extraction_fingerprint(
+            self.USER_ID, "LLM", _single_entity_extraction("Bob"), reference_date=day
+        )
+        assert fingerprint != extraction_fingerprint(self.USER_ID, "LLM", extraction, reference_date=date(2025, 3, 15))
+
+    def test_client_key_replays_stored_results(self):
+        """Test a second sync with the same idempotency key returns the first results without writing."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id=self.USER_ID)
+        first = sync_service.sync_extraction(_single_entity_extraction("Alice"), idempotency_key="note-1")
+
+        # ACT
+        # A retried request may be re-extracted differently; the key still identifies it
+        replayed = sync_service.sync_extraction(_single_entity_extraction("Alicia"), idempotency_key="note-1")
+
+        # ASSERT
+        assert not first.replayed
+        assert replayed.replayed
+        assert replayed.entities_created == first.entities_created
+        assert len(db.tables["entities"]) == 1
+
+    def test_failed_sync_not_stored(self):
+        """Test a sync with errors is not stored, so a retry runs it again."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id=self.USER_ID)
+        extraction = _single_entity_extraction("Alice")
+        failed = SyncResults(errors=[{"type": "entity", "error": "insert failed"}])
+
+        # ACT
+        with patch.object(sync_service, "_sync", return_value=failed):
+            sync_service.sync_extraction(extraction)
+        retried = sync_service.sync_extraction(extraction)
+
+        # ASSERT
+        assert not retried.replayed
+        assert len(retried.entities_created) == 1
+
+    def test_duplicate_during_sync_is_rejected(self):
+        """Test a duplicate arriving while the first sync holds the claim does not sync again."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id=self.USER_ID)
+        duplicates = []
+
+        def sync_and_receive_duplicate(*args):
+            duplicates.append(sync_service.sync_extraction(_single_entity_extraction("Alice"), idempotency_key="note-1"))
+            return SyncResults()
+
+        # ACT
+        with patch.object(sync_service, "_sync", side_effect=sync_and_receive_duplicate) as sync:
+            sync_service.sync_extraction(_single_entity_extraction("Alice"), idempotency_key="note-1")
+
+        # ASSERT
+        assert sync.call_count == 1
+        assert duplicates[0].errors[0]["type"] == "idempotency"
+
+    def test_fingerprint_expires_quickly(self):
+        """Test a note sent again after the fingerprint TTL is synced again."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id=self.USER_ID)
+        extraction = _single_entity_extraction("Alice")
+        sync_service.sync_extraction(extraction)
+        retried = sync_service.sync_extraction(extraction)
+        (claim,) = db.tables["sync_idempotency_keys"]
+        claim["expires_at"] = "2000-01-01T00:00:00+00:00"
+
+        # ACT
+        again = sync_service.sync_extraction(extraction)
+
+        # ASSERT
+        assert retried.replayed
+        assert not again.replayed
+
+    def test_claims_delete_expired_keys(self):
+        """Test each claim deletes every user's expired keys, so stored results do not accumulate."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        db.load("sync_idempotency_keys", [
+            {"user_id": "other-user", "key": "old", "results": {}, "expires_at": "2000-01-01T00:00:00+00:00"},
+            {"user_id": "other-user", "key": "live", "results": {}, "expires_at": "2999-01-01T00:00:00+00:00"},
+        ])
+        sync_service = SupabaseSyncService(db, user_id=self.USER_ID)
+
+        # ACT
+        sync_service.sync_extraction(_single_entity_extraction("Alice"), idempotency_key="note-1")
+
+        # ASSERT
+        assert sorted(k["key"] for k in db.tables["sync_idempotency_keys"]) == ["key:note-1", "live"]
+
+    def test_zero_ttl_disables_idempotency(self, monkeypatch):
+        """Test SYNC_IDEMPOTENCY_TTL_SECONDS=0 syncs every request without lookups or stored keys."""
+        # ARRANGE
+        from app.config import settings
+        from benchmarks.fake_supabase import FakeSupabase
+
+        monkeypatch.setattr(settings, "sync_idempotency_ttl_seconds", 0)
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id=self.USER_ID)
+        extraction = _single_entity_extraction("Alice")
+
+        # ACT
+        sync_service.sync_extraction(extraction)
+        second = sync_service.sync_extraction(extraction)
+
+        # ASSERT
+        assert not second.replayed
+        assert not db.tables.get("sync_idempotency_keys")
+
+
+class TestSyncUpserts:
+    """Unit tests for the identifier, attribute and relation upserts."""
+
+    def test_resync_updates_without_duplicates(self, monkeypatch):
+        """Test re-syncing known entities adds only new identifiers, versions changed attributes and reuses relations."""
+        # ARRANGE
+        from app.config import settings
+        from app.models.extraction import (
+            ConfidenceLevel,
+            EntityExtraction,
+            EntityType,
+            IdentifierExtraction,
+            IdentifierType,
+            IntelligenceExtraction,
+            Reasoning,
+            RelationExtraction,
+            RelationType,
+        )
+        from benchmarks.fake_supabase import FakeSupabase
+
+        def extraction(email: str, position: str):
+            return IntelligenceExtraction(
+                reasoning=Reasoning(
+                    entities_identified="Alice, Bob",
+                    facts_identified="position",
+                    events_identified="",
+                    relationships_identified="colleagues",
+                    confidence_rationale="explicit",
+                ),
+                entities=[
+                    EntityExtraction(
+                        name="Alice",
+                        entity_type=EntityType.PERSON,
+                        identifiers=[IdentifierExtraction(identifier_type=IdentifierType.EMAIL, value=email)],
+                        attributes={"position": position},
+                        confidence=ConfidenceLevel.HIGH,
+                    ),
+                    EntityExtraction(name="Bob", entity_type=EntityType.PERSON, identifiers=[], confidence=ConfidenceLevel.HIGH),
+                ],
+                relations=[
+                    RelationExtraction(
+                        source_entity_name="Alice",
+                        target_entity_name="Bob",
+                        relation_type=RelationType.COLLEAGUE,
+                        confidence=ConfidenceLevel.HIGH,
+                    )
+                ],
+            )
+
+        monkeypatch.setattr(settings, "sync_idempotency_ttl_seconds", 0)
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id="test")
+        sync_service.sync_extraction(extraction("alice@example.com", "Engineer"))
+
+        # ACT
+        sync_service.sync_extraction(extraction("ALICE@example.com", "Engineer"))
+        results = sync_service.sync_extraction(extraction("alice@work.com", "Manager"))
+
+        # ASSERT
+        assert not results.errors
+        emails = sorted(i["value"] for i in db.tables["identifiers"] if i["type"] == "email")
+        assert emails == ["alice@example.com", "alice@work.com"], "Same value in another case is not duplicated"
+        assert len(db.tables["relations"]) == 1
+        assert results.relations_created[0]["created"] is False
+        positions = {a["value"]: a["valid_to"] for a in db.tables["entity_attributes"]}
+        assert set(positions) == {"Engineer", "Manager"}
+        assert positions["Engineer"] is not None and positions["Manager"] is None
+
+    def test_failed_lookup_creates_no_entities(self, monkeypatch):
+        """Test entities are reported as errors, not created, when the batched name lookup fails."""
+        # ARRANGE
+        from postgrest.exceptions import APIError
+
+        from app.services import supabase_sync
+        from benchmarks.fake_supabase import FakeSupabase
+
+        def failing_lookup(*args, **kwargs):
+            raise APIError({"code": "57014", "message": "canceling statement due to statement timeout"})
+
+        monkeypatch.setattr(supabase_sync, "find_entities_by_identifiers", failing_lookup)
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id="a")
+
+        # ACT
+        results = sync_service.sync_extraction(_single_entity_extraction("Alice"))
+
+        # ASSERT
+        assert [e["entity_name"] for e in results.errors] == ["Alice"]
+        assert not results.entities_created
+        assert not db.tables.get("entities")
+
+    def test_identifiers_dedupe_on_normalized_value(self):
+        """Test identifiers differing only in accents or case are not duplicated, as lookups treat them as equal."""
+        # ARRANGE
+        from app.models.extraction import IdentifierExtraction, IdentifierType
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        sync_service = SupabaseSyncService(db, user_id="a")
+
+        def names(*values):
+            return [IdentifierExtraction(identifier_type=IdentifierType.NAME, value=v) for v in values]
+
+        sync_service._create_identifiers("e1", names("José", "Søren"))
+
+        # ACT
+        created = sync_service._create_identifiers("e1", names("JOSE", "Soren", "Zoë", "Zoe"))
+
+        # ASSERT
+        assert len(created) == 1
+        assert sorted(i["value"] for i in db.tables["identifiers"]) == ["José", "Søren", "Zoë"]
+
+
+class TestGetOrCreateSource:
+    """Unit tests for _get_or_create_source and the process-wide source cache."""
+
+    def test_source_cached_after_first_use(self):
+        """Test only the first lookup of a source code reaches the database."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        first_id = SupabaseSyncService(db, user_id="a")._get_or_create_source("LLM")
+        db.reset_round_trips()
+
+        # ACT
+        second_id = SupabaseSyncService(db, user_id="b")._get_or_create_source("LLM")
+
+        # ASSERT
+        assert second_id == first_id
+        assert db.round_trips == 0
+        assert len(db.tables["sources"]) == 1
+
+    def test_existing_source_not_duplicated(self):
+        """Test a source created elsewhere is read back instead of inserted again."""
+        # ARRANGE
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        db.load("sources", [{"code": "LLM", "type": "human", "reliability": "A"}])
+
+        # ACT
+        source_id = SupabaseSyncService(db, user_id="a")._get_or_create_source("LLM")
+
+        # ASSERT
+        assert source_id == db.tables["sources"][0]["id"]
+        assert len(db.tables["sources"]) == 1
+        assert db.tables["sources"][0]["reliability"] == "A", "Existing source is not overwritten"
+
+    def test_preloaded_sources_skip_lookup(self):
+        """Test preload_source_ids fills the cache so syncs make no source round-trips."""
+        # ARRANGE
+        from app.services.supabase_sync import preload_source_ids
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        db.load("sources", [{"code": "LLM"}, {"code": "NOTES"}])
+
+        # ACT
+        cached = preload_source_ids(db)
+        db.reset_round_trips()
+        source_id = SupabaseSyncService(db, user_id="a")._get_or_create_source("NOTES")
+
+        # ASSERT
+        assert cached == 2
+        assert source_id == db.tables["sources"][1]["id"]
+        assert db.round_trips == 0
+
+    def test_stale_source_evicted_and_write_retried(self):
+        """Test a write rejected for a deleted source re-resolves the source and retries once."""
+        # ARRANGE
+        from postgrest.exceptions import APIError
+
+        from app.services import supabase_sync
+        from benchmarks.fake_supabase import FakeSupabase
+
+        db = FakeSupabase()
+        db.load("sources", [{"code": "LLM"}])
+        live_id = db.tables["sources"][0]["id"]
+        supabase_sync._source_ids["LLM"] = "deleted-source-id"
+        sync_service = SupabaseSyncService(db, user_id="a")
+        sync_service._source_code = "LLM"
+        written = []
+
+        def write(source_id):
+            if source_id != live_id:
+                raise APIError({
+                    "code": "23503",
+                    "message": 'insert or update on table "intel" violates foreign key constraint "intel_source_id_fkey"',
+                    "details": f'Key (source_id)=({source_id}) is not present in table "sources".',
+                })
+            written.append(source_id)
+            return source_id
+
+        # ACT
+        result = sync_service._write_with_source(write, "deleted-source-id")
+
+        # ASSERT
+        assert result == live_id
+        assert written == [live_id]
+        assert supabase_sync._source_ids["LLM"] == live_id
+
+    def test_other_write_errors_not_retried(self):
+        """Test errors other than a stale source_id propagate without a retry."""
+        # ARRANGE
+        from postgrest.exceptions import APIError
+
+        sync_service = SupabaseSyncService(MagicMock(), user_id="a")
+        sync_service._source_code = "LLM"
+        calls = []
+
+        def write(source_id):
+            calls.append(source_id)
+            raise APIError({"code": "23505", "message": "duplicate key value", "details": None})
+
+        # ACT / ASSERT
+        with pytest.raises(APIError):
+            sync_service._write_with_source(write, "source-id")
+        assert calls == ["source-id"]
+
+    def test_preload_failure_leaves_cache_empty(self):
+        """Test preload_source_ids returns 0 when the database is unreachable."""
+        # ARRANGE
+        import httpx
+
+        from app.services.supabase_sync import _source_ids, preload_source_ids
+
+        db = MagicMock()
+        db.table.return_value.select.return_value.execute.side_effect = httpx.ConnectError("refused")
+
+        # ACT
+        cached = preload_source_ids(db)
+
+        # ASSERT
+        assert cached == 0
+        assert _source_ids == {}
@@ -0,0 +1,112 @@
+"""
+Unit tests for the lightweight tracing subsystem.
+"""
+
+import asyncio
+import json
+from unittest.mock import patch
+
+import httpx
+
+from app.config import settings
+from app.services.tracing import (
+    NOOP_SPAN,
+    span,
+    trace_http_request,
+    trace_http_response,
+    traced,
+)
+
+
+def _read_spans(path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+class TestTracing:
+    """Unit tests for spans, the traced decorator and PostgREST hooks."""
+
+    def test_disabled_by_default(self, tmp_path):
+        """Test the default exporter records nothing and yields the no-op span."""
+        # ARRANGE
+        trace_file = tmp_path / "traces.jsonl"
+
+        # ACT
+        with patch.object(settings, "tracing_file_path", str(trace_file)), span("sync.entity") as s:
+            s.set_attribute("db.rows", 1)
+
+        # ASSERT
+        assert settings.tracing_exporter == "none"
+        assert s is NOOP_SPAN
+        assert not trace_file.exists()
+
+    def test_nested_spans_share_trace(self, tmp_path):
+        """Test child spans link to their parent and carry result attributes."""
+        # ARRANGE
+        trace_file = tmp_path / "traces.jsonl"
+
+        @traced("entity_resolver.resolve_person_reference", lambda result: {"resolution.candidates": len(result)})
+        async def resolve():
+            return ["a", "b"]
+
+        async def run():
+            with span("extraction.extract_and_classify_with_resolution"):
+                await resolve()
+
+        # ACT
+        with patch.object(settings, "tracing_exporter", "file"), \
+                patch.object(settings, "tracing_file_path", str(trace_file)):
+            asyncio.run(run())
+
+        # ASSERT
+        child, parent = _read_spans(trace_file)
+        assert child["name"] == "entity_resolver.resolve_person_reference"
+        assert child["traceId"] == parent["traceId"]
+        assert child["parentSpanId"] == parent["spanId"]
+        assert parent["parentSpanId"] is None
+        assert child["attributes"] == {"resolution.candidates": 2}
+
+    def test_exception_marks_span_as_error(self, tmp_path):
+        """Test exceptions are recorded on the span and re-raised."""
+        # ARRANGE
+        trace_file = tmp_path / "traces.jsonl"
+
+        # ACT
+        with patch.object(settings, "tracing_exporter", "file"), \
+                patch.object(settings, "tracing_file_path", str(trace_file)):
+            try:
+                with span("sync.intel"):
+                    raise RuntimeError("insert failed")
+            except RuntimeError:
+                pass
+
+        # ASSERT
+        (recorded,) = _read_spans(trace_file)
+        assert recorded["status"] == "ERROR"
+        assert recorded["attributes"]["exception.type"] == "RuntimeError"
+
+    def test_postgrest_requests_are_traced(self, tmp_path):
+        """Test httpx hooks trace PostgREST requests with table and row count."""
+        # ARRANGE
+        trace_file = tmp_path / "traces.jsonl"
+        client = httpx.Client(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(200, json=[{}, {}, {}], headers={"Content-Range": "0-2/*"})
+            ),
+            event_hooks={"request": [trace_http_request], "response": [trace_http_response]},
+        )
+
+        # ACT
+        with patch.object(settings, "tracing_exporter", "file"), \
+                patch.object(settings, "tracing_file_path", str(trace_file)):
+            with span("sync.entity"):
+                client.get("http://db/rest/v1/identifiers?entity_id=eq.1")
+            client.post("http://db/rest/v1/rpc/get_user_stats", json={})
+
+        # ASSERT
+        select, parent, rpc = _read_spans(trace_file)
+        assert select["name"] == "postgrest.select identifiers"
+        assert select["parentSpanId"] == parent["spanId"]
+        assert select["attributes"]["db.sql.table"] == "identifiers"
+        assert select["attributes"]["db.rows"] == 3
+        assert rpc["name"] == "postgrest.rpc get_user_stats"
+        assert rpc["parentSpanId"] is None
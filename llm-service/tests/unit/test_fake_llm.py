@@ -0,0 +1,167 @@
+"""
+Unit tests for the deterministic fake LLM server used by benchmarks.
+"""
+
+import json
+import random
+import time
+
+import instructor
+import ollama
+import openai
+import pytest
+from fastapi.testclient import TestClient
+
+from app.models.extraction import EntityType, IntelligenceExtraction
+from app.models.query import QueryIntent, QueryPlan
+from app.services.llm import build_user_prompt
+from benchmarks.fake_llm import FakeLLMConfig, create_app, parse_distribution
+
+
+def _client(**config) -> TestClient:
+    return TestClient(create_app(FakeLLMConfig(**config)))
+
+
+class TestFakeLLM:
+    """Unit tests for the OpenAI, Anthropic and Ollama endpoints of the fake server."""
+
+    def test_openai_tool_call_is_schema_valid(self):
+        """Test instructor parses an IntelligenceExtraction from the fake OpenAI endpoint."""
+        # ARRANGE
+        client = instructor.from_openai(
+            openai.OpenAI(api_key="fake", base_url="http://testserver/v1", http_client=_client())
+        )
+        prompt = build_user_prompt("Met Anna Berg and Erik at Acme Labs yesterday.", user_name="Sam")
+
+        # ACT
+        result = client.chat.completions.create(
+            model="gpt-4o",
+            response_model=IntelligenceExtraction,
+            messages=[{"role": "user", "content": prompt}],
+        )
+
+        # ASSERT
+        assert [(e.name, e.entity_type) for e in result.entities] == [
+            ("Anna Berg", EntityType.PERSON),
+            ("Erik", EntityType.PERSON),
+            ("Acme Labs", EntityType.ORGANIZATION),
+        ]
+        assert result.intel[0].occurred_at == "yesterday"
+        assert {r.source_entity_name for r in result.relations} == {"Anna Berg", "Sam"}
+
+    def test_openai_query_plan_and_streaming_text(self):
+        """Test QueryPlan templates and streamed plain-text answers."""
+        # ARRANGE
+        http_client = _client()
+        raw = openai.OpenAI(api_key="fake", base_url="http://testserver/v1", http_client=http_client)
+        client = instructor.from_openai(raw)
+
+        # ACT
+        plan = client.chat.completions.create(
+            model="gpt-4o",
+            response_model=QueryPlan,
+            messages=[{"role": "user", "content": "Parse this question into a query plan.\n\nQuestion: When did I last meet Anna Berg?"}],
+        )
+        stream = raw.chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": "Query results:\n- Anna Berg (person)"}],
+            stream=True,
+        )
+        answer = "".join(chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices)
+
+        # ASSERT
+        assert plan.intent == QueryIntent.TEMPORAL_QUERY
+        assert plan.entity_names == ["Anna Berg"]
+        assert answer == "Here is what I found: Anna Berg (person)."
+
+    def test_anthropic_tool_use_and_prompt_caching(self):
+        """Test the messages endpoint returns tool_use input and reports cache reads on repeat."""
+        # ARRANGE
+        client = _client()
+        body = {
+            "model": "claude",
+            "max_tokens": 1024,
+            "system": [{"type": "text", "text": "You are an analyst.", "cache_control": {"type": "ephemeral"}}],
+            "messages": [{"role": "user", "content": "Text:\n\nLunch with Anna Berg."}],
+            "tools": [{"name": "IntelligenceExtraction", "input_schema": IntelligenceExtraction.model_json_schema()}],
+        }
+
+        # ACT
+        first = client.post("/v1/messages", json=body).json()
+        second = client.post("/v1/messages", json=body).json()
+
+        # ASSERT
+        block = first["content"][0]
+        assert block["type"] == "tool_use"
+        assert IntelligenceExtraction.model_validate(block["input"]).entities[0].name == "Anna Berg"
+        assert first["usage"]["cache_read_input_tokens"] == 0
+        assert second["usage"]["cache_read_input_tokens"] > 0
+        assert second["content"][0]["input"] == block["input"]
+
+    def test_ollama_streaming_chat(self):
+        """Test the Ollama client streams schema-valid JSON and reports token counts."""
+        # ARRANGE
+        client = ollama.Client(host="http://testserver", transport=_client()._transport)
+
+        # ACT
+        chunks = list(client.chat(
+            model="qwen2.5:7b",
+            messages=[{"role": "user", "content": "Text:\n\nLunch with Anna Berg."}],
+            format=IntelligenceExtraction.model_json_schema(),
+            stream=True,
+        ))
+
+        # ASSERT
+        content = "".join(chunk.message.content for chunk in chunks)
+        assert IntelligenceExtraction.model_validate_json(content).entities[0].name == "Anna Berg"
+        assert chunks[-1].done and chunks[-1].eval_count > 0
+        assert client.ps().models[0].model == "fake-llm"
+
+    def test_error_injection_and_latency(self):
+        """Test injected errors and time-to-first-token latency."""
+        # ARRANGE
+        failing = _client(error_rate=1.0, error_statuses=(503,))
+        slow = _client(ttft_ms="50")
+        body = {"model": "m", "messages": [{"role": "user", "content": "hello"}]}
+
+        # ACT
+        error = failing.post("/v1/chat/completions", json=body)
+        start = time.perf_counter()
+        slow.post("/v1/chat/completions", json=body)
+        elapsed = time.perf_counter() - start
+
+        # ASSERT
+        assert error.status_code == 503
+        assert failing.get("/stats").json()["errors"] == 1
+        assert elapsed >= 0.05
+
+    def test_malformed_responses_are_truncated(self):
+        """Test malformed_rate returns invalid JSON tool arguments."""
+        # ARRANGE
+        client = _client(malformed_rate=1.0)
+        body = {
+            "model": "m",
+            "messages": [{"role": "user", "content": "Text:\n\nLunch with Anna Berg."}],
+            "tools": [{"type": "function", "function": {"name": "QueryPlan", "parameters": QueryPlan.model_json_schema()}}],
+        }
+
+        # ACT
+        response = client.post("/v1/chat/completions", json=body).json()
+
+        # ASSERT
+        arguments = response["choices"][0]["message"]["tool_calls"][0]["function"]["arguments"]
+        with pytest.raises(json.JSONDecodeError):
+            json.loads(arguments)
+
+    def test_parse_distribution(self):
+        """Test latency distribution specs."""
+        # ARRANGE
+        rng = random.Random(0)
+
+        # ACT
+        samples = [parse_distribution("lognormal:100,0.5")(rng) for _ in range(1000)]
+
+        # ASSERT
+        assert parse_distribution("250")(rng) == 250
+        assert 100 <= parse_distribution("uniform:100,200")(rng) <= 200
+        assert 80 < sorted(samples)[500] < 120
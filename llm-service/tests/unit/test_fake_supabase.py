@@ -0,0 +1,136 @@
+"""
+Unit tests for the in-memory Supabase stand-in used by benchmarks.
+"""
+
+import time
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.services.query_executor import RELATION_KEYS
+from app.services.supabase_sync import SupabaseSyncService
+from app.utils.entity_matcher import find_entity_by_identifier
+from app.utils.pagination import encode_cursor, keyset_filter
+from benchmarks.fake_supabase import FakeSupabase
+
+
+class TestFakeSupabase:
+    """Unit tests for FakeSupabase queries, RPCs, latency and round-trip counting."""
+
+    def test_sync_extraction_writes_rows_and_counts_round_trips(self, extraction_with_relations_factory):
+        """Test sync_extraction against the fake creates rows and counts every execute()."""
+        # ARRANGE
+        db = FakeSupabase()
+        extraction = extraction_with_relations_factory()
+
+        # ACT
+        results = SupabaseSyncService(db, user_id="test").sync_extraction(extraction)
+
+        # ASSERT
+        assert not results.errors
+        assert len(db.tables["entities"]) == 2
+        assert len(db.tables["relations"]) == 1
+        assert len(db.tables["sources"]) == 1
+        assert db.round_trips == len(db.calls)
+        assert ("rpc", "upsert_relations") in db.calls
+
+    def test_or_filter_with_in_lists_and_keyset(self):
+        """Test or_() handles in.() lists and keyset_filter's nested and()."""
+        # ARRANGE
+        db = FakeSupabase()
+        db.load("relations", [
+            {"id": f"00000000-0000-0000-0000-00000000000{i}", "source_id": "a" if i % 2 else "b", "target_id": "c",
+             "type": "colleague", "created_at": f"2025-01-0{i}T00:00:00+00:00"}
+            for i in range(1, 6)
+        ])
+        cursor = encode_cursor(db.tables["relations"][3], RELATION_KEYS)
+
+        # ACT
+        first = db.table("relations").select("*") \
+            .or_("source_id.in.(a,x),target_id.in.(a,x)") \
+            .order("created_at", desc=True).execute()
+        after = db.table("relations").select("id") \
+            .or_(keyset_filter(cursor, RELATION_KEYS)) \
+            .order("created_at", desc=True).execute()
+
+        # ASSERT
+        assert [r["id"][-1] for r in first.data] == ["5", "3", "1"]
+        assert [r["id"][-1] for r in after.data] == ["3", "2", "1"]
+
+    def test_embedded_selects(self):
+        """Test one-to-many and !inner many-to-one embeds resolve through foreign keys."""
+        # ARRANGE
+        db = FakeSupabase()
+        db.load("entities", [{"id": "e1", "type": "person", "data": {"name": "John Smith"}, "created_by": "test"}])
+        db.load("identifiers", [{"entity_id": "e1", "type": "name", "value": "John Smith"}])
+
+        # ACT
+        people = db.table("entities").select("id, data, identifiers(type, value)").eq("type", "person").execute()
+        entity_id = find_entity_by_identifier(db, "name", "john smith", user_id="test")
+
+        # ASSERT
+        assert people.data == [{
+            "id": "e1",
+            "data": {"name": "John Smith"},
+            "identifiers": [{"type": "name", "value": "John Smith"}],
+        }]
+        assert entity_id == "e1"
+
+    def test_rpc_search_and_shortest_path(self):
+        """Test the built-in RPCs mirror the SQL functions."""
+        # ARRANGE
+        db = FakeSupabase()
+        db.load("entities", [{"id": eid, "type": "person", "data": {}} for eid in ("a", "b", "c")])
+        db.load("identifiers", [
+            {"entity_id": "a", "type": "name", "value": "Anna Berg"},
+            {"entity_id": "b", "type": "name", "value": "Anna"},
+        ])
+        db.load("relations", [
+            {"source_id": "a", "target_id": "b", "type": "friend"},
+            {"source_id": "c", "target_id": "b", "type": "colleague"},
+        ])
+
+        # ACT
+        matches = db.rpc("search_entities_by_identifier", {"p_search_value": "anna"}).execute()
+        path = db.rpc("find_shortest_path", {"p_source_id": "a", "p_target_id": "c", "p_max_depth": 3}).execute()
+
+        # ASSERT
+        assert [m["entity_id"] for m in matches.data] == ["b", "a"]
+        assert path.data == [{
+            "path": ["a", "b", "c"],
+            "depth": 2,
+            "relation_types": ["friend", "colleague"],
+            "path_names": ["Anna Berg", "Anna", None],
+        }]
+
+    def test_unique_constraint_and_single(self):
+        """Test duplicate source codes raise 23505 and single() requires exactly one row."""
+        # ARRANGE
+        db = FakeSupabase()
+        db.table("sources").insert({"code": "LLM"}).execute()
+
+        # ACT / ASSERT
+        with pytest.raises(APIError) as duplicate:
+            db.table("sources").insert({"code": "LLM"}).execute()
+        with pytest.raises(APIError):
+            db.table("sources").select("id").eq("code", "missing").single().execute()
+        assert duplicate.value.code == "23505"
+
+    def test_latency_is_injected_per_round_trip(self):
+        """Test each execute() sleeps for the configured latency."""
+        # ARRANGE
+        db = FakeSupabase(latency=lambda operation, target: 0.02 if target == "intel" else 0.0)
+
+        # ACT
+        start = time.perf_counter()
+        db.table("entities").select("*").execute()
+        db.table("intel").select("*").execute()
+        db.table("intel").select("*").execute()
+        elapsed = time.perf_counter() - start
+
+        # ASSERT
+        assert elapsed >= 0.04
+        assert db.round_trips == 3
+        db.reset_round_trips()
+        assert db.round_trips == 0
+        assert not db.calls
@@ -0,0 +1,57 @@
+"""
+Import-time budget for the service entry point.
+
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+fails if heavy optional modules are loaded at import or if the total import
+time exceeds the budget (IMPORT_TIME_BUDGET_MS, default 2500 ms).
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SERVICE_ROOT = Path(__file__).resolve().parents[2]
+
+# Loaded on demand by get_llm_provider / the date parser fallback
+DEFERRED_MODULES = {"openai", "anthropic", "instructor", "ollama", "dateparser"}
+
+IMPORT_TIME_BUDGET_MS = float(os.environ.get("IMPORT_TIME_BUDGET_MS", "2500"))
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """Return cumulative import time (us) per module for importing `module`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=SERVICE_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImportTime:
+    """Import-time regression checks for app.main."""
+
+    def test_provider_sdks_and_dateparser_are_deferred(self):
+        """Test heavy SDKs are not imported when the app module loads."""
+        times = _import_times("app.main")
+
+        loaded = {name.split(".")[0] for name in times} & DEFERRED_MODULES
+
+        assert not loaded, f"Imported at module load: {sorted(loaded)}"
+
+    def test_import_time_within_budget(self):
+        """Test importing app.main stays within the cold-start budget."""
+        times = _import_times("app.main")
+
+        total_ms = times["app.main"] / 1000
+
+        assert total_ms < IMPORT_TIME_BUDGET_MS, f"import app.main took {total_ms:.0f} ms"
@@ -0,0 +1,58 @@
+"""
+Unit tests for the offline end-to-end load test harness.
+"""
+
+import pytest
+
+import app.services.auth as auth_module
+from app.config import settings
+from benchmarks.load_test import mint_token, parse_mix, run_load_test
+
+
+class TestLoadTest:
+    """Unit tests for run_load_test() and its helpers."""
+
+    def test_parse_mix(self):
+        """Test endpoint weights parse, default to 1 and reject unknown endpoints."""
+        # ACT
+        mix = parse_mix("extract=1,query=2.5,ws")
+
+        # ASSERT
+        assert mix == {"extract": 1.0, "query": 2.5, "ws": 1.0}
+        with pytest.raises(ValueError, match="Unknown endpoint"):
+            parse_mix("briefing=1")
+
+    def test_minted_token_verifies(self):
+        """Test a minted token verifies against its JWKS keys."""
+        # ARRANGE
+        user_id = "00000000-0000-0000-0000-0000000000aa"
+        token, jwks = mint_token(user_id)
+        original = auth_module._jwks_keys
+
+        # ACT
+        auth_module._jwks_keys = jwks
+        try:
+            verified = auth_module.verify_supabase_jwt(token)
+        finally:
+            auth_module._jwks_keys = original
+
+        # ASSERT
+        assert verified == user_id
+
+    def test_run_load_test_offline(self):
+        """Test a short ramp hits every endpoint without errors and restores the service settings."""
+        # ARRANGE
+        provider = settings.llm_provider
+
+        # ACT
+        results = run_load_test(stages=[1, 2], stage_seconds=1.0, mix=parse_mix("extract,query,ws"), size="200")
+
+        # ASSERT
+        assert [r.concurrency for r in results] == [1, 2]
+        for result in results:
+            summary = result.summary()
+            assert set(summary["endpoints"]) == {"extract", "query", "ws"}
+            assert all(row["error_rate"] == 0 for row in summary["endpoints"].values())
+            assert summary["db_round_trips_per_request"] > 0
+        assert settings.llm_provider == provider
+        assert auth_module._jwks_keys is None or "load-test-key" not in auth_module._jwks_keys
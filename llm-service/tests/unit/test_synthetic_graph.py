@@ -0,0 +1,94 @@
+"""
+Unit tests for the synthetic graph generator used by benchmarks.
+"""
+
+import asyncio
+import csv
+from collections import Counter
+
+from app.services.entity_resolver import EntityResolverService
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.synthetic_graph import COPY_COLUMNS, generate, load_into_fake, write_csv
+
+
+class TestSyntheticGraph:
+    """Unit tests for generate() and its loaders."""
+
+    def test_generation_is_deterministic(self):
+        """Test the same seed produces the same rows and notes."""
+        # ACT
+        first = generate(300, seed=7, n_notes=10)
+        second = generate(300, seed=7, n_notes=10)
+
+        # ASSERT
+        assert first.tables == second.tables
+        assert first.notes == second.notes
+        assert len(first.tables["entities"]) == 300
+
+    def test_graph_shape(self):
+        """Test name collisions, nicknames and a heavy-tailed degree distribution."""
+        # ACT
+        graph = generate(2000, seed=1)
+
+        # ASSERT
+        persons = {e["id"]: e["data"]["name"] for e in graph.persons}
+        names = Counter(persons.values())
+        assert max(names.values()) > 1, "Full-name collisions expected"
+
+        nickname_ids = [
+            i["entity_id"] for i in graph.tables["identifiers"]
+            if i["type"] == "name" and i["entity_id"] in persons and i["value"] != persons[i["entity_id"]]
+        ]
+        assert nickname_ids
+
+        degrees = Counter()
+        for r in graph.tables["relations"]:
+            if r["source_id"] in persons and r["target_id"] in persons:
+                degrees[r["source_id"]] += 1
+                degrees[r["target_id"]] += 1
+        ordered = sorted(degrees.values())
+        assert ordered[-1] > 10 * ordered[len(ordered) // 2]
+
+        entity_ids = {e["id"] for e in graph.tables["entities"]}
+        assert all(link["entity_id"] in entity_ids for link in graph.tables["intel_entities"])
+
+    def test_notes_resolve_against_fake(self):
+        """Test full-name note references resolve to their expected entity through the resolver."""
+        # ARRANGE
+        graph = generate(500, seed=3, n_notes=50, collision_rate=0.0)
+        db = FakeSupabase()
+        load_into_fake(graph, db)
+        resolver = EntityResolverService(db)
+        context = asyncio.run(resolver.build_resolution_context(graph.user_id))
+        full_name_refs = [
+            (reference, expected)
+            for note in graph.notes
+            for reference, expected, kind in zip(note.references, note.expected_ids, note.reference_kinds, strict=True)
+            if kind == "full"
+        ]
+
+        # ACT
+        matches = [resolver.exact_match(reference, context.persons) for reference, _ in full_name_refs]
+
+        # ASSERT
+        assert len(context.persons) == len(graph.persons)
+        assert all(
+            expected in {str(p.id) for p in found}
+            for (_, expected), found in zip(full_name_refs, matches, strict=True)
+        )
+
+    def test_write_csv(self, tmp_path):
+        """Test CSV export writes every table with a header and a load script."""
+        # ARRANGE
+        graph = generate(100, seed=0, n_notes=5)
+
+        # ACT
+        load_sql = write_csv(graph, tmp_path)
+
+        # ASSERT
+        with open(tmp_path / "relations.csv", encoding="utf-8") as f:
+            rows = list(csv.reader(f))
+        assert rows[0] == COPY_COLUMNS["relations"]
+        assert len(rows) == len(graph.tables["relations"]) + 1
+        assert load_sql.read_text().count("\\copy") == len(COPY_COLUMNS)
+        assert len((tmp_path / "notes.jsonl").read_text().splitlines()) == 5
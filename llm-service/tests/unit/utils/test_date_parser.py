@@ -0,0 +1,82 @@
+"""
+Unit tests for tiered natural language date parsing.
+
+Tests the fast paths against dateparser's results and the memoization of
+relative phrases.
+"""
+
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+
+from app.utils import date_parser
+from app.utils.date_parser import parse_natural_date
+
+# Friday afternoon
+BASE = datetime(2025, 3, 14, 15, 30, 7)
+
+
+class TestFastPaths:
+    """Unit tests for the ISO/numeric and relative tiers."""
+
+    @pytest.mark.parametrize(
+        "phrase",
+        [
+            "2025-12-15T22:20:52.111656+00:00",
+            "2025-12-15",
+            "2025/03/01",
+            "12/03/2025",
+            "today",
+            "yesterday",
+            "tomorrow",
+            "Friday",
+            "last week",
+            "last month",
+            "3 days ago",
+            "a week ago",
+        ],
+    )
+    def test_matches_dateparser(self, phrase):
+        """Test fast paths return what dateparser returns, without calling it."""
+        # ARRANGE
+        expected = date_parser._parse_with_dateparser(phrase.lower(), BASE)
+
+        # ACT
+        with patch.object(date_parser, "_parse_with_dateparser") as fallback:
+            result = parse_natural_date(phrase, BASE)
+
+        # ASSERT
+        fallback.assert_not_called()
+        assert result == expected
+
+    def test_last_weekday_is_before_today(self):
+        """Test 'last Friday' on a Friday is a week earlier (dateparser returns None)."""
+        assert parse_natural_date("last Friday", BASE) == datetime(2025, 3, 7)
+
+    def test_relative_phrases_are_memoized(self):
+        """Test a phrase is resolved once per reference day."""
+        # ARRANGE
+        date_parser._resolve_relative.cache_clear()
+
+        # ACT
+        parse_natural_date("yesterday", BASE)
+        parse_natural_date("Yesterday", BASE.replace(hour=9))
+        parse_natural_date("yesterday", datetime(2025, 3, 15))
+
+        # ASSERT
+        info = date_parser._resolve_relative.cache_info()
+        assert (info.hits, info.misses) == (1, 2)
+
+
+class TestFallback:
+    """Unit tests for the dateparser fallback."""
+
+    def test_uses_dateparser_for_other_phrases(self):
+        """Test phrases outside the fast tiers fall back to dateparser."""
+        assert parse_natural_date("31st December 2024", BASE) == datetime(2024, 12, 31)
+
+    def test_unparseable_returns_reference_time(self):
+        """Test unparseable input defaults to the reference time."""
+        assert parse_natural_date("not a date", BASE) == BASE
+        assert parse_natural_date("", BASE) == BASE
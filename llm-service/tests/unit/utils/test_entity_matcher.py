@@ -0,0 +1,95 @@
+"""
+Unit tests for identifier normalization and entity lookup by identifier.
+"""
+
+from unittest.mock import MagicMock
+
+import httpx
+import pytest
+
+from app.utils.entity_matcher import (
+    find_entities_by_identifiers,
+    find_entity_by_identifier,
+    normalize_identifier_value,
+)
+from benchmarks.fake_supabase import FakeSupabase
+
+
+class TestNormalizeIdentifierValue:
+    """Unit tests for normalize_identifier_value()."""
+
+    def test_case_accents_and_whitespace_ignored(self):
+        """Test case, accents and surrounding or repeated whitespace normalize away."""
+        # ACT
+        normalized = normalize_identifier_value("  José   Ñúñez\tGarcía ")
+
+        # ASSERT
+        assert normalized == "jose nunez garcia"
+
+    def test_letters_without_decomposition_follow_unaccent(self):
+        """Test letters NFKD leaves alone are transliterated as unaccent does."""
+        # ACT
+        normalized = [normalize_identifier_value(v) for v in ("Søren", "Łukasz", "Straße", "Æsa", "O’Brien")]
+
+        # ASSERT
+        assert normalized == ["soren", "lukasz", "strasse", "aesa", "o'brien"]
+
+
+class TestFindEntitiesByIdentifiers:
+    """Unit tests for find_entities_by_identifiers() and find_entity_by_identifier()."""
+
+    def _db(self) -> FakeSupabase:
+        db = FakeSupabase()
+        db.load("entities", [{"id": e, "type": "person", "data": {}, "created_by": "test"} for e in ("e1", "e2", "e3")])
+        db.load("identifiers", [
+            {"entity_id": "e1", "type": "name", "value": "José García", "created_at": "2025-01-01T00:00:00+00:00"},
+            {"entity_id": "e2", "type": "name", "value": "100% Ana_Lee", "created_at": "2025-01-01T00:00:00+00:00"},
+            {"entity_id": "e3", "type": "name", "value": "jose garcia", "created_at": "2025-02-01T00:00:00+00:00"},
+        ])
+        return db
+
+    def test_batch_lookup_in_one_round_trip(self):
+        """Test every name resolves in one query, keyed by normalized value, oldest identifier first."""
+        # ARRANGE
+        db = self._db()
+
+        # ACT
+        matches = find_entities_by_identifiers(db, "name", ["JOSE  GARCIA", "100% ana_lee", "Nobody"], user_id="test")
+
+        # ASSERT
+        assert matches == {"jose garcia": "e1", "100% ana_lee": "e2"}
+        assert db.round_trips == 1
+
+    def test_wildcard_characters_are_literal(self):
+        """Test "%" and "_" in a value do not act as LIKE wildcards."""
+        # ARRANGE
+        db = self._db()
+
+        # ACT
+        entity_id = find_entity_by_identifier(db, "name", "100% Ana_Le_", user_id="test")
+        wildcard = find_entity_by_identifier(db, "name", "%", user_id="test")
+
+        # ASSERT
+        assert entity_id is None
+        assert wildcard is None
+
+    def test_other_users_entities_not_matched(self):
+        """Test only entities created by the user are matched."""
+        # ARRANGE
+        db = self._db()
+
+        # ACT
+        matches = find_entities_by_identifiers(db, "name", ["José García"], user_id="someone-else")
+
+        # ASSERT
+        assert matches == {}
+
+    def test_lookup_errors_raised(self):
+        """Test a failed lookup raises instead of reporting every value as not found."""
+        # ARRANGE
+        db = self._db()
+        db.table = MagicMock(side_effect=httpx.ConnectError("refused"))
+
+        # ACT / ASSERT
+        with pytest.raises(httpx.HTTPError):
+            find_entities_by_identifiers(db, "name", ["José García"], user_id="test")
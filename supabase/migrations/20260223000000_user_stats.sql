@@ -0,0 +1,289 @@
+-- Migration 4: Per-user aggregation stats
+-- Adds trigger-maintained per-user counters (by entity/relation/intel type), daily activity buckets,
+-- a get_user_stats RPC, and replaces the never-refreshed entity_connection_counts materialized view
+-- with an incrementally maintained table
+
+BEGIN;
+
+-- ============================================================
+-- 1. Counter tables
+-- ============================================================
+
+-- Live (non-deleted) record counts per user, scope and type
+CREATE TABLE user_stats (
+  user_id    UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  scope      VARCHAR(20) NOT NULL,
+  kind       VARCHAR(30) NOT NULL,
+  count      BIGINT NOT NULL DEFAULT 0,
+  updated_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+  PRIMARY KEY (user_id, scope, kind),
+  CONSTRAINT valid_stats_scope CHECK (scope IN ('entities','relations','intel'))
+);
+
+-- Live records per user, scope and creation day (for recent-activity windows)
+CREATE TABLE user_activity_daily (
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  scope   VARCHAR(20) NOT NULL,
+  day     DATE NOT NULL,
+  count   BIGINT NOT NULL DEFAULT 0,
+  PRIMARY KEY (user_id, scope, day),
+  CONSTRAINT valid_activity_scope CHECK (scope IN ('entities','relations','intel'))
+);
+
+-- ============================================================
+-- 2. Counter maintenance
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION bump_user_stats(
+  p_user_id UUID,
+  p_scope VARCHAR,
+  p_kind VARCHAR,
+  p_day DATE,
+  p_delta INTEGER
+)
+RETURNS VOID LANGUAGE plpgsql SECURITY DEFINER SET search_path TO 'public' AS $$
+BEGIN
+  IF p_user_id IS NULL OR p_delta = 0 THEN RETURN; END IF;
+
+  INSERT INTO user_stats (user_id, scope, kind, count)
+  VALUES (p_user_id, p_scope, p_kind, p_delta)
+  ON CONFLICT (user_id, scope, kind)
+  DO UPDATE SET count = user_stats.count + EXCLUDED.count, updated_at = now();
+
+  IF p_day IS NOT NULL THEN
+    INSERT INTO user_activity_daily (user_id, scope, day, count)
+    VALUES (p_user_id, p_scope, p_day, p_delta)
+    ON CONFLICT (user_id, scope, day)
+    DO UPDATE SET count = user_activity_daily.count + EXCLUDED.count;
+  END IF;
+END; $$;
+
+-- Relations have no created_by; they are owned by the creator of their source entity
+CREATE OR REPLACE FUNCTION maintain_user_stats()
+RETURNS TRIGGER LANGUAGE plpgsql SECURITY DEFINER SET search_path TO 'public' AS $$
+DECLARE
+  v_owner UUID;
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.deleted_at IS NULL THEN
+    IF TG_TABLE_NAME = 'relations' THEN
+      SELECT created_by INTO v_owner FROM entities WHERE id = OLD.source_id;
+    ELSE
+      v_owner := OLD.created_by;
+    END IF;
+    PERFORM bump_user_stats(v_owner, TG_TABLE_NAME, OLD.type, OLD.created_at::DATE, -1);
+  END IF;
+
+  IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.deleted_at IS NULL THEN
+    IF TG_TABLE_NAME = 'relations' THEN
+      SELECT created_by INTO v_owner FROM entities WHERE id = NEW.source_id;
+    ELSE
+      v_owner := NEW.created_by;
+    END IF;
+    PERFORM bump_user_stats(v_owner, TG_TABLE_NAME, NEW.type, NEW.created_at::DATE, 1);
+  END IF;
+
+  RETURN NULL;
+END; $$;
+
+CREATE OR REPLACE TRIGGER trg_user_stats_entities
+  AFTER INSERT OR DELETE OR UPDATE OF type, deleted_at, created_by ON entities
+  FOR EACH ROW EXECUTE FUNCTION maintain_user_stats();
+
+CREATE OR REPLACE TRIGGER trg_user_stats_intel
+  AFTER INSERT OR DELETE OR UPDATE OF type, deleted_at, created_by ON intel
+  FOR EACH ROW EXECUTE FUNCTION maintain_user_stats();
+
+CREATE OR REPLACE TRIGGER trg_user_stats_relations
+  AFTER INSERT OR DELETE OR UPDATE OF type, deleted_at, source_id ON relations
+  FOR EACH ROW EXECUTE FUNCTION maintain_user_stats();
+
+-- ============================================================
+-- 3. Backfill
+-- ============================================================
+
+INSERT INTO user_stats (user_id, scope, kind, count)
+SELECT created_by, 'entities', type, COUNT(*)
+FROM entities
+WHERE deleted_at IS NULL AND created_by IS NOT NULL
+GROUP BY created_by, type;
+
+INSERT INTO user_stats (user_id, scope, kind, count)
+SELECT created_by, 'intel', type, COUNT(*)
+FROM intel
+WHERE deleted_at IS NULL AND created_by IS NOT NULL
+GROUP BY created_by, type;
+
+INSERT INTO user_stats (user_id, scope, kind, count)
+SELECT e.created_by, 'relations', r.type, COUNT(*)
+FROM relations r
+JOIN entities e ON e.id = r.source_id
+WHERE r.deleted_at IS NULL AND e.created_by IS NOT NULL
+GROUP BY e.created_by, r.type;
+
+INSERT INTO user_activity_daily (user_id, scope, day, count)
+SELECT created_by, 'entities', created_at::DATE, COUNT(*)
+FROM entities
+WHERE deleted_at IS NULL AND created_by IS NOT NULL
+GROUP BY created_by, created_at::DATE;
+
+INSERT INTO user_activity_daily (user_id, scope, day, count)
+SELECT created_by, 'intel', created_at::DATE, COUNT(*)
+FROM intel
+WHERE deleted_at IS NULL AND created_by IS NOT NULL
+GROUP BY created_by, created_at::DATE;
+
+INSERT INTO user_activity_daily (user_id, scope, day, count)
+SELECT e.created_by, 'relations', r.created_at::DATE, COUNT(*)
+FROM relations r
+JOIN entities e ON e.id = r.source_id
+WHERE r.deleted_at IS NULL AND e.created_by IS NOT NULL
+GROUP BY e.created_by, r.created_at::DATE;
+
+-- ============================================================
+-- 4. Stats RPC (reads counters only: no scans of core tables)
+-- ============================================================
+
+CREATE OR REPLACE FUNCTION get_user_stats(p_user_id UUID)
+RETURNS JSONB LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path TO 'public' AS $$
+DECLARE
+  v_stats JSONB;
+BEGIN
+  -- Authenticated callers may only read their own stats; service_role may read any
+  IF auth.uid() IS NOT NULL AND auth.uid() <> p_user_id THEN
+    RAISE EXCEPTION 'Cannot read stats for another user';
+  END IF;
+
+  SELECT jsonb_build_object(
+    'entities',  COALESCE(SUM(count) FILTER (WHERE scope = 'entities'), 0),
+    'relations', COALESCE(SUM(count) FILTER (WHERE scope = 'relations'), 0),
+    'intel',     COALESCE(SUM(count) FILTER (WHERE scope = 'intel'), 0),
+    'by_entity_type',   COALESCE(jsonb_object_agg(kind, count) FILTER (WHERE scope = 'entities' AND count > 0), '{}'::JSONB),
+    'by_relation_type', COALESCE(jsonb_object_agg(kind, count) FILTER (WHERE scope = 'relations' AND count > 0), '{}'::JSONB),
+    'by_intel_type',    COALESCE(jsonb_object_agg(kind, count) FILTER (WHERE scope = 'intel' AND count > 0), '{}'::JSONB)
+  )
+  INTO v_stats
+  FROM user_stats
+  WHERE user_id = p_user_id;
+
+  RETURN v_stats || jsonb_build_object('recent', (
+    SELECT jsonb_build_object(
+      'last_7_days', jsonb_build_object(
+        'entities',  COALESCE(SUM(count) FILTER (WHERE scope = 'entities' AND day > CURRENT_DATE - 7), 0),
+        'relations', COALESCE(SUM(count) FILTER (WHERE scope = 'relations' AND day > CURRENT_DATE - 7), 0),
+        'intel',     COALESCE(SUM(count) FILTER (WHERE scope = 'intel' AND day > CURRENT_DATE - 7), 0)
+      ),
+      'last_30_days', jsonb_build_object(
+        'entities',  COALESCE(SUM(count) FILTER (WHERE scope = 'entities'), 0),
+        'relations', COALESCE(SUM(count) FILTER (WHERE scope = 'relations'), 0),
+        'intel',     COALESCE(SUM(count) FILTER (WHERE scope = 'intel'), 0)
+      )
+    )
+    FROM user_activity_daily
+    WHERE user_id = p_user_id
+      AND day > CURRENT_DATE - 30
+  ));
+END; $$;
+
+-- ============================================================
+-- 5. entity_connection_counts: materialized view -> maintained table
+-- ============================================================
+
+DROP MATERIALIZED VIEW IF EXISTS entity_connection_counts;
+
+CREATE TABLE entity_connection_counts (
+  id          UUID PRIMARY KEY REFERENCES entities(id) ON DELETE CASCADE,
+  type        VARCHAR(20) NOT NULL,
+  connections BIGINT NOT NULL DEFAULT 0
+);
+
+INSERT INTO entity_connection_counts (id, type, connections)
+SELECT e.id, e.type,
+  COUNT(DISTINCT CASE WHEN r.source_id = e.id THEN r.target_id ELSE r.source_id END) AS connections
+FROM entities e
+LEFT JOIN relations r ON (r.source_id = e.id OR r.target_id = e.id) AND r.deleted_at IS NULL
+WHERE e.deleted_at IS NULL
+GROUP BY e.id, e.type;
+
+-- Recompute one entity's distinct connection count (two index lookups)
+CREATE OR REPLACE FUNCTION refresh_entity_connection_count(p_entity_id UUID)
+RETURNS VOID LANGUAGE plpgsql SECURITY DEFINER SET search_path TO 'public' AS $$
+DECLARE
+  v_type VARCHAR(20);
+BEGIN
+  SELECT type INTO v_type FROM entities WHERE id = p_entity_id AND deleted_at IS NULL;
+
+  IF v_type IS NULL THEN
+    DELETE FROM entity_connection_counts WHERE id = p_entity_id;
+    RETURN;
+  END IF;
+
+  INSERT INTO entity_connection_counts (id, type, connections)
+  SELECT p_entity_id, v_type, COUNT(*)
+  FROM (
+    SELECT target_id AS other FROM relations WHERE source_id = p_entity_id AND deleted_at IS NULL
+    UNION
+    SELECT source_id AS other FROM relations WHERE target_id = p_entity_id AND deleted_at IS NULL
+  ) c
+  ON CONFLICT (id) DO UPDATE SET type = EXCLUDED.type, connections = EXCLUDED.connections;
+END; $$;
+
+CREATE OR REPLACE FUNCTION maintain_connection_counts_relations()
+RETURNS TRIGGER LANGUAGE plpgsql SECURITY DEFINER SET search_path TO 'public' AS $$
+BEGIN
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    PERFORM refresh_entity_connection_count(OLD.source_id);
+    PERFORM refresh_entity_connection_count(OLD.target_id);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    IF TG_OP = 'INSERT' OR NEW.source_id <> OLD.source_id THEN
+      PERFORM refresh_entity_connection_count(NEW.source_id);
+    END IF;
+    IF TG_OP = 'INSERT' OR NEW.target_id <> OLD.target_id THEN
+      PERFORM refresh_entity_connection_count(NEW.target_id);
+    END IF;
+  END IF;
+  RETURN NULL;
+END; $$;
+
+CREATE OR REPLACE FUNCTION maintain_connection_counts_entities()
+RETURNS TRIGGER LANGUAGE plpgsql SECURITY DEFINER SET search_path TO 'public' AS $$
+BEGIN
+  IF TG_OP <> 'DELETE' THEN
+    PERFORM refresh_entity_connection_count(NEW.id);
+  END IF;
+  RETURN NULL;
+END; $$;
+
+CREATE OR REPLACE TRIGGER trg_connection_counts_relations
+  AFTER INSERT OR DELETE OR UPDATE OF source_id, target_id, deleted_at ON relations
+  FOR EACH ROW EXECUTE FUNCTION maintain_connection_counts_relations();
+
+CREATE OR REPLACE TRIGGER trg_connection_counts_entities
+  AFTER INSERT OR UPDATE OF type, deleted_at ON entities
+  FOR EACH ROW EXECUTE FUNCTION maintain_connection_counts_entities();
+
+-- ============================================================
+-- 6. RLS + grants
+-- ============================================================
+
+ALTER TABLE user_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE user_activity_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE entity_connection_counts ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Users can read own user_stats" ON user_stats
+  FOR SELECT USING (user_id = auth.uid());
+CREATE POLICY "Users can read own user_activity_daily" ON user_activity_daily
+  FOR SELECT USING (user_id = auth.uid());
+CREATE POLICY "Users can read entity_connection_counts" ON entity_connection_counts
+  FOR SELECT USING (auth.uid() IS NOT NULL);
+
+GRANT SELECT ON TABLE user_stats TO authenticated, service_role;
+GRANT SELECT ON TABLE user_activity_daily TO authenticated, service_role;
+GRANT ALL ON TABLE entity_connection_counts TO anon, authenticated, service_role;
+GRANT ALL ON FUNCTION get_user_stats(UUID) TO authenticated, service_role;
+
+-- Counter maintenance is trigger-only
+REVOKE ALL ON FUNCTION bump_user_stats(UUID, VARCHAR, VARCHAR, DATE, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION refresh_entity_connection_count(UUID) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
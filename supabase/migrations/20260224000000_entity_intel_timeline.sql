@@ -0,0 +1,66 @@
+-- Migration 5: Entity intel timeline
+-- Adds a get_entity_intel RPC returning the latest intel linked to one or many entities in a
+-- single round-trip (optionally within a time window and after a keyset cursor), backed by a
+-- covering (entity_id, intel_id) partial index on intel_entities
+
+BEGIN;
+
+-- ============================================================
+-- 1. Indexes
+-- ============================================================
+
+-- Index-only lookup of live links for a set of entities
+CREATE INDEX idx_intel_entities_entity_intel ON intel_entities (entity_id, intel_id)
+  WHERE deleted_at IS NULL;
+
+-- ============================================================
+-- 2. Timeline function
+-- ============================================================
+
+-- Latest intel linked to any of p_entity_ids, newest first.
+-- p_from/p_to bound occurred_at as [p_from, p_to); p_before_occurred_at/p_before_id
+-- continue from the last row of a previous page (keyset pagination on (occurred_at, id)).
+-- Runs as the caller so intel RLS policies still apply.
+CREATE OR REPLACE FUNCTION get_entity_intel(
+  p_entity_ids UUID[],
+  p_limit INTEGER DEFAULT 20,
+  p_from TIMESTAMPTZ DEFAULT NULL,
+  p_to TIMESTAMPTZ DEFAULT NULL,
+  p_before_occurred_at TIMESTAMPTZ DEFAULT NULL,
+  p_before_id UUID DEFAULT NULL
+)
+RETURNS TABLE(
+  id UUID,
+  type VARCHAR(20),
+  occurred_at TIMESTAMPTZ,
+  data JSONB,
+  source_id UUID,
+  confidence VARCHAR(20),
+  created_at TIMESTAMPTZ,
+  entity_ids UUID[]
+)
+LANGUAGE plpgsql STABLE SET search_path TO 'public' AS $$
+BEGIN
+  RETURN QUERY
+  WITH linked AS (
+    SELECT ie.intel_id, array_agg(ie.entity_id) AS entity_ids
+    FROM intel_entities ie
+    WHERE ie.entity_id = ANY(p_entity_ids)
+      AND ie.deleted_at IS NULL
+    GROUP BY ie.intel_id
+  )
+  SELECT i.id, i.type, i.occurred_at, i.data, i.source_id, i.confidence, i.created_at, l.entity_ids
+  FROM linked l
+  JOIN intel i ON i.id = l.intel_id
+  WHERE i.deleted_at IS NULL
+    AND (p_from IS NULL OR i.occurred_at >= p_from)
+    AND (p_to IS NULL OR i.occurred_at < p_to)
+    AND (p_before_occurred_at IS NULL OR (i.occurred_at, i.id) < (p_before_occurred_at, p_before_id))
+  ORDER BY i.occurred_at DESC, i.id DESC
+  LIMIT LEAST(GREATEST(p_limit, 1), 1000);
+END; $$;
+
+GRANT ALL ON FUNCTION get_entity_intel(UUID[], INTEGER, TIMESTAMPTZ, TIMESTAMPTZ, TIMESTAMPTZ, UUID)
+  TO anon, authenticated, service_role;
+
+COMMIT;
@@ -0,0 +1,86 @@
+-- Migration 6: Shortest path with names
+-- find_shortest_path also returns the display name of every entity on the path, so callers
+-- (path-finding queries, briefings) do not look names up one entity at a time afterwards
+
+BEGIN;
+
+-- ============================================================
+-- 1. Shortest path between two entities, with names
+-- ============================================================
+
+-- The result columns change, so the function is dropped and recreated.
+-- path_names[i] is the first live name identifier of path[i] (NULL if it has none).
+DROP FUNCTION IF EXISTS find_shortest_path(UUID, UUID, INTEGER);
+
+CREATE FUNCTION find_shortest_path(
+  p_source_id UUID,
+  p_target_id UUID,
+  p_max_depth INTEGER DEFAULT 6
+)
+RETURNS TABLE(
+  path UUID[],
+  depth INTEGER,
+  relation_types VARCHAR[],
+  path_names TEXT[]
+)
+LANGUAGE plpgsql STABLE AS $$
+BEGIN
+  RETURN QUERY
+  WITH RECURSIVE search AS (
+    SELECT
+      ARRAY[p_source_id] AS path,
+      0 AS depth,
+      ARRAY[]::VARCHAR[] AS relation_types
+
+    UNION ALL
+
+    SELECT
+      s.path || connected_id,
+      s.depth + 1,
+      s.relation_types || r.type
+    FROM search s
+    CROSS JOIN LATERAL (
+      SELECT r.id, r.type, r.target_id AS connected_id
+      FROM relations r
+      WHERE r.source_id = s.path[array_length(s.path, 1)]
+        AND r.deleted_at IS NULL
+        AND NOT (r.target_id = ANY(s.path))
+      UNION ALL
+      SELECT r.id, r.type, r.source_id AS connected_id
+      FROM relations r
+      WHERE r.target_id = s.path[array_length(s.path, 1)]
+        AND r.deleted_at IS NULL
+        AND NOT (r.source_id = ANY(s.path))
+    ) r
+    WHERE s.depth < p_max_depth
+  ),
+  shortest AS (
+    SELECT s.path, s.depth, s.relation_types
+    FROM search s
+    WHERE s.path[array_length(s.path, 1)] = p_target_id
+    ORDER BY s.depth
+    LIMIT 1
+  )
+  SELECT
+    sp.path,
+    sp.depth,
+    sp.relation_types,
+    ARRAY(
+      SELECT (
+        SELECT i.value
+        FROM identifiers i
+        WHERE i.entity_id = p.id
+          AND i.type = 'name'
+          AND i.deleted_at IS NULL
+        ORDER BY i.created_at
+        LIMIT 1
+      )
+      FROM unnest(sp.path) WITH ORDINALITY AS p(id, ord)
+      ORDER BY p.ord
+    )
+  FROM shortest sp;
+END; $$;
+
+GRANT ALL ON FUNCTION find_shortest_path(UUID, UUID, INTEGER) TO anon, authenticated, service_role;
+
+COMMIT;
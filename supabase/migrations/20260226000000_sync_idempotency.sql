@@ -0,0 +1,51 @@
+-- Migration 7: Idempotent sync
+-- Adds sync_idempotency_keys, storing the results of each extraction sync under a client-supplied
+-- idempotency key or a fingerprint of (user, source, extraction), so a retried or replayed sync
+-- returns the stored results in one lookup instead of writing duplicate rows
+
+BEGIN;
+
+-- ============================================================
+-- 1. Idempotency keys
+-- ============================================================
+
+-- One row per completed sync; results is the SyncResults JSON returned for it.
+-- Keys are only honoured for a limited time (see SYNC_IDEMPOTENCY_TTL_SECONDS).
+CREATE TABLE sync_idempotency_keys (
+  user_id    UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+  key        TEXT NOT NULL,
+  results    JSONB NOT NULL,
+  created_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+  PRIMARY KEY (user_id, key)
+);
+
+-- Pruning by age
+CREATE INDEX idx_sync_idempotency_keys_created_at ON sync_idempotency_keys (created_at);
+
+-- ============================================================
+-- 2. Pruning
+-- ============================================================
+
+-- Delete keys older than p_older_than; returns the number of rows deleted
+CREATE OR REPLACE FUNCTION prune_sync_idempotency_keys(p_older_than INTERVAL DEFAULT INTERVAL '7 days')
+RETURNS BIGINT LANGUAGE sql AS $$
+  WITH deleted AS (
+    DELETE FROM sync_idempotency_keys
+    WHERE created_at < now() - p_older_than
+    RETURNING 1
+  )
+  SELECT count(*) FROM deleted;
+$$;
+
+-- ============================================================
+-- 3. RLS + grants
+-- ============================================================
+
+-- Written and read by the service role only
+ALTER TABLE sync_idempotency_keys ENABLE ROW LEVEL SECURITY;
+
+GRANT ALL ON TABLE sync_idempotency_keys TO service_role;
+GRANT ALL ON FUNCTION prune_sync_idempotency_keys(INTERVAL) TO service_role;
+REVOKE ALL ON FUNCTION prune_sync_idempotency_keys(INTERVAL) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
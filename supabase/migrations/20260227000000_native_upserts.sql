@@ -0,0 +1,166 @@
+-- Migration 8: Native upserts
+-- Unique indexes on live identifiers, relations and current attributes, and upsert functions
+-- built on them, so sync writes each of these in one batched, race-free statement instead of
+-- a SELECT followed by a conditional INSERT or UPDATE.
+-- The indexes are partial or on expressions, which PostgREST's on_conflict cannot target,
+-- hence the functions.
+
+BEGIN;
+
+-- ============================================================
+-- 1. Remove existing duplicates
+-- ============================================================
+
+-- Identifiers: keep the oldest live row per (entity, type, case-insensitive value)
+UPDATE identifiers SET deleted_at = now()
+WHERE id IN (
+  SELECT id FROM (
+    SELECT id, row_number() OVER (
+      PARTITION BY entity_id, type, lower(value) ORDER BY created_at, id
+    ) AS rn
+    FROM identifiers
+    WHERE deleted_at IS NULL
+  ) d
+  WHERE d.rn > 1
+);
+
+-- Relations: keep the oldest live row per (source, target, type)
+UPDATE relations SET deleted_at = now()
+WHERE id IN (
+  SELECT id FROM (
+    SELECT id, row_number() OVER (
+      PARTITION BY source_id, target_id, type ORDER BY created_at, id
+    ) AS rn
+    FROM relations
+    WHERE deleted_at IS NULL
+  ) d
+  WHERE d.rn > 1
+);
+
+-- Attributes: keep the newest current value per (entity, key)
+UPDATE entity_attributes SET deleted_at = now()
+WHERE id IN (
+  SELECT id FROM (
+    SELECT id, row_number() OVER (
+      PARTITION BY entity_id, key ORDER BY created_at DESC, id DESC
+    ) AS rn
+    FROM entity_attributes
+    WHERE deleted_at IS NULL AND valid_to IS NULL
+  ) d
+  WHERE d.rn > 1
+);
+
+-- ============================================================
+-- 2. Unique indexes
+-- ============================================================
+
+CREATE UNIQUE INDEX idx_identifiers_unique_value
+  ON identifiers (entity_id, type, lower(value))
+  WHERE deleted_at IS NULL;
+
+CREATE UNIQUE INDEX idx_relations_unique_live
+  ON relations (source_id, target_id, type)
+  WHERE deleted_at IS NULL;
+
+-- Replaces the non-unique index on current attributes
+DROP INDEX IF EXISTS idx_ea_current;
+CREATE UNIQUE INDEX idx_ea_current ON entity_attributes (entity_id, key)
+  WHERE deleted_at IS NULL AND valid_to IS NULL;
+
+-- ============================================================
+-- 3. Upsert identifiers
+-- ============================================================
+
+-- p_rows: [{"entity_id", "type", "value", "metadata"}]
+-- Identifiers the entity already has (case-insensitively) are skipped; returns the inserted rows.
+CREATE OR REPLACE FUNCTION upsert_identifiers(p_rows JSONB)
+RETURNS TABLE(id UUID, entity_id UUID, type VARCHAR, value TEXT)
+LANGUAGE sql AS $$
+  INSERT INTO identifiers AS i (entity_id, type, value, metadata)
+  SELECT DISTINCT ON (r.entity_id, r.type, lower(r.value))
+    r.entity_id, r.type, r.value, COALESCE(r.metadata, '{}'::JSONB)
+  FROM jsonb_to_recordset(p_rows) AS r(entity_id UUID, type VARCHAR, value TEXT, metadata JSONB)
+  ON CONFLICT (entity_id, type, lower(value)) WHERE deleted_at IS NULL DO NOTHING
+  RETURNING i.id, i.entity_id, i.type, i.value;
+$$;
+
+-- ============================================================
+-- 4. Upsert relations
+-- ============================================================
+
+-- p_rows: [{"source_id", "target_id", "type", "strength", "valid_from", "valid_to", "data"}]
+-- Returns the live relation for every input row; created is false when it already existed.
+CREATE OR REPLACE FUNCTION upsert_relations(p_rows JSONB)
+RETURNS TABLE(id UUID, source_id UUID, target_id UUID, type VARCHAR, created BOOLEAN)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+DECLARE
+  v_created UUID[];
+BEGIN
+  WITH inserted AS (
+    INSERT INTO relations AS rel (source_id, target_id, type, strength, valid_from, valid_to, data)
+    SELECT DISTINCT ON (r.source_id, r.target_id, r.type)
+      r.source_id, r.target_id, r.type, r.strength, r.valid_from, r.valid_to, COALESCE(r.data, '{}'::JSONB)
+    FROM jsonb_to_recordset(p_rows) AS r(
+      source_id UUID, target_id UUID, type VARCHAR, strength SMALLINT,
+      valid_from DATE, valid_to DATE, data JSONB
+    )
+    ON CONFLICT (source_id, target_id, type) WHERE deleted_at IS NULL DO NOTHING
+    RETURNING rel.id
+  )
+  SELECT COALESCE(array_agg(inserted.id), '{}') INTO v_created FROM inserted;
+
+  -- A new statement, so rows committed concurrently by a conflicting insert are visible
+  RETURN QUERY
+  SELECT rel.id, rel.source_id, rel.target_id, rel.type, rel.id = ANY(v_created)
+  FROM relations rel
+  JOIN (
+    SELECT DISTINCT k.source_id, k.target_id, k.type
+    FROM jsonb_to_recordset(p_rows) AS k(source_id UUID, target_id UUID, type VARCHAR)
+  ) k ON rel.source_id = k.source_id AND rel.target_id = k.target_id AND rel.type = k.type
+  WHERE rel.deleted_at IS NULL;
+END; $$;
+
+-- ============================================================
+-- 5. Upsert current attributes
+-- ============================================================
+
+-- p_rows: [{"entity_id", "key", "value", "confidence", "source_id"}]
+-- A changed value closes the current one (valid_to = today) and becomes current; an unchanged
+-- value is left alone. Returns the number of values written.
+CREATE OR REPLACE FUNCTION upsert_entity_attributes(p_rows JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql AS $$
+DECLARE
+  v_written INTEGER;
+BEGIN
+  UPDATE entity_attributes a
+  SET valid_to = GREATEST(CURRENT_DATE, a.valid_from)
+  FROM jsonb_to_recordset(p_rows) AS r(entity_id UUID, key VARCHAR, value TEXT)
+  WHERE a.entity_id = r.entity_id
+    AND a.key = r.key
+    AND a.valid_to IS NULL
+    AND a.deleted_at IS NULL
+    AND a.value <> r.value;
+
+  INSERT INTO entity_attributes (entity_id, key, value, confidence, source_id)
+  SELECT DISTINCT ON (r.entity_id, r.key)
+    r.entity_id, r.key, r.value, COALESCE(r.confidence, 'medium'), r.source_id
+  FROM jsonb_to_recordset(p_rows) AS r(
+    entity_id UUID, key VARCHAR, value TEXT, confidence VARCHAR, source_id UUID
+  )
+  ON CONFLICT (entity_id, key) WHERE deleted_at IS NULL AND valid_to IS NULL DO NOTHING;
+
+  GET DIAGNOSTICS v_written = ROW_COUNT;
+  RETURN v_written;
+END; $$;
+
+-- ============================================================
+-- 6. Grants
+-- ============================================================
+
+GRANT ALL ON FUNCTION upsert_identifiers(JSONB) TO authenticated, service_role;
+GRANT ALL ON FUNCTION upsert_relations(JSONB) TO authenticated, service_role;
+GRANT ALL ON FUNCTION upsert_entity_attributes(JSONB) TO authenticated, service_role;
+
+COMMIT;
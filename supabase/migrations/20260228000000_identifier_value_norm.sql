@@ -0,0 +1,38 @@
+-- Migration 9: Normalized identifier values
+-- Adds identifiers.value_norm (unaccented, lowercased, whitespace-collapsed) with a
+-- (type, value_norm) index, so identifier lookups are indexed equality matches instead of
+-- ILIKE scans, and can be batched with IN (...)
+
+BEGIN;
+
+CREATE EXTENSION IF NOT EXISTS unaccent WITH SCHEMA extensions;
+
+-- ============================================================
+-- 1. Normalization
+-- ============================================================
+
+-- unaccent() is only STABLE (its dictionary could change), so generated columns and indexes
+-- need an IMMUTABLE wrapper with the dictionary pinned.
+-- Must match normalize_identifier_value() in llm-service/app/utils/entity_matcher.py.
+CREATE OR REPLACE FUNCTION normalize_identifier_value(p_value TEXT)
+RETURNS TEXT
+LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE AS $$
+  SELECT lower(btrim(regexp_replace(
+    extensions.unaccent('extensions.unaccent'::regdictionary, p_value),
+    '\s+', ' ', 'g'
+  )));
+$$;
+
+-- ============================================================
+-- 2. Generated column + index
+-- ============================================================
+
+ALTER TABLE identifiers
+  ADD COLUMN value_norm TEXT GENERATED ALWAYS AS (normalize_identifier_value(value)) STORED;
+
+CREATE INDEX idx_identifiers_type_value_norm ON identifiers (type, value_norm)
+  WHERE deleted_at IS NULL;
+
+GRANT ALL ON FUNCTION normalize_identifier_value(TEXT) TO anon, authenticated, service_role;
+
+COMMIT;
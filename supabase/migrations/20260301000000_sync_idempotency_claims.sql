@@ -0,0 +1,72 @@
+-- Migration 10: Claim-first sync idempotency
+-- A sync claims its idempotency key before writing anything and stores its results on the claim
+-- afterwards, so two concurrent requests with the same key cannot both sync: the second one sees
+-- the claim (in progress) or the stored results (replay). Each row records when it expires, and
+-- every claim deletes expired rows, so the table stays bounded without a scheduled prune.
+
+BEGIN;
+
+-- ============================================================
+-- 1. Claims
+-- ============================================================
+
+-- results is NULL while the sync that claimed the key is running
+ALTER TABLE sync_idempotency_keys ALTER COLUMN results DROP NOT NULL;
+
+-- Set from the claiming key's TTL (client keys and fingerprints are honoured for different times);
+-- existing rows get the default client-key TTL
+ALTER TABLE sync_idempotency_keys
+  ADD COLUMN expires_at TIMESTAMPTZ DEFAULT now() + INTERVAL '1 day' NOT NULL;
+UPDATE sync_idempotency_keys SET expires_at = created_at + INTERVAL '1 day';
+
+CREATE INDEX idx_sync_idempotency_keys_expires_at ON sync_idempotency_keys (expires_at);
+
+-- ============================================================
+-- 2. Claim function
+-- ============================================================
+
+-- Claims (p_user_id, p_key) unless a live row holds it. Returns one row:
+--   claimed = true                    the caller owns the key and must sync, then store results
+--   claimed = false, results not null the stored results of an earlier sync (replay)
+--   claimed = false, results null     an earlier sync with this key is still running
+-- A claimed row expires p_ttl_seconds after it was claimed. Expired rows of every user are deleted
+-- here (only those that expired since the last claim, found through the expires_at index), as is
+-- this key's claim if older than 5 minutes (a sync takes seconds, so such a claim was abandoned by
+-- a failed request).
+CREATE OR REPLACE FUNCTION claim_sync_idempotency_key(p_user_id UUID, p_key TEXT, p_ttl_seconds INTEGER)
+RETURNS TABLE(claimed BOOLEAN, results JSONB)
+LANGUAGE plpgsql AS $$
+#variable_conflict use_column
+BEGIN
+  DELETE FROM sync_idempotency_keys k
+  WHERE k.expires_at < now()
+    OR (
+      k.user_id = p_user_id
+      AND k.key = p_key
+      AND k.results IS NULL
+      AND k.created_at < now() - INTERVAL '5 minutes'
+    );
+
+  RETURN QUERY
+  INSERT INTO sync_idempotency_keys AS k (user_id, key, expires_at)
+  VALUES (p_user_id, p_key, now() + make_interval(secs => p_ttl_seconds))
+  ON CONFLICT (user_id, key) DO NOTHING
+  RETURNING true, NULL::JSONB;
+  IF FOUND THEN
+    RETURN;
+  END IF;
+
+  -- A new statement, so a row committed by a concurrent claim is visible
+  RETURN QUERY
+  SELECT false, k.results FROM sync_idempotency_keys k
+  WHERE k.user_id = p_user_id AND k.key = p_key;
+END; $$;
+
+-- ============================================================
+-- 3. Grants
+-- ============================================================
+
+GRANT ALL ON FUNCTION claim_sync_idempotency_key(UUID, TEXT, INTEGER) TO service_role;
+REVOKE ALL ON FUNCTION claim_sync_idempotency_key(UUID, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+
+COMMIT;
@@ -0,0 +1,53 @@
+-- Migration 11: Identifier uniqueness on value_norm
+-- Identifiers were unique per (entity, type, lower(value)) but looked up by value_norm, so
+-- "José" and "Jose" matched the same entity yet were stored as two identifiers. Uniqueness and
+-- upsert_identifiers now use value_norm, the same key lookups use.
+
+BEGIN;
+
+-- ============================================================
+-- 1. Remove existing duplicates
+-- ============================================================
+
+-- Keep the oldest live row per (entity, type, normalized value)
+UPDATE identifiers SET deleted_at = now()
+WHERE id IN (
+  SELECT id FROM (
+    SELECT id, row_number() OVER (
+      PARTITION BY entity_id, type, value_norm ORDER BY created_at, id
+    ) AS rn
+    FROM identifiers
+    WHERE deleted_at IS NULL
+  ) d
+  WHERE d.rn > 1
+);
+
+-- ============================================================
+-- 2. Unique index
+-- ============================================================
+
+DROP INDEX IF EXISTS idx_identifiers_unique_value;
+CREATE UNIQUE INDEX idx_identifiers_unique_value
+  ON identifiers (entity_id, type, value_norm)
+  WHERE deleted_at IS NULL;
+
+-- ============================================================
+-- 3. Upsert identifiers
+-- ============================================================
+
+-- p_rows: [{"entity_id", "type", "value", "metadata"}]
+-- Identifiers the entity already has (same normalized value) are skipped; returns the inserted rows.
+CREATE OR REPLACE FUNCTION upsert_identifiers(p_rows JSONB)
+RETURNS TABLE(id UUID, entity_id UUID, type VARCHAR, value TEXT)
+LANGUAGE sql AS $$
+  INSERT INTO identifiers AS i (entity_id, type, value, metadata)
+  SELECT DISTINCT ON (r.entity_id, r.type, normalize_identifier_value(r.value))
+    r.entity_id, r.type, r.value, COALESCE(r.metadata, '{}'::JSONB)
+  FROM jsonb_to_recordset(p_rows) AS r(entity_id UUID, type VARCHAR, value TEXT, metadata JSONB)
+  ON CONFLICT (entity_id, type, value_norm) WHERE deleted_at IS NULL DO NOTHING
+  RETURNING i.id, i.entity_id, i.type, i.value;
+$$;
+
+GRANT ALL ON FUNCTION upsert_identifiers(JSONB) TO authenticated, service_role;
+
+COMMIT;
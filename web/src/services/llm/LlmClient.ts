@@ -181,6 +181,7 @@ export class LlmClient {
         context: request.context ?? null,
         source_code: request.source_code ?? "LLM",
         sync_to_db: request.sync_to_db ?? false,
+        idempotency_key: request.idempotency_key ?? null,
         anthropic_api_key: anthropicApiKey || undefined,
       }),
     });
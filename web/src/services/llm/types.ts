@@ -152,6 +152,7 @@ export interface SyncResults {
   entities_updated?: Array<Record<string, unknown>>;
   relations_created?: Array<Record<string, unknown>>;
   intel_created?: Array<Record<string, unknown>>;
+  replayed?: boolean;
   [key: string]: unknown;
 }
 
@@ -167,6 +168,7 @@ export interface ExtractionRequest {
   context?: string | null;
   source_code?: string | null;
   sync_to_db?: boolean;
+  idempotency_key?: string | null;
 }
 
 export interface HealthResponse {